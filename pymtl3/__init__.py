@@ -23,6 +23,7 @@ from .dsl.Connectable import (
     Wire,
 )
 from .dsl.ConstraintTypes import RD, WR, M, U
+from .dsl.Dormant import Dormant
 from .dsl.MetadataKey import MetadataKey
 from .dsl.Placeholder import Placeholder
 from .passes.PassGroups import DefaultPassGroup
@@ -36,7 +37,7 @@ __all__ = [
   'blocking', 'CalleeIfcFL', 'CallerIfcFL',
 
   'DefaultPassGroup',
-  'Component', 'Placeholder', 'MetadataKey',
+  'Component', 'Placeholder', 'Dormant', 'MetadataKey',
 
   'trunc', 'sext', 'zext', 'clog2', 'concat', 'reduce_and', 'reduce_or', 'reduce_xor',
   'mk_bits', 'Bits',
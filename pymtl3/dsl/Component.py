@@ -7,6 +7,7 @@ Add clk/reset signals.
 Author : Yanghui Ou
   Date : Apr 6, 2019
 """
+import os
 
 from .ComponentLevel1 import ComponentLevel1
 from .ComponentLevel7 import ComponentLevel7
@@ -26,6 +27,7 @@ from .errors import (
     NotElaboratedError,
     UnsetMetadataError,
 )
+from .Instrumentation import Instrumentation, measure
 from .MetadataKey import MetadataKey
 from .NamedObject import NamedObject
 from .Placeholder import Placeholder
@@ -445,7 +447,11 @@ class Component( ComponentLevel7 ):
     except:
       pass
 
-    super().elaborate()
+    if 'PYMTL_INSTRUMENT' in os.environ and s.get_instrumentation() is None:
+      s.enable_instrumentation()
+
+    with measure( s, 'elaborate', s.__class__.__name__ ):
+      super().elaborate()
 
     # try:
       # import pypyjit
@@ -457,6 +463,28 @@ class Component( ComponentLevel7 ):
   # Public APIs (can be called either before or after elaboration)
   #-----------------------------------------------------------------------
 
+  """ Instrumentation APIs """
+
+  def enable_instrumentation( s, count_objects=True ):
+    """Record the wall time, the peak RSS increase and the object count
+    increase of every elaboration phase and every pass applied through
+    ``apply``.
+
+    Must be called on the top component before elaboration to measure
+    the elaboration phases.
+
+    Args:
+        count_objects (bool): Whether to count the objects tracked by the
+            garbage collector, which is slow for large designs.
+    """
+    s._dsl.instrumentation = Instrumentation( count_objects )
+
+  def get_instrumentation( s ):
+    """Return the :class:`Instrumentation` of the component, or None if
+    instrumentation is not enabled.
+    """
+    return getattr( s._dsl, 'instrumentation', None )
+
   """ Metadata APIs """
 
   def set_metadata( s, key, value ):
@@ -527,7 +555,8 @@ class Component( ComponentLevel7 ):
     assert type(pass_instance) is not type, f"Should pass in a pass instance like " \
                                             f"'{pass_instance.__name__}()' instead of '{pass_instance.__name__}'"
     assert callable( pass_instance ), f"Should override __call__ of {pass_instance.__name__} for a valid pass"
-    pass_instance( s )
+    with measure( s, 'pass', pass_instance.__class__.__name__ ):
+      return pass_instance( s )
 
   def check( s ):
     s._check_valid_dsl_code()
@@ -560,6 +589,10 @@ class Component( ComponentLevel7 ):
     assert s._dsl.constructed
     return s._dsl.update_ff
 
+  def get_update_ff_rates( s ):
+    assert s._dsl.constructed
+    return s._dsl.update_ff_rates
+
   def get_upblk_metadata( s ):
     assert s._dsl.constructed
     return s._dsl.upblk_reads, s._dsl.upblk_writes, s._dsl.upblk_calls
@@ -613,6 +646,13 @@ class Component( ComponentLevel7 ):
     except AttributeError:
       raise NotElaboratedError()
 
+  def get_all_update_ff_rates( s ):
+    try:
+      s._check_called_at_elaborate_top( "get_all_update_ff_rates" )
+      return s._dsl.all_update_ff_rates
+    except AttributeError:
+      raise NotElaboratedError()
+
   def get_all_update_once( s ):
     try:
       s._check_called_at_elaborate_top( "get_all_update_once" )
@@ -620,6 +660,13 @@ class Component( ComponentLevel7 ):
     except AttributeError:
       raise NotElaboratedError()
 
+  def get_all_wake_on( s ):
+    try:
+      s._check_called_at_elaborate_top( "get_all_wake_on" )
+      return s._dsl.all_wake_on
+    except AttributeError:
+      raise NotElaboratedError()
+
   def get_all_upblk_metadata( s ):
     try:
       s._check_called_at_elaborate_top( "get_all_upblk_metadata" )
@@ -40,14 +40,19 @@ from .errors import (
     VarNotDeclaredError,
     WriteNonSignalError,
 )
+from .Instrumentation import measure
 from .NamedObject import NamedObject
 from .Placeholder import Placeholder
 
 compiled_re = re.compile('( *(@|def))')
 
-def update_ff( blk ):
-  NamedObject._elaborate_stack[-1]._update_ff( blk )
-  return blk
+def update_ff( blk=None, *, period=1, phase=0 ):
+  # @update_ff( period=4, phase=1 ) only executes the block at the clock
+  # edges of the cycles where cycle % period == phase
+  def real_decorator( blk ):
+    NamedObject._elaborate_stack[-1]._update_ff( blk, period, phase )
+    return blk
+  return real_decorator if blk is None else real_decorator( blk )
 
 class ComponentLevel2( ComponentLevel1 ):
 
@@ -59,6 +64,7 @@ class ComponentLevel2( ComponentLevel1 ):
     inst = super().__new__( cls, *args, **kwargs )
 
     inst._dsl.update_ff = set()
+    inst._dsl.update_ff_rates = {}
 
     # constraint[var] = (sign, func)
     inst._dsl.RD_U_constraints = defaultdict(set)
@@ -313,6 +319,7 @@ class ComponentLevel2( ComponentLevel1 ):
 
     if isinstance( m, ComponentLevel2 ):
       s._dsl.all_update_ff |= m._dsl.update_ff
+      s._dsl.all_update_ff_rates.update( m._dsl.update_ff_rates )
 
       for k, k_cons in m._dsl.RD_U_constraints.items():
         s._dsl.all_RD_U_constraints[k] |= k_cons
@@ -370,6 +377,8 @@ class ComponentLevel2( ComponentLevel1 ):
 
     if isinstance( m, ComponentLevel2 ):
       s._dsl.all_update_ff -= m._dsl.update_ff
+      for k in m._dsl.update_ff_rates:
+        del s._dsl.all_update_ff_rates[k]
 
       for k in m._dsl.RD_U_constraints:
         s._dsl.all_RD_U_constraints[k] -= m._dsl.RD_U_constraints[k]
@@ -535,10 +544,17 @@ class ComponentLevel2( ComponentLevel1 ):
     raise PyMTLDeprecationError("\ns.update_on_edge decorator has been deprecated! "
                                 "\n- Please use @update_ff instead.")
 
-  def _update_ff( s, blk ):
+  def _update_ff( s, blk, period=1, phase=0 ):
+    assert isinstance( period, int ) and period >= 1, \
+      f"The period of update_ff block {blk.__name__} should be a positive integer"
+    assert isinstance( phase, int ) and 0 <= phase < period, \
+      f"The phase of update_ff block {blk.__name__} should be in [0, {period})"
+
     super()._update( blk )
 
     s._dsl.update_ff.add( blk )
+    if period > 1:
+      s._dsl.update_ff_rates[ blk ] = ( period, phase )
     s._cache_func_meta( blk, is_update_ff=True ) # add caching of src/ast
 
   # Override
@@ -583,6 +599,7 @@ class ComponentLevel2( ComponentLevel1 ):
     super()._elaborate_declare_vars()
 
     s._dsl.all_update_ff = set()
+    s._dsl.all_update_ff_rates = {}
 
     s._dsl.all_RD_U_constraints = defaultdict(set)
     s._dsl.all_WR_U_constraints = defaultdict(set)
@@ -612,18 +629,24 @@ class ComponentLevel2( ComponentLevel1 ):
   # Override
   def elaborate( s ):
     # Don't directly use the base class elaborate anymore
-    s._elaborate_construct()
+    with measure( s, 'phase', 'construct' ):
+      s._elaborate_construct()
 
     # First elaborate all functions to spawn more named objects
-    for c in s._collect_all_single( lambda s: isinstance( s, ComponentLevel2 ) ):
-      c._elaborate_read_write_func()
+    with measure( s, 'phase', 'read/write functions' ):
+      for c in s._collect_all_single( lambda s: isinstance( s, ComponentLevel2 ) ):
+        c._elaborate_read_write_func()
 
-    s._elaborate_collect_all_named_objects()
+    with measure( s, 'phase', 'collect named objects' ):
+      s._elaborate_collect_all_named_objects()
 
-    s._elaborate_declare_vars()
-    s._elaborate_collect_all_vars()
+    with measure( s, 'phase', 'declare vars' ):
+      s._elaborate_declare_vars()
+    with measure( s, 'phase', 'collect vars' ):
+      s._elaborate_collect_all_vars()
 
-    s._check_valid_dsl_code()
+    with measure( s, 'phase', 'check' ):
+      s._check_valid_dsl_code()
 
   #-----------------------------------------------------------------------
   # Post-elaborate public APIs (can only be called after elaboration)
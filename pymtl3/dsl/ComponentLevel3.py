@@ -41,6 +41,7 @@ from .errors import (
     PyMTLDeprecationError,
     SignalTypeError,
 )
+from .Instrumentation import measure
 from .NamedObject import NamedObject
 from .Placeholder import Placeholder
 
@@ -777,7 +778,8 @@ class ComponentLevel3( ComponentLevel2 ):
   # Override
   def _elaborate_collect_all_vars( s ):
     super()._elaborate_collect_all_vars()
-    s._dsl.all_value_nets = s._resolve_value_connections()
+    with measure( s, 'phase', 'resolve value connections' ):
+      s._dsl.all_value_nets = s._resolve_value_connections()
     s._dsl._has_pending_value_connections = False
 
     s._check_valid_dsl_code()
@@ -30,6 +30,7 @@ class ComponentLevel4( ComponentLevel3 ):
 
     inst._dsl.update_once = set()
     inst._dsl.M_constraints = set()
+    inst._dsl.wake_on = {}
 
     # We don't want to get different objects everytime when we get a
     # method object from an instance. We do this by bounding the method
@@ -60,6 +61,7 @@ class ComponentLevel4( ComponentLevel3 ):
     if isinstance( m, ComponentLevel4 ):
       s._dsl.all_update_once   |= m._dsl.update_once
       s._dsl.all_M_constraints |= m._dsl.M_constraints
+      s._dsl.all_wake_on.update( m._dsl.wake_on )
 
   def _check_upblk_calls( s ):
     all_update_once = s._dsl.all_update_once
@@ -114,3 +116,4 @@ class ComponentLevel4( ComponentLevel3 ):
 
     s._dsl.all_M_constraints = set()
     s._dsl.all_update_once = set()
+    s._dsl.all_wake_on = {}
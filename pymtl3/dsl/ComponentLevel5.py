@@ -12,6 +12,7 @@ from .ComponentLevel2 import ComponentLevel2
 from .ComponentLevel4 import ComponentLevel4
 from .Connectable import CalleePort, CallerPort, Const, Interface, MethodPort, Signal
 from .errors import InvalidConnectionError, MultiWriterError
+from .Instrumentation import measure
 from .NamedObject import NamedObject
 from .Placeholder import Placeholder
 
@@ -153,8 +154,10 @@ class ComponentLevel5( ComponentLevel4 ):
       elif isinstance( c, MethodPort ):
         s._dsl.all_method_ports.add( c )
 
-    s._dsl.all_value_nets  = s._resolve_value_connections()
+    with measure( s, 'phase', 'resolve value connections' ):
+      s._dsl.all_value_nets  = s._resolve_value_connections()
     # Added here
-    s._dsl.all_method_nets = s._resolve_method_connections()
+    with measure( s, 'phase', 'resolve method connections' ):
+      s._dsl.all_method_nets = s._resolve_method_connections()
     s._dsl._has_pending_value_connections = False
     s._dsl._has_pending_method_connections = False
@@ -0,0 +1,43 @@
+"""
+========================================================================
+Dormant.py
+========================================================================
+A mixin for components whose update_once blocks may sleep, e.g.
+
+  class DelayPipeDeqCL( Dormant, Component ):
+
+A sleeping block is skipped by the schedule until it is woken up.
+Dormancy is only a hint for the simulator, so sleep and wake are no-ops
+unless the simulator supports it (see DormancyPass), and a sleeping
+block must behave correctly if it still executes.
+
+Author : Batten Research Group
+  Date : Oct 17, 2026
+"""
+
+class Dormant:
+
+  #-----------------------------------------------------------------------
+  # Construction-time APIs
+  #-----------------------------------------------------------------------
+
+  def wake_on( s, blk, *methods ):
+    """ Allow the update_once block blk to sleep with s.sleep( blk ). A
+    sleeping block is woken up when any of the methods (method ports or
+    non-blocking interfaces of s) is called. """
+    assert blk in s._dsl.update_once, \
+      f"{blk.__name__} is not an update_once block of this component"
+    s._dsl.wake_on.setdefault( blk, [] ).extend( methods )
+
+  #-----------------------------------------------------------------------
+  # Simulation-time APIs
+  #-----------------------------------------------------------------------
+
+  def sleep( s, blk, ncycles=None ):
+    """ Put blk to sleep until one of its wake_on methods is called, or
+    at most ncycles cycles, i.e. blk executes again ncycles cycles later
+    at the latest. """
+
+  def wake( s, blk ):
+    """ Wake up blk so that it executes in its next position of the
+    schedule. """
@@ -0,0 +1,128 @@
+"""
+========================================================================
+Instrumentation.py
+========================================================================
+Optional instrumentation of elaboration and pass application. Call
+top.enable_instrumentation() before elaboration, or set the
+PYMTL_INSTRUMENT environment variable, and every elaboration phase and
+every pass applied through top.apply records
+
+- the wall time,
+- the increase of the peak resident set size of the process, which is
+  zero unless the phase allocates beyond the previous peak,
+- the increase of the number of objects tracked by the garbage
+  collector.
+
+Passes applied inside a pass group are nested under the pass group.
+top.get_instrumentation() returns the Instrumentation object, which can
+format a text report and dump the records to JSON. Nothing is measured
+if instrumentation is not enabled.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+import gc
+import json
+import sys
+from time import perf_counter
+
+try:
+  import resource
+except ImportError: # e.g. Windows
+  resource = None
+
+def get_peak_rss():
+  """ Return the peak resident set size of this process in bytes, or 0
+  if it is not available on this platform. """
+  if resource is None:
+    return 0
+  peak = resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss
+  # Linux reports kilobytes and macOS reports bytes
+  return peak if sys.platform == 'darwin' else peak * 1024
+
+class _NullMeasure:
+  def __enter__( s ):
+    return None
+  def __exit__( s, *args ):
+    return False
+
+_null_measure = _NullMeasure()
+
+class _Measure:
+  def __init__( s, inst, kind, name ):
+    s.inst = inst
+    s.rec  = { 'kind': kind, 'name': name, 'children': [] }
+
+  def __enter__( s ):
+    inst, rec = s.inst, s.rec
+    ( inst._stack[-1]['children'] if inst._stack else inst.records ).append( rec )
+    inst._stack.append( rec )
+
+    s.objects = len( gc.get_objects() ) if inst.count_objects else 0
+    s.rss     = get_peak_rss()
+    s.t0      = perf_counter()
+    return rec
+
+  def __exit__( s, *args ):
+    rec = s.rec
+    rec['seconds']        = perf_counter() - s.t0
+    rec['peak_rss_delta'] = get_peak_rss() - s.rss
+    if s.inst.count_objects:
+      rec['objects']       = len( gc.get_objects() )
+      rec['objects_delta'] = rec['objects'] - s.objects
+    s.inst._stack.pop()
+    return False
+
+class Instrumentation:
+
+  def __init__( s, count_objects=True ):
+    # Counting the objects walks all objects tracked by the garbage
+    # collector, which is slow for large designs
+    s.count_objects = count_objects
+    s.records = []
+    s._stack  = []
+
+  def measure( s, kind, name ):
+    """ Return a context manager that records the block as a child of
+    the current record. """
+    return _Measure( s, kind, name )
+
+  def find( s, name ):
+    """ Return all records with the given name in pre-order. """
+    ret = []
+    def visit( recs ):
+      for x in recs:
+        if x['name'] == name:
+          ret.append( x )
+        visit( x['children'] )
+    visit( s.records )
+    return ret
+
+  def to_dict( s ):
+    return {
+      'peak_rss' : get_peak_rss(),
+      'records'  : s.records,
+    }
+
+  def dump_json( s, path ):
+    with open( path, 'w' ) as f:
+      json.dump( s.to_dict(), f, indent=1 )
+
+  def format_report( s ):
+    lines = [ f"{'time(ms)':>10} {'rss(MB)':>8} {'objects':>9}  phase/pass" ]
+    def visit( recs, depth ):
+      for x in recs:
+        objs = f"{x['objects_delta']:+9}" if 'objects_delta' in x else f"{'-':>9}"
+        lines.append( f"{x['seconds']*1e3:10.2f} {x['peak_rss_delta']/2**20:+8.1f} {objs}  "
+                      f"{'  '*depth}{x['name']} ({x['kind']})" )
+        visit( x['children'], depth+1 )
+    visit( s.records, 0 )
+    return "\n".join( lines )
+
+def measure( top, kind, name ):
+  """ Return a context manager that measures the block if instrumentation
+  is enabled on top, otherwise a shared no-op context manager. """
+  inst = getattr( top._dsl, 'instrumentation', None )
+  if inst is None:
+    return _null_measure
+  return inst.measure( kind, name )
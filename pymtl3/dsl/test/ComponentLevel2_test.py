@@ -778,3 +778,22 @@ def test_write_interface_update_ff():
     print("{} is thrown\n{}".format( e.__class__.__name__, e ))
     return
   raise Exception("Should've thrown WriteNonSignalError.")
+
+def test_update_ff_invalid_phase():
+
+  class Top(ComponentLevel2):
+    def construct( s ):
+      s.x = Wire(Bits32)
+
+      @update_ff( period=4, phase=4 )
+      def up():
+        s.x <<= s.x + 1
+
+  x = Top()
+  try:
+    x.elaborate()
+  except AssertionError as e:
+    print("{} is thrown\n{}".format( e.__class__.__name__, e ))
+    assert "phase" in str(e)
+    return
+  raise Exception("Should've thrown AssertionError.")
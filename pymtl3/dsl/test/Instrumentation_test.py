@@ -0,0 +1,99 @@
+"""
+========================================================================
+Instrumentation_test.py
+========================================================================
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+import json
+
+from pymtl3.datatypes import Bits8
+from pymtl3.dsl import Component, InPort, OutPort, update
+from pymtl3.passes.PassGroups import DefaultPassGroup
+
+
+class Incr( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits8 )
+    s.out = OutPort( Bits8 )
+
+    @update
+    def up():
+      s.out @= s.in_ + 1
+
+class Chain( Component ):
+  def construct( s, N=4 ):
+    s.in_ = InPort( Bits8 )
+    s.out = OutPort( Bits8 )
+
+    s.incrs = [ Incr() for _ in range(N) ]
+    s.incrs[0].in_ //= s.in_
+    for i in range(N-1):
+      s.incrs[i].out //= s.incrs[i+1].in_
+    s.out //= s.incrs[-1].out
+
+def test_elaborate_and_passes( tmp_path ):
+  top = Chain()
+  top.enable_instrumentation()
+  top.apply( DefaultPassGroup( print_line_trace=False ) )
+
+  inst = top.get_instrumentation()
+  elaborate, group = inst.records
+  assert ( elaborate['kind'], elaborate['name'] ) == ( 'elaborate', 'Chain' )
+  assert ( group['kind'], group['name'] ) == ( 'pass', 'DefaultPassGroup' )
+
+  phases = [ x['name'] for x in elaborate['children'] ]
+  assert phases == [ 'construct', 'read/write functions', 'collect named objects',
+                     'declare vars', 'collect vars', 'check' ]
+  collect = elaborate['children'][4]
+  assert [ x['name'] for x in collect['children'] ] == \
+         [ 'resolve value connections', 'resolve method connections' ]
+  # The collector may free the garbage of other tests during construct
+  assert 'objects_delta' in elaborate['children'][0]
+
+  # The passes in the pass group are nested
+  passes = [ x['name'] for x in group['children'] ]
+  assert passes[0] == 'LineTraceParamPass' and passes[-1] == 'PrepareSimPass'
+  assert 'DynamicSchedulePass' in passes
+
+  # The optional passes don't run by default
+  assert passes == [ 'LineTraceParamPass', 'GenDAGPass', 'WrapGreenletPass',
+                     'CLLineTracePass', 'DynamicSchedulePass', 'VcdGenerationPass',
+                     'PrintTextWavePass', 'PrepareSimPass' ]
+  assert all( x['seconds'] >= 0 and x['peak_rss_delta'] >= 0 for x in group['children'] )
+
+  assert len( inst.find( 'GenDAGPass' ) ) == 1
+  report = inst.format_report()
+  assert report.splitlines()[-1].endswith( "  PrepareSimPass (pass)" )
+
+  inst.dump_json( tmp_path / "inst.json" )
+  with open( tmp_path / "inst.json" ) as f:
+    data = json.load( f )
+  assert data['records'][1]['children'][0]['name'] == 'LineTraceParamPass'
+
+  # The simulation is not affected
+  top.sim_reset()
+  top.in_ @= 3
+  top.sim_eval_combinational()
+  assert top.out == 7
+
+def test_disabled():
+  top = Chain()
+  top.apply( DefaultPassGroup( print_line_trace=False ) )
+  assert top.get_instrumentation() is None
+
+def test_env( monkeypatch ):
+  monkeypatch.setenv( 'PYMTL_INSTRUMENT', '1' )
+  top = Chain( N=2 )
+  top.elaborate()
+  inst = top.get_instrumentation()
+  assert [ x['name'] for x in inst.records ] == [ 'Chain' ]
+
+def test_no_object_count():
+  top = Chain()
+  top.enable_instrumentation( count_objects=False )
+  top.elaborate()
+  rec = top.get_instrumentation().records[0]
+  assert 'objects_delta' not in rec
+  assert "-" in top.get_instrumentation().format_report()
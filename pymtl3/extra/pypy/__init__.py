@@ -1 +1,2 @@
 from .custom_exec import custom_exec
+from .exec_ast import exec_ast
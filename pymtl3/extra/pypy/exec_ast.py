@@ -0,0 +1,32 @@
+#=========================================================================
+# exec_ast.py
+#=========================================================================
+# Execute a generated module AST with custom_exec. If ast.unparse is
+# available (Python 3.9+), we compile the module from its source and add
+# the source to linecache, so that tracebacks show meaningful lines.
+# Otherwise, we compile the AST directly with all lines numbered 1.
+#
+# Author : Batten Research Group
+# Date   : Oct 17, 2026
+
+import ast
+from linecache import cache as line_cache
+
+from .custom_exec import custom_exec
+
+
+def exec_ast( module, filename, _globals, _locals ):
+  # Return the source of module, or None if it cannot be unparsed
+  ast.fix_missing_locations( module )
+
+  if hasattr( ast, 'unparse' ):
+    src = ast.unparse( module )
+    line_cache[ filename ] = ( len(src), None, src.splitlines(), filename )
+    custom_exec( compile( src, filename, "exec" ), _globals, _locals )
+    return src
+
+  for node in ast.walk( module ):
+    if hasattr( node, 'lineno' ):
+      node.lineno = 1
+  custom_exec( compile( module, filename, "exec" ), _globals, _locals )
+  return None
@@ -1,12 +1,23 @@
 from .autotick.OpenLoopCLPass import OpenLoopCLPass
 from .BasePass import BasePass
+from .sim.CheckpointPass import CheckpointPass
+from .sim.ConeOfInfluencePass import ConeOfInfluencePass
+from .sim.DeadLogicEliminationPass import DeadLogicEliminationPass
+from .sim.DormancyPass import DormancyPass
 from .sim.DynamicSchedulePass import DynamicSchedulePass
+from .sim.EventDrivenSchedulePass import EventDrivenSchedulePass
+from .sim.FastForwardPass import FastForwardPass
 from .sim.GenDAGPass import GenDAGPass
+from .sim.ParallelSchedulePass import ParallelSchedulePass
 from .sim.PrepareSimPass import PrepareSimPass
+from .sim.ProfileSimPass import ProfileSimPass
+from .sim.SimCachePass import SimCachePass
 from .sim.SimpleSchedulePass import SimpleSchedulePass
 from .sim.SimpleTickPass import SimpleTickPass
 from .sim.WrapGreenletPass import WrapGreenletPass
+from .tracing.BinaryWavePass import BinaryWavePass
 from .tracing.CLLineTracePass import CLLineTracePass
+from .tracing.FlightRecorderPass import FlightRecorderPass
 from .tracing.LineTraceParamPass import LineTraceParamPass
 from .tracing.PrintTextWavePass import PrintTextWavePass
 from .tracing.VcdGenerationPass import VcdGenerationPass
@@ -26,40 +37,130 @@ class SimpleSimPass( BasePass ):
     PrepareSimPass(print_line_trace=True)( top )
 
 class DefaultPassGroup( BasePass ):
+  SchedulePass = DynamicSchedulePass
+
+  # The options after reset_active_high enable optional passes, which
+  # don't run unless their option or metadata is set.
+
   def __init__( s, *, vcdwave=None, textwave=False,
-                      print_line_trace=True, reset_active_high=True ):
+                      print_line_trace=True, reset_active_high=True,
+                      binwave=None, flight_recorder=0, cache_dir=None,
+                      alias_nets=False, dormancy=False, observed=None,
+                      dead_logic=False, checkpoint=False, fast_forward=False,
+                      profile=None ):
 
     s.vcdwave = vcdwave
     s.textwave = textwave
     s.print_line_trace = print_line_trace
     s.reset_active_high = reset_active_high
+    s.binwave = binwave
+    s.flight_recorder = flight_recorder
+    s.cache_dir = cache_dir
+    s.alias_nets = alias_nets
+    s.dormancy = dormancy
+    s.observed = observed
+    s.dead_logic = dead_logic
+    s.checkpoint = checkpoint
+    s.fast_forward = fast_forward
+    s.profile = profile
 
   def __call__( s, top ):
 
     if s.vcdwave:
-      top.set_metadata( VcdGenerationPass.vcdwave, s.vcdwave )
+      top.set_metadata( VcdGenerationPass.vcd_file_name, s.vcdwave )
 
     if s.textwave:
       top.set_metadata( PrintTextWavePass.enable, True )
 
-    LineTraceParamPass()( top )
-    GenDAGPass()( top )
-    WrapGreenletPass()( top )
-    CLLineTracePass()( top )
-    DynamicSchedulePass()( top )
-    VcdGenerationPass()( top )
-    PrintTextWavePass()( top )
+    if s.binwave:
+      top.set_metadata( BinaryWavePass.wave_file_name, s.binwave )
+
+    if s.flight_recorder:
+      top.set_metadata( FlightRecorderPass.recorder_cycles, s.flight_recorder )
+
+    if s.cache_dir:
+      top.set_metadata( SimCachePass.cache_dir, s.cache_dir )
+
+    if s.alias_nets:
+      top.set_metadata( GenDAGPass.alias_nets, True )
+
+    if s.observed is not None:
+      top.set_metadata( ConeOfInfluencePass.observed, list( s.observed ) )
+
+    if s.profile:
+      top.set_metadata( ProfileSimPass.mode, s.profile )
+
+    top.apply( LineTraceParamPass() )
+
+    if top.has_metadata( SimCachePass.cache_dir ):
+      top.apply( SimCachePass() )
+
+    top.apply( GenDAGPass() )
+    top.apply( WrapGreenletPass() )
+    top.apply( CLLineTracePass() )
 
-    PrepareSimPass(print_line_trace=s.print_line_trace,
-                   reset_active_high=s.reset_active_high)( top )
+    if s.dormancy:
+      top.apply( DormancyPass() )
+
+    if top.has_metadata( ConeOfInfluencePass.observed ):
+      top.apply( ConeOfInfluencePass() )
+
+    if s.dead_logic:
+      top.apply( DeadLogicEliminationPass() )
+
+    top.apply( s.SchedulePass() )
+    top.apply( VcdGenerationPass() )
+
+    if top.has_metadata( BinaryWavePass.wave_file_name ):
+      top.apply( BinaryWavePass() )
+
+    if top.has_metadata( FlightRecorderPass.recorder_cycles ):
+      top.apply( FlightRecorderPass() )
+
+    top.apply( PrintTextWavePass() )
+
+    if s.checkpoint:
+      top.apply( CheckpointPass() )
+
+    if s.fast_forward:
+      top.apply( FastForwardPass() )
+
+    if s.profile:
+      top.apply( ProfileSimPass() )
+
+    top.apply( PrepareSimPass(print_line_trace=s.print_line_trace,
+                              reset_active_high=s.reset_active_high) )
+
+# EventDrivenPassGroup is a drop-in replacement of DefaultPassGroup that
+# only re-executes the update blocks whose inputs have changed.
+class EventDrivenPassGroup( DefaultPassGroup ):
+  SchedulePass = EventDrivenSchedulePass
+
+# ParallelPassGroup is a drop-in replacement of DefaultPassGroup that
+# executes independent update blocks on multiple threads on free-threaded
+# Python builds.
+class ParallelPassGroup( DefaultPassGroup ):
+  SchedulePass = ParallelSchedulePass
+
+  def __init__( s, *, nthreads=None, **kwargs ):
+    super().__init__( **kwargs )
+    s.nthreads = nthreads
+
+  def __call__( s, top ):
+    if s.nthreads is not None:
+      top.set_metadata( ParallelSchedulePass.nthreads, s.nthreads )
+    super().__call__( top )
 
 class AutoTickSimPass( BasePass ):
-  def __init__( s, print_line_trace=True ):
+  def __init__( s, print_line_trace=True, dormancy=False ):
     s.print_line_trace = print_line_trace
+    s.dormancy = dormancy
 
   def __call__( s, top ):
     top.elaborate()
     GenDAGPass()( top )
     WrapGreenletPass()( top )
+    if s.dormancy:
+      DormancyPass()( top )
     OpenLoopCLPass( s.print_line_trace )( top )
     top.lock_in_simulation()
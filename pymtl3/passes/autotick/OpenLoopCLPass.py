@@ -20,10 +20,14 @@ from pymtl3.dsl.errors import UpblkCyclicError
 
 from ..BasePass import BasePass, PassMetadata
 from ..errors import PassOrderError
+from ..sim.DormancyPass import DormancyPass
 from ..sim.PrepareSimPass import PrepareSimPass
+from ..sim.SimHooks import SimHooks, call_hooks
 from ..sim.SimpleSchedulePass import SimpleSchedulePass, dump_dag
 from ..sim.SimpleTickPass import SimpleTickPass
+from ..tracing.BinaryWavePass import BinaryWavePass
 from ..tracing.CLLineTracePass import CLLineTracePass
+from ..tracing.FlightRecorderPass import FlightRecorderPass
 from ..tracing.PrintTextWavePass import PrintTextWavePass
 from ..tracing.VcdGenerationPass import VcdGenerationPass
 
@@ -364,12 +368,19 @@ class OpenLoopCLPass( BasePass ):
 
     # call ff blocks first
     ffs.extend( top._sched.schedule_ff )
+    ffs.extend( PrepareSimPass.create_multirate_ff( top ) )
 
     # append tracing related work
 
     if top.has_metadata( VcdGenerationPass.vcd_func ):
       ffs.append( top.get_metadata( VcdGenerationPass.vcd_func ) )
 
+    if top.has_metadata( BinaryWavePass.wave_func ):
+      ffs.append( top.get_metadata( BinaryWavePass.wave_func ) )
+
+    if top.has_metadata( FlightRecorderPass.record_func ):
+      ffs.append( top.get_metadata( FlightRecorderPass.record_func ) )
+
     if top.has_metadata( PrintTextWavePass.textwave_func ):
       ffs.append( top.get_metadata( PrintTextWavePass.textwave_func ) )
 
@@ -380,6 +391,11 @@ class OpenLoopCLPass( BasePass ):
     if top.has_metadata( CLLineTracePass.clear_cl_trace_func ):
       ffs.append( top.get_metadata( CLLineTracePass.clear_cl_trace_func ) )
 
+    # Skip the sleeping blocks. This also wraps the methods that wake up
+    # blocks, so we do it after collecting the top level callee ports.
+    if hasattr( top, "_dormancy" ):
+      update_schedule, advance = DormancyPass.bind_schedule( top, update_schedule )
+      ffs.append( advance )
 
     top._sched.new_schedule_index  = 0
     top._sched.orig_schedule_index = 0
@@ -481,3 +497,5 @@ class OpenLoopCLPass( BasePass ):
 
     PrepareSimPass.create_lock_unlock_simulation( top )
     PrepareSimPass.create_sim_cycle_count( top )
+
+    call_hooks( top, SimHooks.sim_api_hooks )
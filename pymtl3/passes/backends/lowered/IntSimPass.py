@@ -0,0 +1,262 @@
+"""
+========================================================================
+IntSimPass.py
+========================================================================
+Simulate a pure-RTL design with plain Python ints instead of Bits
+objects. The update blocks are lowered into straight-line code over a
+flat list of ints, one slot per net, with explicit masks computed from
+the bitwidths that the RTLIR type check pass infers. No Bits object is
+created or range-checked inside the simulation.
+
+Only the ports of the top component are Bits objects. They are loaded
+into the state before every evaluation and written back afterwards, so
+
+- top.in_ @= 3; top.sim_tick(); assert top.out == 4
+
+works like in a normal simulation. Signals inside the design are not
+swapped with values; use top.sim_read( signal ) and
+top.sim_write( signal, value ) to access them.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+from pymtl3.datatypes import b1, is_bitstruct_class
+from pymtl3.passes.BasePass import BasePass, PassMetadata
+from pymtl3.passes.rtlir import BehavioralRTLIR as bir
+
+from .RTLIRLowering import (
+    LoweredDesign,
+    LoweringGen,
+    _type_nbits,
+    get_field_range,
+    int_to_value,
+    mask,
+    value_to_int,
+)
+
+#-------------------------------------------------------------------------
+# IntLoweringGen
+#-------------------------------------------------------------------------
+
+class IntLoweringGen( LoweringGen ):
+
+  def mk_table( s, values ):
+    return values
+
+  def index_table( s, table, idx, vec ):
+    return ( f"{table}[{idx}]", vec )
+
+  def read_slot( s, slot ):
+    if isinstance( slot, int ):
+      return ( f"S[{slot}]", True )
+    table, idx, vec = slot
+    return ( f"S[{table}[{idx}]]", True )
+
+  def write_bits( s, bits, value, seq ):
+    arr = "X" if seq else "S"
+    if seq:
+      s.record_seq_slot( bits.slot )
+
+    if isinstance( bits.slot, int ):
+      dst = f"{arr}[{bits.slot}]"
+    else:
+      table, idx, vec = bits.slot
+      row = s.fresh( "_r" )
+      s.emit( f"{row} = {table}[{idx}]" )
+      dst = f"{arr}[{row}]"
+
+    s.emit( f"{dst} = {s.merge_bits( bits, dst, value )}" )
+
+  def write_tmpvar( s, name, value ):
+    s.emit( f"{name} = {value[0]}" )
+
+  def gen_if( s, cond, body, orelse ):
+    s.emit( f"if {cond[0]}:" )
+    s.gen_suite( body )
+    if orelse:
+      s.emit( "else:" )
+      s.gen_suite( orelse )
+
+  def select( s, cond, body, orelse ):
+    (c, cvec), (b, bvec), (o, ovec) = cond, body, orelse
+    return ( f"(({b}) if ({c}) else ({o}))", cvec or bvec or ovec )
+
+  def to_value( s, code, vec ):
+    return ( f"(1 if {code} else 0)", vec )
+
+  def reduce_value( s, op, code, vec, nbits ):
+    if op is bir.BitXor:
+      return ( f"(bin( {code} ).count( '1' ) & 1)", vec )
+    if op is bir.BitAnd:
+      return s.to_value( f"(({code}) == {mask(nbits)})", vec )
+    return s.to_value( f"(({code}) != 0)", vec )
+
+  def shift( s, left, right, nbits, is_left ):
+    (l, lvec), (r, rvec) = left, right
+    # Python ints never overflow, so a right shift by any amount is fine
+    # but a left shift has to be guarded against huge amounts
+    if is_left:
+      return ( f"((({l}) << ({r})) & {mask(nbits)} if ({r}) < {nbits} else 0)", lvec or rvec )
+    return ( f"(({l}) >> ({r}))", lvec or rvec )
+
+  def power( s, left, right, nbits ):
+    (l, lvec), (r, rvec) = left, right
+    return ( f"pow( {l}, {r}, {1 << nbits} )", lvec or rvec )
+
+  def gen_flip( s ):
+    for k in sorted( s.seq_slots ):
+      s.emit( f"S[{k}] = X[{k}]" )
+
+#-------------------------------------------------------------------------
+# Boundary of the top component
+#-------------------------------------------------------------------------
+
+def _leaves( Type, path, lo ):
+  """ Yield ( path, lo, nbits ) of every Bits field of a value of Type. """
+  if is_bitstruct_class( Type ):
+    for name, t in Type.__bitstruct_fields__.items():
+      yield from _leaves( t, f"{path}.{name}", lo + get_field_range( Type, name )[0] )
+  elif isinstance( Type, list ):
+    nbits = _type_nbits( Type[0] )
+    for i in range( len(Type) ):
+      yield from _leaves( Type[0], f"{path}[{i}]", lo + i * nbits )
+  else:
+    yield ( path, lo, Type.nbits )
+
+def _set_port_value( port, value ):
+  """ Replace the port object in its host with value. """
+  dsl = port._dsl
+  obj = getattr( dsl.parent_obj, dsl._my_name )
+  if not dsl._my_indices:
+    setattr( dsl.parent_obj, dsl._my_name, value )
+  else:
+    for i in dsl._my_indices[:-1]:
+      obj = obj[i]
+    obj[ dsl._my_indices[-1] ] = value
+
+#-------------------------------------------------------------------------
+# IntSimPass
+#-------------------------------------------------------------------------
+
+class IntSimPass( BasePass ):
+
+  def __init__( s, *, reset_active_high=True ):
+    s.reset_active_high = reset_active_high
+
+  def __call__( s, top ):
+    design = LoweredDesign( top )
+
+    S = [ 0 ] * design.nslots
+    X = [ 0 ] * design.nslots
+
+    gen = IntLoweringGen( design )
+    gen.namespace.update({ 'S': S, 'X': X })
+
+    def gen_ff_body():
+      gen.gen_ff_body()
+      gen.gen_flip()
+
+    srcs = [ gen.gen_function( "comb", "S=S, X=X", gen.gen_comb_body ),
+             gen.gen_function( "ff",   "S=S, X=X", gen_ff_body ) ]
+    srcs.extend( s.gen_boundary( top, design, gen ) )
+    gen.compile( "\n".join( srcs ), f"<int sim of {top.__class__.__name__}>" )
+
+    top._lowered = sim = PassMetadata()
+    sim.design = design
+    sim.srcs   = srcs
+    sim.state  = S
+    sim.next_state = X
+    sim.simulated_cycles = 0
+
+    s.create_sim_apis( top, sim, gen.namespace )
+
+  def gen_boundary( s, top, design, gen ):
+    """ Swap the ports of the top component with Bits objects and return
+    the source of the functions that copy them from/to the state. """
+
+    ports = [ x for x in top._dsl.all_signals
+              if ( x.is_input_value_port() or x.is_output_value_port() ) and
+                 x.is_top_level_signal() and x.get_host_component() is top ]
+    ports = sorted( ports, key=repr )
+
+    load  = []
+    store = []
+    for i, port in enumerate( ports ):
+      value = port.default_value()
+      _set_port_value( port, value )
+
+      name = f"_p{i}"
+      gen.namespace[ name ] = value
+      k = design.slot_of[ port ]
+
+      if port.is_input_value_port():
+        if is_bitstruct_class( port._dsl.Type ):
+          load.append( f"S[{k}] = int( {name}.to_bits() )" )
+        else:
+          load.append( f"S[{k}] = {name}._uint" )
+      else:
+        for path, lo, nbits in _leaves( port._dsl.Type, name, 0 ):
+          if lo == 0 and nbits == design.slot_nbits[k]:
+            store.append( f"{path}._uint = S[{k}]" )
+          elif lo == 0:
+            store.append( f"{path}._uint = S[{k}] & {mask(nbits)}" )
+          else:
+            store.append( f"{path}._uint = (S[{k}] >> {lo}) & {mask(nbits)}" )
+
+    return [ "def load( S=S ):\n" + "".join( f"  {x}\n" for x in load or [ "pass" ] ),
+             "def store( S=S ):\n" + "".join( f"  {x}\n" for x in store or [ "pass" ] ),
+             "def tick( comb=comb, ff=ff, load=load, store=store ):\n"
+             "  load()\n  comb()\n  ff()\n  comb()\n  store()\n" ]
+
+  def create_sim_apis( s, top, sim, namespace ):
+    design = sim.design
+    S = sim.state
+    X = sim.next_state
+    comb  = namespace['comb']
+    ff    = namespace['ff']
+    load  = namespace['load']
+    store = namespace['store']
+    tick  = namespace['tick']
+
+    def sim_read( sig ):
+      k, lo, nbits = design.get_access( sig )
+      return int_to_value( sig._dsl.Type, nbits, ( S[k] >> lo ) & mask( nbits ) )
+
+    def sim_write( sig, value ):
+      k, lo, nbits = design.get_access( sig )
+      value = value_to_int( nbits, value )
+      S[k] = ( S[k] & ( mask( design.slot_nbits[k] ) ^ ( mask(nbits) << lo ) ) ) | ( value << lo )
+      # Registers merge their next values into X
+      X[k] = S[k]
+
+    def sim_eval_combinational():
+      load()
+      comb()
+      store()
+
+    def sim_tick():
+      tick()
+      sim.simulated_cycles += 1
+
+    active_high = s.reset_active_high
+
+    def sim_reset():
+      top.reset @= b1( active_high )
+      load()
+      comb()
+      for i in range(3):
+        ff()
+        sim.simulated_cycles += 1
+        if i < 2:
+          comb()
+      top.reset @= b1( not active_high )
+      load()
+      comb()
+      store()
+
+    top.sim_read  = sim_read
+    top.sim_write = sim_write
+    top.sim_eval_combinational = sim_eval_combinational
+    top.sim_tick  = sim_tick
+    top.sim_reset = sim_reset
+    top.sim_cycle_count = lambda: sim.simulated_cycles
@@ -0,0 +1,425 @@
+"""
+========================================================================
+NumPySimPass.py
+========================================================================
+Simulate N instances of a pure-RTL design in lockstep, e.g. to run many
+test vector sets or fault-injection experiments at once. The update
+blocks are lowered into NumPy operations over N lanes, one lane per
+instance, so that a single top.sim_tick() advances all N instances.
+
+The state of all instances is a 2D uint64 array S[slot, lane]. Every
+signal must be at most 64 bits wide. Control flow that depends on the
+state is predicated: both sides of an if statement are executed with
+their writes masked by the lanes that take the branch, and a branch is
+skipped if no lane takes it.
+
+The model itself is not locked in. Use
+
+- top.sim_write( signal, values ) and top.sim_read( signal ) to access a
+  signal of all instances as a NumPy array;
+- top.sim_lane( i ) to get a view of instance i that behaves like the
+  model in a normal simulation, e.g. view.in_ @= 3; assert view.out == 4.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+from pymtl3.dsl.Connectable import Signal
+from pymtl3.dsl.NamedObject import NamedObject
+from pymtl3.passes.BasePass import BasePass, PassMetadata
+from pymtl3.passes.rtlir import BehavioralRTLIR as bir
+from pymtl3.passes.rtlir import RTLIRType as rt
+
+from .errors import LoweringError
+from .RTLIRLowering import LoweredDesign, LoweringGen, int_to_value, mask, value_to_int
+
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+#-------------------------------------------------------------------------
+# NumPyLoweringGen
+#-------------------------------------------------------------------------
+
+def _parity( x ):
+  x = x ^ (x >> 32)
+  x = x ^ (x >> 16)
+  x = x ^ (x >> 8)
+  x = x ^ (x >> 4)
+  x = x ^ (x >> 2)
+  x = x ^ (x >> 1)
+  return x & 1
+
+class NumPyLoweringGen( LoweringGen ):
+
+  def __init__( s, design, nlanes ):
+    super().__init__( design )
+    s.nlanes = nlanes
+    s.pred   = None # the name of the lane mask of the current branch
+    s.views  = set()
+    s.table_values = {}
+
+  def expr( s, node ):
+    if isinstance( node.Type, rt.Signal ) and s.nbits_of( node ) > 64:
+      raise LoweringError( s.blk_host, f"NumPySimPass only supports values of at most 64 bits, "
+                                       f"but {type(node).__name__} has {s.nbits_of( node )} bits." )
+    return super().expr( node )
+
+  def enter_upblk( s, upblk ):
+    # Temporary variables are arrays that are always merged with their
+    # previous values under a lane mask, so we define them upfront
+    names = set()
+    def collect( node ):
+      if isinstance( node, bir.TmpVar ):
+        names.add( s.tmpvar_name( node ) )
+      for value in vars(node).values():
+        if isinstance( value, bir.BaseBehavioralRTLIR ):
+          collect( value )
+        elif isinstance( value, list ):
+          for x in value:
+            if isinstance( x, bir.BaseBehavioralRTLIR ):
+              collect( x )
+    collect( upblk )
+    for name in sorted( names ):
+      s.emit( f"{name} = Z" )
+
+  def mk_table( s, values ):
+    return values
+
+  def get_table( s, values ):
+    name = super().get_table( values )
+    s.table_values[ name ] = tuple( values )
+    return name
+
+  def get_array_table( s, table ):
+    name = f"{table}a"
+    if name not in s.namespace:
+      s.namespace[ name ] = np.array( s.table_values[ table ], dtype=np.uint64 )
+    return name
+
+  def index_table( s, table, idx, vec ):
+    if vec:
+      return ( f"{s.get_array_table( table )}[{idx}]", True )
+    return ( f"{table}[{idx}]", False )
+
+  def read_slot( s, slot ):
+    if isinstance( slot, int ):
+      code = f"S[{slot}]"
+    else:
+      table, idx, vec = slot
+      if vec:
+        code = f"S[{s.get_array_table( table )}[{idx}], L]"
+      else:
+        code = f"S[{table}[{idx}]]"
+    # A row of S is a view that changes with later writes
+    s.views.add( code )
+    return ( code, True )
+
+  def write_bits( s, bits, value, seq ):
+    arr = "X" if seq else "S"
+    if seq:
+      s.record_seq_slot( bits.slot )
+
+    if isinstance( bits.slot, int ):
+      dst = f"{arr}[{bits.slot}]"
+    else:
+      table, idx, vec = bits.slot
+      row = s.fresh( "_r" )
+      if vec:
+        s.emit( f"{row} = {s.get_array_table( table )}[{idx}]" )
+        dst = f"{arr}[{row}, L]"
+      else:
+        s.emit( f"{row} = {table}[{idx}]" )
+        dst = f"{arr}[{row}]"
+
+    new = s.merge_bits( bits, dst, value )
+    if s.pred is not None:
+      new = f"np.where( {s.pred}, {new}, {dst} )"
+    s.emit( f"{dst} = {new}" )
+
+  def write_tmpvar( s, name, value ):
+    code, vec = value
+    if not vec or code in s.views:
+      code = f"(Z | {code})"
+    if s.pred is not None:
+      code = f"np.where( {s.pred}, {code}, {name} )"
+    s.emit( f"{name} = {code}" )
+
+  def gen_if( s, cond, body, orelse ):
+    outer = s.pred
+
+    c = s.fresh( "_c" )
+    s.emit( f"{c} = ({cond[0]}) != 0" )
+    if outer is None:
+      taken = c
+    else:
+      taken = s.fresh( "_p" )
+      s.emit( f"{taken} = {outer} & {c}" )
+
+    s.emit( f"if {taken}.any():" )
+    s.pred = taken
+    s.gen_suite( body )
+
+    if orelse:
+      not_taken = s.fresh( "_p" )
+      s.emit( f"{not_taken} = ~{c}" if outer is None else f"{not_taken} = {outer} & ~{c}" )
+      s.emit( f"if {not_taken}.any():" )
+      s.pred = not_taken
+      s.gen_suite( orelse )
+
+    s.pred = outer
+
+  def select( s, cond, body, orelse ):
+    (c, cvec), (b, bvec), (o, ovec) = cond, body, orelse
+    if not cvec:
+      return ( f"(({b}) if ({c}) else ({o}))", bvec or ovec )
+    if not bvec and not ovec:
+      return ( f"np.where( {c}, U({b}), U({o}) )", True )
+    return ( f"np.where( {c}, {b}, {o} )", True )
+
+  def to_value( s, code, vec ):
+    if vec:
+      return ( f"{code}.astype( U )", True )
+    return ( f"int( {code} )", False )
+
+  def reduce_value( s, op, code, vec, nbits ):
+    if op is bir.BitXor:
+      if vec:
+        return ( f"_parity( {code} )", True )
+      return ( f"(bin( {code} ).count( '1' ) & 1)", False )
+    if op is bir.BitAnd:
+      return s.to_value( f"(({code}) == {mask(nbits)})", vec )
+    return s.to_value( f"(({code}) != 0)", vec )
+
+  def shift( s, left, right, nbits, is_left ):
+    (l, lvec), (r, rvec) = left, right
+    M = mask(nbits)
+    if not rvec:
+      if is_left:
+        return ( f"((({l}) << ({r})) & {M} if ({r}) < {nbits} else 0)", lvec )
+      return ( f"(({l}) >> ({r}) if ({r}) < {nbits} else 0)", lvec )
+    if is_left:
+      return ( f"np.where( ({r}) < {nbits}, (({l}) << (({r}) & 63)) & {M}, U(0) )", True )
+    return ( f"np.where( ({r}) < {nbits}, ({l}) >> (({r}) & 63), U(0) )", True )
+
+  def power( s, left, right, nbits ):
+    (l, lvec), (r, rvec) = left, right
+    if lvec or rvec:
+      return ( f"((({l}) ** ({r})) & {mask(nbits)})", True )
+    return ( f"pow( {l}, {r}, {1 << nbits} )", False )
+
+  def gen_flip( s ):
+    if s.seq_slots:
+      s.namespace['_FF'] = np.array( sorted( s.seq_slots ), dtype=np.intp )
+      s.emit( "S[_FF] = X[_FF]" )
+
+#-------------------------------------------------------------------------
+# LaneView
+#-------------------------------------------------------------------------
+
+class LaneView:
+  """ A view of a component/interface of one instance. Reading a signal
+  returns its value in the lane, and writing a signal, e.g. with @=,
+  writes the lane. """
+
+  def __init__( s, sim, obj, lane ):
+    object.__setattr__( s, "_sim",  sim  )
+    object.__setattr__( s, "_obj",  obj  )
+    object.__setattr__( s, "_lane", lane )
+
+  def __getattr__( s, name ):
+    return s._sim.lane_get( getattr( s._obj, name ), s._lane )
+
+  def __setattr__( s, name, value ):
+    s._sim.lane_set( getattr( s._obj, name ), s._lane, value )
+
+  def __repr__( s ):
+    return f"{s._obj!r}@lane{s._lane}"
+
+class LaneList:
+  """ A view of a list of signals/components/interfaces of one instance. """
+
+  def __init__( s, sim, objs, lane ):
+    s._sim  = sim
+    s._objs = objs
+    s._lane = lane
+
+  def __len__( s ):
+    return len( s._objs )
+
+  def __getitem__( s, idx ):
+    return s._sim.lane_get( s._objs[ idx ], s._lane )
+
+  def __setitem__( s, idx, value ):
+    s._sim.lane_set( s._objs[ idx ], s._lane, value )
+
+  def __iter__( s ):
+    return ( s[i] for i in range(len(s._objs)) )
+
+#-------------------------------------------------------------------------
+# NumPySimPass
+#-------------------------------------------------------------------------
+
+class NumPySimPass( BasePass ):
+
+  def __init__( s, nlanes, *, reset_active_high=True ):
+    s.nlanes = nlanes
+    s.reset_active_high = reset_active_high
+
+  def __call__( s, top ):
+    if np is None:
+      raise ImportError( "NumPySimPass requires NumPy. Please install it with `pip install numpy`." )
+
+    design = LoweredDesign( top )
+    for k, nbits in enumerate( design.slot_nbits ):
+      if nbits > 64:
+        raise LoweringError( top, f"{design.get_slot_name(k)} has {nbits} bits, but NumPySimPass "
+                                   "only supports signals of at most 64 bits." )
+
+    N = s.nlanes
+    S = np.zeros( ( design.nslots, N ), dtype=np.uint64 )
+    X = np.zeros( ( design.nslots, N ), dtype=np.uint64 )
+
+    gen = NumPyLoweringGen( design, N )
+    gen.namespace.update({
+      'np': np, 'U': np.uint64, '_parity': _parity,
+      'S': S, 'X': X, 'L': np.arange( N ), 'Z': np.zeros( N, dtype=np.uint64 ),
+    })
+
+    def gen_ff_body():
+      gen.gen_ff_body()
+      gen.gen_flip()
+
+    srcs = [ gen.gen_function( "comb", "S=S, X=X, L=L, Z=Z", gen.gen_comb_body ),
+             gen.gen_function( "ff",   "S=S, X=X, L=L, Z=Z", gen_ff_body ) ]
+    gen.compile( "\n".join( srcs ), f"<numpy sim of {top.__class__.__name__}>" )
+
+    comb = gen.namespace['comb']
+    ff   = gen.namespace['ff']
+
+    if gen.has_division:
+      # Dividing by zero gives zero in the lanes instead of warnings
+      _comb, _ff = comb, ff
+      def comb():
+        with np.errstate( divide='ignore', invalid='ignore' ):
+          _comb()
+      def ff():
+        with np.errstate( divide='ignore', invalid='ignore' ):
+          _ff()
+
+    top._lowered = sim = PassMetadata()
+    sim.design = design
+    sim.srcs   = srcs
+    sim.nlanes = N
+    sim.state  = S
+    sim.next_state = X
+    sim.simulated_cycles = 0
+    sim.dirty  = True
+
+    s.create_lane_access( top, sim )
+    s.create_sim_apis( top, sim, comb, ff )
+
+  def create_lane_access( s, top, sim ):
+    design = sim.design
+    S = sim.state
+    X = sim.next_state
+
+    def lane_get( obj, lane ):
+      if isinstance( obj, Signal ):
+        k, lo, nbits = design.get_access( obj )
+        return int_to_value( obj._dsl.Type, nbits, ( int( S[k, lane] ) >> lo ) & mask( nbits ) )
+      if isinstance( obj, NamedObject ):
+        return LaneView( sim, obj, lane )
+      if isinstance( obj, list ):
+        return LaneList( sim, obj, lane )
+      return obj
+
+    def lane_set( obj, lane, value ):
+      if not isinstance( obj, Signal ):
+        raise AttributeError( f"{obj!r} is not a signal." )
+      k, lo, nbits = design.get_access( obj )
+      value = value_to_int( nbits, value )
+      if lo == 0 and nbits == design.slot_nbits[k]:
+        S[k, lane] = value
+      else:
+        old = int( S[k, lane] )
+        S[k, lane] = ( old & ~( mask(nbits) << lo ) ) | ( value << lo )
+      # Registers merge their next values into X
+      X[k, lane] = S[k, lane]
+      sim.dirty = True
+
+    sim.lane_get = lane_get
+    sim.lane_set = lane_set
+
+  def create_sim_apis( s, top, sim, comb, ff ):
+    design = sim.design
+    S = sim.state
+    X = sim.next_state
+    N = sim.nlanes
+
+    def sim_read( sig ):
+      k, lo, nbits = design.get_access( sig )
+      if lo == 0 and nbits == design.slot_nbits[k]:
+        return S[k].copy()
+      return ( S[k] >> lo ) & mask( nbits )
+
+    def sim_write( sig, values ):
+      k, lo, nbits = design.get_access( sig )
+      if isinstance( values, np.ndarray ):
+        if values.shape != (N,):
+          raise ValueError( f"Expected {N} values for {sig!r}, got an array of shape {values.shape}." )
+        values = values.astype( np.uint64 )
+        if nbits < 64 and ( values >> nbits ).any():
+          raise ValueError( f"Some values do not fit in {nbits} bits of {sig!r}." )
+      elif isinstance( values, (list, tuple) ):
+        if len(values) != N:
+          raise ValueError( f"Expected {N} values for {sig!r}, got {len(values)}." )
+        values = np.array( [ value_to_int( nbits, x ) for x in values ], dtype=np.uint64 )
+      else:
+        values = value_to_int( nbits, values )
+
+      if lo == 0 and nbits == design.slot_nbits[k]:
+        S[k] = values
+      else:
+        S[k] = ( S[k] & ( mask( design.slot_nbits[k] ) ^ ( mask(nbits) << lo ) ) ) | \
+               ( np.asarray( values, dtype=np.uint64 ) << np.uint64(lo) )
+      X[k] = S[k]
+      sim.dirty = True
+
+    def sim_eval_combinational():
+      comb()
+      sim.dirty = False
+
+    # The state only changes at clock edges and through
+    # sim_write/lane views, so the first evaluation of a tick can be
+    # skipped if nothing is written since the last evaluation.
+    def sim_tick():
+      if sim.dirty:
+        comb()
+      ff()
+      sim.simulated_cycles += 1
+      comb()
+      sim.dirty = False
+
+    reset = design.get_access( top.reset )[0]
+    active_high = int( s.reset_active_high )
+
+    def sim_reset():
+      S[ reset ] = active_high
+      comb()
+      for i in range(3):
+        ff()
+        sim.simulated_cycles += 1
+        if i < 2:
+          comb()
+      S[ reset ] = 1 - active_high
+      comb()
+      sim.dirty = False
+
+    top.sim_read  = sim_read
+    top.sim_write = sim_write
+    top.sim_lane  = lambda i: LaneView( sim, top, i )
+    top.sim_eval_combinational = sim_eval_combinational
+    top.sim_tick  = sim_tick
+    top.sim_reset = sim_reset
+    top.sim_cycle_count = lambda: sim.simulated_cycles
@@ -0,0 +1,37 @@
+"""
+========================================================================
+PassGroups.py
+========================================================================
+Pass groups that simulate a design with the lowered backends.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+from pymtl3.passes.BasePass import BasePass
+from pymtl3.passes.sim.DynamicSchedulePass import DynamicSchedulePass
+from pymtl3.passes.sim.GenDAGPass import GenDAGPass
+
+from .IntSimPass import IntSimPass
+from .NumPySimPass import NumPySimPass
+
+
+class NumPySim( BasePass ):
+  def __init__( s, nlanes, *, reset_active_high=True ):
+    s.nlanes = nlanes
+    s.reset_active_high = reset_active_high
+
+  def __call__( s, top ):
+    top.elaborate()
+    GenDAGPass()( top )
+    DynamicSchedulePass()( top )
+    NumPySimPass( s.nlanes, reset_active_high=s.reset_active_high )( top )
+
+class IntSim( BasePass ):
+  def __init__( s, *, reset_active_high=True ):
+    s.reset_active_high = reset_active_high
+
+  def __call__( s, top ):
+    top.elaborate()
+    GenDAGPass()( top )
+    DynamicSchedulePass()( top )
+    IntSimPass( reset_active_high=s.reset_active_high )( top )
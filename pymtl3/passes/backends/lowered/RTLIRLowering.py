@@ -0,0 +1,828 @@
+"""
+========================================================================
+RTLIRLowering.py
+========================================================================
+Lower a pure-RTL design into straight-line Python code that operates on
+a flat state store instead of Bits objects.
+
+LoweredDesign assigns one slot of the store to every group of top-level
+signals that are connected by a net. A bitstruct signal occupies a single
+slot that holds its to_bits() value, and a sub-signal (slice or struct
+field) is a bit range of the slot of its top-level signal. Nets that
+involve sub-signals become bit copies.
+
+LoweringGen walks the behavioral RTLIR of every update block in the
+schedule computed by the schedule pass and emits code in which every
+value is an unsigned integer masked to the bitwidth that the RTLIR type
+check pass infers. The code generator is agnostic to what a "value" is;
+subclasses decide the state representation and override the hooks that
+differ, e.g. NumPy arrays over N lanes in NumPySimPass.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+from linecache import cache as line_cache
+
+from pymtl3.datatypes import is_bitstruct_class, is_bitstruct_inst, mk_bits
+from pymtl3.dsl.Component import Component
+from pymtl3.dsl.Connectable import Const, MethodPort, Signal
+from pymtl3.dsl.NamedObject import NamedObject
+from pymtl3.dsl.Placeholder import Placeholder
+from pymtl3.extra.pypy import custom_exec
+from pymtl3.passes.errors import PassOrderError
+from pymtl3.passes.rtlir import BehavioralRTLIR as bir
+from pymtl3.passes.rtlir import BehavioralRTLIRGenPass, BehavioralRTLIRTypeCheckPass
+from pymtl3.passes.rtlir import RTLIRDataType as rdt
+from pymtl3.passes.rtlir import RTLIRType as rt
+from pymtl3.passes.rtlir.behavioral.BehavioralRTLIRGenL1Pass import (
+    BehavioralRTLIRGenL1Pass,
+)
+
+from .errors import LoweringError
+
+#-------------------------------------------------------------------------
+# Bit layout helpers
+#-------------------------------------------------------------------------
+
+def _type_nbits( t ):
+  if isinstance( t, list ):
+    return len(t) * _type_nbits( t[0] )
+  return t.nbits
+
+def get_field_range( Type, name, indices=() ):
+  """ Return (lo, nbits) of the field of a bitstruct type. Like to_bits,
+  the first field occupies the most significant bits and element 0 of a
+  list field occupies the least significant bits of the field. """
+  hi = Type.nbits
+  for fname, t in Type.__bitstruct_fields__.items():
+    nbits = _type_nbits( t )
+    if fname == name:
+      break
+    hi -= nbits
+  lo = hi - nbits
+
+  for i in indices:
+    t = t[0]
+    nbits = _type_nbits( t )
+    lo += i * nbits
+  return lo, nbits
+
+def get_dtype_field_range( dtype, name ):
+  """ The same as get_field_range but for an RTLIR struct data type. """
+  hi = dtype.get_length()
+  for fname, t in dtype.get_all_properties().items():
+    nbits = t.get_length()
+    if fname == name:
+      break
+    hi -= nbits
+  return hi - nbits, nbits
+
+def const_to_int( v ):
+  if is_bitstruct_inst( v ):
+    return int( v.to_bits() )
+  return int( v )
+
+def mask( nbits ):
+  return (1 << nbits) - 1
+
+def value_to_int( nbits, value ):
+  """ Convert a value written to an nbits-bit signal into an int. Bits
+  checks that the value fits. """
+  if is_bitstruct_inst( value ):
+    return int( value.to_bits() )
+  return int( mk_bits( nbits )( value ) )
+
+def int_to_value( Type, nbits, value ):
+  """ Convert the int of a signal back into a value of its type. """
+  if is_bitstruct_class( Type ):
+    return Type.from_bits( mk_bits( nbits )( value ) )
+  return Type( value )
+
+#-------------------------------------------------------------------------
+# LoweredDesign
+#-------------------------------------------------------------------------
+
+class LoweredDesign:
+
+  def __init__( s, top ):
+    s.top = top
+
+    if not hasattr( top, "_sched" ):
+      raise PassOrderError( "_sched" )
+
+    s._check_pure_rtl()
+    s._gen_rtlir()
+    s._allocate_slots()
+    s._collect_net_copies()
+
+  def _check_pure_rtl( s ):
+    top = s.top
+
+    methods = top.get_all_object_filter( lambda x: isinstance( x, MethodPort ) )
+    if methods:
+      raise LoweringError( top, f"{sorted( methods, key=repr )[0]!r} is a method port. "
+                                 "Only pure RTL designs can be lowered." )
+
+    onces = top.get_all_update_once()
+    if onces:
+      raise LoweringError( top, f"{sorted( onces, key=lambda x: x.__name__ )[0].__name__} "
+                                 "is an update_once block. Only pure RTL designs can be lowered." )
+
+    placeholders = top.get_all_object_filter( lambda x: isinstance( x, Placeholder ) )
+    if placeholders:
+      raise LoweringError( top, f"{sorted( placeholders, key=repr )[0]!r} is a placeholder "
+                                 "which does not have update blocks." )
+
+    scc_blocks = getattr( top._sched, 'scc_blocks', {} )
+    if scc_blocks:
+      blks = next( iter( scc_blocks.values() ) )
+      raise LoweringError( top, "combinational loops are not supported. The loop involves "
+                                f"{', '.join( x.__name__ for x in blks )}." )
+
+  def _gen_rtlir( s ):
+    top = s.top
+
+    # We generate and type-check behavioral RTLIR component by
+    # component, the same way the translators do.
+    s.upblk_rtlir = {}
+    s.upblk_host  = {}
+
+    for m in sorted( top.get_all_object_filter( lambda x: isinstance( x, Component ) ), key=repr ):
+      blks = m.get_update_block_order()
+      if not blks:
+        continue
+      m.apply( BehavioralRTLIRGenPass( top ) )
+      m.apply( BehavioralRTLIRTypeCheckPass( top ) )
+      rtlir_upblks = m.get_metadata( BehavioralRTLIRGenL1Pass.rtlir_upblks )
+      for blk in blks:
+        s.upblk_rtlir[ blk ] = rtlir_upblks[ blk ]
+        s.upblk_host [ blk ] = m
+
+  def _allocate_slots( s ):
+    top = s.top
+
+    # Union all top-level signals of the same net
+
+    parent = {}
+
+    def find( x ):
+      while parent[x] is not x:
+        parent[x] = parent[ parent[x] ]
+        x = parent[x]
+      return x
+
+    for x in top._dsl.all_signals:
+      x = x.get_top_level_signal()
+      parent[x] = x
+
+    for writer, signals in top.get_all_value_nets():
+      tops = [ x for x in signals if isinstance( x, Signal ) and x.is_top_level_signal() ]
+      for x in tops:
+        parent.setdefault( x, x )
+      for x in tops[1:]:
+        u, v = find( tops[0] ), find( x )
+        if u is not v:
+          parent[v] = u
+
+    groups = {}
+    for x in parent:
+      groups.setdefault( find(x), [] ).append( x )
+
+    # Sort by name for a fixed layout
+
+    s.slot_signals = sorted( [ sorted( g, key=repr ) for g in groups.values() ],
+                             key=lambda g: repr(g[0]) )
+    s.slot_of    = {}
+    s.slot_nbits = []
+    for i, g in enumerate( s.slot_signals ):
+      s.slot_nbits.append( g[0]._dsl.Type.nbits )
+      for x in g:
+        s.slot_of[x] = i
+
+    s.nslots = len( s.slot_signals )
+
+  def _collect_net_copies( s ):
+    top = s.top
+
+    # genblk -> ( source access or constant, [ destination accesses ] )
+    s.net_copies = {}
+
+    for blk in top._dag.genblks:
+      writer  = top._dag.genblk_srcs[ blk ][3]
+      readers = top._dag.genblk_writes[ blk ]
+
+      if isinstance( writer, Const ):
+        src = const_to_int( writer._dsl.const )
+        seen = set()
+      else:
+        src = s.get_access( writer )
+        seen = { src }
+
+      dsts = []
+      for x in readers:
+        acc = s.get_access( x )
+        if acc not in seen:
+          seen.add( acc )
+          dsts.append( acc )
+
+      s.net_copies[ blk ] = ( src, dsts )
+
+  #-----------------------------------------------------------------------
+  # Public APIs
+  #-----------------------------------------------------------------------
+
+  def get_access( s, sig ):
+    """ Return ( slot, lo, nbits ) of a signal. """
+    if sig.is_top_level_signal():
+      k = s.slot_of[ sig ]
+      return ( k, 0, s.slot_nbits[k] )
+
+    parent = sig._dsl.parent_obj
+    k, lo, _ = s.get_access( parent )
+
+    if sig._dsl.slice is not None:
+      sl = sig._dsl.slice
+      return ( k, lo + sl.start, sl.stop - sl.start )
+
+    off, nbits = get_field_range( parent._dsl.Type, sig._dsl._my_name, sig._dsl._my_indices )
+    return ( k, lo + off, nbits )
+
+  def get_slot_name( s, k ):
+    return repr( s.slot_signals[k][0] )
+
+#-------------------------------------------------------------------------
+# References produced when resolving RTLIR attribute/index/slice chains
+#-------------------------------------------------------------------------
+
+class _Obj:
+  """ A Python object that is known at lowering time, e.g. a component,
+  an interface, a list of signals or a constant. """
+  def __init__( s, obj ):
+    s.obj = obj
+
+class _Dyn:
+  """ One of the candidate objects, selected by a runtime index. """
+  def __init__( s, cands, idx, vec ):
+    s.cands = cands
+    s.idx   = idx
+    s.vec   = vec
+
+class _Bits:
+  """ A bit range [lo, lo+nbits) of a slot or of a value.
+
+  - slot is an int for a slot known at lowering time, or a tuple
+    ( table, idx, vec ) where the slot is table[idx];
+  - value is the code of a value if the range is not in the store;
+  - lo is an int, or the code of the runtime offset. """
+  def __init__( s, slot, value, width, lo, lo_vec, nbits ):
+    s.slot   = slot
+    s.value  = value
+    s.width  = width # the bitwidth of the slot/value
+    s.lo     = lo
+    s.lo_vec = lo_vec
+    s.nbits  = nbits
+
+  def is_whole( s ):
+    return s.lo == 0 and s.nbits == s.width
+
+#-------------------------------------------------------------------------
+# LoweringGen
+#-------------------------------------------------------------------------
+
+class LoweringGen:
+
+  # The code of a value is either a Python int or a runtime value. "vec"
+  # is True if the value depends on the simulation state, in which case
+  # it might be a NumPy array etc. instead of an int.
+
+  def __init__( s, design ):
+    s.design    = design
+    s.namespace = {}
+    s.lines     = []
+    s.indent    = 1
+    s.ntmps     = 0
+    s.tables    = {}
+
+    s.seq_slots    = set()
+    s.has_division = False
+
+  #-----------------------------------------------------------------------
+  # Emission helpers
+  #-----------------------------------------------------------------------
+
+  def emit( s, line ):
+    s.lines.append( "  "*s.indent + line )
+
+  def fresh( s, prefix ):
+    s.ntmps += 1
+    return f"{prefix}{s.ntmps}"
+
+  def get_table( s, values ):
+    """ Hoist a tuple of ints into the namespace and return its name. """
+    values = tuple( values )
+    if values not in s.tables:
+      name = s.tables[ values ] = f"_T{len(s.tables)}"
+      s.namespace[ name ] = s.mk_table( values )
+    return s.tables[ values ]
+
+  def gen_function( s, name, args, gen_body ):
+    s.lines  = [ f"def {name}( {args} ):" ]
+    s.indent = 1
+    gen_body()
+    if len(s.lines) == 1:
+      s.emit( "pass" )
+    return "\n".join( s.lines ) + "\n"
+
+  def compile( s, src, filename ):
+    """ Compile the generated source in the namespace of hoisted objects
+    and register it in linecache for meaningful tracebacks. """
+    line_cache[ filename ] = ( len(src), None, src.splitlines(), filename )
+    custom_exec( compile( src, filename, "exec" ), s.namespace, s.namespace )
+
+  #-----------------------------------------------------------------------
+  # Schedules
+  #-----------------------------------------------------------------------
+
+  def gen_comb_body( s ):
+    design = s.design
+    for blk in design.top._sched.update_schedule:
+      if blk in design.net_copies:
+        s.gen_net_copy( blk )
+      elif blk in design.upblk_rtlir:
+        s.gen_upblk( blk, seq=False )
+      else:
+        raise LoweringError( blk.__name__, "it is neither an update block nor a net." )
+
+  def gen_ff_body( s ):
+    design = s.design
+    for blk in sorted( design.top._sched.schedule_ff, key=lambda x: x.__name__ ):
+      s.gen_upblk( blk, seq=True )
+
+  def gen_net_copy( s, blk ):
+    src, dsts = s.design.net_copies[ blk ]
+    if not dsts:
+      return
+
+    s.emit( f"# {blk.__name__}" )
+    if isinstance( src, int ):
+      value = ( str( src ), False )
+    else:
+      value = s.read_bits( s.mk_bits_from_access( src ) )
+
+    for dst in dsts:
+      acc = s.mk_bits_from_access( dst )
+      s.write_bits( acc, s.truncate( value, acc.nbits, acc.nbits ), seq=False )
+
+  def gen_upblk( s, blk, seq ):
+    design = s.design
+    host   = design.upblk_host[ blk ]
+    s.blk_id   = s.fresh( "" )
+    s.blk_host = host
+    s.seq      = seq
+
+    s.emit( f"# {blk.__name__} in {host!r}" )
+    s.enter_upblk( design.upblk_rtlir[ blk ] )
+    for stmt in design.upblk_rtlir[ blk ].body:
+      s.stmt( stmt )
+
+  def enter_upblk( s, upblk ):
+    pass
+
+  #-----------------------------------------------------------------------
+  # Statements
+  #-----------------------------------------------------------------------
+
+  def stmt( s, node ):
+    method = getattr( s, f"stmt_{type(node).__name__}", None )
+    if method is None:
+      raise LoweringError( s.blk_host, f"{type(node).__name__} statements are not supported." )
+    method( node )
+
+  def stmt_Assign( s, node ):
+    value = s.expr( node.value )
+
+    if len(node.targets) > 1 and value[1]:
+      tmp = s.fresh( "_v" )
+      s.emit( f"{tmp} = {value[0]}" )
+      value = ( tmp, True )
+
+    for target in node.targets:
+      if isinstance( target, bir.TmpVar ):
+        s.write_tmpvar( s.tmpvar_name( target ),
+                        s.truncate( value, s.nbits_of( target ), s.nbits_of( node.value ) ) )
+      else:
+        acc = s.to_bits( s.resolve( target ), target )
+        if acc.slot is None:
+          raise LoweringError( s.blk_host, f"cannot assign to {type(target).__name__}." )
+        s.write_bits( acc, s.truncate( value, acc.nbits, s.nbits_of( node.value ) ),
+                      seq=not node.blocking )
+
+  def stmt_For( s, node ):
+    var   = s.loopvar_name( node.var.name )
+    start = s.expr( node.start )
+    end   = s.expr( node.end )
+    step  = s.expr( node.step )
+    s.emit( f"for {var} in range( {start[0]}, {end[0]}, {step[0]} ):" )
+    s.gen_suite( node.body )
+
+  def stmt_If( s, node ):
+    cond = s.expr_cond( node.cond )
+    if not cond[1]:
+      s.emit( f"if {cond[0]}:" )
+      s.gen_suite( node.body )
+      if node.orelse:
+        s.emit( "else:" )
+        s.gen_suite( node.orelse )
+    else:
+      s.gen_if( cond, node.body, node.orelse )
+
+  def gen_suite( s, stmts ):
+    n = len(s.lines)
+    s.indent += 1
+    for x in stmts:
+      s.stmt( x )
+    if len(s.lines) == n:
+      s.emit( "pass" )
+    s.indent -= 1
+
+  def tmpvar_name( s, node ):
+    return f"_t{s.blk_id}_{node.name}"
+
+  def loopvar_name( s, name ):
+    return f"_i{s.blk_id}_{name}"
+
+  #-----------------------------------------------------------------------
+  # Expressions
+  #-----------------------------------------------------------------------
+
+  def nbits_of( s, node ):
+    t = node.Type
+    if isinstance( t, rt.Signal ):
+      return t.get_dtype().get_length()
+    raise LoweringError( s.blk_host, f"{type(node).__name__} of type {t} is not a value." )
+
+  def expr( s, node ):
+    """ Return ( code, vec ) of the value of the expression. The value
+    is always masked to the bitwidth of the expression. """
+    if hasattr( node, '_value' ) and isinstance( node._value, int ):
+      return ( str( node._value & mask( s.nbits_of( node ) ) ), False )
+
+    method = getattr( s, f"expr_{type(node).__name__}", None )
+    if method is None:
+      raise LoweringError( s.blk_host, f"{type(node).__name__} expressions are not supported." )
+    return method( node )
+
+  def truncate( s, value, nbits, src_nbits ):
+    """ Truncate a src_nbits-bit value to nbits bits. """
+    code, vec = value
+    if not vec:
+      try:
+        return ( str( int(code) & mask(nbits) ), False )
+      except ValueError: # depends on loop variables
+        pass
+    if src_nbits > nbits:
+      return ( f"(({code}) & {mask(nbits)})", vec )
+    return value
+
+  def expr_Number( s, node ):
+    return ( str( int(node.value) & mask( s.nbits_of( node ) ) ), False )
+
+  def expr_TmpVar( s, node ):
+    return ( s.tmpvar_name( node ), True )
+
+  def expr_LoopVar( s, node ):
+    return ( s.loopvar_name( node.name ), False )
+
+  def expr_FreeVar( s, node ):
+    return s.read_ref( _Obj( node.obj ), node )
+
+  def expr_Attribute( s, node ):
+    return s.read_ref( s.resolve( node ), node )
+
+  expr_Index = expr_Slice = expr_Base = expr_Attribute
+
+  def expr_Concat( s, node ):
+    parts = [ ( s.expr( x ), s.nbits_of( x ) ) for x in node.values ]
+    offset = 0
+    terms  = []
+    vec    = False
+    for (code, v), nbits in reversed( parts ):
+      terms.append( f"({code} << {offset})" if offset else f"({code})" )
+      offset += nbits
+      vec = vec or v
+    return ( "(" + " | ".join( reversed( terms ) ) + ")", vec )
+
+  def expr_StructInst( s, node ):
+    dtype = rdt.get_rtlir_dtype( node.struct() )
+    offset = dtype.get_length()
+    terms  = []
+    vec    = False
+    for (fname, ftype), value in zip( dtype.get_all_properties().items(), node.values ):
+      code, v = s.truncate( s.expr( value ), ftype.get_length(), s.nbits_of( value ) )
+      offset -= ftype.get_length()
+      terms.append( f"({code} << {offset})" if offset else f"({code})" )
+      vec = vec or v
+    return ( "(" + " | ".join( terms ) + ")", vec )
+
+  def expr_ZeroExt( s, node ):
+    return s.expr( node.value )
+
+  def expr_SignExt( s, node ):
+    code, vec = s.expr( node.value )
+    sign = 1 << ( s.nbits_of( node.value ) - 1 )
+    return ( f"((({code}) ^ {sign}) - {sign}) & {mask( s.nbits_of( node ) )}", vec )
+
+  def expr_Truncate( s, node ):
+    code, vec = s.expr( node.value )
+    return ( f"(({code}) & {mask( s.nbits_of( node ) )})", vec )
+
+  def expr_SizeCast( s, node ):
+    code, vec = s.expr( node.value )
+    if s.nbits_of( node ) >= s.nbits_of( node.value ):
+      return ( code, vec )
+    return ( f"(({code}) & {mask( s.nbits_of( node ) )})", vec )
+
+  def expr_Reduce( s, node ):
+    code, vec = s.expr( node.value )
+    return s.reduce_value( type(node.op), code, vec, s.nbits_of( node.value ) )
+
+  def expr_IfExp( s, node ):
+    return s.select( s.expr_cond( node.cond ), s.expr( node.body ), s.expr( node.orelse ) )
+
+  def expr_UnaryOp( s, node ):
+    code, vec = s.expr( node.operand )
+    M  = mask( s.nbits_of( node ) )
+    op = type(node.op)
+    if op is bir.Invert:
+      return ( f"(({code}) ^ {M})", vec )
+    if op is bir.USub:
+      return ( f"((-({code})) & {M})", vec )
+    return ( code, vec )
+
+  _binops = {
+    bir.Add : '+', bir.Sub : '-', bir.Mult : '*',
+    bir.BitAnd : '&', bir.BitOr : '|', bir.BitXor : '^',
+    bir.Div : '//', bir.Mod : '%',
+  }
+  _masked_binops = { bir.Add, bir.Sub, bir.Mult }
+
+  _cmpops = {
+    bir.Eq : '==', bir.NotEq : '!=', bir.Lt : '<', bir.LtE : '<=',
+    bir.Gt : '>', bir.GtE : '>=',
+  }
+
+  def expr_BinOp( s, node ):
+    l, lvec = s.expr( node.left )
+    r, rvec = s.expr( node.right )
+    vec   = lvec or rvec
+    nbits = s.nbits_of( node )
+    op    = type(node.op)
+
+    if op in s._binops:
+      code = f"(({l}) {s._binops[op]} ({r}))"
+      if op in s._masked_binops:
+        code = f"({code} & {mask(nbits)})"
+      elif op is bir.Div or op is bir.Mod:
+        s.has_division = True
+      return ( code, vec )
+
+    if op is bir.Pow:
+      return s.power( (l, lvec), (r, rvec), nbits )
+
+    if op is bir.ShiftLeft or op is bir.ShiftRightLogic:
+      left = op is bir.ShiftLeft
+      if not rvec:
+        try:
+          amount = int(r)
+        except ValueError: # a loop variable
+          return s.shift( (l, lvec), (r, rvec), nbits, left )
+        if amount >= nbits:
+          return ( "0", False )
+        if left:
+          return ( f"((({l}) << {amount}) & {mask(nbits)})", vec )
+        return ( f"(({l}) >> {amount})", vec )
+      return s.shift( (l, lvec), (r, rvec), nbits, left )
+
+    raise LoweringError( s.blk_host, f"operator {op.__name__} is not supported." )
+
+  def expr_Compare( s, node ):
+    return s.to_value( *s.expr_cond( node ) )
+
+  def expr_cond( s, node ):
+    """ Return ( code, vec ) of a condition. The result of a comparison
+    is used as is without being converted to a 1-bit value. """
+    if isinstance( node, bir.Compare ):
+      l, lvec = s.expr( node.left )
+      r, rvec = s.expr( node.right )
+      return ( f"(({l}) {s._cmpops[ type(node.op) ]} ({r}))", lvec or rvec )
+    return s.expr( node )
+
+  #-----------------------------------------------------------------------
+  # Resolving attribute/index/slice chains
+  #-----------------------------------------------------------------------
+
+  def resolve( s, node ):
+    """ Resolve a chain of Attribute/Index/Slice into a reference. """
+    if isinstance( node, bir.Base ):
+      return _Obj( node.base )
+
+    if isinstance( node, bir.FreeVar ):
+      return _Obj( node.obj )
+
+    if isinstance( node, bir.Attribute ):
+      ref = s.resolve( node.value )
+      if isinstance( ref, _Obj ) and not isinstance( ref.obj, Signal ) and \
+         not is_bitstruct_inst( ref.obj ):
+        return _Obj( getattr( ref.obj, node.attr ) )
+
+      if isinstance( ref, _Dyn ) and not isinstance( ref.cands[0], Signal ):
+        return _Dyn( [ getattr( x, node.attr ) for x in ref.cands ], ref.idx, ref.vec )
+
+      bits  = s.to_bits( ref, node.value )
+      dtype = node.value.Type.get_dtype()
+      if not isinstance( dtype, rdt.Struct ):
+        raise LoweringError( s.blk_host, f"{dtype} has no field {node.attr}." )
+      lo, nbits = get_dtype_field_range( dtype, node.attr )
+      return s.sub_bits( bits, lo, nbits )
+
+    if isinstance( node, bir.Index ):
+      ref = s.resolve( node.value )
+
+      if isinstance( ref, _Obj ) and isinstance( ref.obj, list ):
+        if hasattr( node.idx, '_value' ):
+          return _Obj( ref.obj[ int(node.idx._value) ] )
+        idx, vec = s.expr( node.idx )
+        return _Dyn( ref.obj, idx, vec )
+
+      if isinstance( ref, _Dyn ) and isinstance( ref.cands[0], list ):
+        if hasattr( node.idx, '_value' ):
+          i = int(node.idx._value)
+          return _Dyn( [ x[i] for x in ref.cands ], ref.idx, ref.vec )
+        idx, vec = s.expr( node.idx )
+        n = len(ref.cands[0])
+        return _Dyn( [ y for x in ref.cands for y in x ],
+                     f"(({ref.idx}) * {n} + ({idx}))", vec or ref.vec )
+
+      bits  = s.to_bits( ref, node.value )
+      dtype = node.value.Type.get_dtype()
+      if isinstance( dtype, rdt.PackedArray ):
+        nbits = dtype.get_next_dim_type().get_length()
+      else:
+        nbits = 1
+
+      if hasattr( node.idx, '_value' ):
+        return s.sub_bits( bits, int(node.idx._value) * nbits, nbits )
+      idx, vec = s.expr( node.idx )
+      return s.sub_bits( bits, ( f"({idx})" if nbits == 1 else f"(({idx}) * {nbits})", vec ), nbits )
+
+    if isinstance( node, bir.Slice ):
+      bits  = s.to_bits( s.resolve( node.value ), node.value )
+      nbits = s.nbits_of( node )
+      if node.base is not None:
+        if hasattr( node.base, '_value' ):
+          return s.sub_bits( bits, int(node.base._value), nbits )
+        return s.sub_bits( bits, s.expr( node.base ), nbits )
+      return s.sub_bits( bits, int(node.lower._value), nbits )
+
+    # Any other expression, e.g. a temporary variable
+    code, vec = s.expr( node )
+    return _Bits( None, (code, vec), s.nbits_of( node ), 0, False, s.nbits_of( node ) )
+
+  def to_bits( s, ref, node ):
+    """ Turn a resolved reference into a bit range. """
+    if isinstance( ref, _Bits ):
+      return ref
+
+    if isinstance( ref, _Obj ):
+      obj = ref.obj
+      if isinstance( obj, Signal ):
+        return s.mk_bits_from_access( s.design.get_access( obj ) )
+      if isinstance( obj, (Const, NamedObject) ) or isinstance( obj, list ):
+        raise LoweringError( s.blk_host, f"{obj!r} is not a value." )
+      nbits = s.nbits_of( node )
+      return _Bits( None, ( str( const_to_int( obj ) & mask(nbits) ), False ), nbits, 0, False, nbits )
+
+    # Dynamic selection of a signal or a constant
+
+    cands = ref.cands
+    if not isinstance( cands[0], Signal ):
+      nbits = s.nbits_of( node )
+      table = s.get_table( [ const_to_int( x ) & mask(nbits) for x in cands ] )
+      return _Bits( None, s.index_table( table, ref.idx, ref.vec ), nbits, 0, False, nbits )
+
+    accs = [ s.design.get_access( x ) for x in cands ]
+    nbits = accs[0][2]
+    width = max( s.design.slot_nbits[ x[0] ] for x in accs )
+
+    slots = [ x[0] for x in accs ]
+    los   = [ x[1] for x in accs ]
+
+    if len( set(slots) ) == 1:
+      slot = slots[0]
+      width = s.design.slot_nbits[ slot ]
+    else:
+      slot = ( s.get_table( slots ), ref.idx, ref.vec )
+
+    if len( set(los) ) == 1:
+      return _Bits( slot, None, width, los[0], False, nbits )
+    lo, lo_vec = s.index_table( s.get_table( los ), ref.idx, ref.vec )
+    return _Bits( slot, None, width, lo, lo_vec, nbits )
+
+  def mk_bits_from_access( s, acc ):
+    k, lo, nbits = acc
+    return _Bits( k, None, s.design.slot_nbits[k], lo, False, nbits )
+
+  def sub_bits( s, bits, lo, nbits ):
+    """ Return the bit range [lo, lo+nbits) of bits. lo is either an int
+    or ( code, vec ). """
+    if isinstance( lo, int ):
+      if isinstance( bits.lo, int ):
+        return _Bits( bits.slot, bits.value, bits.width, bits.lo + lo, bits.lo_vec, nbits )
+      return _Bits( bits.slot, bits.value, bits.width, f"({bits.lo} + {lo})", bits.lo_vec, nbits )
+
+    code, vec = lo
+    if bits.lo != 0:
+      code = f"({bits.lo} + {code})"
+    return _Bits( bits.slot, bits.value, bits.width, code, vec or bits.lo_vec, nbits )
+
+  def read_ref( s, ref, node ):
+    if isinstance( ref, _Obj ) and not isinstance( ref.obj, (Signal, NamedObject, list) ):
+      return ( str( const_to_int( ref.obj ) & mask( s.nbits_of( node ) ) ), False )
+    return s.read_bits( s.to_bits( ref, node ) )
+
+  def read_bits( s, bits ):
+    if bits.slot is None:
+      code, vec = bits.value
+    else:
+      code, vec = s.read_slot( bits.slot )
+
+    if bits.is_whole():
+      return ( code, vec )
+    if bits.lo == 0:
+      return ( f"(({code}) & {mask(bits.nbits)})", vec )
+    return ( f"((({code}) >> {bits.lo}) & {mask(bits.nbits)})", vec or bits.lo_vec )
+
+  def merge_bits( s, bits, old, value ):
+    """ Return the code that writes value into the bit range of old. """
+    code, vec = value
+    if bits.is_whole():
+      return code
+    full = mask( bits.width )
+    M    = mask( bits.nbits )
+    if isinstance( bits.lo, int ):
+      return f"(({old}) & {full ^ (M << bits.lo)}) | (({code}) << {bits.lo})"
+    return f"(({old}) & ({full} ^ ({M} << {bits.lo}))) | (({code}) << {bits.lo})"
+
+  def record_seq_slot( s, slot ):
+    if isinstance( slot, int ):
+      s.seq_slots.add( slot )
+    else:
+      table = next( k for k, v in s.tables.items() if v == slot[0] )
+      s.seq_slots.update( table )
+
+  #-----------------------------------------------------------------------
+  # Hooks
+  #-----------------------------------------------------------------------
+  # Subclasses implement these according to the state representation.
+
+  def mk_table( s, values ):
+    """ Return the runtime object of a constant lookup table. """
+    raise NotImplementedError
+
+  def index_table( s, table, idx, vec ):
+    """ Return ( code, vec ) of table[idx]. """
+    raise NotImplementedError
+
+  def read_slot( s, slot ):
+    """ Return ( code, vec ) of the value of a slot. """
+    raise NotImplementedError
+
+  def write_bits( s, bits, value, seq ):
+    """ Emit code that writes value into bits. seq is True for writes in
+    update_ff blocks, which take effect at the next clock edge. """
+    raise NotImplementedError
+
+  def write_tmpvar( s, name, value ):
+    raise NotImplementedError
+
+  def gen_if( s, cond, body, orelse ):
+    """ Emit an if statement whose condition depends on the state. """
+    raise NotImplementedError
+
+  def select( s, cond, body, orelse ):
+    """ Return the code of cond ? body : orelse. """
+    raise NotImplementedError
+
+  def to_value( s, code, vec ):
+    """ Convert the result of a comparison into a 1-bit value. """
+    raise NotImplementedError
+
+  def reduce_value( s, op, code, vec, nbits ):
+    raise NotImplementedError
+
+  def shift( s, left, right, nbits, is_left ):
+    """ Return the code of a shift by a runtime amount. """
+    raise NotImplementedError
+
+  def power( s, left, right, nbits ):
+    raise NotImplementedError
@@ -0,0 +1,4 @@
+from .errors import LoweringError
+from .IntSimPass import IntSimPass
+from .NumPySimPass import NumPySimPass
+from .PassGroups import IntSim, NumPySim
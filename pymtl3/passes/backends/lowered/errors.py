@@ -0,0 +1,15 @@
+"""
+========================================================================
+errors.py
+========================================================================
+Exception types of the lowered simulation backends.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+
+class LoweringError( Exception ):
+  """ Raised when a design or a construct in an update block cannot be
+      lowered into the flat-state simulation code. """
+  def __init__( self, obj, msg ):
+    return super().__init__( f"\nCannot lower {obj}:\n- {msg}" )
@@ -0,0 +1,146 @@
+#=========================================================================
+# IntSimPass_test.py
+#=========================================================================
+#
+# Author : Batten Research Group
+# Date   : Oct 17, 2026
+
+import random
+
+import pytest
+
+from pymtl3 import *
+from pymtl3.stdlib.queues import NormalQueueCL
+
+from ..errors import LoweringError
+from ..PassGroups import IntSim
+
+
+@bitstruct
+class Point:
+  x: Bits8
+  y: [ Bits4, Bits4 ]
+
+class ValIfc( Interface ):
+  def construct( s, nbits ):
+    s.val = InPort()
+    s.msg = InPort( nbits )
+
+class Accum( Component ):
+  def construct( s ):
+    s.in_  = ValIfc( 8 )
+    s.pt   = InPort( Point )
+    s.vec  = [ InPort(8) for _ in range(3) ]
+    s.sh   = InPort(4)
+
+    s.sum  = OutPort(16)
+    s.opt  = OutPort( Point )
+    s.outs = [ OutPort(8) for _ in range(2) ]
+    s.misc = OutPort(8)
+
+    s.acc  = Wire(16)
+    s.sum //= s.acc
+
+    # List ports are connected to wires since the RTLIR
+    # frontend does not support subscripts on newer Python versions.
+    s.v0 = Wire(8)
+    s.v1 = Wire(8)
+    s.v2 = Wire(8)
+    s.o0 = Wire(8)
+    s.o1 = Wire(8)
+    s.v0 //= s.vec[0]
+    s.v1 //= s.vec[1]
+    s.v2 //= s.vec[2]
+    s.outs[0] //= s.o0
+    s.outs[1] //= s.o1
+
+    @update
+    def up_comb():
+      s.opt @= Point( s.pt.x + s.v0, s.pt.y )
+      s.o0 @= s.v1 ^ s.v2
+      s.o1 @= s.v1 << zext( s.sh, 8 )
+      s.misc @= zext( reduce_xor( s.v2 ), 8 ) | ( sext( s.pt.x[4:8], 8 ) >> 2 )
+
+    @update_ff
+    def up_acc():
+      if s.reset:
+        s.acc <<= 0
+      elif s.in_.val:
+        s.acc <<= s.acc + zext( s.in_.msg, 16 )
+
+def _int( x ):
+  return int( x.to_bits() ) if isinstance( x, Point ) else int( x )
+
+def _trace( m, stim ):
+  trace = []
+  for val, msg, x, y0, y1, v0, v1, v2, sh in stim:
+    m.in_.val @= val
+    m.in_.msg @= msg
+    m.pt @= Point( x, [ y0, y1 ] )
+    m.vec[0] @= v0
+    m.vec[1] @= v1
+    m.vec[2] @= v2
+    m.sh @= sh
+    m.sim_eval_combinational()
+    trace.append( ( _int( m.sum ), _int( m.opt ), _int( m.outs[0] ), _int( m.outs[1] ), _int( m.misc ) ) )
+    m.sim_tick()
+  return trace
+
+def test_equivalence():
+  rng = random.Random(0xbeef)
+  widths = [ 1, 8, 8, 4, 4, 8, 8, 8, 4 ]
+  stim = [ [ rng.getrandbits(n) for n in widths ] for _ in range(200) ]
+
+  A = Accum()
+  A.apply( DefaultPassGroup( print_line_trace=False ) )
+  A.sim_reset()
+
+  B = Accum()
+  B.apply( IntSim() )
+  B.sim_reset()
+  assert B.sim_cycle_count() == 3
+
+  assert _trace( B, stim ) == _trace( A, stim )
+  assert B.sim_cycle_count() == 203
+
+def test_ports_are_bits():
+  A = Accum()
+  A.apply( IntSim() )
+  A.sim_reset()
+
+  assert isinstance( A.sum, Bits16 )
+  assert isinstance( A.opt, Point )
+  assert isinstance( A.outs[1], Bits8 )
+
+  A.in_.val @= 1
+  A.in_.msg @= 5
+  A.sim_tick()
+  A.sim_tick()
+  assert A.sum == 10
+
+  with pytest.raises( ValueError ):
+    A.in_.msg @= 256
+
+def test_sim_read_write():
+  A = Accum()
+  A.apply( IntSim() )
+  A.sim_reset()
+
+  A.sim_write( A.acc, 100 )
+  assert A.sim_read( A.acc ) == Bits16(100)
+  A.in_.val @= 1
+  A.in_.msg @= 1
+  A.sim_tick()
+  assert A.sum == 101
+
+  A.sim_write( A.acc[8:16], 1 )
+  A.sim_eval_combinational()
+  assert A.sum == 0x0165
+
+class CLTop( Component ):
+  def construct( s ):
+    s.q = NormalQueueCL( 2 )
+
+def test_reject_cl():
+  with pytest.raises( LoweringError ):
+    CLTop().apply( IntSim() )
@@ -0,0 +1,194 @@
+#=========================================================================
+# NumPySimPass_test.py
+#=========================================================================
+#
+# Author : Batten Research Group
+# Date   : Oct 17, 2026
+
+import random
+
+import pytest
+
+from pymtl3 import *
+from pymtl3.datatypes import is_bitstruct_inst
+from pymtl3.stdlib.queues import NormalQueueCL
+from pymtl3.stdlib.test_utils import TestVectorSimulator
+
+from ..errors import LoweringError
+from ..PassGroups import NumPySim
+
+np = pytest.importorskip( "numpy" )
+
+@bitstruct
+class Pair:
+  a: Bits8
+  b: Bits8
+
+class Inner( Component ):
+  def construct( s ):
+    s.in_ = InPort(8)
+    s.out = OutPort(8)
+
+    @update
+    def up():
+      s.out @= s.in_ + 1
+
+class Top( Component ):
+  def construct( s ):
+    s.in_ = InPort(8)
+    s.sel = InPort(2)
+    s.out = OutPort(16)
+    s.pr  = OutPort( Pair )
+    s.cnt = OutPort(8)
+    s.lo  = OutPort(4)
+    s.r   = Wire(8)
+    s.r2  = Wire(8)
+
+    s.inner = Inner()
+    s.inner.in_ //= s.in_
+    s.lo //= s.r[0:4]
+
+    @update
+    def up_comb():
+      tmp = concat( s.in_, s.r )
+      if s.sel == 1:
+        s.out @= tmp
+      else:
+        s.out @= zext( s.r, 16 )
+      for i in range(4):
+        s.r2 @= s.in_ + i
+      s.pr @= Pair( s.in_, s.r )
+      s.pr.b @= s.r if s.sel == 2 else Bits8(3)
+
+    @update_ff
+    def up_ff():
+      s.r <<= s.inner.out
+      if s.reset:
+        s.cnt <<= 0
+      elif s.sel == 3:
+        s.cnt <<= s.cnt + s.r2
+      else:
+        s.cnt <<= s.cnt - 1
+
+class Alu( Component ):
+  def construct( s ):
+    s.a     = InPort(16)
+    s.b     = InPort(16)
+    s.sh    = InPort(5)
+    s.op    = InPort(3)
+    s.out   = OutPort(16)
+    s.wide  = OutPort(32)
+    s.sx    = OutPort(32)
+    s.flags = OutPort(4)
+
+    @update
+    def up_alu():
+      if   s.op == 0: s.out @= s.a + s.b
+      elif s.op == 1: s.out @= s.a - s.b
+      elif s.op == 2: s.out @= s.a & s.b
+      elif s.op == 3: s.out @= s.a << zext( s.sh, 16 )
+      elif s.op == 4: s.out @= s.a >> zext( s.sh, 16 )
+      elif s.op == 5: s.out @= ~s.a
+      elif s.op == 6: s.out @= s.a * s.b
+      else:           s.out @= zext( s.a < s.b, 16 )
+
+    @update
+    def up_misc():
+      s.wide  @= concat( s.a, s.b )
+      s.sx    @= sext( s.a, 32 )
+      s.flags @= concat( reduce_xor( s.a ), reduce_and( s.b ), reduce_or( s.a ), s.a[15:16] )
+
+def _int( x ):
+  return int( x.to_bits() ) if is_bitstruct_inst( x ) else int( x )
+
+def _trace( m, ins, outs, stim ):
+  trace = []
+  for vec in stim:
+    for name, value in zip( ins, vec ):
+      port = getattr( m, name )
+      port @= value
+    m.sim_eval_combinational()
+    trace.append( tuple( _int( getattr( m, x ) ) for x in outs ) )
+    m.sim_tick()
+  return trace
+
+@pytest.mark.parametrize( "Type, ins, outs", [
+  ( Top, [ ('in_', 8), ('sel', 2) ], [ 'out', 'pr', 'cnt', 'lo' ] ),
+  ( Alu, [ ('a', 16), ('b', 16), ('sh', 5), ('op', 3) ], [ 'out', 'wide', 'sx', 'flags' ] ),
+])
+def test_lockstep_equivalence( Type, ins, outs ):
+  N = 8
+  rng = random.Random(0xdead)
+  stims = [ [ [ rng.getrandbits(n) for _, n in ins ] for _ in range(50) ] for _ in range(N) ]
+  names = [ x for x, _ in ins ]
+
+  refs = []
+  for stim in stims:
+    m = Type()
+    m.apply( DefaultPassGroup( print_line_trace=False ) )
+    m.sim_reset()
+    refs.append( _trace( m, names, outs, stim ) )
+
+  m = Type()
+  m.apply( NumPySim( N ) )
+  m.sim_reset()
+  lanes = [ m.sim_lane(i) for i in range(N) ]
+
+  traces = [ [] for _ in range(N) ]
+  for t in range(50):
+    for lane, stim in zip( lanes, stims ):
+      for name, value in zip( names, stim[t] ):
+        setattr( lane, name, value )
+    m.sim_eval_combinational()
+    for lane, trace in zip( lanes, traces ):
+      trace.append( tuple( _int( getattr( lane, x ) ) for x in outs ) )
+    m.sim_tick()
+
+  assert traces == refs
+
+def test_sim_read_write():
+  m = Top()
+  m.apply( NumPySim( 4 ) )
+  m.sim_reset()
+
+  m.sim_write( m.in_, np.arange( 4 ) )
+  m.sim_write( m.sel, 1 )
+  m.sim_tick()
+  m.sim_tick()
+  assert list( m.sim_read( m.r ) ) == [ 1, 2, 3, 4 ]
+  assert list( m.sim_read( m.lo ) ) == [ 1, 2, 3, 4 ]
+  assert list( m.sim_read( m.out ) ) == [ 0x0001, 0x0102, 0x0203, 0x0304 ]
+  assert list( m.sim_read( m.pr.a ) ) == [ 0, 1, 2, 3 ]
+  assert m.sim_lane(2).pr == Pair( 2, 3 )
+  assert m.sim_cycle_count() == 5
+
+  with pytest.raises( ValueError ):
+    m.sim_write( m.in_, [ 1, 2 ] )
+  with pytest.raises( ValueError ):
+    m.sim_write( m.sel, np.array( [ 4, 0, 0, 0 ] ) )
+
+class CLTop( Component ):
+  def construct( s ):
+    s.q = NormalQueueCL( 2 )
+
+def test_reject_cl():
+  with pytest.raises( LoweringError ):
+    CLTop().apply( NumPySim( 2 ) )
+
+def test_batch_test_vectors():
+  def tv_in( m, tv ):
+    m.in_ @= tv[0]
+    m.sel @= tv[1]
+  def tv_out( m, tv ):
+    assert m.out == tv[2]
+
+  # r is the incremented input of the previous cycle, which is 1 right
+  # after reset
+  batch = [ [ (i+j, 1, ((i+j) << 8) | (i+j) if j else (i << 8) | 1) for j in range(6) ]
+            for i in range(5) ]
+  batch[0] = batch[0][:3]
+  TestVectorSimulator( Top(), None, tv_in, tv_out ).run_batch_test( batch )
+
+  batch[3][4] = (7, 1, 0)
+  with pytest.raises( AssertionError, match="instance 3" ):
+    TestVectorSimulator( Top(), None, tv_in, tv_out ).run_batch_test( batch )
@@ -34,7 +34,7 @@ class VerilogTranslationImportPass( BasePass ):
     s.traverse_hierarchy( top )
     top.apply( c.get_translation_pass()() )
     s.add_placeholder_marks( top )
-    return c.get_import_pass()()( top )
+    return top.apply( c.get_import_pass()() )
 
   def traverse_hierarchy( s, m ):
     c = s.__class__
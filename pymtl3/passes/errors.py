@@ -37,3 +37,8 @@ class PlaceholderConfigError( Exception ):
   """ Raised when a placeholder is incorrectly configured. """
   def __init__( self, obj, msg ):
     return super().__init__(f"Error while configuring {obj}:\n - {msg}")
+
+class PartitionError( Exception ):
+  """ Raised when a design cannot be partitioned as requested. """
+  def __init__( self, obj, msg ):
+    return super().__init__(f"Cannot partition {obj}:\n - {msg}")
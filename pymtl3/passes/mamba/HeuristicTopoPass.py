@@ -120,6 +120,7 @@ class HeuristicTopoPass( UnrollSimPass ):
     self.create_sim_eval_comb( top )
     self.create_sim_tick( top )
     self.create_sim_reset( top )
+    self.create_sim_run( top )
 
   def schedule_intra_cycle( self, top ):
 
@@ -0,0 +1,349 @@
+"""
+========================================================================
+InlineSimPass.py
+========================================================================
+Generate whole-cycle functions that inline the bodies of update blocks
+instead of calling them one by one. We reuse the AST of each update
+block that ComponentLevel2 already caches in the class object, rename
+the local variables of each block to avoid conflicts, and resolve the
+s.x.y[i] chains to the actual signal value objects after lock-in. These
+objects are hoisted to the locals of the generated function so that
+every access becomes a single LOAD_FAST on CPython.
+
+Blocks that cannot be inlined (SCC blocks, greenlet-wrapped blocks,
+lambda blocks, blocks with return/nested functions/comprehensions, etc)
+are still called as normal functions.
+
+Note that this only works because @= and <<= mutate the value object in
+place and never rebind the attribute. Global variables of the update
+blocks are bound by value when the function is generated.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+import ast
+from copy import deepcopy
+
+from pymtl3.dsl.Connectable import MethodPort
+from pymtl3.dsl.NamedObject import NamedObject
+from pymtl3.extra.pypy import exec_ast
+from pymtl3.passes.BasePass import PassMetadata
+
+from ..sim.PrepareSimPass import PrepareSimPass
+
+_unresolved = object()
+
+# We give up inlining a block if it has any of these nodes
+_unsupported_nodes = [ ast.Return, ast.Yield, ast.YieldFrom, ast.Await,
+                       ast.Global, ast.Nonlocal, ast.FunctionDef,
+                       ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda,
+                       ast.ListComp, ast.SetComp, ast.DictComp,
+                       ast.GeneratorExp, ast.Import, ast.ImportFrom ]
+if hasattr( ast, 'Match' ):
+  _unsupported_nodes.append( ast.Match )
+_unsupported_nodes = tuple( _unsupported_nodes )
+
+class InlineSimPass( PrepareSimPass ):
+
+  # Override
+  def create_sim_eval_comb( self, top ):
+    top._sim.inline = PassMetadata()
+    top._sim.inline.num_inlined = 0
+    top._sim.inline.num_called  = 0
+    top._sim.inline.srcs        = []
+
+    # The intra-cycle schedule is shared by eval_combinational and tick
+    top._sim.inline.comb = comb = self.gen_inline_function( top, top._sched.update_schedule,
+                                                            "eval_combinational" )
+
+    method_ports = top.get_all_object_filter( lambda x: isinstance( x, MethodPort ) )
+
+    if len(method_ports) == 0: # Pure RTL design, add eval_combinational
+      check = top._sim.check_top_level_inports
+      def sim_eval_combinational():
+        check()
+        comb()
+    else:
+      def sim_eval_combinational():
+        raise NotImplementedError(f"top is not a pure RTL design. {'top'+repr(list(method_ports)[0])[1:]} is a method port.")
+
+    top.sim_eval_combinational = sim_eval_combinational
+
+  # Override
+  def create_sim_tick( self, top ):
+    comb = top._sim.inline.comb
+
+    final_schedule = []
+    if not top.get_all_object_filter( lambda x: isinstance( x, MethodPort ) ):
+      # Pure RTL -- tick update blocks first
+      final_schedule.append( comb )
+
+    if self.print_line_trace and hasattr( top, 'line_trace' ):
+      final_schedule.append( top.print_line_trace )
+    final_schedule += self.collect_ff_funcs( top )
+    final_schedule.append( comb )
+    final_schedule.append( top._sim.check_top_level_inports )
+    top.sim_tick = self.gen_inline_function( top, final_schedule, "tick" )
+    # The tick is already a single function
+    top._sim.tick_schedule = [ top.sim_tick ]
+
+  def gen_inline_function( self, top, schedule, name ):
+    """ Return a function that executes the schedule where the update
+    blocks are inlined whenever possible. """
+
+    ctx = _InlineContext( top )
+    body = []
+
+    for idx, blk in enumerate( schedule ):
+      stmts = ctx.inline_block( idx, blk )
+      if stmts is None:
+        body.append( ast.Expr( value=ast.Call( func=ast.Name( id=ctx.hoist( blk ), ctx=ast.Load() ),
+                                               args=[], keywords=[] ) ) )
+        top._sim.inline.num_called += 1
+      else:
+        body.extend( stmts )
+        top._sim.inline.num_inlined += 1
+
+    # Load all hoisted objects into the locals in one go
+    if ctx.hoisted:
+      names = [ ast.Name( id=f"__h{i}", ctx=ast.Store() ) for i in range(len(ctx.hoisted)) ]
+      body.insert( 0, ast.Assign( targets=[ ast.Tuple( elts=names, ctx=ast.Store() ) ],
+                                  value=ast.Name( id="__H", ctx=ast.Load() ) ) )
+    if not body:
+      body.append( ast.Pass() )
+
+    module = ast.parse( f"def inlined_{name}():\n  pass" )
+    module.body[0].body = body
+    _globals = { "__H": tuple( ctx.hoisted ) }
+    _locals  = {}
+
+    filename = f"<inlined {name} of {top.__class__.__name__}>"
+    src = exec_ast( module, filename, _globals, _locals )
+    if src is not None:
+      top._sim.inline.srcs.append( src )
+
+    return _locals[ f"inlined_{name}" ]
+
+#-------------------------------------------------------------------------
+# _InlineContext
+#-------------------------------------------------------------------------
+# We resolve the object chain statically, so we only do it for
+# Name/Attribute/Subscript nodes whose base is a component, interface or
+# a list of them. Everything else stays dynamic on top of the hoisted
+# local, e.g. bitstruct fields and slices of a hoisted signal value.
+
+class _InlineContext:
+
+  def __init__( s, top ):
+    s.top = top
+    s.hoisted = []
+    s.hoisted_ids = {}
+
+    # Constant nets might be backed by int, which should not be hoisted
+    # as a signal value
+    s.signal_ids = { id(x[-1]) for x in top._sim.signal_object_mapping.values()
+                     if not isinstance( x[-1], int ) }
+
+    s.genblk_srcs = getattr( top._dag, 'genblk_srcs', {} )
+
+  def hoist( s, obj ):
+    try:
+      return s.hoisted_ids[ id(obj) ]
+    except KeyError:
+      name = s.hoisted_ids[ id(obj) ] = f"__h{len(s.hoisted)}"
+      s.hoisted.append( obj )
+      return name
+
+  def is_structural( s, obj ):
+    # Only the lists created at elaboration time, i.e. lists of components,
+    # interfaces and signals, are considered structural
+    if isinstance( obj, list ):
+      return len(obj) > 0 and all( s.is_structural( x ) or s.is_signal_value( x ) for x in obj )
+    return isinstance( obj, NamedObject )
+
+  def is_signal_value( s, obj ):
+    return id(obj) in s.signal_ids
+
+  def get_block_ast( s, blk ):
+    """ Return the FunctionDef node of the block, or None if we cannot
+    get the AST that matches the function object. """
+    if blk in s.genblk_srcs:
+      src = s.genblk_srcs[ blk ][0]
+      tree = ast.parse( src )
+    else:
+      host = s.top._dsl.all_upblk_hostobj.get( blk )
+      if host is None:
+        return None
+      info = host.get_update_block_info( blk )
+      if info is None:
+        return None
+      is_lambda, _, line, filename, tree = info
+      if is_lambda:
+        return None
+
+      # A subclass might reuse the cache of its parent class with the
+      # same block name
+      code = getattr( blk, '__code__', None )
+      if code is None or code.co_firstlineno != line or code.co_filename != filename:
+        return None
+
+    for node in tree.body:
+      if isinstance( node, ast.FunctionDef ) and node.name == blk.__name__:
+        return node
+    return None
+
+  def inline_block( s, idx, blk ):
+    if not hasattr( blk, '__code__' ) or blk.__code__.co_argcount:
+      return None
+
+    tree = s.get_block_ast( blk )
+    if tree is None:
+      return None
+
+    for stmt in tree.body:
+      for node in ast.walk( stmt ):
+        if isinstance( node, _unsupported_nodes ):
+          return None
+
+    code = blk.__code__
+    freevars = {}
+    if code.co_freevars:
+      for name, cell in zip( code.co_freevars, blk.__closure__ ):
+        try:
+          freevars[ name ] = cell.cell_contents
+        except ValueError: # empty cell
+          return None
+
+    try:
+      tree = _InlineTransformer( s, idx, freevars, blk.__globals__ ).visit( deepcopy( tree ) )
+    except _NotInlinable:
+      return None
+
+    # Empty net blocks simply disappear
+    body = [ x for x in tree.body if not isinstance( x, ast.Pass ) ]
+    if not body:
+      return []
+
+    host = s.top._dsl.all_upblk_hostobj.get( blk )
+    desc = f"{host!r}.{blk.__name__}" if host is not None else blk.__name__
+    # Keep the block name in the generated source as a no-op string
+    return [ ast.Expr( value=ast.Constant( value=desc ) ) ] + body
+
+class _NotInlinable( Exception ):
+  pass
+
+class _InlineTransformer( ast.NodeTransformer ):
+
+  def __init__( s, ctx, idx, freevars, _globals ):
+    s.ctx      = ctx
+    s.prefix   = f"__{idx}_"
+    s.freevars = freevars
+    s.globals  = _globals
+    s.local_names = set()
+
+  def visit_FunctionDef( s, node ):
+    for x in ast.walk( node ):
+      if isinstance( x, ast.Name ) and isinstance( x.ctx, (ast.Store, ast.Del) ):
+        s.local_names.add( x.id )
+      elif isinstance( x, ast.ExceptHandler ) and x.name:
+        s.local_names.add( x.name )
+    node.body = [ s.visit( x ) for x in node.body ]
+    return node
+
+  def resolve( s, node ):
+    """ Return the object that node refers to or _unresolved. """
+    if isinstance( node, ast.Name ):
+      name = node.id
+      if name in s.local_names:
+        return _unresolved
+      if name in s.freevars:
+        return s.freevars[ name ]
+      if name in s.globals:
+        return s.globals[ name ]
+      return _unresolved
+
+    if isinstance( node, ast.Attribute ):
+      base = s.resolve( node.value )
+      if base is _unresolved or not isinstance( base, NamedObject ):
+        return _unresolved
+      return getattr( base, node.attr, _unresolved )
+
+    if isinstance( node, ast.Subscript ):
+      base = s.resolve( node.value )
+      if not isinstance( base, list ):
+        return _unresolved
+      idx = node.slice
+      if isinstance( idx, getattr( ast, 'Index', () ) ):
+        idx = idx.value
+      if isinstance( idx, ast.Constant ):
+        idx = idx.value
+      elif isinstance( idx, ast.Name ):
+        idx = s.resolve( idx )
+      else:
+        return _unresolved
+      if type(idx) is not int:
+        return _unresolved
+      try:
+        return base[ idx ]
+      except IndexError:
+        return _unresolved
+
+    return _unresolved
+
+  def visit_load( s, node ):
+    obj = s.resolve( node )
+    if obj is not _unresolved and (isinstance( node, ast.Name ) or
+                                   s.ctx.is_structural( obj ) or s.ctx.is_signal_value( obj )):
+      return ast.copy_location( ast.Name( id=s.ctx.hoist( obj ), ctx=ast.Load() ), node )
+
+    if isinstance( node, ast.Name ):
+      if node.id in s.local_names:
+        node.id = s.prefix + node.id
+      return node
+    return s.generic_visit( node )
+
+  def visit_Name( s, node ):
+    if isinstance( node.ctx, ast.Load ):
+      return s.visit_load( node )
+    if node.id not in s.local_names:
+      raise _NotInlinable()
+    node.id = s.prefix + node.id
+    return node
+
+  def visit_Attribute( s, node ):
+    if isinstance( node.ctx, ast.Load ):
+      return s.visit_load( node )
+    # We cannot hoist an object that is rebound by an update block
+    obj = s.resolve( node )
+    if obj is not _unresolved and (s.ctx.is_structural( obj ) or s.ctx.is_signal_value( obj )):
+      raise _NotInlinable()
+    node.value = s.visit( node.value )
+    return node
+
+  def visit_Subscript( s, node ):
+    if isinstance( node.ctx, ast.Load ):
+      return s.visit_load( node )
+    node.value = s.visit( node.value )
+    node.slice = s.visit( node.slice )
+    return node
+
+  def visit_AugAssign( s, node ):
+    target = node.target
+    # s.x @= y and s.x <<= y mutate the signal value in place, so we can
+    # directly use the hoisted local
+    if isinstance( node.op, (ast.MatMult, ast.LShift) ) and \
+       isinstance( target, (ast.Attribute, ast.Subscript) ):
+      obj = s.resolve( target )
+      if obj is not _unresolved and s.ctx.is_signal_value( obj ) and not isinstance( obj, int ):
+        node.target = ast.copy_location( ast.Name( id=s.ctx.hoist( obj ), ctx=ast.Store() ), target )
+        node.value  = s.visit( node.value )
+        return node
+
+    node.target = s.visit( target )
+    node.value  = s.visit( node.value )
+    return node
+
+  def visit_ExceptHandler( s, node ):
+    if node.name:
+      node.name = s.prefix + node.name
+    return s.generic_visit( node )
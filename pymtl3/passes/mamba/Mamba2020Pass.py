@@ -5,22 +5,32 @@
 # we don't need the old TraceBreaking pass which only supports DAG
 # anymore.
 #
+# The meta block heuristics are tuned for the tracing JIT of PyPy using
+# the static branchiness of update blocks. If profile_cycles is set, the
+# pass instead measures the cost of every block and the iterations of
+# every SCC during a warm-up window, and then regenerates the schedule
+# and meta blocks from the measured costs. The profile is saved to
+# profile_path so that later runs start with the tuned schedule.
+#
 # Author : Shunning Jiang
 # Date   : Feb 14, 2020
 
+import json
 import os
 from collections import defaultdict, deque
+from time import perf_counter
 
 import py
 
 from pymtl3.datatypes import Bits, is_bitstruct_class
-from pymtl3.dsl import MethodPort
+from pymtl3.dsl import MetadataKey, MethodPort
 from pymtl3.dsl.errors import UpblkCyclicError
 from pymtl3.extra.pypy import custom_exec
 from pymtl3.passes.BasePass import BasePass, PassMetadata
 from pymtl3.passes.errors import PassOrderError
 
 from ..sim.DynamicSchedulePass import kosaraju_scc
+from ..sim.SimCachePass import compute_cache_key
 from ..sim.SimpleSchedulePass import SimpleSchedulePass, dump_dag
 from .HeuristicTopoPass import CountBranchesLoops
 from .UnrollSimPass import UnrollSimPass
@@ -28,8 +38,40 @@ from .UnrollSimPass import UnrollSimPass
 # _DEBUG = True
 _DEBUG = False
 
+# Bump this whenever the format of the profile changes
+PROFILE_FORMAT_VERSION = 1
+
 class Mamba2020Pass( UnrollSimPass ):
 
+  # Mamba2020Pass public pass data
+
+  #: The JSON file that stores the profile of the design. If it holds a
+  #: profile of the same design, the schedule is generated from it right
+  #: away. A new profile is written to it after the warm-up window.
+  #:
+  #: Type: ``str``; input
+  #:
+  #: Default value: None
+  profile_path = MetadataKey(str)
+
+  #: The number of cycles of the warm-up window, including the reset
+  #: cycles. If it is positive and there is no valid profile, the blocks
+  #: are profiled during the first profile_cycles cycles and then the
+  #: schedule is regenerated from the measured costs.
+  #:
+  #: Type: ``int``; input
+  #:
+  #: Default value: 0
+  profile_cycles = MetadataKey(int)
+
+  #: The bound of the total measured cost of the blocks in a meta block
+  #: in nanoseconds. Only used with a profile.
+  #:
+  #: Type: ``int``; input
+  #:
+  #: Default value: 10000
+  meta_block_budget = MetadataKey(int)
+
   def __call__( self, top ):
     if not hasattr( top._dag, "all_constraints" ):
       raise PassOrderError( "all_constraints" )
@@ -63,6 +105,15 @@ class Mamba2020Pass( UnrollSimPass ):
       else:
         self.branchiness[ blk ], self.only_loop_at_top[ blk ] = v.enter( hostobj.get_update_block_info( blk )[-1] )
 
+    # Branchiness factor is the bound of branchiness in a meta block.
+    self.branchiness_factor = 20
+
+    # Block factor is the bound of the number of branchy blocks in a
+    # meta block.
+    self.branchy_block_factor = 6
+
+    self.init_profile( top )
+
     self.schedule_ff( top )
 
     # Reuse simple's flip schedule
@@ -80,6 +131,7 @@ class Mamba2020Pass( UnrollSimPass ):
     self.create_sim_eval_comb( top )
     self.create_sim_tick( top )
     self.create_sim_reset( top )
+    self.create_sim_run( top )
 
   #-----------------------------------------------------------------------
   # compile_meta_block
@@ -131,25 +183,33 @@ class Mamba2020Pass( UnrollSimPass ):
   def schedule_ff( self, top ):
 
     top._sched.schedule_ff = schedule = []
-    if not top.get_all_update_ff():
+
+    # Multi-rate blocks are executed by per-phase tick functions
+    SimpleSchedulePass.schedule_ff_phases( top )
+    rates  = top.get_all_update_ff_rates()
+    pruned = getattr( top._dag, 'pruned_upblks', () )
+    blks   = top.get_all_update_ff().difference( rates, pruned )
+
+    if top._sched.profiling:
+      schedule.extend( [ self.instrument_block( top, x ) for x in blks ] )
+      schedule.append( self.create_profile_trigger( top ) )
+      return
+
+    if not blks:
       return
 
     # tuples in ffs: ( branchiness, blk )
 
     ffs = []
-    for x in top.get_all_update_ff():
+    for x in blks:
       # Here we treat loop-only upblk as 0 branchiness
       ffs.append( (0 if self.only_loop_at_top[x] else self.branchiness[x], x) )
     ffs = sorted( ffs, key=lambda x:x[0] )
 
     # Divide all blks into meta blocks
 
-    # Branchiness factor is the bound of branchiness in a meta block.
-    branchiness_factor = 20
-
-    # Block factor is the bound of the number of branchy blocks in a
-    # meta block.
-    branchy_block_factor = 6
+    branchiness_factor   = self.branchiness_factor
+    branchy_block_factor = self.branchy_block_factor
 
     cur_meta, cur_br, cur_count = [], 0, 0
 
@@ -288,6 +348,7 @@ def wrapped_SCC_{0}():
     {3}
     {2}
     # print( "SCC block{0} is executed", N, "times" )
+    {5}
     break
 generated_block = wrapped_SCC_{0}
 """
@@ -348,9 +409,8 @@ generated_block = wrapped_SCC_{0}
         check_srcs.append( f"if { ' or '.join(sub_check_srcs)}: continue" )
 
       # Divide all blks into meta blocks
-      # Branchiness factor is the bound of branchiness in a meta block.
-      branchiness_factor = 20
-      branchy_block_factor = 6
+      branchiness_factor   = self.branchiness_factor
+      branchy_block_factor = self.branchy_block_factor
 
       num_blks = 0  # sanity check
       cur_meta, cur_br, cur_count = [], 0, 0
@@ -426,19 +486,28 @@ generated_block = wrapped_SCC_{0}
             _globals[ b.__name__ ] = b
 
 
+      # Count the iterations of the SCC during profiling
+      profile_src = ""
+      if top._sched.profiling:
+        _globals['_scc_rec'] = self.profile_data['sccs'].setdefault( self.get_scc_key( top, scc ), [0, 0, 0] )
+        profile_src = "_scc_rec[1] += N"
+
       scc_block_src = template.format( scc_id, "; ".join( copy_srcs ), "\n    ".join( check_srcs ),
                                        '\n    '.join(blk_srcs),
-                                       ", ".join( [ x.__name__ for x in scc] ) )
+                                       ", ".join( [ x.__name__ for x in scc] ), profile_src )
 
       if _DEBUG: print(scc_block_src, "\n", "="*100 )
 
       _locals  = {}
       custom_exec(py.code.Source( scc_block_src ).compile(), _globals, _locals)
-      return _locals[ 'generated_block' ]
+      ret = _locals[ 'generated_block' ]
+      self.scc_members[ ret ] = list(scc)
+      return ret
 
     # Now we generate meta blocks for each SCC and produce final schedule
 
     constraint_objs = top._dag.constraint_objs
+    self.scc_members = {}
 
     # Perform topological sort on SCCs
 
@@ -457,6 +526,15 @@ generated_block = wrapped_SCC_{0}
       for v in vs:
         InD[ v ] += 1
 
+    # Non-trivial SCCs and loop-only blocks have zero branchiness, but
+    # SCCs have their measured cost with a profile
+    def get_weight( v ):
+      if v in nontrivial_sccs:
+        return self.scc_costs.get( self.get_scc_key( top, SCCs[v] ), 0 )
+      if v in trivial_loop_sccs:
+        return 0
+      return self.branchiness[ list(SCCs[v])[0] ]
+
     # Shunning: reuse this binary search from TraceBreakingPass. Not the
     # most efficient one. Ideally we want to use two heaps or a balanced
     # binary search tree ... TODO
@@ -484,19 +562,12 @@ generated_block = wrapped_SCC_{0}
       if not InD[v]:
         cnt += 1
         scc_pred[v] = None
-        if v in nontrivial_sccs or v in trivial_loop_sccs:
-          insert_sortedlist( Q, (0, -cnt), v )
-        else:
-          insert_sortedlist( Q, (self.branchiness[list(SCCs[v])[0]], -cnt), v )
+        insert_sortedlist( Q, (get_weight(v), -cnt), v )
 
     schedule = []
 
-    # Branchiness factor is the bound of branchiness in a meta block.
-    branchiness_factor = 20
-
-    # Block factor is the bound of the number of branchy blocks in a
-    # meta block.
-    branchy_block_factor = 6
+    branchiness_factor   = self.branchiness_factor
+    branchy_block_factor = self.branchy_block_factor
 
     # refactored code ...
     def expand_node( u ):
@@ -510,10 +581,7 @@ generated_block = wrapped_SCC_{0}
           # of preserve DFS behavior on top of the branch priority
           # Basically we want to pop in a DFS order such that the variable
           # most recently written can directly feed into the next block
-          if v in nontrivial_sccs or v in trivial_loop_sccs:
-            insert_sortedlist( Q, (0, -cnt), v )
-          else:
-            insert_sortedlist( Q, (self.branchiness[list(SCCs[v])[0]], -cnt), v )
+          insert_sortedlist( Q, (get_weight(v), -cnt), v )
 
     # Run topological sort
 
@@ -560,6 +628,11 @@ generated_block = wrapped_SCC_{0}
     # Put the graph schedule to _sched
     top._sched.update_schedule = []
 
+    # Profile each block and SCC without meta blocks
+    if top._sched.profiling:
+      top._sched.update_schedule = [ self.instrument_block( top, b ) for meta in schedule for b in meta ]
+      return
+
     # TODO Same as what we want to do for the last block in SCC, we might
     # be able to remove the overhead of the last block's call_assembler_r
     # since the tracing will end anyway. We compile all meta block except
@@ -578,3 +651,161 @@ generated_block = wrapped_SCC_{0}
     else:
       for i, meta in enumerate( schedule ):
         top._sched.update_schedule.append( self.compile_meta_block( meta ) )
+
+  #-----------------------------------------------------------------------
+  # Profile-guided scheduling
+  #-----------------------------------------------------------------------
+  # A profile records [ncalls, total_ns] of every block and [nexecs,
+  # total_iterations, total_ns] of every non-trivial SCC, keyed by the
+  # names of the blocks which are stable across runs.
+
+  def init_profile( self, top ):
+    self.profile_file = None
+    if top.has_metadata( self.profile_path ):
+      self.profile_file = top.get_metadata( self.profile_path )
+
+    self.warmup_cycles = 0
+    if top.has_metadata( self.profile_cycles ):
+      self.warmup_cycles = top.get_metadata( self.profile_cycles )
+
+    self.budget = 10000
+    if top.has_metadata( self.meta_block_budget ):
+      self.budget = top.get_metadata( self.meta_block_budget )
+
+    self.greenlet_origin = { y: x for x, y in top._dag.blk_greenlet_mapping.items() }
+    self.scc_members = {}
+    self.scc_costs   = {}
+
+    top._sched.profile   = self.load_profile( top )
+    top._sched.profiling = top._sched.profile is None and self.warmup_cycles > 0
+
+    if top._sched.profile is not None:
+      self.apply_profile( top )
+    elif top._sched.profiling:
+      self.profile_data = { 'blocks': {}, 'sccs': {} }
+
+  @staticmethod
+  def get_design_id( top ):
+    key = compute_cache_key( top )
+    if key is None:
+      key = f"{top.__class__.__module__}.{top.__class__.__qualname__}"
+    return key
+
+  def get_profile_key( self, top, blk ):
+    if blk in self.scc_members:
+      return self.get_scc_key( top, self.scc_members[ blk ] )
+    blk = self.greenlet_origin.get( blk, blk )
+    if blk in top._dag.genblks:
+      return blk.__name__
+    return f"{top.get_update_block_host_component( blk )!r}.{blk.__name__}"
+
+  def get_scc_key( self, top, scc ):
+    return "scc:" + ",".join( sorted( [ self.get_profile_key( top, x ) for x in scc ] ) )
+
+  def load_profile( self, top ):
+    path = self.profile_file
+    if path is None or not os.path.exists( path ):
+      return None
+    try:
+      with open( path ) as f:
+        profile = json.load( f )
+    except (OSError, ValueError):
+      return None
+
+    if not isinstance( profile, dict ) or \
+       profile.get( 'version' ) != PROFILE_FORMAT_VERSION or \
+       profile.get( 'design' ) != self.get_design_id( top ):
+      return None
+    return profile
+
+  def save_profile( self, profile ):
+    path = self.profile_file
+    if path is None:
+      return
+
+    # Same as SimCachePass, never expose a partially written profile
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+      dirname = os.path.dirname( os.path.abspath( path ) )
+      os.makedirs( dirname, exist_ok=True )
+      with open( tmp_path, 'w' ) as f:
+        json.dump( profile, f, indent=1, sort_keys=True )
+      os.replace( tmp_path, path )
+    except OSError:
+      pass
+
+  def apply_profile( self, top ):
+    """ Replace the branchiness of every block with its measured cost per
+    call in nanoseconds, and the branchiness factor with the cost budget
+    of a meta block. Blocks missing in the profile get the median cost. """
+    profile = top._sched.profile
+
+    costs = { k: ns / n for k, (n, ns) in profile['blocks'].items() if n }
+    median = sorted( costs.values() )[ len(costs) // 2 ] if costs else 1
+
+    for blk in self.branchiness:
+      cost = costs.get( self.get_profile_key( top, blk ), median )
+      self.branchiness[ blk ] = max( 1, int( cost ) )
+      # The measured cost already tells how expensive a loop is
+      self.only_loop_at_top[ blk ] = False
+
+    self.scc_costs = { k: max( 1, int( ns / n ) ) for k, (n, _, ns) in profile['sccs'].items() if n }
+
+    self.branchiness_factor   = self.budget
+    self.branchy_block_factor = len( self.branchiness ) + 1
+
+  def instrument_block( self, top, blk ):
+    """ Return a function with the same name that calls blk and records
+    the number of calls and the time spent in blk. """
+    key = self.get_profile_key( top, blk )
+    if blk in self.scc_members:
+      rec, idx = self.profile_data['sccs'][ key ], 2
+    else:
+      rec, idx = self.profile_data['blocks'].setdefault( key, [0, 0] ), 1
+
+    src = f"""
+def {blk.__name__}():
+  t = _clock()
+  _blk()
+  _rec[{idx}] += int( ( _clock() - t ) * 1e9 )
+  _rec[0] += 1
+"""
+    _globals = { '_clock': perf_counter, '_blk': blk, '_rec': rec }
+    _locals  = {}
+    custom_exec( py.code.Source( src ).compile(), _globals, _locals )
+    return _locals[ blk.__name__ ]
+
+  def create_profile_trigger( self, top ):
+    def profile_trigger():
+      if top._sched.profiling and top._sim.simulated_cycles >= self.warmup_cycles:
+        self.finish_profiling( top )
+    return profile_trigger
+
+  def finish_profiling( self, top ):
+    """ Save the profile of the warm-up window and regenerate the
+    schedule and the simulation functions from it. The functions that
+    are still running keep calling the instrumented blocks until they
+    return, which only affects the speed. """
+    top._sched.profiling = False
+
+    data = self.profile_data
+    top._sched.profile = profile = {
+      'version': PROFILE_FORMAT_VERSION,
+      'design' : self.get_design_id( top ),
+      'cycles' : top._sim.simulated_cycles,
+      'blocks' : { k: list(v) for k, v in data['blocks'].items() },
+      'sccs'   : { k: list(v) for k, v in data['sccs'].items() },
+    }
+    self.save_profile( profile )
+    self.apply_profile( top )
+
+    self.schedule_ff( top )
+    self.schedule_intra_cycle( top )
+
+    # collect_ff_funcs restarts the cycle count
+    cycles = top._sim.simulated_cycles
+    self.create_sim_eval_comb( top )
+    self.create_sim_tick( top )
+    self.create_sim_reset( top )
+    self.create_sim_run( top )
+    top._sim.simulated_cycles = cycles
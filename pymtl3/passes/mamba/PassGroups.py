@@ -1,4 +1,5 @@
 from ..BasePass import BasePass
+from ..sim.DynamicSchedulePass import DynamicSchedulePass
 from ..sim.GenDAGPass import GenDAGPass
 from ..sim.PrepareSimPass import PrepareSimPass
 from ..sim.SimpleSchedulePass import SimpleSchedulePass
@@ -6,6 +7,7 @@ from ..sim.WrapGreenletPass import WrapGreenletPass
 from ..tracing.CLLineTracePass import CLLineTracePass
 from ..tracing.LineTraceParamPass import LineTraceParamPass
 from .HeuristicTopoPass import HeuristicTopoPass
+from .InlineSimPass import InlineSimPass
 from .Mamba2020Pass import Mamba2020Pass
 from .UnrollSimPass import UnrollSimPass
 
@@ -38,6 +40,29 @@ class HeuTopoUnrollSim( BasePass ):
                       reset_active_high=s.reset_active_high)( top )
 
 class Mamba2020( BasePass ):
+  def __init__( s, *, waveform=None, print_line_trace=True, reset_active_high=True,
+                profile_path=None, profile_cycles=0 ):
+    s.waveform = waveform
+    s.print_line_trace = print_line_trace
+    s.reset_active_high = reset_active_high
+    s.profile_path = profile_path
+    s.profile_cycles = profile_cycles
+
+  def __call__( s, top ):
+    top.elaborate()
+    if s.profile_path is not None:
+      top.set_metadata( Mamba2020Pass.profile_path, s.profile_path )
+    if s.profile_cycles:
+      top.set_metadata( Mamba2020Pass.profile_cycles, s.profile_cycles )
+    top.apply( GenDAGPass() )
+    top.apply( WrapGreenletPass() )
+    if s.print_line_trace:
+      top.apply( CLLineTracePass() )
+      top.apply( LineTraceParamPass() )
+    top.apply( Mamba2020Pass(print_line_trace=s.print_line_trace,
+                             reset_active_high=s.reset_active_high) )
+
+class InlineSim( BasePass ):
   def __init__( s, *, waveform=None, print_line_trace=True, reset_active_high=True ):
     s.waveform = waveform
     s.print_line_trace = print_line_trace
@@ -50,5 +75,6 @@ class Mamba2020( BasePass ):
     if s.print_line_trace:
       CLLineTracePass()( top )
       LineTraceParamPass()( top )
-    Mamba2020Pass(print_line_trace=s.print_line_trace,
+    DynamicSchedulePass()( top )
+    InlineSimPass(print_line_trace=s.print_line_trace,
                   reset_active_high=s.reset_active_high)( top )
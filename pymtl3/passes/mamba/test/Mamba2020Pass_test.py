@@ -1,7 +1,10 @@
+import json
+
 from pymtl3.datatypes import Bits32
 from pymtl3.dsl import *
 from pymtl3.dsl.errors import UpblkCyclicError
 
+from ..Mamba2020Pass import Mamba2020Pass
 from ..PassGroups import Mamba2020
 
 
@@ -143,3 +146,108 @@ def test_update_once():
     return
 
   raise Exception("Should've thrown UpblkCyclicError")
+
+class ProfiledInner( Component ):
+  def construct( s ):
+    s.in_ = InPort(Bits32)
+    s.out = OutPort(Bits32)
+
+    @update
+    def up():
+      s.out @= s.in_ + 1
+
+class ProfiledTop( Component ):
+  def construct( s, N=8 ):
+    s.in_ = InPort(Bits32)
+    s.out = OutPort(Bits32)
+    s.acc = OutPort(Bits32)
+
+    s.inners = [ ProfiledInner() for i in range(N) ]
+    s.inners[0].in_ //= s.in_
+    for i in range(N-1):
+      s.inners[i].out //= s.inners[i+1].in_
+
+    s.last = Wire(Bits32)
+    s.last //= s.inners[N-1].out
+
+    # A combinational loop that converges in two iterations
+    s.x = Wire(Bits32)
+    s.y = Wire(Bits32)
+
+    @update
+    def up_x():
+      if s.y > 0: s.x @= s.last
+      else:       s.x @= s.last
+
+    @update
+    def up_y():
+      s.y @= s.x + 1
+
+    @update
+    def up_out():
+      s.out @= s.y
+
+    @update_ff
+    def up_acc():
+      if s.reset: s.acc <<= 0
+      else:       s.acc <<= s.acc + s.out
+
+def run_profiled( top, ncycles, use_sim_run ):
+  acc = 0
+  top.sim_reset()
+  if use_sim_run:
+    top.in_ @= 1
+    top.sim_run( ncycles )
+    acc = ncycles * 10
+  else:
+    for i in range( ncycles ):
+      top.in_ @= i
+      top.sim_eval_combinational()
+      assert top.out == i + 9
+      top.sim_tick()
+      acc += i + 9
+  assert top.acc == acc
+
+def test_profile_guided_schedule( tmp_path ):
+  path = str( tmp_path / "profile.json" )
+
+  top = ProfiledTop()
+  top.apply( Mamba2020( print_line_trace=False, profile_path=path, profile_cycles=10 ) )
+  assert top._sched.profiling
+  run_profiled( top, 20, False )
+
+  # The schedule is regenerated after the warm-up window
+  assert not top._sched.profiling
+  with open( path ) as f:
+    profile = json.load( f )
+  assert profile == top._sched.profile
+  assert profile['cycles'] == 10
+
+  assert "s.inners[3].up" in profile['blocks']
+  ncalls, ns = profile['blocks'][ "s.up_acc" ]
+  assert ncalls >= 10 and ns > 0
+
+  (scc, (nexecs, iters, _)), = profile['sccs'].items()
+  assert scc == "scc:s.up_x,s.up_y"
+  assert iters > nexecs > 0
+
+  # A later run starts with the tuned schedule
+  top = ProfiledTop()
+  top.apply( Mamba2020( print_line_trace=False, profile_path=path, profile_cycles=10 ) )
+  assert not top._sched.profiling
+  assert top._sched.profile['design'] == profile['design']
+  run_profiled( top, 20, False )
+
+def test_profile_with_sim_run( tmp_path ):
+  path = str( tmp_path / "profile.json" )
+
+  top = ProfiledTop()
+  top.apply( Mamba2020( print_line_trace=False, profile_path=path, profile_cycles=5 ) )
+  run_profiled( top, 30, True )
+  assert not top._sched.profiling
+
+  # A profile of another design is ignored
+  top = ProfiledTop( N=4 )
+  top.apply( Mamba2020( print_line_trace=False, profile_path=path ) )
+  assert top._sched.profile is None
+  assert not top._sched.profiling
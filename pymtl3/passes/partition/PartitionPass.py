@@ -0,0 +1,291 @@
+"""
+========================================================================
+PartitionPass.py
+========================================================================
+Split the child components of the top component into partitions that
+only communicate through latency-insensitive en/rdy channels, i.e. a
+SendIfcRTL of one child connected to a RecvIfcRTL of another child
+where the en, rdy, and msg nets do not leave these two children. Such a channel can be cut:
+the two sides can be simulated in different processes as long as the
+messages are delivered in order, because neither side may depend on
+the exact cycle in which a message arrives.
+
+This pass only analyzes the net/constraint graph that GenDAGPass has
+built. Children that share any other net, call each other's methods, or
+are accessed by the update blocks of the same component are coupled and
+always stay in the same partition. The coupled clusters are assigned to
+partitions based on the estimated cost of their update blocks, or as
+the user specifies.
+
+PartitionedSim (in PartitionedSim.py) uses the result to simulate the
+partitions in parallel.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+from pymtl3.dsl import CalleeIfcRTL, CallerIfcRTL, Component, MetadataKey
+from pymtl3.passes.BasePass import BasePass, PassMetadata
+from pymtl3.passes.errors import PartitionError, PassOrderError
+from pymtl3.passes.sim.ParallelSchedulePass import estimate_cost
+
+
+def get_top_child( top, obj ):
+  """ Return the child of top that hosts obj, or top itself. """
+  c = obj if isinstance( obj, Component ) else obj.get_host_component()
+  while c is not top and c.get_parent_object() is not top:
+    c = c.get_parent_object()
+  return c
+
+def get_child_name( top, child ):
+  """ Return the name of a child of top, e.g. 'src' or 'stages[1]'. """
+  return "top" if child is top else repr(child)[2:]
+
+class PartitionPass( BasePass ):
+
+  # PartitionPass public pass data
+
+  #: The number of partitions. PartitionPass creates fewer partitions if
+  #: the design does not have enough independent clusters of children.
+  #:
+  #: Type: ``int``; input
+  #:
+  #: Default value: 2
+  nparts = MetadataKey(int)
+
+  #: The user-specified partitions. Each partition is a list of child
+  #: components of top or their names (e.g. ``"src"`` or ``"s.src"``).
+  #: A child that is not listed goes with the children it is coupled to,
+  #: or to the least loaded partition.
+  #:
+  #: Type: ``list``; input
+  #:
+  #: Default value: None
+  partitions = MetadataKey(list)
+
+  def __call__( self, top ):
+    if not hasattr( top, "_dag" ) or not hasattr( top._dag, "final_upblks" ):
+      raise PassOrderError( "_dag" )
+
+    top._partition = p = PassMetadata()
+
+    p.children = [ top ] + list( top.get_child_components( repr ) )
+    p.all_channels = self.find_channels( top )
+    p.clusters = self.find_clusters( top, p.children, p.all_channels )
+
+    p.child_cost = self.estimate_child_costs( top, p.children )
+
+    if top.has_metadata( self.partitions ) and top.get_metadata( self.partitions ):
+      parts = self.assign_user_partitions( top, p, top.get_metadata( self.partitions ) )
+    else:
+      nparts = top.get_metadata( self.nparts ) if top.has_metadata( self.nparts ) else 2
+      parts = self.assign_partitions( p, nparts )
+
+    # Drop empty partitions and keep top in partition 0
+
+    parts = [ x for x in parts if x ]
+    parts.sort( key=lambda x: top not in x )
+
+    p.parts   = parts
+    p.part_of = { c: i for i, part in enumerate( parts ) for c in part }
+    p.costs   = [ sum( p.child_cost[c] for c in part ) for part in parts ]
+
+    p.channels = []
+    for ch in p.all_channels:
+      ch.src_part = p.part_of[ ch.src ]
+      ch.dst_part = p.part_of[ ch.dst ]
+      if ch.src_part != ch.dst_part:
+        p.channels.append( ch )
+
+  #-----------------------------------------------------------------------
+  # find_channels
+  #-----------------------------------------------------------------------
+  # A channel is a caller ifc and a callee ifc of two different children
+  # whose en, rdy, and msg nets only consist of whole signals inside
+  # these two children. The signals of such nets share the same object in
+  # simulation and have no copying net blocks.
+
+  def find_channels( self, top ):
+    net_of = {}
+    for net in top.get_all_value_nets():
+      for x in net[1]:
+        net_of[ x ] = net[1]
+
+    channels = []
+    callers  = top.get_all_object_filter( lambda x: isinstance( x, CallerIfcRTL ) )
+
+    for send in sorted( callers, key=repr ):
+      if not all( hasattr( send, x ) for x in ('en', 'rdy', 'msg') ) or send.RetType is not None:
+        continue
+
+      src = get_top_child( top, send )
+      if src is top or send.get_host_component() is not src:
+        continue
+
+      recv = None
+      for x in net_of.get( send.en, () ):
+        ifc = x.get_parent_object()
+        if isinstance( ifc, CalleeIfcRTL ) and ifc.get_host_component().get_parent_object() is top:
+          recv = ifc
+
+      if recv is None or not all( hasattr( recv, x ) for x in ('en', 'rdy', 'msg') ):
+        continue
+
+      dst = get_top_child( top, recv )
+      if dst is top or dst is src or recv.get_host_component() is not dst:
+        continue
+
+      def is_channel_net( name ):
+        net = net_of.get( getattr( send, name ), () )
+        return getattr( recv, name ) in net and \
+               all( x.is_top_level_signal() and get_top_child( top, x ) in (src, dst) for x in net )
+
+      if all( is_channel_net( x ) for x in ('en', 'rdy', 'msg') ):
+        ch = PassMetadata()
+        ch.send, ch.recv = send, recv
+        ch.src,  ch.dst  = src, dst
+        ch.nets = { x: set( net_of[ getattr( send, x ) ] ) for x in ('en', 'rdy', 'msg') }
+        channels.append( ch )
+
+    return channels
+
+  #-----------------------------------------------------------------------
+  # find_clusters
+  #-----------------------------------------------------------------------
+  # Union-find over the children of top. Top itself is a node so that
+  # the children that connect to the ports of top stay with it.
+
+  def find_clusters( self, top, children, channels ):
+    parent = { c: c for c in children }
+
+    def find( x ):
+      while parent[x] is not x:
+        parent[x] = parent[ parent[x] ]
+        x = parent[x]
+      return x
+
+    def union( objs ):
+      hosts = { get_top_child( top, x ) for x in objs }
+      root = find( hosts.pop() ) if hosts else None
+      for x in hosts:
+        parent[ find(x) ] = root
+
+    channel_signals = set()
+    for ch in channels:
+      for net in ch.nets.values():
+        channel_signals.update( net )
+
+    # The clk and reset are driven by the simulator in every process
+    for writer, signals in top.get_all_value_nets():
+      if writer is top.clk or writer is top.reset:
+        continue
+      if not signals.isdisjoint( channel_signals ):
+        continue
+      union( signals )
+
+    for writer, ports in top.get_all_method_nets():
+      union( ports if writer is None else [ writer, *ports ] )
+
+    reads, writes, calls = top.get_all_upblk_metadata()
+    for blk in top.get_all_update_blocks():
+      host = top.get_update_block_host_component( blk )
+      for data in ( reads, writes, calls ):
+        union( [ host, *data.get( blk, () ) ] )
+
+    clusters = {}
+    for c in children:
+      clusters.setdefault( find(c), [] ).append( c )
+    return list( clusters.values() )
+
+  def estimate_child_costs( self, top, children ):
+    cost = { c: 0 for c in children }
+    for blk in top.get_all_update_blocks():
+      cost[ get_top_child( top, top.get_update_block_host_component( blk ) ) ] += estimate_cost( blk )
+    return cost
+
+  #-----------------------------------------------------------------------
+  # assign_partitions
+  #-----------------------------------------------------------------------
+
+  @staticmethod
+  def _cluster_cost( p, cluster ):
+    return sum( p.child_cost[c] for c in cluster )
+
+  def assign_partitions( self, p, nparts ):
+    """ Greedily assign the most expensive cluster first to the partition
+    with the least cost. """
+    if nparts < 1:
+      raise PartitionError( "top", f"nparts must be positive, not {nparts}" )
+
+    parts = [ [] for _ in range(nparts) ]
+    loads = [ 0 ] * nparts
+    order = { c: i for i, c in enumerate( p.children ) }
+
+    for cluster in sorted( p.clusters, key=lambda x: ( -self._cluster_cost( p, x ), order[x[0]] ) ):
+      i = min( range(nparts), key=lambda i: loads[i] )
+      parts[i].extend( cluster )
+      loads[i] += self._cluster_cost( p, cluster )
+
+    return [ sorted( x, key=order.__getitem__ ) for x in parts ]
+
+  def assign_user_partitions( self, top, p, partitions ):
+    names = { get_child_name( top, c ): c for c in p.children }
+
+    def lookup( x ):
+      if isinstance( x, Component ):
+        if x in p.children:
+          return x
+        raise PartitionError( top, f"{x!r} is not a child component of top" )
+      name = x[2:] if x.startswith("s.") else x[4:] if x.startswith("top.") else x
+      if name not in names:
+        raise PartitionError( top, f"'{x}' is not a child component of top" )
+      return names[ name ]
+
+    part_of = {}
+    for i, part in enumerate( partitions ):
+      for x in part:
+        c = lookup( x )
+        if c in part_of and part_of[c] != i:
+          raise PartitionError( top, f"{get_child_name( top, c )} appears in more than one partition" )
+        part_of[c] = i
+
+    parts = [ [] for _ in partitions ]
+    loads = [ 0 ] * len(partitions)
+    order = { c: i for i, c in enumerate( p.children ) }
+
+    unassigned = []
+    for cluster in p.clusters:
+      ids = { part_of[c] for c in cluster if c in part_of }
+      if len(ids) > 1:
+        raise PartitionError( top, f"{', '.join( get_child_name( top, c ) for c in cluster )} "
+                                    "are not connected through latency-insensitive channels "
+                                    "and cannot be in different partitions" )
+      if ids:
+        i = ids.pop()
+        parts[i].extend( cluster )
+        loads[i] += self._cluster_cost( p, cluster )
+      else:
+        unassigned.append( cluster )
+
+    for cluster in sorted( unassigned, key=lambda x: ( -self._cluster_cost( p, x ), order[x[0]] ) ):
+      i = min( range(len(parts)), key=lambda i: loads[i] )
+      parts[i].extend( cluster )
+      loads[i] += self._cluster_cost( p, cluster )
+
+    return [ sorted( x, key=order.__getitem__ ) for x in parts ]
+
+def format_partition_report( top ):
+  """ Return a text summary of the partitions that PartitionPass found. """
+  p = top._partition
+  total = sum( p.costs ) or 1
+  lines = [ f"{len(p.parts)} partitions, {len(p.clusters)} clusters, "
+            f"{len(p.channels)}/{len(p.all_channels)} channels cut" ]
+  lines.append( f"{'part':>4} {'cost':>8} {'share':>6}  children" )
+  for i, (part, cost) in enumerate( zip( p.parts, p.costs ) ):
+    lines.append( f"{i:>4} {cost:>8} {cost/total:>6.1%}  "
+                  f"{', '.join( get_child_name( top, c ) for c in part )}" )
+  if p.costs:
+    mean = total / len(p.costs)
+    lines.append( f"imbalance (max/mean): {max(p.costs)/mean:.2f}" )
+  for ch in p.channels:
+    lines.append( f"channel {ch.send!r} ({ch.src_part}) -> {ch.recv!r} ({ch.dst_part})" )
+  return "\n".join( lines )
@@ -0,0 +1,415 @@
+"""
+========================================================================
+PartitionedSim.py
+========================================================================
+Simulate the partitions that PartitionPass finds in separate processes.
+Each process elaborates the whole design but only schedules the update
+blocks of its own partition. A cut channel becomes a ring buffer in
+shared memory:
+
+- the sender side drives send.rdy when the ring has space and pushes
+  send.msg into the ring at the clock edge when send.en is high,
+- the receiver side drives recv.en/recv.msg from the head of the ring
+  and pops it at the clock edge when recv.en is high.
+
+The processes run a quantum of cycles at a time and then exchange the
+ring pointers at a barrier, so a message pushed in a quantum becomes
+visible to the receiver at the beginning of the next quantum. This
+changes the cycle in which a message arrives, but not the order of the
+messages, which is all that latency-insensitive channels guarantee. The
+pointers of quantum e are published in slot e%2 so that the result is
+deterministic no matter how the processes are scheduled.
+
+  sim = PartitionedSim( mk_top, nparts=2, quantum=16 )
+  result = sim.run( max_cycles=10000 )
+  print( format_balance_report( result ) )
+
+The top component is created by calling a picklable factory in every
+process.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+import ctypes
+import multiprocessing
+import traceback
+from collections import namedtuple
+from multiprocessing.connection import wait as wait_objects
+from threading import BrokenBarrierError
+from time import perf_counter
+
+from pymtl3.datatypes import b1, is_bitstruct_class, mk_bits
+from pymtl3.passes.errors import PartitionError
+from pymtl3.passes.sim.DynamicSchedulePass import DynamicSchedulePass
+from pymtl3.passes.sim.GenDAGPass import GenDAGPass
+from pymtl3.passes.sim.PrepareSimPass import PrepareSimPass
+from pymtl3.passes.sim.SimpleSchedulePass import SimpleSchedulePass
+from pymtl3.passes.sim.WrapGreenletPass import WrapGreenletPass
+from pymtl3.passes.tracing.CLLineTracePass import CLLineTracePass
+from pymtl3.passes.tracing.LineTraceParamPass import LineTraceParamPass
+
+from .PartitionPass import PartitionPass, get_child_name, get_top_child
+
+# Returned by PartitionedSim.run. parts has one PartitionStats per
+# partition and collected has the results of collect( top ) of each
+# process.
+PartitionedSimResult = namedtuple( 'PartitionedSimResult',
+                                   [ 'ncycles', 'seconds', 'done', 'parts', 'collected' ] )
+
+# busy_seconds is the time spent in simulation and wait_seconds is the
+# time spent at the barrier waiting for the other partitions.
+PartitionStats = namedtuple( 'PartitionStats',
+                             [ 'part', 'children', 'cost', 'ncycles', 'busy_seconds',
+                               'wait_seconds', 'nsent', 'nrecv' ] )
+
+class _RemoteTraceback( Exception ):
+  def __init__( self, tb ):
+    self.tb = tb
+  def __str__( self ):
+    return self.tb
+
+#-------------------------------------------------------------------------
+# PartitionedSim
+#-------------------------------------------------------------------------
+
+class PartitionedSim:
+
+  def __init__( s, factory, *, nparts=2, partitions=None, quantum=1,
+                ring_size=64, start_method=None, timeout=300.0 ):
+    assert quantum > 0 and ring_size > 0
+
+    s.factory   = factory
+    s.quantum   = quantum
+    s.ring_size = ring_size
+    s.timeout   = timeout # seconds a partition waits for the others
+    s.ctx       = multiprocessing.get_context( start_method )
+
+    # Analyze the design in this process to create the shared memory
+
+    s.top = top = factory()
+    top.elaborate()
+    GenDAGPass()( top )
+    top.set_metadata( PartitionPass.nparts, nparts )
+    if partitions:
+      top.set_metadata( PartitionPass.partitions, partitions )
+    PartitionPass()( top )
+
+    p = top._partition
+    s.partitions = [ [ get_child_name( top, c ) for c in part ] for part in p.parts ]
+    s.has_done   = any( callable( getattr( c, 'done', None ) ) for c in p.children if c is not top )
+
+    s.rings = []
+    for ch in p.channels:
+      nbytes = ( ch.send.msg._dsl.Type.nbits + 7 ) // 8
+      s.rings.append( ( s.ctx.RawArray( ctypes.c_uint8, ring_size * max( nbytes, 1 ) ),
+                        s.ctx.RawArray( ctypes.c_int64, 4 ) ) )
+
+  def run( s, max_cycles=None, collect=None ):
+    """ Simulate until the done() of every child that has one returns
+    True, or for max_cycles cycles. collect( top ) is called in every
+    process at the end and must return a picklable value. """
+    if max_cycles is None and not s.has_done:
+      raise PartitionError( "top", "no child has done(), please specify max_cycles" )
+
+    nparts  = len( s.partitions )
+    barrier = s.ctx.Barrier( nparts, timeout=s.timeout )
+    flags   = s.ctx.RawArray( ctypes.c_int8, 2 * nparts )
+
+    procs, conns = [], []
+    for i in range( nparts ):
+      recv_conn, send_conn = s.ctx.Pipe( duplex=False )
+      config = ( s.partitions, s.quantum, s.ring_size, max_cycles, s.has_done )
+      proc = s.ctx.Process( target=_partition_worker, name=f"pymtl-part{i}",
+                            args=( i, s.factory, config, s.rings, barrier, flags,
+                                   collect, send_conn ) )
+      procs.append( proc )
+      conns.append( recv_conn )
+
+    t0 = perf_counter()
+    for proc in procs:
+      proc.start()
+
+    # If a process dies without reporting back, e.g. it is killed or it
+    # crashes in native code, we break the barrier so that the others
+    # don't wait for it until the timeout.
+
+    results = [ None ] * nparts
+    pending = { conn: i for i, conn in enumerate( conns ) }
+    pending.update( { proc.sentinel: i for i, proc in enumerate( procs ) } )
+
+    while pending:
+      for obj in wait_objects( list( pending ) ):
+        if obj not in pending:
+          continue # both ends of the same process are ready
+        i = pending.pop( obj )
+        conn = conns[i]
+        if obj is conn or conn.poll():
+          try:
+            results[i] = conn.recv()
+          except EOFError:
+            results[i] = ( 'died', )
+        else:
+          results[i] = ( 'died', )
+        if results[i][0] == 'died':
+          barrier.abort()
+        pending.pop( conn, None )
+        pending.pop( procs[i].sentinel, None )
+    seconds = perf_counter() - t0
+
+    for proc in procs:
+      proc.join()
+
+    for i, ret in enumerate( results ):
+      if ret[0] == 'error':
+        exc, tb = ret[1], ret[2]
+        exc.__cause__ = _RemoteTraceback( f"\nin partition {i}:\n{tb}" )
+        raise exc
+
+    for i, ret in enumerate( results ):
+      if ret[0] == 'died':
+        raise PartitionError( "top", f"partition {i} exited unexpectedly "
+                                     f"(exit code {procs[i].exitcode})" )
+
+    if any( ret[0] != 'ok' for ret in results ):
+      raise PartitionError( "top", f"partitions didn't reach the barrier within "
+                                   f"{s.timeout} seconds" )
+
+    parts = [ x[1] for x in results ]
+    return PartitionedSimResult( parts[0].ncycles, seconds, results[0][2],
+                                 parts, [ x[3] for x in results ] )
+
+#-------------------------------------------------------------------------
+# Channel ends
+#-------------------------------------------------------------------------
+# Each end returns ( drive, commit, publish, sync, count ). drive is an
+# update block that drives the ifc from the ring, commit is called at the
+# clock edge, and publish/sync exchange the pointers at the barrier.
+
+def _msg_codec( Type ):
+  nbits = Type.nbits
+  if is_bitstruct_class( Type ):
+    BitsN = mk_bits( nbits )
+    return ( lambda x: int( x.to_bits() ) ), ( lambda v: Type.from_bits( BitsN( v ) ) )
+  return int, Type
+
+def _mk_send_end( send, data, ctrl, cap ):
+  Type    = send.msg._dsl.Type
+  nbytes  = max( ( Type.nbits + 7 ) // 8, 1 )
+  encode  = _msg_codec( Type )[0]
+  mv      = memoryview( data ).cast( 'B' )
+  ptr     = [ 0, 0 ] # tail, head seen at the last barrier
+
+  def partition_send_rdy():
+    send.rdy @= b1( ptr[0] - ptr[1] < cap )
+
+  def commit():
+    if send.en:
+      off = ( ptr[0] % cap ) * nbytes
+      mv[ off:off+nbytes ] = encode( send.msg ).to_bytes( nbytes, 'little' )
+      ptr[0] += 1
+
+  def publish( e ):
+    ctrl[ e & 1 ] = ptr[0]
+
+  def sync( e ):
+    ptr[1] = ctrl[ 2 + ( e & 1 ) ]
+
+  return partition_send_rdy, commit, publish, sync, lambda: ptr[0]
+
+def _mk_recv_end( recv, data, ctrl, cap ):
+  Type    = recv.msg._dsl.Type
+  nbytes  = max( ( Type.nbits + 7 ) // 8, 1 )
+  decode  = _msg_codec( Type )[1]
+  mv      = memoryview( data ).cast( 'B' )
+  ptr     = [ 0, 0 ]     # head, tail seen at the last barrier
+  head    = [ -1, None ] # decoded message at the head
+
+  def partition_recv_en_msg():
+    h = ptr[0]
+    if h < ptr[1]:
+      if head[0] != h:
+        off = ( h % cap ) * nbytes
+        head[0], head[1] = h, decode( int.from_bytes( mv[ off:off+nbytes ], 'little' ) )
+      recv.en  @= recv.rdy
+      recv.msg @= head[1]
+    else:
+      recv.en  @= 0
+
+  def commit():
+    if recv.en:
+      ptr[0] += 1
+
+  def publish( e ):
+    ctrl[ 2 + ( e & 1 ) ] = ptr[0]
+
+  def sync( e ):
+    ptr[1] = ctrl[ e & 1 ]
+
+  return partition_recv_en_msg, commit, publish, sync, lambda: ptr[0]
+
+#-------------------------------------------------------------------------
+# Localize the schedule of a partition
+#-------------------------------------------------------------------------
+
+def _touches( objs, signals ):
+  for x in objs:
+    while x.is_signal():
+      if x in signals:
+        return True
+      x = x.get_parent_object()
+  return False
+
+def localize_dag( top, part ):
+  """ Remove the update blocks of other partitions from top._dag. Net
+  blocks stay with the partition of their writer. Return the predicate
+  of local blocks. """
+  p = top._partition
+  dag = top._dag
+
+  def is_local( blk ):
+    if blk in dag.genblks:
+      reads = dag.genblk_reads.get( blk )
+      objs  = reads if reads else dag.genblk_writes[ blk ]
+      return any( p.part_of[ get_top_child( top, x ) ] == part for x in objs )
+    return p.part_of[ get_top_child( top, top.get_update_block_host_component( blk ) ) ] == part
+
+  dag.final_upblks = { x for x in dag.final_upblks if is_local( x ) }
+  return is_local
+
+def add_channel_blocks( top, drive, reads, writes ):
+  """ Add the drive block of a channel end to top._dag. It is scheduled
+  after the local blocks that write any signal in reads, and before the
+  local blocks that read any signal in writes. """
+  dag = top._dag
+  upblk_reads, upblk_writes, _ = top.get_all_upblk_metadata()
+
+  for blk in dag.final_upblks:
+    if blk in dag.genblks:
+      rd, wr = dag.genblk_reads.get( blk, () ), dag.genblk_writes.get( blk, () )
+    else:
+      rd, wr = upblk_reads.get( blk, () ), upblk_writes.get( blk, () )
+
+    if reads and _touches( wr, reads ):
+      dag.all_constraints.add( ( blk, drive ) )
+    if _touches( rd, writes ):
+      dag.all_constraints.add( ( drive, blk ) )
+
+  dag.final_upblks.add( drive )
+
+#-------------------------------------------------------------------------
+# Worker process
+#-------------------------------------------------------------------------
+
+def _partition_worker( part, factory, config, rings, barrier, flags, collect, conn ):
+  try:
+    partitions, quantum, ring_size, max_cycles, has_done = config
+
+    top = factory()
+    top.elaborate()
+    LineTraceParamPass()( top )
+    GenDAGPass()( top )
+    WrapGreenletPass()( top )
+    CLLineTracePass()( top )
+    top.set_metadata( PartitionPass.partitions, partitions )
+    PartitionPass()( top )
+
+    p = top._partition
+    assert len( p.channels ) == len( rings )
+
+    is_local = localize_dag( top, part )
+
+    ends = []
+    for ch, (data, ctrl) in zip( p.channels, rings ):
+      if ch.src_part == part:
+        end = _mk_send_end( ch.send, data, ctrl, ring_size )
+        add_channel_blocks( top, end[0], (), ch.nets['rdy'] )
+        ends.append( ( 'send', end ) )
+      elif ch.dst_part == part:
+        end = _mk_recv_end( ch.recv, data, ctrl, ring_size )
+        add_channel_blocks( top, end[0], ch.nets['rdy'], ch.nets['en'] | ch.nets['msg'] )
+        ends.append( ( 'recv', end ) )
+
+    DynamicSchedulePass()( top )
+    top._sched.schedule_ff = [ x for x in top._sched.schedule_ff if is_local( x ) ] + \
+                             [ end[1] for _, end in ends ]
+    SimpleSchedulePass.schedule_ff_phases( top, is_local )
+    PrepareSimPass( print_line_trace=False )( top )
+
+    local_done = [ c for c in p.parts[ part ]
+                   if c is not top and callable( getattr( c, 'done', None ) ) ]
+    nparts = len( partitions )
+
+    top.sim_reset()
+
+    e = ncycles = 0
+    busy = wait = 0.0
+    all_done = False
+
+    while max_cycles is None or ncycles < max_cycles:
+      k = quantum if max_cycles is None else min( quantum, max_cycles - ncycles )
+      busy += top.sim_run( k ).seconds
+      ncycles += k
+
+      for _, end in ends:
+        end[2]( e )
+      flags[ ( e & 1 ) * nparts + part ] = all( c.done() for c in local_done )
+
+      t0 = perf_counter()
+      barrier.wait()
+      wait += perf_counter() - t0
+
+      for _, end in ends:
+        end[3]( e )
+      all_done = has_done and all( flags[ ( e & 1 ) * nparts : ( e & 1 ) * nparts + nparts ] )
+      e += 1
+      if all_done:
+        break
+
+    stats = PartitionStats( part, [ get_child_name( top, c ) for c in p.parts[ part ] ],
+                            p.costs[ part ], ncycles, busy, wait,
+                            sum( end[4]() for kind, end in ends if kind == 'send' ),
+                            sum( end[4]() for kind, end in ends if kind == 'recv' ) )
+    conn.send( ( 'ok', stats, all_done, collect( top ) if collect else None ) )
+
+  except BrokenBarrierError:
+    conn.send( ( 'aborted', ) )
+
+  except BaseException as e:
+    barrier.abort()
+    tb = traceback.format_exc()
+    try:
+      conn.send( ( 'error', e, tb ) )
+    except Exception:
+      conn.send( ( 'error', PartitionError( "top", f"{e!r}" ), tb ) )
+
+  finally:
+    conn.close()
+
+#-------------------------------------------------------------------------
+# Report
+#-------------------------------------------------------------------------
+
+def format_balance_report( result ):
+  """ Return a text summary of how well the partitions are balanced. The
+  estimated cost is the size of the bytecode of the update blocks, and
+  the busy time is the measured time in simulation. The time a partition
+  spends waiting at the barrier is the time it would gain from a better
+  partitioning. """
+  parts = result.parts
+  total_cost = sum( x.cost for x in parts ) or 1
+  total_busy = sum( x.busy_seconds for x in parts ) or 1e-9
+
+  lines = [ f"{len(parts)} partitions, {result.ncycles} cycles in {result.seconds:.3f}s"
+            f"{' (done)' if result.done else ''}",
+            f"{'part':>4} {'cost':>8} {'share':>6} {'busy(s)':>9} {'share':>6} "
+            f"{'wait(s)':>9} {'sent':>7} {'recv':>7}  children" ]
+  for x in parts:
+    lines.append( f"{x.part:>4} {x.cost:>8} {x.cost/total_cost:>6.1%} {x.busy_seconds:>9.3f} "
+                  f"{x.busy_seconds/total_busy:>6.1%} {x.wait_seconds:>9.3f} {x.nsent:>7} "
+                  f"{x.nrecv:>7}  {', '.join( x.children )}" )
+
+  mean_cost = total_cost / len(parts)
+  mean_busy = total_busy / len(parts)
+  lines.append( f"imbalance (max/mean): estimated {max( x.cost for x in parts )/mean_cost:.2f}, "
+                f"measured {max( x.busy_seconds for x in parts )/mean_busy:.2f}" )
+  return "\n".join( lines )
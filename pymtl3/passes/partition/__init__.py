@@ -0,0 +1,2 @@
+from .PartitionedSim import PartitionedSim, format_balance_report
+from .PartitionPass import PartitionPass, format_partition_report
@@ -0,0 +1,195 @@
+#=========================================================================
+# PartitionedSim_test.py
+#=========================================================================
+#
+# Author : Batten Research Group
+# Date   : Oct 17, 2026
+
+import os
+import time
+
+import pytest
+
+from pymtl3.datatypes import Bits1, Bits16
+from pymtl3.dsl import *
+from pymtl3.passes.errors import PartitionError
+from pymtl3.passes.sim.GenDAGPass import GenDAGPass
+from pymtl3.stdlib.ifcs import RecvIfcRTL, SendIfcRTL
+from pymtl3.stdlib.test_utils.test_sinks import TestSinkRTL
+from pymtl3.stdlib.test_utils.test_srcs import TestSrcRTL
+
+from ..PartitionedSim import PartitionedSim, format_balance_report
+from ..PartitionPass import PartitionPass, format_partition_report
+
+
+class Incr( Component ):
+  def construct( s ):
+    s.recv = RecvIfcRTL( Bits16 )
+    s.send = SendIfcRTL( Bits16 )
+
+    s.busy = OutPort( Bits1 )
+
+    s.full = Wire( Bits1 )
+    s.buf  = Wire( Bits16 )
+    s.busy //= s.full
+
+    @update
+    def up_comb():
+      s.recv.rdy @= ~s.full
+      s.send.en  @= s.full & s.send.rdy
+      s.send.msg @= s.buf + 1
+
+    @update_ff
+    def up_ff():
+      if s.reset:
+        s.full <<= 0
+      elif s.recv.en:
+        s.full <<= 1
+        s.buf  <<= s.recv.msg
+      elif s.send.en:
+        s.full <<= 0
+
+MSGS = [ Bits16(x * 7) for x in range(20) ]
+
+class Pipeline( Component ):
+  def construct( s ):
+    s.src  = TestSrcRTL( Bits16, MSGS, interval_delay=1 )
+    s.inc0 = Incr()
+    s.inc1 = Incr()
+    s.sink = TestSinkRTL( Bits16, [ x + 2 for x in MSGS ] )
+
+    s.src.send  //= s.inc0.recv
+    s.inc0.send //= s.inc1.recv
+    s.inc1.send //= s.sink.recv
+
+class Coupled( Component ):
+  def construct( s ):
+    s.src  = TestSrcRTL( Bits16, MSGS )
+    s.inc0 = Incr()
+    s.sink = TestSinkRTL( Bits16, [ x + 1 for x in MSGS ] )
+
+    s.src.send      //= s.inc0.recv
+    s.inc0.send.en  //= s.sink.recv.en
+    s.inc0.send.msg //= s.sink.recv.msg
+    s.inc0.send.rdy //= s.sink.recv.rdy
+
+    s.dbg = OutPort( Bits1 )
+
+    @update
+    def up_dbg():
+      s.dbg @= s.inc0.busy
+
+def get_cycles( top ):
+  return top.sim_cycle_count()
+
+def test_partition_pass():
+  top = Pipeline()
+  top.elaborate()
+  GenDAGPass()( top )
+  top.set_metadata( PartitionPass.nparts, 2 )
+  PartitionPass()( top )
+
+  p = top._partition
+  assert len( p.all_channels ) == 3
+  assert len( p.parts ) == 2
+  assert sorted( len(x) for x in p.clusters ) == [ 1, 1, 1, 1, 1 ]
+  assert len( p.channels ) >= 1
+  print( format_partition_report( top ) )
+
+def test_partition_pass_coupled():
+  top = Coupled()
+  top.elaborate()
+  GenDAGPass()( top )
+  top.set_metadata( PartitionPass.partitions, [ [ "src" ], [ "inc0" ] ] )
+  PartitionPass()( top )
+
+  # Connecting en/rdy/msg one by one still forms a channel, but inc0 is
+  # coupled to top through up_dbg
+  p = top._partition
+  assert len( p.all_channels ) == 2
+  assert p.part_of[ top.inc0 ] == p.part_of[ top ]
+  assert p.part_of[ top.src ] != p.part_of[ top ]
+
+  top = Coupled()
+  top.elaborate()
+  GenDAGPass()( top )
+  top.set_metadata( PartitionPass.partitions, [ [ "s.inc0" ], [ "top" ] ] )
+  with pytest.raises( PartitionError ):
+    PartitionPass()( top )
+
+@pytest.mark.parametrize( "quantum", [ 1, 4 ] )
+def test_partitioned_sim( quantum ):
+  sim = PartitionedSim( Pipeline, partitions=[ [ "src", "inc0" ], [ "inc1", "sink" ] ],
+                        quantum=quantum, ring_size=4 )
+  result = sim.run( max_cycles=1000, collect=get_cycles )
+
+  assert result.done
+  assert len( result.parts ) == 2
+  assert result.parts[0].nsent == result.parts[1].nrecv == len(MSGS)
+  assert result.parts[0].ncycles == result.parts[1].ncycles == result.ncycles < 1000
+  assert result.collected == [ result.ncycles + 3 ] * 2
+
+  report = format_balance_report( result )
+  print( report )
+  assert "imbalance" in report
+
+def test_partitioned_sim_four_parts():
+  sim = PartitionedSim( Pipeline, nparts=4, quantum=2 )
+  result = sim.run( max_cycles=1000 )
+  assert result.done
+  assert len( result.parts ) == 4
+  assert sum( x.nsent for x in result.parts ) == 3 * len(MSGS)
+
+class BadSink( Pipeline ):
+  def construct( s ):
+    s.src  = TestSrcRTL( Bits16, MSGS )
+    s.inc0 = Incr()
+    s.sink = TestSinkRTL( Bits16, MSGS )
+
+    s.src.send  //= s.inc0.recv
+    s.inc0.send //= s.sink.recv
+
+def test_partitioned_sim_error():
+  sim = PartitionedSim( BadSink, nparts=2 )
+  with pytest.raises( Exception ) as e:
+    sim.run( max_cycles=100 )
+  assert "in partition" in str( e.value.__cause__ )
+
+class Stuck( Component ):
+  def construct( s, exit_code=None ):
+    s.cnt = Wire( Bits16 )
+
+    @update_ff
+    def up_stuck():
+      s.cnt <<= s.cnt + 1
+      if s.cnt == 5:
+        if exit_code is None:
+          time.sleep( 3 )
+        else:
+          os._exit( exit_code )
+
+class CrashSink( Pipeline ):
+  def construct( s ):
+    super().construct()
+    s.stuck = Stuck( 3 )
+
+class SlowSink( Pipeline ):
+  def construct( s ):
+    super().construct()
+    s.stuck = Stuck()
+
+def test_partitioned_sim_crash():
+  # The other partition must not wait for the crashed one
+  sim = PartitionedSim( CrashSink, partitions=[ [ "src", "inc0" ], [ "inc1", "sink", "stuck" ] ] )
+  t0 = time.perf_counter()
+  with pytest.raises( PartitionError ) as e:
+    sim.run( max_cycles=100 )
+  assert "partition 1 exited unexpectedly (exit code 3)" in str( e.value )
+  assert time.perf_counter() - t0 < sim.timeout
+
+def test_partitioned_sim_timeout():
+  sim = PartitionedSim( SlowSink, partitions=[ [ "src", "inc0" ], [ "inc1", "sink", "stuck" ] ],
+                        timeout=0.5 )
+  with pytest.raises( PartitionError ) as e:
+    sim.run( max_cycles=100 )
+  assert "within 0.5 seconds" in str( e.value )
@@ -66,6 +66,9 @@ class BehavioralRTLIRGenL1Pass( RTLIRPass ):
       for blk in upblks[ upblk_type ]:
         visitor._upblk_type = upblk_type
         upblk_info = m.get_update_block_info( blk )
+        if blk in m.get_update_ff_rates():
+          raise PyMTLSyntaxError( blk, upblk_info[-1],
+            'multi-rate update_ff blocks (period > 1) cannot be translated!' )
         upblk = visitor.enter( blk, upblk_info[-1] )
         upblk.is_lambda = upblk_info[0]
         upblk.src       = upblk_info[1]
@@ -0,0 +1,302 @@
+"""
+========================================================================
+CheckpointPass.py
+========================================================================
+Snapshot and restore the complete simulation state. When the simulation
+is locked in, we record
+
+- every Bits object that backs a signal, including the leaf fields of
+  bitstruct signals, whose _uint and _next we save;
+- every component/interface and every plain Python object reachable
+  from their attributes (e.g. MagicMemoryFL), whose attributes we save,
+  e.g. queues in cl_queues, pipelines in DelayPipeCL, memory arrays;
+- top._sim.simulated_cycles.
+
+Saved attributes are deep-copied except for the recorded objects above
+which keep their identity, so a restored model still refers to the same
+signal values and components that the generated tick functions use.
+Containers (list, dict, deque, bytearray, ...) are restored in place.
+
+top.sim_save() returns a pickled binary blob that can be written to the
+disk, and top.sim_restore() accepts the blob or a file path. The blob
+can be restored into another instance of the same design, e.g. in a
+different process, as long as the elaboration is identical.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+import hashlib
+import io
+import pickle
+import types
+from collections import deque
+from copy import deepcopy
+from functools import partial
+
+from pymtl3.datatypes import Bits, is_bitstruct_inst
+from pymtl3.dsl import Const, Signal
+from pymtl3.dsl.NamedObject import NamedObject
+from pymtl3.passes.BasePass import BasePass
+
+from .SimHooks import CHECKPOINT_PRIORITY, SimHooks, add_hook
+
+CHECKPOINT_FORMAT_VERSION = 1
+
+# Attributes of these types are neither state nor picklable in general
+_skip_types = ( type, types.ModuleType, types.FunctionType, types.MethodType,
+                types.BuiltinFunctionType, partial )
+
+# These containers are restored in place so that other references to
+# them stay valid
+_inplace_types = ( list, bytearray, dict, set, deque )
+
+_missing = object()
+
+class CheckpointPass( BasePass ):
+
+  def __call__( self, top ):
+    top._check_called_at_elaborate_top( "CheckpointPass" )
+
+    def bind_checkpoint():
+      top._sim.checkpoint = state = SimState( top )
+
+      def sim_save( path=None ):
+        blob = state.dumps()
+        if path is not None:
+          with open( path, 'wb' ) as f:
+            f.write( blob )
+        return blob
+
+      def sim_restore( blob ):
+        if isinstance( blob, str ):
+          with open( blob, 'rb' ) as f:
+            blob = f.read()
+        state.loads( blob )
+
+      top.sim_save    = sim_save
+      top.sim_restore = sim_restore
+
+    add_hook( top, SimHooks.lock_in_hooks, 'CheckpointPass', CHECKPOINT_PRIORITY,
+              bind_checkpoint )
+
+    # The simulation is already locked in
+    if hasattr( top, '_sim' ) and getattr( top._sim, 'locked_simulation', False ):
+      bind_checkpoint()
+
+#-------------------------------------------------------------------------
+# SimState
+#-------------------------------------------------------------------------
+# Capture/restore work on Python objects and are used for fast
+# in-memory snapshots. dumps/loads additionally pickle the snapshot with
+# the recorded objects replaced by persistent ids.
+
+def _is_plain_object( obj ):
+  """ Return True if obj is an instance of a plain Python class whose
+  state is simply its __dict__. """
+  if isinstance( obj, _skip_types ) or not hasattr( obj, '__dict__' ):
+    return False
+  cls = type(obj)
+  return cls.__reduce__ is object.__reduce__ and \
+         cls.__reduce_ex__ is object.__reduce_ex__ and \
+         getattr( cls, '__getstate__', None ) is getattr( object, '__getstate__', None ) and \
+         not hasattr( cls, '__setstate__' ) and not hasattr( cls, '__deepcopy__' )
+
+def _get_leaf_bits( value, ret ):
+  if isinstance( value, Bits ):
+    ret.append( value )
+  elif isinstance( value, list ):
+    for x in value:
+      _get_leaf_bits( x, ret )
+  elif is_bitstruct_inst( value ):
+    for name in value.__bitstruct_fields__:
+      _get_leaf_bits( getattr( value, name ), ret )
+
+class SimState:
+
+  def __init__( s, top ):
+    s.top = top
+
+    # Signal values, ordered by the name of the signal. Signals in the
+    # same net share the same value object.
+
+    values = {}
+    for sig, (_, _, _, value) in top._sim.signal_object_mapping.items():
+      if not isinstance( value, int ):
+        name = repr(sig)
+        if id(value) not in values or name < values[ id(value) ][0]:
+          values[ id(value) ] = (name, value)
+    s.values = [ v for _, v in sorted( values.values(), key=lambda x: x[0] ) ]
+
+    s.leaves = []
+    for v in s.values:
+      _get_leaf_bits( v, s.leaves )
+
+    # Objects whose attributes are saved: components, interfaces and
+    # method ports first, then plain Python objects reachable from them
+
+    named = sorted( [ x for x in top._dsl.all_named_objects
+                      if not isinstance( x, (Signal, Const) ) ], key=repr )
+
+    s.holders = []
+    shared = { id(x) for x in s.values }
+    shared.update( id(x) for x in s.leaves )
+
+    def add_holder( obj ):
+      if id(obj) not in shared:
+        shared.add( id(obj) )
+        s.holders.append( obj )
+        return True
+      return False
+
+    def discover( obj ):
+      if isinstance( obj, (list, tuple) ):
+        for x in obj:
+          discover( x )
+      elif isinstance( obj, dict ):
+        for x in obj.values():
+          discover( x )
+      elif isinstance( obj, NamedObject ) or _is_plain_object( obj ):
+        if add_holder( obj ):
+          Q.append( obj )
+
+    Q = deque()
+    for x in named:
+      add_holder( x )
+      Q.append( x )
+
+    while Q:
+      obj = Q.popleft()
+      for name, value in s._get_attrs( obj ):
+        discover( value )
+
+    s.memo = {}
+    for x in s.values:  s.memo[ id(x) ] = x
+    for x in s.leaves:  s.memo[ id(x) ] = x
+    for x in s.holders: s.memo[ id(x) ] = x
+
+    # Persistent ids for pickling
+    s.pid = {}
+    for i, x in enumerate( s.values ):  s.pid[ id(x) ] = ('v', i)
+    for i, x in enumerate( s.leaves ):  s.pid[ id(x) ] = ('l', i)
+    for i, x in enumerate( s.holders ): s.pid[ id(x) ] = ('h', i)
+
+    h = hashlib.sha1()
+    h.update( f"{CHECKPOINT_FORMAT_VERSION}".encode() )
+    for x in named:
+      h.update( repr(x).encode() )
+    h.update( " ".join( str(x._nbits) for x in s.leaves ).encode() )
+    s.signature = h.hexdigest()
+
+  def _get_attrs( s, obj ):
+    # We skip the metadata of NamedObjects, e.g. _dsl
+    is_named = isinstance( obj, NamedObject )
+    for name, value in obj.__dict__.items():
+      if is_named and name[0] == '_':
+        continue
+      if isinstance( value, _skip_types ):
+        continue
+      yield name, value
+
+  def capture( s ):
+    """ Return a snapshot of the current state. """
+    memo  = dict( s.memo )
+    attrs = [ deepcopy( dict( s._get_attrs( x ) ), memo ) for x in s.holders ]
+    return ( [ x._uint for x in s.leaves ],
+             [ getattr( x, '_next', None ) for x in s.leaves ],
+             attrs, s.top._sim.simulated_cycles )
+
+  def capture_values( s ):
+    """ Return a snapshot of the signal values only. restore() accepts
+    it as well and leaves the attributes untouched. """
+    return ( [ x._uint for x in s.leaves ],
+             [ getattr( x, '_next', None ) for x in s.leaves ],
+             [], s.top._sim.simulated_cycles )
+
+  def dumps_attrs( s ):
+    """ Return the pickled attributes of the recorded objects, i.e. the
+    Python state besides the signal values, to check if it has changed.
+    Raise TypeError if it cannot be pickled. """
+    f = io.BytesIO()
+    try:
+      _Pickler( f, s.pid ).dump( [ dict( s._get_attrs( x ) ) for x in s.holders ] )
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+      raise TypeError( f"Cannot serialize the simulation state: {e}" ) from e
+    return f.getvalue()
+
+  def restore( s, state, copy=True ):
+    """ Restore the snapshot. The snapshot can be restored again later
+    unless copy is False. """
+    uints, nexts, attrs, cycles = state
+
+    for x, u, n in zip( s.leaves, uints, nexts ):
+      x._uint = u
+      if n is not None:
+        x._next = n
+
+    if copy:
+      attrs = deepcopy( attrs, dict( s.memo ) )
+
+    for obj, saved in zip( s.holders, attrs ):
+      d = obj.__dict__
+      for name, value in saved.items():
+        cur = d.get( name, _missing )
+        if cur is value:
+          continue
+        t = type(cur)
+        if t is type(value) and t in _inplace_types:
+          if t is deque:
+            if cur.maxlen == value.maxlen:
+              cur.clear()
+              cur.extend( value )
+              continue
+          elif t is list or t is bytearray:
+            cur[:] = value
+            continue
+          else: # dict, set
+            cur.clear()
+            cur.update( value )
+            continue
+        setattr( obj, name, value )
+
+    s.top._sim.simulated_cycles = cycles
+
+    # The event-driven update function needs to re-evaluate every block
+    ed = getattr( getattr( s.top, '_sched', None ), 'event_driven', None )
+    if ed is not None and hasattr( ed, 'invalidate' ):
+      ed.invalidate()
+
+  def dumps( s ):
+    f = io.BytesIO()
+    try:
+      _Pickler( f, s.pid ).dump( (s.signature, s.capture()) )
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+      raise TypeError( f"Cannot serialize the simulation state: {e}" ) from e
+    return f.getvalue()
+
+  def loads( s, blob ):
+    lookup = { 'v': s.values, 'l': s.leaves, 'h': s.holders }
+
+    signature = None
+    try:
+      signature, state = _Unpickler( io.BytesIO( blob ), lookup ).load()
+    except (IndexError, KeyError):
+      pass
+    if signature != s.signature:
+      raise ValueError( "The checkpoint was saved from a different design." )
+    s.restore( state, copy=False )
+
+class _Pickler( pickle.Pickler ):
+  def __init__( s, f, pid ):
+    super().__init__( f, protocol=pickle.HIGHEST_PROTOCOL )
+    s.pid = pid
+
+  def persistent_id( s, obj ):
+    return s.pid.get( id(obj) )
+
+class _Unpickler( pickle.Unpickler ):
+  def __init__( s, f, lookup ):
+    super().__init__( f )
+    s.lookup = lookup
+
+  def persistent_load( s, pid ):
+    return s.lookup[ pid[0] ][ pid[1] ]
@@ -0,0 +1,229 @@
+"""
+========================================================================
+ConeOfInfluencePass.py
+========================================================================
+Prune the update blocks that cannot affect a given set of observed
+signals. A test that only checks some output ports does not need to
+simulate the logic that only drives the other ones.
+
+Starting from the blocks that write the observed signals, we walk
+backwards through
+
+- the constraint graph, which covers the combinational dependencies and
+  the explicit constraints,
+- the signals read by every kept block, including the signals that are
+  written by update_ff blocks in the previous cycle, and the value nets
+  that connect them.
+
+Blocks whose effects we cannot see are always kept, together with their
+cone of influence: update_once blocks, blocks that call methods, and
+blocks that do not write any signal (e.g. blocks that check values or
+update Python state).
+
+The pruned blocks are removed from top._dag.final_upblks and from the
+constraints, and top._dag.pruned_upblks tells the schedule passes to
+skip the pruned update_ff blocks. The signals that are only driven by
+pruned blocks keep stale values, so waveforms and line traces of the
+pruned logic are meaningless.
+
+This pass has to be applied after GenDAGPass and before the schedule
+pass.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+from collections import defaultdict, deque
+
+from pymtl3.dsl import MetadataKey
+from pymtl3.passes.BasePass import BasePass, PassMetadata
+from pymtl3.passes.errors import PassOrderError
+
+
+class ConeOfInfluencePass( BasePass ):
+
+  # ConeOfInfluencePass public pass data
+
+  #: The signals that are observed. The pass does nothing if this is not
+  #: set.
+  #:
+  #: Type: ``list`` of signals; input
+  observed = MetadataKey(list)
+
+  def __call__( self, top ):
+    if not hasattr( top, "_dag" ):
+      raise PassOrderError( "_dag" )
+    if hasattr( top, "_sched" ):
+      raise Exception( "ConeOfInfluencePass must be applied before the schedule pass!" )
+
+    if not top.has_metadata( self.observed ):
+      return
+
+    observed = top.get_metadata( self.observed )
+    for x in observed:
+      assert x.is_signal(), f"{x!r} is not a signal"
+
+    top._coi = coi = PassMetadata()
+    coi.observed = list( observed )
+
+    self.find_cone( top, coi )
+    self.prune( top, coi )
+
+  def find_cone( self, top, coi ):
+    """ Set coi.kept and coi.pruned to the blocks in and out of the cone
+    of influence of coi.observed. """
+    g = gen_signal_dependency( top )
+    coi.all_upblks = g.all_upblks
+
+    # Blocks with invisible effects are the other roots
+    _, _, upblk_calls = top.get_all_upblk_metadata()
+    onces = top.get_all_update_once()
+    roots = [ x for x in g.all_upblks
+              if x not in top._dag.genblks and ( x in onces or upblk_calls.get( x ) or
+                                                 not g.node_writes[ x ] ) ]
+
+    visited = set( roots )
+    Q = deque( roots )
+    for sig in coi.observed:
+      for node in g.writers_of( sig ):
+        if node not in visited:
+          visited.add( node )
+          Q.append( node )
+
+    while Q:
+      u = Q.popleft()
+      deps = set( g.pred.get( u, () ) )
+      for rd in g.node_reads[ u ]:
+        deps |= g.writers_of( rd )
+      for v in deps:
+        if v not in visited:
+          visited.add( v )
+          Q.append( v )
+
+    coi.roots  = set( roots )
+    coi.kept   = g.all_upblks & visited
+    coi.pruned = g.all_upblks - visited
+
+  def prune( self, top, coi ):
+    dag = top._dag
+    mapping = getattr( dag, 'blk_greenlet_mapping', {} )
+    pruned  = { mapping.get( x, x ) for x in coi.pruned }
+
+    dag.final_upblks    = dag.final_upblks - pruned
+    dag.all_constraints = { (x, y) for (x, y) in dag.all_constraints
+                            if x not in pruned and y not in pruned }
+    dag.pruned_upblks   = getattr( dag, 'pruned_upblks', set() ) | coi.pruned
+
+#-------------------------------------------------------------------------
+# gen_signal_dependency
+#-------------------------------------------------------------------------
+
+def gen_signal_dependency( top ):
+  """ Return the signals that every block in top._dag reads and writes,
+  the function that finds the writers of a signal, and the predecessors
+  of every block in the constraint graph. Blocks are the original ones,
+  not the greenlet wrappers. Value nets are also nodes, which never show
+  up in the schedule, since alias nets don't have net blocks (see
+  GenDAGPass.alias_nets). They are redundant for nets with a net block
+  but also harmless. """
+  dag = top._dag
+  upblk_reads, upblk_writes, _ = top.get_all_upblk_metadata()
+
+  g = PassMetadata()
+
+  g.mapping = mapping = getattr( dag, 'blk_greenlet_mapping', {} )
+  origin = { y: x for x, y in mapping.items() }
+
+  g.all_upblks = { origin.get( x, x ) for x in dag.final_upblks }
+
+  g.node_reads  = node_reads  = {}
+  g.node_writes = node_writes = {}
+
+  for blk in g.all_upblks:
+    if blk in dag.genblks:
+      node_reads[ blk ]  = dag.genblk_reads.get( blk, () )
+      node_writes[ blk ] = dag.genblk_writes.get( blk, () )
+    else:
+      node_reads[ blk ]  = upblk_reads.get( blk, () )
+      node_writes[ blk ] = upblk_writes.get( blk, () )
+
+  # A Const writer doesn't depend on anything
+  for i, (writer, signals) in enumerate( top.get_all_value_nets() ):
+    net = ( 'net', i )
+    node_reads[ net ]  = ( writer, ) if writer.is_signal() else ()
+    node_writes[ net ] = [ x for x in signals if x is not writer ]
+
+  # Index the writers of every signal. A read of A.b depends on the
+  # writes of A.b, of its parents, of its children, and of the
+  # overlapping sibling slices.
+  write_exact = defaultdict(set)
+  write_under = defaultdict(set)
+
+  for node, writes in node_writes.items():
+    for wr in writes:
+      write_exact[ wr ].add( node )
+      x = wr.get_parent_object()
+      while x.is_signal():
+        write_under[ x ].add( node )
+        x = x.get_parent_object()
+
+  def writers_of( obj ):
+    ret = set( write_under.get( obj, () ) )
+    x = obj
+    while x.is_signal():
+      ret.update( write_exact.get( x, () ) )
+      x = x.get_parent_object()
+    if obj.is_signal():
+      for x in obj.get_sibling_slices():
+        if x.slice_overlap( obj ):
+          ret.update( write_exact.get( x, () ) )
+    return ret
+
+  g.writers_of = writers_of
+
+  g.pred = defaultdict(list)
+  for (x, y) in dag.all_constraints:
+    g.pred[ origin.get( y, y ) ].append( origin.get( x, x ) )
+
+  return g
+
+def format_coi_report( top ):
+  """ Return a text summary of how much of the design ConeOfInfluencePass
+  pruned, in total and per component. """
+  coi = top._coi
+  dag = top._dag
+  ffs = top.get_all_update_ff()
+
+  def kind( blk ):
+    if blk in dag.genblks: return 'net'
+    if blk in ffs:         return 'ff'
+    return 'comb'
+
+  total  = defaultdict(int)
+  pruned = defaultdict(int)
+  for blk in coi.all_upblks:
+    total[ kind( blk ) ] += 1
+  for blk in coi.pruned:
+    pruned[ kind( blk ) ] += 1
+
+  def ratio( n, d ):
+    return f"{n}/{d} ({100.0 * n / d if d else 0.0:.1f}%)"
+
+  lines = [ f"{len(coi.observed)} observed signals, pruned "
+            f"{ratio( len(coi.pruned), len(coi.all_upblks) )} blocks",
+            f"{'kind':>6} {'total':>7} {'pruned':>7}" ]
+  for k in [ 'comb', 'ff', 'net' ]:
+    lines.append( f"{k:>6} {total[k]:>7} {pruned[k]:>7}" )
+
+  # Net blocks don't belong to a component
+  comp_total  = defaultdict(int)
+  comp_pruned = defaultdict(int)
+  for blk in coi.all_upblks - dag.genblks:
+    comp_total[ top.get_update_block_host_component( blk ) ] += 1
+  for blk in coi.pruned - dag.genblks:
+    comp_pruned[ top.get_update_block_host_component( blk ) ] += 1
+
+  if comp_pruned:
+    lines.append( "pruned blocks per component:" )
+    for c in sorted( comp_pruned, key=repr ):
+      lines.append( f"  {c!r}: {comp_pruned[c]}/{comp_total[c]}" )
+  return "\n".join( lines )
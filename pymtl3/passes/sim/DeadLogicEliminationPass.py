@@ -0,0 +1,365 @@
+"""
+========================================================================
+DeadLogicEliminationPass.py
+========================================================================
+Remove the work that never changes the observable behavior of the
+design from the schedule:
+
+- Dead logic: blocks whose writes are never read. Reads by kept blocks
+  and the ports of top count. Like ConeOfInfluencePass, we keep
+  blocks with effects that we cannot see, i.e. update_once blocks,
+  blocks that call methods, and blocks that do not write any signal.
+- Constant logic: net blocks of Const writers, and net blocks and pure
+  combinational update blocks that only read constant signals. These
+  blocks are evaluated once at lock-in instead of every cycle.
+- Constant folding: when the simulation is locked in, the kept pure
+  blocks are recompiled with the constant signals they read bound to
+  their values, and the int/bool free variables replaced by literals.
+
+Line traces and waveforms of the internal signals that nobody reads
+show stale values, so this pass is only applied on request.
+
+This pass has to be applied after GenDAGPass and before the schedule
+pass.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+import ast
+import builtins
+from copy import deepcopy
+
+from pymtl3.dsl import MethodPort
+from pymtl3.dsl.NamedObject import NamedObject
+from pymtl3.extra.pypy import exec_ast
+from pymtl3.passes.BasePass import BasePass, PassMetadata
+from pymtl3.passes.errors import PassOrderError
+
+from .ConeOfInfluencePass import ConeOfInfluencePass, gen_signal_dependency
+from .EventDrivenSchedulePass import EventDrivenSchedulePass
+from .SimHooks import DEAD_LOGIC_PRIORITY, SimHooks, add_hook
+
+# Global functions that constant blocks may call, besides everything in
+# pymtl3.datatypes like Bits types, zext, concat, etc.
+_pure_builtins = { int, bool, len, range, min, max, abs }
+
+class DeadLogicEliminationPass( BasePass ):
+
+  def __call__( self, top ):
+    if not hasattr( top, "_dag" ):
+      raise PassOrderError( "_dag" )
+    if hasattr( top, "_sched" ):
+      raise Exception( "DeadLogicEliminationPass must be applied before the schedule pass!" )
+
+    top._dead_logic = d = PassMetadata()
+
+    self.eliminate_dead_blocks( top, d )
+    self.extract_constant_blocks( top, d )
+
+    d.folded = {}
+    add_hook( top, SimHooks.lock_in_hooks, 'DeadLogicEliminationPass', DEAD_LOGIC_PRIORITY,
+              lambda: self.bind_constants( top, d ) )
+
+  #-----------------------------------------------------------------------
+  # eliminate_dead_blocks
+  #-----------------------------------------------------------------------
+  # Everything outside the cone of influence of the ports of top is dead
+
+  def eliminate_dead_blocks( self, top, d ):
+    live = PassMetadata()
+    live.observed = [ x for x in top._dsl.all_signals if x.get_host_component() is top and
+                      ( x.is_input_value_port() or x.is_output_value_port() ) ]
+
+    coi = ConeOfInfluencePass()
+    coi.find_cone( top, live )
+    coi.prune( top, live )
+
+    d.num_upblks = len( live.all_upblks )
+    d.dead = live.pruned
+
+  #-----------------------------------------------------------------------
+  # extract_constant_blocks
+  #-----------------------------------------------------------------------
+
+  def extract_constant_blocks( self, top, d ):
+    dag = top._dag
+    g   = gen_signal_dependency( top )
+
+    # Methods and update_once blocks may change the Python attributes
+    # that the update blocks of their components read
+    ffs  = top.get_all_update_ff()
+    pure = EventDrivenSchedulePass().collect_pure_signal_blocks( top, include_ff=True )
+
+    stateful = { x.get_host_component() for x in
+                 top.get_all_object_filter( lambda x: isinstance( x, MethodPort ) ) }
+    stateful.update( top.get_update_block_host_component( x ) for x in top.get_all_update_once() )
+
+    candidates = dag.genblks & pure & g.all_upblks
+    candidates.update( x for x in pure
+                       if x in g.all_upblks and x not in dag.genblks and x not in ffs and
+                          top.get_update_block_host_component( x ) not in stateful and
+                          self.only_calls_pure_functions( top, x ) )
+
+    # Value nets are never scheduled but convey the constants
+    candidates.update( x for x in g.node_reads if x not in g.all_upblks )
+
+    # A signal is constant if all of its writers are constant,
+    # so we iteratively remove the candidates that read a signal with a
+    # non-constant writer, or with no writer at all, e.g. top-level
+    # input ports that the test bench writes.
+    const = set( candidates )
+    changed = True
+    while changed:
+      changed = False
+      for blk in list( const ):
+        for rd in g.node_reads[ blk ]:
+          writers = g.writers_of( rd )
+          if not writers or not writers <= const:
+            const.discard( blk )
+            changed = True
+            break
+
+    const_blocks = const & g.all_upblks
+
+    # Evaluate the constant blocks in the topological order. We give up if
+    # they form a cycle, which is reported by the schedule pass anyway.
+    InD = { x: 0 for x in const_blocks }
+    Es  = { x: [] for x in const_blocks }
+    for v in const_blocks:
+      for u in g.pred.get( v, () ):
+        if u in const_blocks:
+          InD[v] += 1
+          Es[u].append( v )
+
+    Q = sorted( [ x for x in const_blocks if not InD[x] ], key=lambda x: x.__name__ )
+    order = []
+    while Q:
+      u = Q.pop()
+      order.append( u )
+      for v in Es[u]:
+        InD[v] -= 1
+        if not InD[v]:
+          Q.append( v )
+
+    if len(order) != len(const_blocks):
+      order = []
+
+    d.const_blocks = order
+
+    # The top-level signals whose values never change after lock-in
+    d.const_signals = [ x for x in top._dsl.all_signals
+                        if x.is_top_level_signal() and not x.is_input_value_port() and
+                           g.writers_of( x ) and g.writers_of( x ) <= const ]
+
+    removed = set( order )
+    dag.final_upblks    = dag.final_upblks - removed
+    dag.all_constraints = { (x, y) for (x, y) in dag.all_constraints
+                            if x not in removed and y not in removed }
+
+    # The kept pure update blocks are the candidates for constant folding
+    d.fold_candidates = sorted( [ x for x in pure if x in dag.final_upblks and x not in dag.genblks ],
+                                key=lambda x: x.__name__ )
+
+  @staticmethod
+  def only_calls_pure_functions( top, blk ):
+    host = top.get_update_block_host_component( blk )
+    info = host.get_update_block_info( blk )
+    if info is None or info[0]: # lambda
+      return False
+
+    code = blk.__code__
+    freevars = {}
+    for name, cell in zip( code.co_freevars, blk.__closure__ or () ):
+      try:
+        freevars[ name ] = cell.cell_contents
+      except ValueError: # empty cell
+        return False
+
+    calls = host.__class__._name_fc.get( blk.__name__ )
+    if calls is None:
+      return False
+
+    for obj_name, _, _ in calls:
+      if len(obj_name) != 1:
+        return False
+      name = obj_name[0][0]
+      func = freevars.get( name, blk.__globals__.get( name, getattr( builtins, name, None ) ) )
+      if not any( func is x for x in _pure_builtins ) and \
+         not getattr( func, '__module__', '' ).startswith( 'pymtl3.datatypes' ):
+        return False
+    return True
+
+  #-----------------------------------------------------------------------
+  # bind_constants
+  #-----------------------------------------------------------------------
+
+  def bind_constants( self, top, d ):
+    for blk in d.const_blocks:
+      blk()
+
+    mapping   = top._sim.signal_object_mapping
+    const_ids = { id( mapping[x][-1] ) for x in d.const_signals if x in mapping }
+
+    d.folded.clear()
+    for blk in d.fold_candidates:
+      new_blk = fold_constants( top, blk, const_ids )
+      if new_blk is not None:
+        d.folded[ blk ] = new_blk
+
+    if d.folded:
+      for name in [ 'update_schedule', 'schedule_ff' ]:
+        schedule = getattr( top._sched, name, None )
+        if schedule is not None:
+          schedule[:] = [ d.folded.get( x, x ) for x in schedule ]
+
+#-------------------------------------------------------------------------
+# fold_constants
+#-------------------------------------------------------------------------
+# The folded block is created by a factory function that takes
+# the remaining free variables, so it is still a closure like the
+# original one and reads the other signals through s.x.y[i] chains.
+
+def fold_constants( top, blk, const_ids ):
+  """ Return blk recompiled with the constants folded, or None if there
+  is nothing to fold or we cannot get the AST of blk. """
+  host = top.get_update_block_host_component( blk )
+  info = host.get_update_block_info( blk )
+  if info is None:
+    return None
+  is_lambda, _, line, filename, tree = info
+  code = blk.__code__
+  if is_lambda or code.co_firstlineno != line or code.co_filename != filename:
+    return None
+
+  func = None
+  for node in tree.body:
+    if isinstance( node, ast.FunctionDef ) and node.name == blk.__name__:
+      func = node
+  if func is None:
+    return None
+
+  freevars = {}
+  for name, cell in zip( code.co_freevars, blk.__closure__ or () ):
+    try:
+      freevars[ name ] = cell.cell_contents
+    except ValueError: # empty cell
+      return None
+
+  # A nonlocal statement in any block of the host might rebind a cell
+  for x in host.get_update_blocks():
+    x_info = host.get_update_block_info( x )
+    if x_info is None or any( isinstance( n, ast.Nonlocal ) for n in ast.walk( x_info[-1] ) ):
+      return None
+
+  folder = _ConstantFolder( freevars, const_ids )
+  func   = folder.visit( deepcopy( func ) )
+  if not folder.nfolded:
+    return None
+
+  func.decorator_list = []
+  rest = [ x for x in code.co_freevars if x not in folder.folded_names or x in folder.kept_names ]
+
+  factory = ast.parse( f"def __fold_{blk.__name__}({', '.join(rest)}):\n  return {blk.__name__}" )
+  factory.body[0].body.insert( 0, func )
+
+  _globals = dict( blk.__globals__ )
+  _globals.update( folder.bound )
+  _locals  = {}
+
+  exec_ast( factory, f"<folded {host!r}.{blk.__name__}>", _globals, _locals )
+  return _locals[ f"__fold_{blk.__name__}" ]( *[ freevars[x] for x in rest ] )
+
+class _ConstantFolder( ast.NodeTransformer ):
+
+  def __init__( s, freevars, const_ids ):
+    s.freevars     = freevars
+    s.const_ids    = const_ids
+    s.bound        = {}
+    s.bound_ids    = {}
+    s.folded_names = set()
+    s.kept_names   = set()
+    s.local_names  = set()
+    s.nfolded      = 0
+
+  def visit_FunctionDef( s, node ):
+    for x in ast.walk( node ):
+      if isinstance( x, ast.Name ) and not isinstance( x.ctx, ast.Load ):
+        s.local_names.add( x.id )
+    node.body = [ s.visit( x ) for x in node.body ]
+    return node
+
+  def resolve( s, node ):
+    if isinstance( node, ast.Name ):
+      if node.id in s.local_names or node.id not in s.freevars:
+        return None
+      return s.freevars[ node.id ]
+
+    if isinstance( node, ast.Attribute ):
+      base = s.resolve( node.value )
+      if not isinstance( base, NamedObject ):
+        return None
+      return getattr( base, node.attr, None )
+
+    if isinstance( node, ast.Subscript ):
+      base = s.resolve( node.value )
+      idx  = node.slice
+      if not isinstance( base, list ) or not isinstance( idx, ast.Constant ) or \
+         type(idx.value) is not int or not -len(base) <= idx.value < len(base):
+        return None
+      return base[ idx.value ]
+
+    return None
+
+  def bind( s, obj, node ):
+    name = s.bound_ids.get( id(obj) )
+    if name is None:
+      name = s.bound_ids[ id(obj) ] = f"__k{len(s.bound)}"
+      s.bound[ name ] = obj
+    s.nfolded += 1
+    return ast.copy_location( ast.Name( id=name, ctx=ast.Load() ), node )
+
+  def visit_Name( s, node ):
+    if isinstance( node.ctx, ast.Load ) and node.id not in s.local_names and node.id in s.freevars:
+      value = s.freevars[ node.id ]
+      if type(value) in ( int, bool ):
+        s.folded_names.add( node.id )
+        s.nfolded += 1
+        return ast.copy_location( ast.Constant( value=value ), node )
+      s.kept_names.add( node.id )
+    return node
+
+  def visit_load_chain( s, node ):
+    if isinstance( node.ctx, ast.Load ) and id( s.resolve( node ) ) in s.const_ids:
+      return s.bind( s.resolve( node ), node )
+    return s.generic_visit( node )
+
+  visit_Attribute = visit_load_chain
+  visit_Subscript = visit_load_chain
+
+#-------------------------------------------------------------------------
+# format_dead_logic_report
+#-------------------------------------------------------------------------
+
+def format_dead_logic_report( top ):
+  """ Return a text summary of the blocks that DeadLogicEliminationPass
+  removed or folded. """
+  d   = top._dead_logic
+  dag = top._dag
+
+  def count( blks ):
+    nnet = len( [ x for x in blks if x in dag.genblks ] )
+    return f"{len(blks)} ({len(blks) - nnet} update blocks, {nnet} net blocks)"
+
+  lines = [ f"{d.num_upblks} blocks before elimination",
+            f"dead blocks removed      : {count( d.dead )}",
+            f"constant blocks extracted: {count( d.const_blocks )}",
+            f"constant signals         : {len( d.const_signals )}",
+            f"blocks with folded constants: {len( d.folded )}" ]
+
+  for title, blks in [ ( "dead", d.dead ), ( "constant", d.const_blocks ) ]:
+    upblks = sorted( [ f"{top.get_update_block_host_component(x)!r}.{x.__name__}"
+                       for x in blks if x not in dag.genblks ] )
+    if upblks:
+      lines.append( f"{title} update blocks:" )
+      lines.extend( f"  {x}" for x in upblks )
+  return "\n".join( lines )
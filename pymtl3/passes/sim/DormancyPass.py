@@ -0,0 +1,278 @@
+"""
+========================================================================
+DormancyPass.py
+========================================================================
+Support sleeping update_once blocks. A component that mixes in Dormant
+declares that an update_once block may sleep and which of its methods
+wake it up:
+
+  s.wake_on( up_delay, s.enq, s.deq )
+
+and the block puts itself to sleep with s.sleep( up_delay ) or
+s.sleep( up_delay, ncycles ). The schedule passes (DynamicSchedulePass
+and OpenLoopCLPass) call DormancyPass.bind_schedule to guard these
+blocks with an awake flag. Consecutive guarded blocks are merged into
+one generated function, so a sleeping block only costs a flag check.
+Timed wakeups are kept in a timing wheel that is advanced once per
+cycle at the clock edge.
+
+Dormancy is a hint. Other schedule passes ignore it and simply execute
+the blocks every cycle, and we wake up all blocks after sim_reset and
+sim_restore.
+
+This pass has to be applied after GenDAGPass and before the schedule
+pass.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+import py
+
+from pymtl3.dsl import CalleePort, MetadataKey, MethodPort, NonBlockingIfc
+from pymtl3.extra.pypy import custom_exec
+from pymtl3.passes.BasePass import BasePass, PassMetadata
+from pymtl3.passes.errors import PassOrderError
+
+from .SimHooks import DORMANCY_PRIORITY, SimHooks, add_hook
+
+#-------------------------------------------------------------------------
+# TimingWheel
+#-------------------------------------------------------------------------
+
+class TimingWheel:
+  """ A single-level timing wheel of cycles. An item scheduled more than
+  nslots cycles ahead stays in its slot for more rounds. """
+
+  def __init__( s, nslots=256 ):
+    assert nslots > 0 and nslots & (nslots - 1) == 0, "nslots must be a power of two"
+    s.mask  = nslots - 1
+    s.slots = [ [] for _ in range(nslots) ]
+    s.now   = 0
+    s.size  = 0
+
+  def schedule( s, item, cycle ):
+    assert cycle > s.now
+    s.slots[ cycle & s.mask ].append( (cycle, item) )
+    s.size += 1
+
+  def advance( s, cycle ):
+    """ Move to cycle and return the (cycle, item) pairs that are due. """
+    start, s.now = s.now + 1, cycle
+    if not s.size or cycle < start:
+      return ()
+
+    # The cycle count may jump forward, e.g. in fast-forward,
+    # in which case we visit every slot at most once
+    if cycle - start >= len(s.slots):
+      slots = s.slots
+    else:
+      slots = [ s.slots[ t & s.mask ] for t in range( start, cycle + 1 ) ]
+
+    ret = []
+    for slot in slots:
+      if slot:
+        due = [ x for x in slot if x[0] <= cycle ]
+        if due:
+          slot[:] = [ x for x in slot if x[0] > cycle ]
+          ret.extend( due )
+    s.size -= len(ret)
+    return ret
+
+  def clear( s, cycle ):
+    for slot in s.slots:
+      slot.clear()
+    s.now  = cycle
+    s.size = 0
+
+#-------------------------------------------------------------------------
+# DormancyPass
+#-------------------------------------------------------------------------
+
+class DormancyPass( BasePass ):
+
+  # DormancyPass public pass data
+
+  #: The number of slots of the timing wheel. Timed sleeps longer than
+  #: this are still supported but are revisited once per round.
+  #:
+  #: Type: ``int``; input
+  #:
+  #: Default value: 256
+  wheel_size = MetadataKey(int)
+
+  def __call__( self, top ):
+    if not hasattr( top, "_dag" ):
+      raise PassOrderError( "_dag" )
+    if hasattr( top, "_sched" ):
+      raise Exception( "DormancyPass must be applied before the schedule pass!" )
+
+    all_wake_on = top.get_all_wake_on()
+    if not all_wake_on:
+      return
+
+    top._dormancy = d = PassMetadata()
+
+    d.blocks   = sorted( all_wake_on, key=lambda x: repr( top.get_update_block_host_component(x) ) + x.__name__ )
+    d.block_id = { x: i for i, x in enumerate( d.blocks ) }
+    d.wake_on  = all_wake_on
+    d.awake    = [ True ] * len(d.blocks)
+    d.wake_at  = [ None ] * len(d.blocks)
+    d.groups   = {}
+    d.bound    = False
+
+    nslots  = top.get_metadata( self.wheel_size ) if top.has_metadata( self.wheel_size ) else 256
+    d.wheel = TimingWheel( nslots )
+
+    self.create_sleep_wake( top, d )
+
+    add_hook( top, SimHooks.sim_api_hooks, 'DormancyPass', DORMANCY_PRIORITY,
+              lambda: self.wrap_sim_reset( top, d ) )
+
+  def create_sleep_wake( self, top, d ):
+    block_id = d.block_id
+    awake    = d.awake
+    wake_at  = d.wake_at
+    wheel    = d.wheel
+
+    def get_id( blk ):
+      i = block_id.get( blk )
+      assert i is not None, f"Please declare {blk.__name__} with s.wake_on before putting it to sleep"
+      return i
+
+    def sleep( blk, ncycles=None ):
+      i = get_id( blk )
+      if ncycles is None:
+        awake[i]   = False
+        wake_at[i] = None
+      # Executing in the next cycle anyway
+      elif ncycles > 1:
+        t = top._sim.simulated_cycles + ncycles
+        awake[i]   = False
+        wake_at[i] = t
+        wheel.schedule( i, t )
+
+    def wake( blk ):
+      i = get_id( blk )
+      awake[i]   = True
+      wake_at[i] = None
+
+    for c in { top.get_update_block_host_component( x ) for x in d.blocks }:
+      c.sleep = sleep
+      c.wake  = wake
+
+  def wrap_sim_reset( self, top, d ):
+
+    def wake_all():
+      for i in range(len(d.awake)):
+        d.awake[i]   = True
+        d.wake_at[i] = None
+      d.wheel.clear( top._sim.simulated_cycles )
+
+    for name in [ 'sim_reset', 'sim_restore' ]:
+      func = getattr( top, name, None )
+      if func is not None:
+        def wrapped( *args, _func=func, **kwargs ):
+          ret = _func( *args, **kwargs )
+          wake_all()
+          return ret
+        setattr( top, name, wrapped )
+
+  #-----------------------------------------------------------------------
+  # bind_schedule
+  #-----------------------------------------------------------------------
+
+  @staticmethod
+  def bind_schedule( top, schedule ):
+    """ Return the guarded schedule and the function that advances the
+    timing wheel, which the caller has to add to the ff schedule. This
+    also makes the wake_on methods wake up their blocks, so the caller
+    has to call it after analyzing the method ports. """
+
+    d = top._dormancy
+    assert not d.bound, "The schedule has already been bound"
+    d.bound = True
+
+    DormancyPass.wrap_wake_methods( top, d )
+
+    # The scheduled function of a blocking update block is its greenlet
+    # wrapper
+    mapping = getattr( top._dag, 'blk_greenlet_mapping', {} )
+    sched_id = { mapping.get( x, x ): i for x, i in d.block_id.items() }
+
+    new_schedule = []
+    run = []
+
+    def flush():
+      if run:
+        func = gen_guarded_blocks( len(d.groups), run, [ sched_id[x] for x in run ], d.awake )
+        d.groups[ func ] = list( run )
+        new_schedule.append( func )
+        run.clear()
+
+    for x in schedule:
+      if x in sched_id:
+        run.append( x )
+      else:
+        flush()
+        new_schedule.append( x )
+    flush()
+
+    awake   = d.awake
+    wake_at = d.wake_at
+    wheel   = d.wheel
+
+    # This runs at the clock edge before the cycle count
+    # advances, so we wake up the blocks that are due in the next cycle
+    def advance_timing_wheel():
+      for t, i in wheel.advance( top._sim.simulated_cycles + 1 ):
+        if wake_at[i] == t:
+          awake[i]   = True
+          wake_at[i] = None
+
+    return new_schedule, advance_timing_wheel
+
+  @staticmethod
+  def wrap_wake_methods( top, d ):
+    # Collect the blocks that each method wakes up
+    port_blocks = {}
+    for blk, methods in d.wake_on.items():
+      host = top.get_update_block_host_component( blk )
+      for m in methods:
+        port = m.method if isinstance( m, NonBlockingIfc ) else m
+        assert isinstance( port, CalleePort ) and port.get_host_component() is host, \
+          f"{blk.__name__} can only wake on method ports or non-blocking interfaces of {host!r}"
+        port_blocks.setdefault( port, [] ).append( d.block_id[ blk ] )
+
+    # All method ports in a net share the same method object, so we
+    # replace every reference to it. CLLineTracePass wraps the method of
+    # each port and keeps the original one in raw_method.
+    all_method_ports = top.get_all_object_filter( lambda x: isinstance( x, MethodPort ) )
+
+    for port, ids in port_blocks.items():
+      raw = getattr( port, 'raw_method', port.method )
+      wrapped = gen_wake_method( raw, sorted( set(ids) ), d.awake, d.wake_at )
+      for x in all_method_ports:
+        if getattr( x, 'raw_method', None ) is raw:
+          x.raw_method = wrapped
+        elif x.method is raw:
+          x.method = wrapped
+
+def gen_guarded_blocks( k, blks, ids, awake ):
+  src = [ f"def dormant_blocks_{k}():" ]
+  for j, i in enumerate( ids ):
+    src.append( f"  if _awake[{i}]: _b{j}()" )
+  _globals = { f"_b{j}": x for j, x in enumerate( blks ) }
+  _globals['_awake'] = awake
+  _locals  = {}
+  custom_exec( py.code.Source( "\n".join( src ) ).compile(), _globals, _locals )
+  return _locals[ f"dormant_blocks_{k}" ]
+
+def gen_wake_method( raw, ids, awake, wake_at ):
+  src = [ "def wake_method( *args, **kwargs ):" ]
+  for i in ids:
+    src.append( f"  _awake[{i}] = True; _wake_at[{i}] = None" )
+  src.append( "  return _raw( *args, **kwargs )" )
+  _globals = { '_raw': raw, '_awake': awake, '_wake_at': wake_at }
+  _locals  = {}
+  custom_exec( py.code.Source( "\n".join( src ) ).compile(), _globals, _locals )
+  return _locals['wake_method']
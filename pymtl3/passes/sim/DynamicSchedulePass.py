@@ -17,8 +17,9 @@ from pymtl3.extra.pypy import custom_exec
 from pymtl3.passes.BasePass import BasePass, PassMetadata
 from pymtl3.passes.errors import PassOrderError
 
+from .DormancyPass import DormancyPass
+from .SimCachePass import SimCachePass
 from .SimpleSchedulePass import SimpleSchedulePass, dump_dag
-from .SimpleTickPass import SimpleTickPass
 
 
 class DynamicSchedulePass( BasePass ):
@@ -38,8 +39,32 @@ class DynamicSchedulePass( BasePass ):
     simple.schedule_ff( top )
     simple.schedule_posedge_flip( top )
 
+    # Skip the sleeping blocks
+    if hasattr( top, "_dormancy" ):
+      top._sched.update_schedule, advance = DormancyPass.bind_schedule( top, top._sched.update_schedule )
+      top._sched.schedule_ff.append( advance )
+
   def schedule_intra_cycle( self, top ):
 
+    # Reuse the schedule from the persistent cache if possible. SCC blocks
+    # are regenerated from the cached source.
+    if hasattr( top, "_cache" ):
+      cached_schedule = SimCachePass.restore_schedule( top )
+      if cached_schedule is not None:
+        top._sched.update_schedule = schedule = []
+        top._sched.scc_blocks = {}
+        top._sched.scc_srcs   = {}
+        for x in cached_schedule:
+          if isinstance( x, tuple ):
+            tmp_schedule, scc_block_src = x
+            scc_blk = gen_wrapped_SCCblk( top, tmp_schedule, scc_block_src )
+            top._sched.scc_blocks[ scc_blk ] = tmp_schedule
+            top._sched.scc_srcs  [ scc_blk ] = scc_block_src
+            schedule.append( scc_blk )
+          else:
+            schedule.append( x )
+        return
+
     # Construct the intra-cycle graph based on normal update blocks
 
     V   = top._dag.final_upblks - top.get_all_update_ff()
@@ -93,8 +118,12 @@ class DynamicSchedulePass( BasePass ):
     constraint_objs = top._dag.constraint_objs
     onces = top.get_all_update_once()
 
-    # Put the graph schedule to _sched
+    # Put the graph schedule to _sched. We also record the blocks that
+    # each generated SCC block wraps for the passes that need to look
+    # into the SCCs.
     top._sched.update_schedule = schedule = []
+    top._sched.scc_blocks = {}
+    top._sched.scc_srcs   = {}
 
     scc_id = 0
     for i in scc_schedule:
@@ -165,94 +194,157 @@ class DynamicSchedulePass( BasePass ):
                           "Probably a loop that involves blocks that should be update_once:\n{}"\
                           .format(", ".join( [ x.__name__ for x in scc] )))
 
-        # generate a loop for scc
-        # Shunning: we just simply loop over the whole SCC block
-        # TODO performance optimizations using Mamba techniques within a SCC block
-
-        def gen_wrapped_SCCblk( s, scc, src ):
-
-          # TODO mamba?
-          scc_tick_func = SimpleTickPass.gen_tick_function( scc )
-          _globals = { 's': s, 'scc_tick_func': scc_tick_func, 'deepcopy': deepcopy,
-                       'UpblkCyclicError': UpblkCyclicError }
-          _locals  = {}
-
-          custom_exec(py.code.Source( src ).compile(), _globals, _locals)
-          return _locals[ 'generated_block' ]
-
-        template = """
-def wrapped_SCC_{0}():
-  N = 0
-  while True:
-    N += 1
-    if N > 100:
-      raise UpblkCyclicError("Combinational loop detected at runtime in {{{3}}} after 100 iters!")
-    {1}
-    scc_tick_func()
-    {2}
-    # print( "SCC block{0} is executed", num_iters, "times" )
-    break
-generated_block = wrapped_SCC_{0}
-          """
-
-        copy_srcs  = []
-        check_srcs = []
-        # print_srcs = []
-
-        # clean up non-top variables if top is there. remove slices
-
-        final_variables = set()
-
-        for x in sorted( variables, key=repr ):
-          w = x.get_top_level_signal()
-          if w is x:
-            final_variables.add( x )
-            continue
-
-          # w is not x
-          if issubclass( w._dsl.Type, Bits ):
-            if w not in final_variables:
-              final_variables.add( w )
-          elif is_bitstruct_class( w._dsl.Type ):
-            if w not in final_variables:
-              final_variables.add( x )
-          else:
-            final_variables.add( x )
-
-        # group them by host component so that we create less bytecode
-
-        final_var_host = defaultdict(list)
-        for x in final_variables:
-          final_var_host[ x.get_host_component() ].append( x )
-
-        # create a block of copy/check code for each host component. Need
-        # to allocate global var_id across different host components.
-
-        var_id = 0
-        for host, var_list in final_var_host.items():
-
-          copy_srcs .append( f"host={host!r}" )
-          check_srcs.append( f"host={host!r}" )
-
-          sub_check_srcs = []
-
-          hostlen = len(repr(host))
-          for var in var_list:
-            var_id += 1
-            subname = repr(var)[hostlen+1:]
-            if issubclass( var._dsl.Type, Bits ):     copy_srcs.append( f"t{var_id}=host.{subname}.clone()" )
-            elif is_bitstruct_class( var._dsl.Type ): copy_srcs.append( f"t{var_id}=host.{subname}.clone()" )
-            else:                                     copy_srcs.append( f"t{var_id}=deepcopy(host.{subname})" )
-
-            sub_check_srcs.append( f"host.{subname} != t{var_id}" )
+        # Generate a worklist-based evaluator for the SCC. Each block has
+        # an active flag. When a block executes, we compare the raw values
+        # of the variables it writes before and after the execution and
+        # only activate the blocks that read the changed variables. We
+        # keep looping until no block is active.
+        #
+        # def wrapped_SCC_1():
+        #   a0 = a1 = True
+        #   N = 0
+        #   while a0 or a1:
+        #     ...
+        #     if a0:
+        #       a0 = False
+        #       t0 = s.x._uint
+        #       b0()
+        #       if s.x._uint != t0: a1 = True
+        #     if a1:
+        #       ...
+        #
+        # Constraints that come from method calls don't carry
+        # any variable so we cannot tell which block to activate. In this
+        # case we fall back to re-executing the whole SCC whenever any
+        # variable changes.
+
+        blk_id  = { x: i for i, x in enumerate( tmp_schedule ) }
+        names   = ", ".join( [ x.__name__ for x in scc ] )
+
+        triggers = { x: defaultdict(set) for x in tmp_schedule }
+        precise  = True
+
+        # An empty net block never changes its readers by itself since
+        # they share the same value object with the writer. The blocks
+        # that read the net are triggered by the writer block instead.
+        alias_genblks = top._dag.alias_genblks
+        alias_succ = defaultdict(set)
+        for (u, v) in E:
+          if u in alias_genblks and v in scc:
+            alias_succ[u].add( v )
 
-          check_srcs.append( f"if { ' or '.join(sub_check_srcs)}: continue" )
+        for (u, v) in E:
+          if u in scc and v in scc:
+            objs = constraint_objs.get( (u, v) )
+            if not objs:
+              precise = False
+            targets = alias_succ[v] | { v } if v in alias_genblks else { v }
+            for x in objs or ():
+              triggers[u][ _normalize_scc_variable( x ) ].update( targets )
+
+        def gen_copy_check( var, i ):
+          expr = repr(var)
+          if issubclass( var._dsl.Type, Bits ) or is_bitstruct_class( var._dsl.Type ):
+            raw = gen_raw_value_src( var._dsl.Type, expr )
+            return f"t{i} = {raw}", f"{raw} != t{i}"
+          return f"t{i} = deepcopy({expr})", f"{expr} != t{i}"
+
+        src = [ f"def wrapped_SCC_{scc_id}():" ]
+
+        if precise:
+          flags = [ f"a{i}" for i in range(len(tmp_schedule)) ]
+          src.append( f"  {' = '.join( flags )} = True" )
+          src.append(  "  N = 0" )
+          src.append( f"  while {' or '.join( flags )}:" )
+          src.append(  "    N += 1" )
+          src.append(  "    if N > 100:" )
+          src.append( f"      raise UpblkCyclicError(\"Combinational loop detected at runtime in {{{names}}} after 100 iters!\")" )
+
+          var_id = 0
+          for i, blk in enumerate( tmp_schedule ):
+            src.append( f"    if a{i}:" )
+            src.append( f"      a{i} = False" )
+            checks = []
+            for var, targets in sorted( triggers[blk].items(), key=lambda x: repr(x[0]) ):
+              copy, check = gen_copy_check( var, var_id )
+              var_id += 1
+              src.append( f"      {copy}" )
+              flags = " = ".join( [ f"a{blk_id[v]}" for v in sorted( targets, key=blk_id.get ) ] )
+              checks.append( f"      if {check}: {flags} = True" )
+            src.append( f"      b{i}() # {blk.__name__}" )
+            src.extend( checks )
 
-        scc_block_src = template.format( scc_id, "; ".join( copy_srcs ), "\n    ".join( check_srcs ),
-                                         ", ".join( [ x.__name__ for x in scc] ) )
+        else:
+          final_variables = { _normalize_scc_variable( x ) for x in variables }
+          copies, checks = [], []
+          for i, var in enumerate( sorted( final_variables, key=repr ) ):
+            copy, check = gen_copy_check( var, i )
+            copies.append( copy )
+            checks.append( check )
+
+          src.append(  "  N = 0" )
+          src.append(  "  while True:" )
+          src.append(  "    N += 1" )
+          src.append(  "    if N > 100:" )
+          src.append( f"      raise UpblkCyclicError(\"Combinational loop detected at runtime in {{{names}}} after 100 iters!\")" )
+          src.append( f"    {'; '.join( copies )}" )
+          for i, blk in enumerate( tmp_schedule ):
+            src.append( f"    b{i}() # {blk.__name__}" )
+          src.append( f"    if {' or '.join( checks )}: continue" )
+          src.append(  "    break" )
+
+        src.append( f"generated_block = wrapped_SCC_{scc_id}" )
+        scc_block_src = "\n".join( src )
 
         # print(scc_block_src)
-        schedule.append( gen_wrapped_SCCblk( top, tmp_schedule, scc_block_src ) )
+        scc_blk = gen_wrapped_SCCblk( top, tmp_schedule, scc_block_src )
+        top._sched.scc_blocks[ scc_blk ] = tmp_schedule
+        top._sched.scc_srcs  [ scc_blk ] = scc_block_src
+        schedule.append( scc_blk )
+
+    if hasattr( top, "_cache" ):
+      SimCachePass.record_schedule( top )
+
+def _normalize_scc_variable( x ):
+  # Compare the whole top-level signal instead of a slice, but keep the
+  # field of a bitstruct signal to avoid comparing the whole struct
+  w = x.get_top_level_signal()
+  if w is not x and issubclass( w._dsl.Type, Bits ):
+    return w
+  return x
+
+def gen_wrapped_SCCblk( s, scc, src ):
+
+  _globals = { f"b{i}": x for i, x in enumerate( scc ) }
+  _globals.update( { 's': s, 'deepcopy': deepcopy,
+                     'UpblkCyclicError': UpblkCyclicError } )
+  _locals  = {}
+
+  custom_exec(py.code.Source( src ).compile(), _globals, _locals)
+  return _locals[ 'generated_block' ]
+
+def gen_raw_value_src( Type, expr ):
+  """ Return the source of an expression that evaluates to the raw
+  integer value of a signal value ``expr`` of type ``Type``. A bitstruct
+  becomes a tuple of the raw values of all its fields so that we don't
+  need to create Bits objects just to compare two values. """
+
+  def gen_field_srcs( T, prefix ):
+    if isinstance( T, list ):
+      ret = []
+      for i in range(len(T)):
+        ret.extend( gen_field_srcs( T[0], f"{prefix}[{i}]" ) )
+      return ret
+    if is_bitstruct_class( T ):
+      ret = []
+      for name, field_T in T.__bitstruct_fields__.items():
+        ret.extend( gen_field_srcs( field_T, f"{prefix}.{name}" ) )
+      return ret
+    return [ f"{prefix}._uint" ]
+
+  if is_bitstruct_class( Type ):
+    return f"({', '.join( gen_field_srcs( Type, expr ) )},)"
+  return f"{expr}._uint"
 
 def kosaraju_scc( G, G_T ):
 
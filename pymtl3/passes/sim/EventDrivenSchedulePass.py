@@ -0,0 +1,355 @@
+"""
+========================================================================
+EventDrivenSchedulePass.py
+========================================================================
+An activity-driven alternative to DynamicSchedulePass. We still produce
+the same topological (SCC) schedule, but instead of calling every entry
+of the schedule, we generate one function that only re-executes a block
+if one of the signals it reads has changed since it last ran. This is
+basically a sensitivity list derived from the read/write sets that
+elaboration and GenDAGPass have already extracted.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+from collections import defaultdict
+
+from pymtl3.dsl import BlockingIfc, MethodPort, NonBlockingIfc, Signal
+from pymtl3.dsl.NamedObject import NamedObject
+from pymtl3.extra.pypy import custom_exec
+from pymtl3.passes.BasePass import PassMetadata
+from pymtl3.passes.errors import PassOrderError
+
+from .DynamicSchedulePass import DynamicSchedulePass, gen_raw_value_src
+from .SimHooks import SCHEDULE_PRIORITY, SimHooks, add_hook
+from .SimpleSchedulePass import SimpleSchedulePass
+
+# Python values that we consider as elaboration-time constants if they
+# are read by an update block
+_const_types = ( int, float, bool, str, bytes, type, type(None), tuple, frozenset )
+
+class EventDrivenSchedulePass( DynamicSchedulePass ):
+
+  def __call__( self, top ):
+    if not hasattr( top._dag, "all_constraints" ):
+      raise PassOrderError( "all_constraints" )
+
+    if hasattr( top, "_sched" ):
+      raise Exception("Some schedule pass has already been applied!")
+
+    top._sched = PassMetadata()
+
+    self.schedule_intra_cycle( top )
+
+    # Reuse simple's ff and flip schedule
+    simple = SimpleSchedulePass()
+    simple.schedule_ff( top )
+    simple.schedule_posedge_flip( top )
+
+    self.schedule_event_driven( top )
+
+  #-----------------------------------------------------------------------
+  # schedule_event_driven
+  #-----------------------------------------------------------------------
+  # We keep the static schedule in top._sched.update_schedule until the
+  # simulation is locked in. At that point every top-level signal has
+  # become a single Bits/bitstruct object shared by the whole net, so we
+  # can generate the event-driven function that directly refers to those
+  # objects.
+
+  def schedule_event_driven( self, top ):
+
+    schedule = top._sched.update_schedule
+    top._sched.static_update_schedule = schedule
+
+    pure_blks = self.collect_pure_signal_blocks( top )
+
+    upblk_reads, upblk_writes, _ = top.get_all_upblk_metadata()
+    genblk_reads, genblk_writes  = top._dag.genblk_reads, top._dag.genblk_writes
+
+    # For each entry of the schedule, collect the top level signals it
+    # reads and writes. An SCC block is sensitive to the union of its
+    # blocks and it is only pure if all of its blocks are pure.
+
+    entry_reads  = []
+    entry_writes = []
+    entry_pure   = []
+
+    for entry in schedule:
+      blks = top._sched.scc_blocks.get( entry, [ entry ] )
+
+      reads, writes = set(), set()
+      pure = True
+      for blk in blks:
+        pure &= blk in pure_blks
+        for data, ret in [ (upblk_reads, reads), (genblk_reads, reads),
+                           (upblk_writes, writes), (genblk_writes, writes) ]:
+          for x in data.get( blk, () ):
+            if isinstance( x, Signal ):
+              ret.add( x.get_top_level_signal() )
+            else:
+              pure = False # e.g. the whole interface is read
+
+      entry_reads.append( reads )
+      entry_writes.append( writes )
+      entry_pure.append( pure )
+
+    top._sched.event_driven = ed = PassMetadata()
+    ed.entry_reads  = entry_reads
+    ed.entry_writes = entry_writes
+    ed.entry_pure   = entry_pure
+
+    def bind_event_driven():
+      top._sched.update_schedule = [ self.gen_event_driven_func( top, schedule ) ]
+
+    add_hook( top, SimHooks.lock_in_hooks, 'EventDrivenSchedulePass', SCHEDULE_PRIORITY,
+              bind_event_driven )
+
+  #-----------------------------------------------------------------------
+  # collect_pure_signal_blocks
+  #-----------------------------------------------------------------------
+  # A block can only be skipped if everything it observes and everything
+  # it changes are signals. CL blocks that call methods, blocks that read
+  # mutable Python state, and blocks that write Python attributes must be
+  # executed every time. update_ff blocks are only analyzed if include_ff
+  # is set since they are not part of the intra-cycle schedule.
+
+  def collect_pure_signal_blocks( self, top, include_ff=False ):
+
+    onces    = top.get_all_update_once()
+    ffs      = top.get_all_update_ff()
+    greenlet = top._dag.greenlet_upblks
+    _, _, upblk_calls = top.get_all_upblk_metadata()
+
+    # Every net block only reads and writes signals
+    pure = set( top._dag.genblks )
+
+    def resolve( host, obj_name ):
+      """ Walk s.x.y.z from host. Return (parent, field, obj) where obj is
+      the first non-NamedObject value, or None if the chain only has
+      NamedObjects. """
+      parent, obj = None, host
+      for field, idx in obj_name[1:]:
+        if isinstance( obj, Signal ):
+          return None # field of a bitstruct signal or attributes of Bits
+        try:
+          parent, obj = obj, getattr( obj, field )
+        except AttributeError:
+          return (parent, field, None)
+
+        for _ in idx:
+          if isinstance( obj, list ):
+            if not obj: return None
+            obj = obj[0]
+
+        if isinstance( obj, list ): # s.x is an array of objects
+          while isinstance( obj, list ) and obj:
+            obj = obj[0]
+          if not isinstance( obj, NamedObject ):
+            return (parent, field, [])
+
+        if not isinstance( obj, NamedObject ):
+          return (parent, field, obj)
+      return None
+
+    # First pass: find out all Python attributes that are written by any
+    # update block, and the blocks that write them
+
+    candidates = {}
+    python_writes = set()
+
+    for blk in top.get_all_update_blocks():
+      if blk in onces or ( blk in ffs and not include_ff ) or blk in greenlet:
+        continue
+      if any( isinstance( x, (MethodPort, NonBlockingIfc, BlockingIfc) )
+              for x in upblk_calls[ blk ] ):
+        continue
+
+      host = top.get_update_block_host_component( blk )
+      cls  = host.__class__
+
+      # Also look into the functions that this block calls
+      names = [ blk.__name__ ] + [ x.__name__ for x in upblk_calls[ blk ]
+                                   if x.__name__ in cls._name_rd ]
+
+      writes_python = False
+      rd_names = []
+      for name in names:
+        for obj_name, _, _ in cls._name_wr[ name ]:
+          if obj_name[0][0] == 's':
+            r = resolve( host, obj_name )
+            if r is not None:
+              python_writes.add( (id(r[0]), r[1]) )
+              writes_python = True
+
+        for obj_name, _, _ in cls._name_fc[ name ]:
+          # s.queue.append() modifies Python state
+          if obj_name[0][0] == 's' and obj_name[-1][0] not in cls._name_rd:
+            if resolve( host, obj_name ) is not None:
+              writes_python = True
+
+        rd_names.extend( cls._name_rd[ name ] )
+
+      if not writes_python:
+        candidates[ blk ] = (host, rd_names)
+
+    # Second pass: a candidate is pure if it only reads constants besides
+    # signals
+
+    for blk, (host, rd_names) in candidates.items():
+      is_pure = True
+      for obj_name, _, _ in rd_names:
+        if obj_name[0][0] != 's':
+          continue
+        if len(obj_name) == 1: # s itself is passed around
+          is_pure = False
+          break
+        r = resolve( host, obj_name )
+        if r is not None:
+          parent, field, value = r
+          if not isinstance( value, _const_types ) or (id(parent), field) in python_writes:
+            is_pure = False
+            break
+      if is_pure:
+        pure.add( blk )
+
+    return pure
+
+  #-----------------------------------------------------------------------
+  # gen_event_driven_func
+  #-----------------------------------------------------------------------
+  # The generated function looks like the following. Signals that are
+  # not written by the schedule, or are read before/at the entry that
+  # writes them, are "source" signals whose values are checked at the
+  # beginning of each evaluation against the values we saw last time.
+  #
+  # def event_driven_update():
+  #   if F[0]: F[0] = False; a0 = a1 = True
+  #   else:    a0 = a1 = False
+  #   x = v0._uint
+  #   if x != L[0]:
+  #     L[0] = x; a0 = True
+  #   if a0:
+  #     t0 = v1._uint
+  #     blk0()
+  #     if v1._uint != t0: a1 = True
+  #   if a1:
+  #     blk1()
+  #   blk2() # not pure, always executed
+
+  def gen_event_driven_func( self, top, schedule ):
+
+    ed = top._sched.event_driven
+    signal_object_mapping = top._sim.signal_object_mapping
+
+    # Map each top-level signal to the actual value object. Signals of
+    # the same net share the same object after lock_in_simulation, so we
+    # use the value object as the identity of the "variable".
+
+    value_ids = {}
+    values    = []
+    value_srcs = []
+
+    def get_value_id( signal ):
+      try:
+        value = signal_object_mapping[ signal ][-1]
+      except KeyError:
+        return None
+      vid = id(value)
+      if vid not in value_ids:
+        value_ids[ vid ] = len(values)
+        value_srcs.append( gen_raw_value_src( signal._dsl.Type, f"v{len(values)}" ) )
+        values.append( value )
+      return value_ids[ vid ]
+
+    n = len(schedule)
+    sensitive = [ False ] * n
+    entry_rd_ids = []
+    entry_wr_ids = []
+
+    for i in range(n):
+      rd_ids = { get_value_id( x ) for x in ed.entry_reads[i] }
+      wr_ids = { get_value_id( x ) for x in ed.entry_writes[i] }
+      # We cannot observe the change of an unmapped signal
+      sensitive[i] = ed.entry_pure[i] and None not in rd_ids and None not in wr_ids
+      rd_ids.discard( None )
+      wr_ids.discard( None )
+      entry_rd_ids.append( rd_ids )
+      entry_wr_ids.append( wr_ids )
+
+    # The first entry that writes each value, and all readers
+
+    first_writer = {}
+    readers = defaultdict(list)
+    for i in range(n):
+      for v in entry_wr_ids[i]:
+        first_writer.setdefault( v, i )
+      for v in entry_rd_ids[i]:
+        readers[v].append( i )
+
+    # Source values are checked at the beginning of the evaluation
+
+    sources = sorted( v for v, rds in readers.items()
+                        if v not in first_writer or min(rds) <= first_writer[v] )
+
+    ed.num_entries    = n
+    ed.num_sensitive  = sum( sensitive )
+    ed.num_sources    = len(sources)
+
+    flags = [ f"a{i}" for i in range(n) if sensitive[i] ]
+
+    src = [ "def event_driven_update():" ]
+    if flags:
+      src.append( "  if F[0]:" )
+      src.append( "    F[0] = False" )
+      src.append( f"    {' = '.join( flags )} = True" )
+      src.append( "  else:" )
+      src.append( f"    {' = '.join( flags )} = False" )
+
+    for j, v in enumerate( sources ):
+      targets = [ f"a{i}" for i in readers[v] if sensitive[i] ]
+      if targets:
+        src.append( f"  x = {value_srcs[v]}" )
+        src.append( f"  if x != L[{j}]:" )
+        src.append( f"    L[{j}] = x; {' = '.join( targets )} = True" )
+
+    for i in range(n):
+      # Only generate the checks for the values that some sensitive entry
+      # later in the schedule reads
+      wr_checks = []
+      for v in sorted( entry_wr_ids[i] ):
+        targets = [ f"a{k}" for k in readers[v] if k > i and sensitive[k] ]
+        if targets:
+          wr_checks.append( (v, targets) )
+
+      indent = "  "
+      if sensitive[i]:
+        src.append( f"  if a{i}:" )
+        indent = "    "
+
+      for j, (v, _) in enumerate( wr_checks ):
+        src.append( f"{indent}t{j} = {value_srcs[v]}" )
+
+      src.append( f"{indent}blk{i}() # {schedule[i].__name__}" )
+
+      for j, (v, targets) in enumerate( wr_checks ):
+        src.append( f"{indent}if {value_srcs[v]} != t{j}: {' = '.join( targets )} = True" )
+
+    if len(src) == 1:
+      src.append( "  pass" )
+
+    _globals = { f"v{i}": x for i, x in enumerate( values ) }
+    _globals.update( { f"blk{i}": x for i, x in enumerate( schedule ) } )
+    _globals['F'] = F = [ True ]
+    _globals['L'] = [ None ] * len(sources)
+
+    _locals = {}
+    fname = f"event_driven_update_{top.__class__.__name__}"
+    custom_exec( compile( "\n".join( src ), filename=fname, mode="exec" ), _globals, _locals )
+
+    # Re-evaluate every block next time, e.g. after restoring a checkpoint
+    def invalidate():
+      F[0] = True
+    ed.invalidate = invalidate
+
+    return _locals[ 'event_driven_update' ]
@@ -0,0 +1,232 @@
+"""
+========================================================================
+FastForwardPass.py
+========================================================================
+Skip idle cycles in top.sim_run and top.sim_run_until. After every
+cycle we check whether the design has reached a fixed point, i.e.
+
+- the values of all signals are the same as after the previous cycle,
+  except for the registered per-cycle counters,
+- and every component with Python state declares that it will stay idle
+  for a number of cycles.
+
+The top-level inputs cannot change inside sim_run, so the following
+cycles would exactly repeat the last one until the earliest declared
+event. We jump to the cycle right before that event, advance
+simulated_cycles, the per-cycle counters, and the timers of the
+components, and then continue cycle by cycle.
+
+A component with Python state, i.e. one that hosts an update block that
+does not only access signals or one whose methods are called by others,
+declares its events with two methods:
+
+- next_event( s ): return k > 0 if the component will not do anything
+  observable in the next k-1 cycles as long as the rest of the design is
+  idle, 0 if it is active now, or None if it only reacts to others,
+- skip_cycles( s, ncycles ): optional, advance the internal timers as if
+  ncycles idle cycles have passed.
+
+Fast-forward is disabled if any such component lacks next_event, or if
+waveforms are being generated. top.sim_tick always simulates exactly one
+cycle.
+
+This pass analyzes the update blocks and has to be applied before
+PrepareSimPass, which calls its sim API hook to replace top.sim_run and
+top.sim_run_until after creating them.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+from time import perf_counter
+
+import py
+
+from pymtl3.dsl import CalleePort, Component, MetadataKey
+from pymtl3.extra.pypy import custom_exec
+from pymtl3.passes.backends.verilog import VerilogTBGenPass
+from pymtl3.passes.BasePass import BasePass, PassMetadata
+from pymtl3.passes.errors import PassOrderError
+from pymtl3.passes.tracing.BinaryWavePass import BinaryWavePass
+from pymtl3.passes.tracing.FlightRecorderPass import FlightRecorderPass
+from pymtl3.passes.tracing.PrintTextWavePass import PrintTextWavePass
+from pymtl3.passes.tracing.VcdGenerationPass import VcdGenerationPass
+
+from .CheckpointPass import _get_leaf_bits
+from .EventDrivenSchedulePass import EventDrivenSchedulePass
+from .SimHooks import FAST_FORWARD_PRIORITY, SimHooks, add_hook
+from .SimpleTickPass import SimpleTickPass
+
+
+class FastForwardPass( BasePass ):
+
+  # FastForwardPass public pass data
+
+  #: Signals that increment by one every cycle, e.g. cycle counters for
+  #: performance statistics. They are not compared when detecting a fixed
+  #: point and are advanced by the number of skipped cycles. Note that
+  #: any other signal computed from them breaks the fixed point.
+  #:
+  #: Type: ``list`` of signals; input
+  #:
+  #: Default value: []
+  cycle_counters = MetadataKey(list)
+
+  def __call__( self, top ):
+    if not hasattr( top, "_sched" ):
+      raise PassOrderError( "_sched" )
+    if hasattr( top, "_sim" ):
+      raise Exception( "FastForwardPass must be applied before PrepareSimPass!" )
+
+    top._ff = ff = PassMetadata()
+    ff.skipped_cycles = 0
+    ff.nskips = 0
+    ff.blockers = self.find_blockers( top )
+    ff.waveform = any( top.has_metadata( x ) for x in [ VcdGenerationPass.vcd_func,
+                                                        BinaryWavePass.wave_func,
+                                                        FlightRecorderPass.record_func,
+                                                        PrintTextWavePass.textwave_func,
+                                                        VerilogTBGenPass.vtbgen_hooks ] )
+    # A multi-rate block may only be due in some of the idle
+    # cycles, so one cycle that repeats the last one is not a fixed point
+    ff.multirate = bool( top.get_all_update_ff_rates() )
+    ff.enabled = not ff.blockers and not ff.waveform and not ff.multirate
+
+    if ff.enabled:
+      add_hook( top, SimHooks.sim_api_hooks, 'FastForwardPass', FAST_FORWARD_PRIORITY,
+                lambda: self.create_sim_run( top, ff ) )
+
+  def find_blockers( self, top ):
+    """ Return the components that have Python state but do not declare
+    their next events. """
+    pure = EventDrivenSchedulePass().collect_pure_signal_blocks( top, include_ff=True )
+
+    stateful = set()
+    for blk in top._dag.final_upblks:
+      if blk not in pure and blk not in top._dag.genblks:
+        stateful.add( top.get_update_block_host_component( blk ) )
+
+    for port in top.get_all_object_filter( lambda x: isinstance( x, CalleePort ) ):
+      host = getattr( port.method, '__self__', None )
+      if isinstance( host, Component ):
+        stateful.add( host )
+
+    return sorted( [ x for x in stateful if not callable( getattr( x, 'next_event', None ) ) ],
+                   key=repr )
+
+  #-----------------------------------------------------------------------
+  # create_sim_run
+  #-----------------------------------------------------------------------
+
+  def create_sim_run( self, top, ff ):
+    # PrepareSimPass imports this module
+    from .PrepareSimPass import SimRunStats
+
+    tick = SimpleTickPass.gen_tick_function( top._sim.tick_schedule )
+
+    hooks    = [ x.next_event for x in top._dsl.all_components
+                 if callable( getattr( x, 'next_event', None ) ) ]
+    skippers = [ x.skip_cycles for x in top._dsl.all_components
+                 if callable( getattr( x, 'skip_cycles', None ) ) ]
+
+    # Per-cycle counters
+
+    counters = []
+    for c in top._dsl.all_components:
+      if c.has_metadata( self.cycle_counters ):
+        counters.extend( top._sim.signal_object_mapping[x][-1]
+                         for x in c.get_metadata( self.cycle_counters ) )
+
+    # Compare the leaf Bits objects of all signals except the counters
+
+    values = { id(v): v for (_, _, _, v) in top._sim.signal_object_mapping.values()
+               if not isinstance( v, int ) }
+    leaves = []
+    for v in values.values():
+      _get_leaf_bits( v, leaves )
+    skip_ids = { id(x) for x in counters }
+    leaves = list( { id(x): x for x in leaves if id(x) not in skip_ids }.values() )
+
+    ff.nleaves = len(leaves)
+    snapshot = gen_snapshot_function( leaves )
+
+    print_line_trace = getattr( top, 'print_line_trace', None )
+    INF = float('inf')
+
+    def next_event():
+      m = INF
+      for f in hooks:
+        x = f()
+        if x is not None:
+          if x <= 0:
+            return 0
+          if x < m:
+            m = x
+      return m
+
+    def skip( n ):
+      top._sim.simulated_cycles += n
+      for f in skippers:
+        f( n )
+      for x in counters:
+        x._uint = ( x._uint + n ) & ( ( 1 << x._nbits ) - 1 )
+      ff.skipped_cycles += n
+      ff.nskips += 1
+      if print_line_trace is not None:
+        print( f"{top._sim.simulated_cycles:3}: ... fast-forwarded {n} idle cycles" )
+
+    # prev[0] is the snapshot after the previous cycle. We reset it in
+    # every call because the inputs might have changed in between.
+    prev = [ None ]
+
+    def step( budget ):
+      tick()
+      k = next_event()
+      if not k:
+        prev[0] = None
+        return 1
+      snap = snapshot()
+      if snap != prev[0]:
+        prev[0] = snap
+        return 1
+      n = min( k - 1, budget - 1 )
+      if n > 0:
+        skip( n )
+      return 1 + n
+
+    def sim_run( ncycles ):
+      t0 = perf_counter()
+      prev[0] = None
+      n = 0
+      while n < ncycles:
+        n += step( ncycles - n )
+      return SimRunStats( ncycles, perf_counter() - t0, None )
+
+    def sim_run_until( cond, max_cycles, check_every=1 ):
+      assert check_every > 0
+      t0 = perf_counter()
+      prev[0] = None
+      n = 0
+      done = False
+      while n < max_cycles:
+        if cond():
+          done = True
+          break
+        # The cond() cannot change in idle cycles as long as it does
+        # not depend on the cycle count, so we may skip past the window
+        end = n + min( check_every, max_cycles - n )
+        while n < end:
+          n += step( max_cycles - n )
+      else:
+        done = bool( cond() )
+      return SimRunStats( n, perf_counter() - t0, done )
+
+    top.sim_run       = sim_run
+    top.sim_run_until = sim_run_until
+
+def gen_snapshot_function( leaves ):
+  src = "def snapshot():\n  return ( {} )\n".format(
+          "".join( f"_{i}._uint, " for i in range(len(leaves)) ) )
+  _globals = { f"_{i}": x for i, x in enumerate( leaves ) }
+  _locals  = {}
+  custom_exec( py.code.Source( src ).compile(), _globals, _locals )
+  return _locals['snapshot']
@@ -18,9 +18,24 @@ from pymtl3.dsl.errors import LeftoverPlaceholderError
 from pymtl3.extra.pypy import custom_exec
 from pymtl3.passes.BasePass import BasePass, PassMetadata
 
+from .SimCachePass import SimCachePass
+
 
 class GenDAGPass( BasePass ):
 
+  # GenDAGPass public pass data
+
+  #: Eliminate the net blocks of nets that only consist of whole signals.
+  #: These signals share the same value object in simulation, so the net
+  #: blocks do nothing but convey constraints. We directly connect the
+  #: writer and reader update blocks instead. Nets that involve slices or
+  #: bitstruct fields still need net blocks to copy values.
+  #:
+  #: Type: ``bool``; input
+  #:
+  #: Default value: False
+  alias_nets = MetadataKey(bool)
+
   def __call__( self, top ):
     top.check()
     top._dag = PassMetadata()
@@ -31,8 +46,19 @@ class GenDAGPass( BasePass ):
     if placeholders:
       raise LeftoverPlaceholderError( placeholders )
 
-    self._generate_net_blocks( top )
-    self._process_value_constraints( top )
+    # Check if we can reuse the net blocks and constraints from the
+    # persistent cache. Method-related constraints are always processed
+    # because _process_methods also binds the methods of callee ports.
+    alias_nets = top.has_metadata( self.alias_nets ) and top.get_metadata( self.alias_nets )
+
+    if not ( hasattr( top, "_cache" ) and SimCachePass.restore_dag( top, alias_nets ) ):
+      self._generate_net_blocks( top )
+      self._process_value_constraints( top )
+      if alias_nets:
+        self._eliminate_alias_net_blocks( top )
+      if hasattr( top, "_cache" ):
+        SimCachePass.record_dag( top, alias_nets )
+
     self._process_methods( top )
 
   def _generate_net_blocks( self, top ):
@@ -45,7 +71,8 @@ class GenDAGPass( BasePass ):
     top._dag.genblk_hostobj = {}
     top._dag.genblk_reads   = {}
     top._dag.genblk_writes  = {}
-    # top._dag.genblk_src     = {}
+    top._dag.genblk_srcs    = {}
+    top._dag.alias_genblks  = set()
 
     # Fall back to compiling one block at a time
     # This is currently because there might be different structs with
@@ -57,9 +84,12 @@ class GenDAGPass( BasePass ):
     def compile_net_blk( _globals, src, writer ):
       _locals = {}
       fname = f"Net (writer is {writer!r}"
-      custom_exec( compile( src, filename=fname, mode="exec"), _globals, _locals )
+      code  = compile( src, filename=fname, mode="exec")
+      custom_exec( code, _globals, _locals )
       line_cache[ fname ] = (len(src), None, src.splitlines(), fname )
-      return list(_locals.values())[0]
+      blk = list(_locals.values())[0]
+      top._dag.genblk_srcs[ blk ] = (src, code, _globals.get('s'), writer)
+      return blk
 
     for writer, signals in top.get_all_value_nets():
       if len(signals) == 1:
@@ -123,6 +153,7 @@ class GenDAGPass( BasePass ):
         blk = compile_net_blk( {}, f"""def {genblk_name}(): pass""", writer )
 
         top._dag.genblks.add( blk )
+        top._dag.alias_genblks.add( blk )
         if writer.is_signal():
           top._dag.genblk_reads[ blk ] = [ writer ]
         top._dag.genblk_writes[ blk ] = all_readers
@@ -336,6 +367,53 @@ def {}():
       if (y, x) not in U_U: # no conflicting expl
         top._dag.all_constraints.add( (x, y) )
 
+  def _eliminate_alias_net_blocks( self, top ):
+    """ _eliminate_alias_net_blocks:
+    All signals of an alias net share the same value object, so the
+    empty net block only conveys the constraints. We replace each
+      >>> U1 == WR(a) < net(a, b) < RD(b) == U2
+    with U1 < U2 and remove the net block. """
+
+    alias_genblks = top._dag.alias_genblks
+    if not alias_genblks:
+      return
+
+    constraint_objs = top._dag.constraint_objs
+
+    pred = defaultdict(list)
+    succ = defaultdict(list)
+    new_constraints = set()
+
+    for (x, y) in top._dag.all_constraints:
+      if x in alias_genblks:
+        succ[x].append( y )
+      elif y in alias_genblks:
+        pred[y].append( x )
+      else:
+        new_constraints.add( (x, y) )
+
+    for blk in alias_genblks:
+      for x in pred[blk]:
+        objs = constraint_objs[ (x, blk) ]
+        for y in succ[blk]:
+          if x is not y and y not in alias_genblks:
+            new_constraints.add( (x, y) )
+            constraint_objs[ (x, y) ] |= objs
+
+    for (x, y) in list(constraint_objs.keys()):
+      if x in alias_genblks or y in alias_genblks:
+        del constraint_objs[ (x, y) ]
+
+    for blk in alias_genblks:
+      top._dag.genblk_reads.pop( blk, None )
+      top._dag.genblk_writes.pop( blk )
+      top._dag.genblk_srcs.pop( blk )
+
+    top._dag.genblks      -= alias_genblks
+    top._dag.final_upblks -= alias_genblks
+    top._dag.all_constraints = new_constraints
+    top._dag.alias_genblks = set()
+
   #-----------------------------------------------------------------------
   # Process methods
   #----------------------------------------------------------------------
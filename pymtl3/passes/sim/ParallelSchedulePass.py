@@ -0,0 +1,267 @@
+"""
+========================================================================
+ParallelSchedulePass.py
+========================================================================
+A multi-threaded alternative to DynamicSchedulePass for free-threaded
+CPython (3.13+ built with --disable-gil). We still produce the same
+topological (SCC) schedule, and then levelize it: the level of an entry
+is one more than the highest level of the entries it depends on, so the
+entries of a level are independent of each other. Each level with enough
+work is split into chunks of about the same estimated cost which are
+executed by a thread pool, and the next level starts after all chunks
+have finished.
+
+Only blocks that purely read and write signals run on worker threads.
+Other blocks (CL blocks, blocks that touch Python state, etc.) keep their
+relative order and run on the main thread.
+
+On a build with the GIL, threads cannot run update blocks concurrently,
+so we keep the serial schedule unless the parallel execution is forced.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+import os
+import sys
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+
+from pymtl3.dsl import MetadataKey
+from pymtl3.passes.BasePass import PassMetadata
+
+from .DynamicSchedulePass import DynamicSchedulePass
+from .EventDrivenSchedulePass import EventDrivenSchedulePass
+from .SimpleTickPass import SimpleTickPass
+
+
+def is_gil_enabled():
+  check = getattr( sys, "_is_gil_enabled", None )
+  return True if check is None else check()
+
+class ParallelSchedulePass( DynamicSchedulePass ):
+
+  # ParallelSchedulePass public pass data
+
+  #: The number of threads, including the main thread. The default is
+  #: the number of CPUs.
+  #:
+  #: Type: ``int``; input
+  #:
+  #: Default value: ``os.cpu_count()``
+  nthreads = MetadataKey(int)
+
+  #: The estimated cost below which a level is executed serially. The
+  #: cost of a block is the size of its bytecode in bytes, a rough proxy
+  #: of its execution time. Dispatching a level to the thread pool costs
+  #: about as much as executing a few thousand bytes of bytecode.
+  #:
+  #: Type: ``int``; input
+  #:
+  #: Default value: 8192
+  min_level_cost = MetadataKey(int)
+
+  #: The estimated cost below which a level is not split further, i.e.
+  #: a level is split into at most cost // min_chunk_cost chunks.
+  #:
+  #: Type: ``int``; input
+  #:
+  #: Default value: 2048
+  min_chunk_cost = MetadataKey(int)
+
+  #: Run levels on the thread pool even if the GIL is enabled. This is
+  #: only useful for testing since the GIL serializes the threads.
+  #:
+  #: Type: ``bool``; input
+  #:
+  #: Default value: False
+  force = MetadataKey(bool)
+
+  def __call__( self, top ):
+    super().__call__( top )
+
+    c = top.get_metadata
+    h = top.has_metadata
+    self.nthreads       = c( self.nthreads ) if h( self.nthreads ) else ( os.cpu_count() or 1 )
+    self.min_level_cost = c( self.min_level_cost ) if h( self.min_level_cost ) else 8192
+    self.min_chunk_cost = c( self.min_chunk_cost ) if h( self.min_chunk_cost ) else 2048
+    self.force          = h( self.force ) and c( self.force )
+
+    self.schedule_levels( top )
+    self.schedule_parallel( top )
+
+  #-----------------------------------------------------------------------
+  # schedule_levels
+  #-----------------------------------------------------------------------
+
+  def schedule_levels( self, top ):
+    schedule   = top._sched.update_schedule
+    scc_blocks = top._sched.scc_blocks
+
+    entry_of = {}
+    for entry in schedule:
+      for blk in scc_blocks.get( entry, [ entry ] ):
+        entry_of[ blk ] = entry
+
+    preds = { entry: set() for entry in schedule }
+    for (u, v) in top._dag.all_constraints:
+      if u in entry_of and v in entry_of:
+        eu, ev = entry_of[u], entry_of[v]
+        if eu is not ev:
+          preds[ ev ].add( eu )
+
+    # Blocks that write different slices of the same signal don't depend
+    # on each other, but writing a slice reads and writes the whole
+    # signal, so they must not run at the same time. We keep their order
+    # in the schedule.
+
+    _, upblk_writes, _ = top.get_all_upblk_metadata()
+    origin = { y: x for x, y in getattr( top._dag, 'blk_greenlet_mapping', {} ).items() }
+
+    last_writer = {}
+    for entry in schedule:
+      written = set()
+      for blk in scc_blocks.get( entry, [ entry ] ):
+        blk = origin.get( blk, blk )
+        if blk in top._dag.genblks:
+          writes = top._dag.genblk_writes.get( blk, () )
+        else:
+          writes = upblk_writes.get( blk, () )
+        written.update( x.get_top_level_signal() for x in writes if x.is_signal() )
+
+      for x in written:
+        if x in last_writer:
+          preds[ entry ].add( last_writer[x] )
+        last_writer[x] = entry
+
+    # Impure entries run on the main thread in the original order
+
+    pure_blks = EventDrivenSchedulePass().collect_pure_signal_blocks( top )
+    pure = { entry: all( x in pure_blks for x in scc_blocks.get( entry, [ entry ] ) )
+             for entry in schedule }
+
+    last_impure = None
+    for entry in schedule:
+      if not pure[ entry ]:
+        if last_impure is not None:
+          preds[ entry ].add( last_impure )
+        last_impure = entry
+
+    level = {}
+    levels = []
+    for entry in schedule:
+      l = max( ( level[x] + 1 for x in preds[ entry ] ), default=0 )
+      level[ entry ] = l
+      if l == len(levels):
+        levels.append( [] )
+      levels[l].append( entry )
+
+    cost = { entry: sum( estimate_cost( x ) for x in scc_blocks.get( entry, [ entry ] ) )
+             for entry in schedule }
+
+    top._sched.parallel = p = PassMetadata()
+    p.levels      = levels
+    p.entry_cost  = cost
+    p.entry_pure  = pure
+    p.level_costs = [ sum( cost[x] for x in lv ) for lv in levels ]
+    p.gil_enabled = is_gil_enabled()
+    p.nthreads    = self.nthreads
+    p.chunks      = [ None ] * len(levels)
+
+  #-----------------------------------------------------------------------
+  # schedule_parallel
+  #-----------------------------------------------------------------------
+  # We keep the serial schedule in top._sched.static_update_schedule and
+  # replace update_schedule with one entry per level.
+
+  def schedule_parallel( self, top ):
+    p = top._sched.parallel
+    top._sched.static_update_schedule = top._sched.update_schedule
+
+    if self.nthreads <= 1 or ( p.gil_enabled and not self.force ):
+      return
+
+    pool = None
+    schedule = []
+
+    for i, (lv, lv_cost) in enumerate( zip( p.levels, p.level_costs ) ):
+      nchunks = min( self.nthreads, lv_cost // max( self.min_chunk_cost, 1 ),
+                     sum( p.entry_pure[x] for x in lv ) + 1 )
+
+      if lv_cost < self.min_level_cost or nchunks <= 1:
+        schedule.extend( lv )
+        continue
+
+      chunks = self.partition( lv, p.entry_cost, p.entry_pure, nchunks )
+      if len(chunks) <= 1:
+        schedule.extend( lv )
+        continue
+
+      if pool is None:
+        pool = ThreadPoolExecutor( max_workers=self.nthreads - 1,
+                                   thread_name_prefix="pymtl-level" )
+        # Stop the worker threads when top is garbage collected
+        weakref.finalize( top, pool.shutdown )
+      p.chunks[i] = chunks
+      schedule.append( gen_level_func( pool, [ SimpleTickPass.gen_tick_function( x )
+                                               for x in chunks ] ) )
+
+    p.pool = pool
+    if pool is not None:
+      top._sched.update_schedule = schedule
+
+  @staticmethod
+  def partition( entries, cost, pure, nchunks ):
+    """ Greedily assign the most expensive entries first to the chunk with
+    the least cost. All impure entries go to chunk 0, which the main
+    thread executes. Within a chunk the entries keep the schedule order. """
+    order = { x: i for i, x in enumerate( entries ) }
+
+    chunks = [ [] for _ in range(nchunks) ]
+    loads  = [ 0 ] * nchunks
+    for x in entries:
+      if not pure[x]:
+        chunks[0].append( x )
+        loads[0] += cost[x]
+
+    for x in sorted( [ x for x in entries if pure[x] ], key=lambda x: ( -cost[x], order[x] ) ):
+      i = min( range(nchunks), key=lambda i: loads[i] )
+      chunks[i].append( x )
+      loads[i] += cost[x]
+
+    chunks = [ sorted( x, key=order.__getitem__ ) for x in chunks if x ]
+    return chunks
+
+def estimate_cost( blk ):
+  code = getattr( blk, '__code__', None )
+  if code is None: # e.g. a method port
+    return 64
+  return len( code.co_code )
+
+def gen_level_func( pool, funcs ):
+  main, rest = funcs[0], funcs[1:]
+  submit = pool.submit
+
+  def parallel_level():
+    futures = [ submit( x ) for x in rest ]
+    try:
+      main()
+    finally:
+      # Never leave a level running in the background
+      wait_futures( futures )
+    for x in futures:
+      x.result()
+
+  return parallel_level
+
+def format_level_report( top ):
+  """ Return a text summary of the levels of a ParallelSchedulePass
+  schedule. """
+  p = top._sched.parallel
+  lines = [ f"{len(p.levels)} levels, {p.nthreads} threads, "
+            f"GIL {'enabled' if p.gil_enabled else 'disabled'}",
+            f"{'level':>5} {'entries':>8} {'cost':>10} {'chunks':>7}" ]
+  for i, (lv, lv_cost) in enumerate( zip( p.levels, p.level_costs ) ):
+    nchunks = len( p.chunks[i] ) if p.chunks[i] else 1
+    lines.append( f"{i:>5} {len(lv):>8} {lv_cost:>10} {nchunks:>7}" )
+  return "\n".join( lines )
@@ -7,25 +7,55 @@ Author : Shunning Jiang
 Date   : Jan 26, 2020
 """
 
+from collections import namedtuple
+from time import perf_counter
+
 import py
 
 from pymtl3.datatypes import Bits, b1
 from pymtl3.dsl.Component import Component
 from pymtl3.dsl.Connectable import Const, Interface, MethodPort, Signal
+from pymtl3.dsl.MetadataKey import MetadataKey
 from pymtl3.dsl.NamedObject import NamedObject
 from pymtl3.extra.pypy import custom_exec
 from pymtl3.passes.backends.verilog import VerilogTBGenPass
 from pymtl3.passes.BasePass import BasePass, PassMetadata
 from pymtl3.passes.errors import PassOrderError
+from pymtl3.passes.tracing.BinaryWavePass import BinaryWavePass
 from pymtl3.passes.tracing.CLLineTracePass import CLLineTracePass
+from pymtl3.passes.tracing.FlightRecorderPass import FlightRecorderPass
 from pymtl3.passes.tracing.LineTraceParamPass import LineTraceParamPass
 from pymtl3.passes.tracing.PrintTextWavePass import PrintTextWavePass
 from pymtl3.passes.tracing.VcdGenerationPass import VcdGenerationPass
 
+from .CheckpointPass import SimState
+from .SimHooks import SimHooks, call_hooks
 from .SimpleTickPass import SimpleTickPass
 
+# Returned by sim_run and sim_run_until. done is None for sim_run.
+SimRunStats = namedtuple( 'SimRunStats', [ 'ncycles', 'seconds', 'done' ] )
+
 
 class PrepareSimPass( BasePass ):
+
+  # PrepareSimPass public pass data
+
+  #: Cache the signal values after the first sim_reset() and restore
+  #: them in later resets instead of simulating the reset cycles again.
+  #: Set it to False on top or on any component to opt out, e.g. on a
+  #: component whose reset is not deterministic. The reset cycles are
+  #: simulated again if the top-level inputs differ from those in the
+  #: first reset, or if the Python state of any component, e.g. of a
+  #: testbench, has changed since the first reset, because we cannot
+  #: tell if the reset would overwrite it. The snapshot is disabled if
+  #: waveforms are generated during reset, and if the Python state
+  #: cannot be pickled, e.g. because it holds a lock.
+  #:
+  #: Type: ``bool``; input
+  #:
+  #: Default value: True
+  reset_snapshot = MetadataKey(bool)
+
   def __init__( self, print_line_trace=True, reset_active_high=True ):
     assert reset_active_high in [ True, False ]
 
@@ -57,6 +87,9 @@ class PrepareSimPass( BasePass ):
     self.create_sim_eval_comb( top )
     self.create_sim_tick( top )
     self.create_sim_reset( top )
+    self.create_sim_run( top )
+
+    call_hooks( top, SimHooks.sim_api_hooks )
 
 
   def create_sim_eval_comb( self, top ):
@@ -82,15 +115,22 @@ class PrepareSimPass( BasePass ):
     final_schedule += self.collect_ff_funcs( top )
     final_schedule += top._sched.update_schedule
     final_schedule.append( top._sim.check_top_level_inports )
+    top._sim.tick_schedule = final_schedule
     top.sim_tick = SimpleTickPass.gen_tick_function( final_schedule )
 
-  def collect_ff_funcs( self, top ):
+  def collect_ff_funcs( self, top, all_phases=False ):
     # ff_funcs summarizes the execution at the clock edge
     ret = []
     # append tracing related work
     if top.has_metadata( VcdGenerationPass.vcd_func ):
       ret.append( top.get_metadata( VcdGenerationPass.vcd_func ) )
 
+    if top.has_metadata( BinaryWavePass.wave_func ):
+      ret.append( top.get_metadata( BinaryWavePass.wave_func ) )
+
+    if top.has_metadata( FlightRecorderPass.record_func ):
+      ret.append( top.get_metadata( FlightRecorderPass.record_func ) )
+
     if top.has_metadata( PrintTextWavePass.textwave_func ):
       ret.append( top.get_metadata( PrintTextWavePass.textwave_func ) )
 
@@ -98,6 +138,7 @@ class PrepareSimPass( BasePass ):
       ret.extend( top.get_metadata( VerilogTBGenPass.vtbgen_hooks ) )
 
     ret.extend( top._sched.schedule_ff )
+    ret.extend( self.create_multirate_ff( top, all_phases ) )
     ret.extend( top._sched.schedule_posedge_flip )
     ret.append( self.create_advance_sim_cycle( top ) )
 
@@ -107,15 +148,38 @@ class PrepareSimPass( BasePass ):
 
     return ret
 
+  @staticmethod
+  def create_multirate_ff( top, all_phases=False ):
+    """ Return the functions that execute the multi-rate update_ff
+    blocks. Normally it is a single function that only calls the tick
+    function of the current phase of each period. If all_phases is True,
+    all blocks execute at every clock edge. """
+    phases = getattr( top._sched, 'schedule_ff_phases', None )
+    if not phases:
+      return []
+    if all_phases:
+      return [ f for funcs in phases.values() for f in funcs ]
+
+    src = [ "def tick_multirate_ff():", "  c = _sim.simulated_cycles" ]
+    _globals = { '_sim': top._sim }
+    for i, (period, funcs) in enumerate( phases.items() ):
+      src.append( f"  _p{i}[ c % {period} ]()" )
+      _globals[ f"_p{i}" ] = funcs
+    _locals = {}
+    custom_exec( py.code.Source( "\n".join( src ) ).compile(), _globals, _locals )
+    return [ _locals['tick_multirate_ff'] ]
+
   # Simulation related APIs
   def create_sim_reset( self, top ):
-    ff = SimpleTickPass.gen_tick_function( self.collect_ff_funcs( top ) )
+    # Every multi-rate block executes at every clock edge during
+    # reset so that all of them observe the reset regardless of the phase
+    ff = SimpleTickPass.gen_tick_function( self.collect_ff_funcs( top, all_phases=True ) )
     up = SimpleTickPass.gen_tick_function( top._sched.update_schedule )
 
     print_line_trace = self.print_line_trace and hasattr( top, 'line_trace' )
     active_high      = self.reset_active_high
 
-    def sim_reset():
+    def reset_cycles( traces ):
       if print_line_trace:
         print()
       # cycle 0
@@ -126,21 +190,147 @@ class PrepareSimPass( BasePass ):
       # cycle 1
       up()
       if print_line_trace:
-        print( f"{top._sim.simulated_cycles:3}r {top.line_trace()}" )
+        traces.append( top.line_trace() )
+        print( f"{top._sim.simulated_cycles:3}r {traces[-1]}" )
 
       ff()
       # cycle 2
       up()
       if print_line_trace:
-        print( f"{top._sim.simulated_cycles:3}r {top.line_trace()}" )
+        traces.append( top.line_trace() )
+        print( f"{top._sim.simulated_cycles:3}r {traces[-1]}" )
 
       ff()
       # cycle 3
       top.reset @= b1( not active_high )
       up()
 
+    if not self.use_reset_snapshot( top ):
+      top.sim_reset = lambda: reset_cycles( [] )
+      return
+
+    # The post-reset state also depends on the values of the
+    # top-level input ports during reset, so we only reuse the snapshot
+    # if they are the same as those in the first reset.
+    inports = [ top._sim.signal_object_mapping[x][-1] for x in top._dsl.all_signals
+                if x.is_input_value_port() and x.is_top_level_signal() and
+                   x.get_host_component() is top and x.get_field_name() not in ('reset', 'clk') ]
+
+    snapshot = top._sim.reset_snapshot = PassMetadata()
+    snapshot.values = None
+    snapshot.failed = False
+
+    def sim_reset():
+      inputs = [ int( x.to_bits() ) for x in inports ]
+
+      if snapshot.values is not None and inputs == snapshot.inputs:
+        try:
+          unchanged = snapshot.sim_state.dumps_attrs() == snapshot.attrs
+        except TypeError:
+          unchanged = False
+
+        if unchanged:
+          cycles = top._sim.simulated_cycles
+          snapshot.sim_state.restore( snapshot.values, copy=False )
+          top._sim.simulated_cycles = cycles + 3
+          if print_line_trace:
+            print()
+            for i, trace in enumerate( snapshot.traces ):
+              print( f"{cycles+i+1:3}r {trace}" )
+          return
+
+        # The Python state, e.g. of a testbench, is not restored by the
+        # snapshot, so we fall back to simulating the reset from now on
+        snapshot.values = None
+        snapshot.failed = True
+
+      traces = []
+      reset_cycles( traces )
+
+      if snapshot.values is None and not snapshot.failed:
+        try:
+          # The checkpoint pass might have already recorded the objects
+          snapshot.sim_state = getattr( top._sim, 'checkpoint', None ) or SimState( top )
+          snapshot.attrs = snapshot.sim_state.dumps_attrs()
+        # The state might hold objects that cannot be pickled, e.g. locks,
+        # so we keep simulating the reset cycles
+        except Exception:
+          snapshot.failed = True
+          return
+        snapshot.values = snapshot.sim_state.capture_values()
+        snapshot.inputs = inputs
+        snapshot.traces = traces
+
     top.sim_reset = sim_reset
 
+  def use_reset_snapshot( self, top ):
+    if top.has_metadata( self.reset_snapshot ) and not top.get_metadata( self.reset_snapshot ):
+      return False
+
+    # Waveform generation and testbench generation record the reset cycles
+    for key in [ VcdGenerationPass.vcd_func, BinaryWavePass.wave_func,
+                 FlightRecorderPass.record_func, PrintTextWavePass.textwave_func,
+                 VerilogTBGenPass.vtbgen_hooks ]:
+      if top.has_metadata( key ):
+        return False
+
+    for c in top._dsl.all_components:
+      if c.has_metadata( self.reset_snapshot ) and not c.get_metadata( self.reset_snapshot ):
+        return False
+    return True
+
+  def create_sim_run( self, top ):
+    """ Create top.sim_run( ncycles ) and top.sim_run_until( cond,
+    max_cycles, check_every=1 ). Both run a loop with the tick schedule
+    unrolled into the loop body instead of calling top.sim_tick, and
+    return a SimRunStats. sim_run_until checks cond() before every
+    check_every cycles, so it ticks at most check_every-1 extra cycles
+    after cond() becomes true. Note that they simulate the top.sim_tick
+    at the time they are created, which is kept in top._sim.run_tick.
+    If sim_tick is replaced later, e.g. wrapped by a test, the callers
+    need to call the new sim_tick every cycle instead. """
+    schedule = getattr( top._sim, 'tick_schedule', [ top.sim_tick ] )
+    top.sim_run, top.sim_run_until = self.gen_run_functions( schedule )
+    top._sim.run_tick = top.sim_tick
+
+  @staticmethod
+  def gen_run_functions( schedule ):
+    body = "; ".join( [ f"_{i}()" for i in range(len(schedule)) ] ) or "pass"
+
+    src = f"""
+def compile_run( schedule ):
+  {"; ".join( [ f"_{i}=schedule[{i}]" for i in range(len(schedule)) ] ) or "pass"}
+
+  def sim_run( ncycles ):
+    t0 = perf_counter()
+    for _ in range( ncycles ):
+      {body}
+    return SimRunStats( ncycles, perf_counter() - t0, None )
+
+  def sim_run_until( cond, max_cycles, check_every=1 ):
+    assert check_every > 0
+    t0 = perf_counter()
+    n = 0
+    done = False
+    while n < max_cycles:
+      if cond():
+        done = True
+        break
+      k = min( check_every, max_cycles - n )
+      for _ in range( k ):
+        {body}
+      n += k
+    else:
+      done = bool( cond() )
+    return SimRunStats( n, perf_counter() - t0, done )
+
+  return sim_run, sim_run_until
+"""
+    _globals = { 'perf_counter': perf_counter, 'SimRunStats': SimRunStats }
+    _locals  = {}
+    custom_exec( py.code.Source( src ).compile(), _globals, _locals )
+    return _locals['compile_run']( schedule )
+
   def create_print_line_trace( self, top ):
     if self.print_line_trace and hasattr( top, 'line_trace' ):
       def print_line_trace():
@@ -257,6 +447,10 @@ class PrepareSimPass( BasePass ):
       top._sim.signal_object_mapping = signal_object_mapping
       top._sim.locked_simulation = True
 
+      # Now that all signals have become actual values, let the passes
+      # bind their functions to these values.
+      call_hooks( top, SimHooks.lock_in_hooks )
+
       # Add the function that checks if the Bits objects of
       # top-level input ports are modified. If so, it's mostly because
       # the top-level ports are assigned with = instead of @=.
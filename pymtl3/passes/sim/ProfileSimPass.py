@@ -0,0 +1,338 @@
+"""
+========================================================================
+ProfileSimPass.py
+========================================================================
+Find out which update blocks and components dominate the simulation
+time. When the simulation is locked in, we profile every entry of
+top._sched.update_schedule and top._sched.schedule_ff, the blocks
+inside the SCC blocks and the multi-rate update_ff phases, in one of
+two modes:
+
+- exact: every block is replaced by a function that counts the calls
+  and accumulates the time spent in the block in nanoseconds.
+- sample: nothing is replaced. A daemon thread wakes up every
+  sample_interval seconds and attributes one sample to the innermost
+  block on the stack of every other thread. The overhead does not
+  depend on the number of blocks, but we only get the share of the
+  samples instead of the calls and the time.
+
+format_profile_report, dump_profile_json and dump_profile_csv
+aggregate the results per block, per host component and per component
+class. The time of an SCC block only includes the time spent outside
+its blocks, e.g. saving and comparing the signals of the loop.
+
+Nothing in the simulation changes if this pass is not applied. This
+pass has to be applied after the schedule pass and before
+PrepareSimPass.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+import csv
+import json
+import sys
+import threading
+from collections import defaultdict
+from time import perf_counter
+
+import py
+
+from pymtl3.dsl import MetadataKey
+from pymtl3.extra.pypy import custom_exec
+from pymtl3.passes.BasePass import BasePass, PassMetadata
+from pymtl3.passes.errors import PassOrderError
+
+from .SimHooks import PROFILE_PRIORITY, SimHooks, add_hook
+
+
+class ProfileSimPass( BasePass ):
+
+  # ProfileSimPass public pass data
+
+  #: The profiling mode, either 'exact' or 'sample'.
+  #:
+  #: Type: ``str``; input
+  #:
+  #: Default value: 'exact'
+  mode = MetadataKey(str)
+
+  #: The time between two samples in seconds in the sample mode.
+  #:
+  #: Type: ``float``; input
+  #:
+  #: Default value: 0.001
+  sample_interval = MetadataKey(float)
+
+  def __call__( self, top ):
+    if not hasattr( top, "_sched" ):
+      raise PassOrderError( "_sched" )
+    if hasattr( top, "_sim" ):
+      raise Exception( "ProfileSimPass must be applied before PrepareSimPass!" )
+
+    mode = 'exact'
+    if top.has_metadata( self.mode ):
+      mode = top.get_metadata( self.mode )
+    if mode not in ( 'exact', 'sample' ):
+      raise ValueError( f"Unknown profiling mode '{mode}', please use 'exact' or 'sample'" )
+
+    top._profile = p = PassMetadata()
+    p.mode     = mode
+    p.interval = 0.001
+    if top.has_metadata( self.sample_interval ):
+      p.interval = top.get_metadata( self.sample_interval )
+
+    # Each record is [ ncalls, ns, nsamples ]
+    p.records     = {}
+    p.scc_members = {}
+    p.num_samples = 0
+    p.stop        = lambda: None
+
+    add_hook( top, SimHooks.lock_in_hooks, 'ProfileSimPass', PROFILE_PRIORITY,
+              lambda: self.bind_profile( top, p ) )
+
+  #-----------------------------------------------------------------------
+  # bind_profile
+  #-----------------------------------------------------------------------
+  # Records are keyed by the original blocks, not the greenlet wrappers or
+  # the blocks recompiled by DeadLogicEliminationPass, so that we can find
+  # their host components.
+
+  def bind_profile( self, top, p ):
+    origin = { y: x for x, y in getattr( top._dag, 'blk_greenlet_mapping', {} ).items() }
+    dead_logic = getattr( top, '_dead_logic', None )
+    if dead_logic is not None:
+      origin.update( { y: x for x, y in dead_logic.folded.items() } )
+
+    exact = p.mode == 'exact'
+
+    def profile( func ):
+      key = origin.get( func, func )
+      rec = p.records.setdefault( key, [ 0, 0, 0 ] )
+      return self.wrap_block( func, rec ) if exact else func
+
+    scc_blocks = getattr( top._sched, 'scc_blocks', {} )
+
+    for name in [ 'update_schedule', 'schedule_ff' ]:
+      schedule = getattr( top._sched, name, None )
+      if schedule is None:
+        continue
+      for i, x in enumerate( schedule ):
+        if x in scc_blocks:
+          p.scc_members[ x ] = [ origin.get( y, y ) for y in scc_blocks[ x ] ]
+          self.profile_globals( x, 'b', profile )
+        schedule[i] = profile( x )
+
+    for funcs in getattr( top._sched, 'schedule_ff_phases', {} ).values():
+      for f in funcs:
+        self.profile_globals( f, '_', profile )
+
+    if not exact:
+      p.stop = self.start_sampler( p )
+
+  @staticmethod
+  def profile_globals( func, prefix, profile ):
+    """ Profile the blocks that a generated function calls through the
+    globals named prefix0, prefix1, ... """
+    g = func.__globals__
+    for name in list( g ):
+      if name.startswith( prefix ) and name[ len(prefix): ].isdigit():
+        g[ name ] = profile( g[ name ] )
+
+  @staticmethod
+  def wrap_block( func, rec ):
+    # Keep the name since the tick functions are generated from the names
+    src = f"""
+def {func.__name__}():
+  t = _clock()
+  _func()
+  _rec[1] += int( ( _clock() - t ) * 1e9 )
+  _rec[0] += 1
+"""
+    _globals = { '_clock': perf_counter, '_func': func, '_rec': rec }
+    _locals  = {}
+    custom_exec( py.code.Source( src ).compile(), _globals, _locals )
+    return _locals[ func.__name__ ]
+
+  #-----------------------------------------------------------------------
+  # start_sampler
+  #-----------------------------------------------------------------------
+  # All instances of the same component class share the code
+  # objects of their update blocks, so we tell them apart by a free
+  # variable of the closure, usually s.
+
+  def start_sampler( self, p ):
+    groups = defaultdict(list)
+    for key, rec in p.records.items():
+      code = getattr( key, '__code__', None )
+      if code is not None:
+        groups[ code ].append( (key, rec) )
+
+    code_map = {}
+    for code, items in groups.items():
+      code_map[ code ] = ( None, items[0][1] )
+      if len(items) == 1:
+        continue
+      for i, name in enumerate( code.co_freevars ):
+        try:
+          values = { id( key.__closure__[i].cell_contents ): rec for key, rec in items }
+        except ValueError: # empty cell
+          continue
+        if len(values) == len(items):
+          code_map[ code ] = ( name, values )
+          break
+
+    stopped = threading.Event()
+
+    def sample():
+      me = threading.get_ident()
+      while not stopped.wait( p.interval ):
+        p.num_samples += 1
+        for tid, frame in sys._current_frames().items():
+          if tid == me:
+            continue
+          while frame is not None:
+            entry = code_map.get( frame.f_code )
+            if entry is not None:
+              name, target = entry
+              if name is not None:
+                target = target.get( id( frame.f_locals.get( name ) ) )
+              if target is not None:
+                target[2] += 1
+              break
+            frame = frame.f_back
+
+    thread = threading.Thread( target=sample, name="pymtl3-profiler", daemon=True )
+    thread.start()
+
+    def stop():
+      stopped.set()
+      thread.join()
+    return stop
+
+#-------------------------------------------------------------------------
+# collect_profile
+#-------------------------------------------------------------------------
+
+def collect_profile( top ):
+  """ Return a list of dicts, one per profiled block, sorted by time in
+  the exact mode and by samples in the sample mode. """
+  p = top._profile
+  ffs = top.get_all_update_ff()
+  upblks = top.get_all_update_blocks()
+
+  member_ns = defaultdict(int)
+  for scc, members in p.scc_members.items():
+    member_ns[ scc ] = sum( p.records[x][1] for x in members if x in p.records )
+
+  # An SCC belongs to the lowest common ancestor of its blocks
+  def get_lca( members ):
+    common = None
+    for x in members:
+      if x not in upblks:
+        continue
+      path, c = [], top.get_update_block_host_component( x )
+      while c is not None:
+        path.append( c )
+        c = c.get_parent_object()
+      path.reverse()
+      if common is None:
+        common = path
+      else:
+        n = 0
+        while n < min( len(common), len(path) ) and common[n] is path[n]:
+          n += 1
+        common = common[:n]
+    return common[-1] if common else top
+
+  rows = []
+  for key, (ncalls, ns, nsamples) in p.records.items():
+    host = None
+    if key in p.scc_members:
+      kind = 'scc'
+      host = get_lca( p.scc_members[ key ] )
+      ns  -= member_ns[ key ]
+    elif key in top._dag.genblks:
+      kind = 'net'
+    elif key in upblks:
+      kind = 'ff' if key in ffs else 'comb'
+      host = top.get_update_block_host_component( key )
+    else:
+      kind = 'other'
+
+    if host is not None:
+      component, cls = repr(host), host.__class__.__qualname__
+    else:
+      component = cls = "(net blocks)" if kind == 'net' else "(other)"
+
+    rows.append( { 'block': key.__name__, 'component': component, 'class': cls,
+                   'kind': kind, 'calls': ncalls, 'time_ns': max( ns, 0 ),
+                   'samples': nsamples } )
+
+  metric = 'time_ns' if p.mode == 'exact' else 'samples'
+  rows.sort( key=lambda x: ( -x[ metric ], x['component'], x['block'] ) )
+  return rows
+
+def _aggregate( rows, field, metric ):
+  total = defaultdict(int)
+  for x in rows:
+    total[ x[field] ] += x[ metric ]
+  return sorted( total.items(), key=lambda x: ( -x[1], x[0] ) )
+
+def format_profile_report( top, limit=20 ):
+  """ Return a text report of the limit most expensive blocks, components
+  and component classes. """
+  p = top._profile
+  rows = collect_profile( top )
+  exact = p.mode == 'exact'
+  metric = 'time_ns' if exact else 'samples'
+  total = sum( x[ metric ] for x in rows )
+
+  def share( n ):
+    return f"{100.0 * n / total if total else 0.0:6.2f}%"
+
+  if exact:
+    lines = [ f"exact profile: {total/1e6:.3f} ms in {len(rows)} blocks",
+              f"{'time(ms)':>10} {'share':>7} {'calls':>9} {'avg(ns)':>9}  block" ]
+    for x in rows[:limit]:
+      avg = x['time_ns'] // x['calls'] if x['calls'] else 0
+      lines.append( f"{x['time_ns']/1e6:10.3f} {share( x['time_ns'] )} {x['calls']:9} {avg:9}  "
+                    f"{x['component']}.{x['block']} ({x['kind']})" )
+  else:
+    lines = [ f"sampled profile: {total} of {p.num_samples} samples in {len(rows)} blocks",
+              f"{'samples':>10} {'share':>7}  block" ]
+    for x in rows[:limit]:
+      lines.append( f"{x['samples']:10} {share( x['samples'] )}  "
+                    f"{x['component']}.{x['block']} ({x['kind']})" )
+
+  for title, field in [ ( "per component:", 'component' ), ( "per class:", 'class' ) ]:
+    lines.append( title )
+    for name, n in _aggregate( rows, field, metric )[:limit]:
+      value = f"{n/1e6:10.3f}" if exact else f"{n:10}"
+      lines.append( f"{value} {share( n )}  {name}" )
+
+  return "\n".join( lines )
+
+def dump_profile_json( top, path ):
+  """ Write the per-block records and the per-component and per-class
+  totals to a JSON file. """
+  p = top._profile
+  rows = collect_profile( top )
+  metric = 'time_ns' if p.mode == 'exact' else 'samples'
+  data = {
+    'mode'       : p.mode,
+    'metric'     : metric,
+    'num_samples': p.num_samples,
+    'blocks'     : rows,
+    'components' : dict( _aggregate( rows, 'component', metric ) ),
+    'classes'    : dict( _aggregate( rows, 'class', metric ) ),
+  }
+  with open( path, 'w' ) as f:
+    json.dump( data, f, indent=1 )
+
+def dump_profile_csv( top, path ):
+  """ Write the per-block records to a CSV file. """
+  fields = [ 'block', 'component', 'class', 'kind', 'calls', 'time_ns', 'samples' ]
+  with open( path, 'w', newline='' ) as f:
+    writer = csv.DictWriter( f, fieldnames=fields )
+    writer.writeheader()
+    writer.writerows( collect_profile( top ) )
@@ -0,0 +1,444 @@
+"""
+========================================================================
+SimCachePass.py
+========================================================================
+A persistent on-disk cache for the results of GenDAGPass and the
+intra-cycle schedule of DynamicSchedulePass. The cache is keyed by the
+source code of all component classes in the hierarchy and the arguments
+used to construct each component/interface. On a cache hit, GenDAGPass
+and DynamicSchedulePass rebind the cached net blocks, constraints and
+schedule to the freshly elaborated instance instead of recomputing them.
+Within an entry, the schedules are keyed by the final update blocks and
+constraints, because the passes between GenDAGPass and the schedule
+pass may remove some of them. A cached schedule is only used if it has
+exactly the current update blocks.
+
+Note that we only track the source of the classes. Changes in the
+module-level helper functions or global variables used by update blocks
+are not detected, so please clear the cache directory if you change them.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+import hashlib
+import inspect
+import marshal
+import os
+import pickle
+import struct
+import sys
+from collections import defaultdict
+from linecache import cache as line_cache
+
+from pymtl3.datatypes import is_bitstruct_class
+from pymtl3.datatypes.bitstructs import get_bitstruct_inst_all_classes
+from pymtl3.dsl import Const, Interface, MetadataKey, Signal
+from pymtl3.dsl.Component import Component
+from pymtl3.extra.pypy import custom_exec
+from pymtl3.passes.BasePass import BasePass, PassMetadata
+
+# Bump this whenever the format of the cache entry changes
+CACHE_FORMAT_VERSION = 4
+
+# Every cache file starts with this magic, the format version and the
+# SHA-256 digest of the pickled entry that follows.
+_CACHE_MAGIC  = b"PYMTL3SC"
+_CACHE_HEADER = struct.Struct( f"<{len(_CACHE_MAGIC)}sI32s" )
+
+# The passes whose results are cached. The cache is invalidated if the
+# source code of any of them changes.
+_cached_pass_files = [ "GenDAGPass.py", "DynamicSchedulePass.py", "SimCachePass.py",
+                       "ConeOfInfluencePass.py", "DeadLogicEliminationPass.py" ]
+
+class SimCachePass( BasePass ):
+
+  # SimCachePass public pass data
+
+  #: The directory that stores the cache entries. If not set, we use the
+  #: PYMTL_SIM_CACHE environment variable. The cache is disabled if
+  #: neither is set. DefaultPassGroup only applies SimCachePass if this
+  #: is set, e.g. with its cache_dir option.
+  #:
+  #: Type: ``str``; input
+  #:
+  #: Default value: None
+  cache_dir = MetadataKey(str)
+
+  def __call__( self, top ):
+    top._check_called_at_elaborate_top( "SimCachePass" )
+
+    cache_dir = None
+    if top.has_metadata( self.cache_dir ):
+      cache_dir = top.get_metadata( self.cache_dir )
+    if cache_dir is None:
+      cache_dir = os.environ.get( 'PYMTL_SIM_CACHE' )
+    if not cache_dir:
+      return
+
+    top._cache = PassMetadata()
+    top._cache.cache_dir = cache_dir
+    top._cache.key   = key = compute_cache_key( top )
+    top._cache.entry = None
+    top._cache.dag_restored   = False
+    top._cache.sched_restored = False
+
+    # We cannot cache a design whose key is not deterministic
+    if key is None:
+      top._cache.path = None
+      return
+
+    top._cache.path = path = os.path.join( cache_dir, f"{key}.pkl" )
+    entry = read_cache_entry( path )
+    if entry is not None and entry.get( 'key' ) == key:
+      top._cache.entry = entry
+
+  #-----------------------------------------------------------------------
+  # GenDAGPass
+  #-----------------------------------------------------------------------
+
+  @staticmethod
+  def restore_dag( top, alias_nets ):
+    """ Rebind the cached net blocks and constraints to top. Return True
+    if successful, otherwise the caller needs to generate them. """
+
+    entry = top._cache.entry
+    if entry is None or entry['alias_nets'] != alias_nets:
+      top._cache.entry = None
+      return False
+
+    objs = { repr(x): x for x in top._dsl.all_named_objects }
+
+    try:
+      genblks = []
+      const_types = {}
+
+      for name, src, code, lca, const, reads, writes in entry['genblks']:
+        _globals = {}
+        if lca is not None:
+          lca = _globals['s'] = objs[ lca ]
+
+        # The net writer is a bitstruct constant, so we need to find the
+        # struct classes from the actual constant
+        if const is not None:
+          if not const_types:
+            for writer, _ in top.get_all_value_nets():
+              if isinstance( writer, Const ) and type(writer._dsl.const) is not int:
+                const_types[ repr(writer) ] = get_bitstruct_inst_all_classes( writer._dsl.const )
+          for t in const_types[ const ]:
+            _globals[ t.__name__ ] = t
+
+        _locals = {}
+        fname = f"Net (writer is {name}"
+        code = marshal.loads( code )
+        custom_exec( code, _globals, _locals )
+        line_cache[ fname ] = (len(src), None, src.splitlines(), fname )
+        blk = list(_locals.values())[0]
+
+        genblks.append( (blk, src, code, lca, [ objs[x] for x in reads ], [ objs[x] for x in writes ]) )
+
+      uid_blk = { ('n', i): x[0] for i, x in enumerate( genblks ) }
+      for host in top._dsl.all_components:
+        host_name = repr(host)
+        for name, blk in host._dsl.name_upblk.items():
+          uid_blk[ ('u', host_name, name) ] = blk
+
+      all_constraints = { (uid_blk[x], uid_blk[y]) for x, y in entry['constraints'] }
+      constraint_objs = defaultdict(set)
+      for x, y, vs in entry['constraint_objs']:
+        constraint_objs[ (uid_blk[x], uid_blk[y]) ] = { objs[v] for v in vs }
+
+    except (KeyError, IndexError):
+      top._cache.entry = None
+      return False
+
+    top._dag.genblks = set()
+    top._dag.genblk_hostobj = {}
+    top._dag.genblk_reads   = {}
+    top._dag.genblk_writes  = {}
+    top._dag.genblk_srcs    = {}
+    top._dag.alias_genblks  = set()
+
+    # An empty net block doesn't have an LCA
+    for blk, src, code, lca, reads, writes in genblks:
+      top._dag.genblks.add( blk )
+      top._dag.genblk_srcs[ blk ] = (src, code, lca, None)
+      if lca is None:
+        top._dag.alias_genblks.add( blk )
+      if reads:
+        top._dag.genblk_reads[ blk ] = reads
+      top._dag.genblk_writes[ blk ] = writes
+
+    top._dag.final_upblks = top.get_all_update_blocks() | top._dag.genblks
+    top._dag.constraint_objs = constraint_objs
+    top._dag.all_constraints = all_constraints
+
+    top._cache.uid_blk = uid_blk
+    top._cache.blk_uid = { y: x for x, y in uid_blk.items() }
+    top._cache.dag_restored = True
+    return True
+
+  @staticmethod
+  def record_dag( top, alias_nets ):
+    """ Serialize the net blocks and constraints generated by GenDAGPass
+    into a cache entry that is written after scheduling. """
+
+    if top._cache.path is None:
+      return
+
+    blk_uid = {}
+    genblks = []
+
+    # Sort the net blocks by name for a fixed outcome
+    for blk in sorted( top._dag.genblks, key=lambda x: x.__name__ ):
+      src, code, lca, writer = top._dag.genblk_srcs[ blk ]
+      const = None
+      if isinstance( writer, Const ) and type(writer._dsl.const) is not int:
+        const = repr(writer)
+
+      blk_uid[ blk ] = ('n', len(genblks))
+      genblks.append( (repr(writer), src, marshal.dumps( code ),
+                       None if lca is None else repr(lca), const,
+                       [ repr(x) for x in top._dag.genblk_reads.get( blk, () ) ],
+                       [ repr(x) for x in top._dag.genblk_writes[ blk ] ]) )
+
+    for blk, host in top._dsl.all_upblk_hostobj.items():
+      blk_uid[ blk ] = ('u', repr(host), blk.__name__)
+
+    top._cache.blk_uid = blk_uid
+    top._cache.dag = {
+      'alias_nets': alias_nets,
+      'genblks': genblks,
+      'constraints': [ (blk_uid[x], blk_uid[y]) for x, y in top._dag.all_constraints ],
+      'constraint_objs': [ (blk_uid[x], blk_uid[y], [ repr(v) for v in vs ])
+                           for (x, y), vs in top._dag.constraint_objs.items() ],
+    }
+
+  #-----------------------------------------------------------------------
+  # DynamicSchedulePass
+  #-----------------------------------------------------------------------
+
+  @staticmethod
+  def get_schedule_key( top ):
+    """ Return the key of the intra-cycle schedule of top in its cache
+    entry. The passes between GenDAGPass and the schedule pass may remove
+    update blocks and constraints, e.g. ConeOfInfluencePass and
+    DeadLogicEliminationPass, so the schedule depends on the final update
+    blocks and constraints as well as on the observed signals and whether
+    dead logic is eliminated. Raise KeyError if a block is not in the
+    cached DAG. """
+
+    blk_uid = top._cache.blk_uid
+
+    h = hashlib.sha256()
+    observed = None
+    if hasattr( top, "_coi" ):
+      observed = sorted( repr(x) for x in top._coi.observed )
+    h.update( f"observed {observed!r}\n".encode() )
+    h.update( f"dead_logic {hasattr( top, '_dead_logic' )}\n".encode() )
+
+    upblks = sorted( blk_uid[x] for x in top._dag.final_upblks )
+    constraints = sorted( (blk_uid[x], blk_uid[y]) for x, y in top._dag.all_constraints )
+    h.update( repr(upblks).encode() )
+    h.update( repr(constraints).encode() )
+    return h.hexdigest()
+
+  @staticmethod
+  def restore_schedule( top ):
+    """ Return the cached intra-cycle schedule where each entry is either
+    an update block or a (blocks, src) tuple of a SCC block. Return None
+    if there is no valid cached schedule. """
+
+    if not top._cache.dag_restored:
+      return None
+
+    uid_blk = top._cache.uid_blk
+    mapping = getattr( top._dag, 'blk_greenlet_mapping', {} )
+
+    def get_blk( uid ):
+      blk = uid_blk[ uid ]
+      return mapping.get( blk, blk )
+
+    try:
+      cached = top._cache.entry['schedules'][ SimCachePass.get_schedule_key( top ) ]
+
+      # Only trust a schedule that has exactly the current blocks
+      scheduled = []
+      for x in cached:
+        scheduled.extend( x[1] if x[0] == 'scc' else [ x ] )
+      expected = top._dag.final_upblks - top.get_all_update_ff()
+      if len(scheduled) != len(expected) or \
+         { uid_blk[x] for x in scheduled } != expected:
+        return None
+
+      schedule = []
+      for x in cached:
+        if x[0] == 'scc':
+          schedule.append( ([ get_blk(y) for y in x[1] ], x[2]) )
+        else:
+          schedule.append( get_blk( x ) )
+    except KeyError:
+      return None
+
+    top._cache.sched_restored = True
+    return schedule
+
+  @staticmethod
+  def record_schedule( top ):
+    """ Serialize the intra-cycle schedule and write the cache entry. """
+
+    if top._cache.path is None or not hasattr( top._cache, 'blk_uid' ):
+      return
+
+    try:
+      sched_key = SimCachePass.get_schedule_key( top )
+    except KeyError:
+      return
+
+    blk_uid = dict( top._cache.blk_uid )
+    for blk, wrapped in getattr( top._dag, 'blk_greenlet_mapping', {} ).items():
+      blk_uid[ wrapped ] = blk_uid[ blk ]
+
+    schedule = []
+    for x in top._sched.update_schedule:
+      if x in top._sched.scc_blocks:
+        schedule.append( ('scc', [ blk_uid[y] for y in top._sched.scc_blocks[x] ],
+                                  top._sched.scc_srcs[x]) )
+      else:
+        schedule.append( blk_uid[x] )
+
+    # Add the schedule to the entry of the design, which keeps the
+    # schedules of other sets of blocks, e.g. with and without pruning
+    if top._cache.dag_restored:
+      entry = dict( top._cache.entry )
+    else:
+      entry = dict( top._cache.dag )
+      entry['key'] = top._cache.key
+      entry['schedules'] = {}
+    entry['schedules'] = dict( entry['schedules'] )
+    entry['schedules'][ sched_key ] = schedule
+
+    # Write to a temporary file first so that concurrent processes never
+    # observe a partially written entry
+    path = top._cache.path
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+      os.makedirs( top._cache.cache_dir, exist_ok=True )
+      write_cache_entry( tmp_path, entry )
+      os.replace( tmp_path, path )
+    except OSError:
+      pass
+
+#-------------------------------------------------------------------------
+# read_cache_entry/write_cache_entry
+#-------------------------------------------------------------------------
+
+def write_cache_entry( path, entry ):
+  payload = pickle.dumps( entry, protocol=pickle.HIGHEST_PROTOCOL )
+  header  = _CACHE_HEADER.pack( _CACHE_MAGIC, CACHE_FORMAT_VERSION,
+                                hashlib.sha256( payload ).digest() )
+  with open( path, 'wb' ) as f:
+    f.write( header )
+    f.write( payload )
+
+def read_cache_entry( path ):
+  """ Return the entry stored in path. Return None, i.e. a cache miss, if
+  the file is missing, written in another format, truncated or
+  corrupted. We only unpickle the payload if it matches the digest in
+  the header. """
+  try:
+    with open( path, 'rb' ) as f:
+      blob = f.read()
+  except OSError:
+    return None
+
+  if len(blob) < _CACHE_HEADER.size:
+    return None
+  magic, version, digest = _CACHE_HEADER.unpack_from( blob )
+  payload = blob[ _CACHE_HEADER.size: ]
+  if magic != _CACHE_MAGIC or version != CACHE_FORMAT_VERSION or \
+     hashlib.sha256( payload ).digest() != digest:
+    return None
+
+  try:
+    entry = pickle.loads( payload )
+  except Exception:
+    return None
+  return entry if isinstance( entry, dict ) else None
+
+#-------------------------------------------------------------------------
+# compute_cache_key
+#-------------------------------------------------------------------------
+
+_class_srcs = {}
+_pass_srcs  = None
+
+def _get_class_src( cls ):
+  try:
+    return _class_srcs[ cls ]
+  except KeyError:
+    try:
+      src = inspect.getsource( cls )
+    except (OSError, TypeError):
+      src = None
+    _class_srcs[ cls ] = src
+    return src
+
+def _get_pass_srcs():
+  global _pass_srcs
+  if _pass_srcs is None:
+    h = hashlib.sha256()
+    dirname = os.path.dirname( os.path.abspath( __file__ ) )
+    for filename in _cached_pass_files:
+      with open( os.path.join( dirname, filename ), 'rb' ) as f:
+        h.update( f.read() )
+    _pass_srcs = h.digest()
+  return _pass_srcs
+
+def compute_cache_key( top ):
+  """ Return the key of the elaborated model top. Return None if the
+  model cannot be cached, e.g. a component is constructed with a lambda
+  whose repr contains the object address. """
+
+  h = hashlib.sha256()
+  h.update( f"{CACHE_FORMAT_VERSION} {sys.version}".encode() )
+  h.update( _get_pass_srcs() )
+
+  classes = set()
+  types   = set()
+  params  = []
+
+  for obj in top._dsl.all_named_objects:
+    if isinstance( obj, (Component, Interface) ):
+      classes.add( obj.__class__ )
+      params.append( f"{obj!r} {obj.__class__.__qualname__} {obj._dsl.args!r} "
+                     f"{sorted( obj._dsl.kwargs.items() )!r}" )
+    elif isinstance( obj, Signal ):
+      types.add( obj._dsl.Type )
+
+  params.sort()
+
+  for x in params:
+    if " at 0x" in x:
+      return None
+    h.update( x.encode() )
+
+  for cls in sorted( { y for x in classes for y in x.__mro__ if y is not object },
+                     key=lambda x: (x.__module__, x.__qualname__) ):
+    src = _get_class_src( cls )
+    if src is None:
+      return None
+    h.update( f"{cls.__module__}.{cls.__qualname__}".encode() )
+    h.update( src.encode() )
+
+  # The same bitstruct name might refer to different fields
+  type_srcs = []
+  for T in types:
+    if is_bitstruct_class( T ):
+      type_srcs.append( f"{T.__qualname__} {T.__bitstruct_fields__!r}" )
+    else:
+      type_srcs.append( T.__name__ )
+
+  for x in sorted( type_srcs ):
+    h.update( x.encode() )
+
+  return h.hexdigest()
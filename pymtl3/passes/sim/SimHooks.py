@@ -0,0 +1,59 @@
+"""
+========================================================================
+SimHooks.py
+========================================================================
+Hooks that passes register on top to finish their work once
+PrepareSimPass has created the simulation. A pass that needs the actual
+signal values, e.g. to bind a waveform function to them, registers a
+lock-in hook. A pass that wraps or replaces the simulation APIs
+registers a sim API hook. PrepareSimPass calls each kind of hooks in
+ascending order of their priorities.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+from pymtl3.dsl.MetadataKey import MetadataKey
+
+# Priorities of the lock-in hooks. The constants are folded into the
+# blocks before anything captures them, and the blocks are profiled
+# before the event-driven update function captures them.
+DEAD_LOGIC_PRIORITY = 0
+PROFILE_PRIORITY    = 10
+SCHEDULE_PRIORITY   = 20
+CHECKPOINT_PRIORITY = 30
+TRACING_PRIORITY    = 40
+
+# Priorities of the sim API hooks. Dormancy wraps sim_reset before
+# fast-forward replaces sim_run.
+DORMANCY_PRIORITY     = 0
+FAST_FORWARD_PRIORITY = 10
+
+class SimHooks:
+
+  #: The hooks that lock_in_simulation calls after all signals have
+  #: become actual values. It maps the name of a hook to a
+  #: ( priority, func ) pair so that applying a pass again replaces its
+  #: hook.
+  #:
+  #: Type: ``dict``; input
+  lock_in_hooks = MetadataKey(dict)
+
+  #: The hooks that PrepareSimPass calls after creating sim_tick,
+  #: sim_reset and sim_run, in the same format as lock_in_hooks.
+  #:
+  #: Type: ``dict``; input
+  sim_api_hooks = MetadataKey(dict)
+
+def add_hook( top, key, name, priority, func ):
+  if not top.has_metadata( key ):
+    top.set_metadata( key, {} )
+  top.get_metadata( key )[ name ] = ( priority, func )
+
+def has_hook( top, key, name ):
+  return top.has_metadata( key ) and name in top.get_metadata( key )
+
+def call_hooks( top, key ):
+  if not top.has_metadata( key ):
+    return
+  for _, func in sorted( top.get_metadata( key ).values(), key=lambda x: x[0] ):
+    func()
@@ -72,7 +72,32 @@ class SimpleSchedulePass( BasePass ):
 
     if not hasattr( top, "_sched" ):
       raise Exception( "Please create top._sched pass metadata namespace first!" )
-    top._sched.schedule_ff = list( top.get_all_update_ff().copy() )
+    rates  = top.get_all_update_ff_rates()
+    pruned = getattr( top._dag, 'pruned_upblks', () )
+    top._sched.schedule_ff = [ x for x in top.get_all_update_ff()
+                               if x not in rates and x not in pruned ]
+    self.schedule_ff_phases( top )
+
+  @staticmethod
+  def schedule_ff_phases( top, filt=lambda x: True ):
+    """ Generate a tick function for each phase of each period of the
+    multi-rate update_ff blocks that satisfy filt, so the blocks that are
+    not due are never called. schedule_ff_phases[ period ][ phase ]
+    executes the blocks of this period and phase. """
+
+    # ConeOfInfluencePass may have pruned some update_ff blocks
+    pruned = getattr( top._dag, 'pruned_upblks', () )
+
+    blocks = {}
+    for blk, (period, phase) in top.get_all_update_ff_rates().items():
+      if filt( blk ) and blk not in pruned:
+        blocks.setdefault( period, [ [] for _ in range(period) ] )[ phase ].append( blk )
+
+    top._sched.schedule_ff_phases = {
+      period: [ gen_ff_phase_function( period, i, sorted( x, key=lambda b: b.__name__ ) )
+                for i, x in enumerate( phases ) ]
+      for period, phases in sorted( blocks.items() )
+    }
 
   def schedule_posedge_flip( self, top ):
 
@@ -146,6 +171,14 @@ class SimpleSchedulePass( BasePass ):
       linecache.cache['ff_flips'] = (1, None, lines, 'ff_flips')
       top._sched.schedule_posedge_flip = [ l['compile_double_buffer']( top ) ]
 
+def gen_ff_phase_function( period, phase, blocks ):
+  name = f"ff_period{period}_phase{phase}"
+  src  = f"def {name}():\n  " + ( "; ".join( [ f"_{i}()" for i in range(len(blocks)) ] ) or "pass" )
+  _globals = { f"_{i}": x for i, x in enumerate( blocks ) }
+  _locals  = {}
+  custom_exec( compile( src, filename=name, mode="exec" ), _globals, _locals )
+  return _locals[ name ]
+
 def dump_dag( top, V, E ):
   from graphviz import Digraph
 
@@ -0,0 +1,156 @@
+#=========================================================================
+# CheckpointPass_test.py
+#=========================================================================
+#
+# Author : Batten Research Group
+# Date   : Oct 17, 2026
+
+import pytest
+
+from pymtl3.datatypes import Bits8, Bits32, bitstruct
+from pymtl3.dsl import *
+from pymtl3.passes.PassGroups import DefaultPassGroup, EventDrivenPassGroup
+from pymtl3.stdlib.queues import NormalQueueCL
+from pymtl3.stdlib.test_utils import TestSinkCL, TestSrcCL
+
+from ..CheckpointPass import CheckpointPass
+
+
+@bitstruct
+class Pair:
+  a: Bits8
+  b: Bits8
+
+class Plain:
+  def __init__( s ):
+    s.data = bytearray( 4 )
+    s.ptr  = 0
+
+  def write( s, x ):
+    s.data[ s.ptr ] = x
+    s.ptr = (s.ptr + 1) % 4
+
+class RTLTop( Component ):
+  def construct( s ):
+    s.in_ = InPort(32)
+    s.out = OutPort(32)
+    s.pr  = OutPort( Pair )
+    s.acc = Wire(32)
+
+    @update_ff
+    def up_acc():
+      if s.reset:
+        s.acc <<= 0
+      else:
+        s.acc <<= s.acc + s.in_
+
+    @update_ff
+    def up_pr():
+      s.pr <<= Pair( s.acc[0:8], s.pr.a )
+
+    @update
+    def up_out():
+      s.out @= s.acc + 1
+
+class CLTop( Component ):
+  def construct( s ):
+    msgs = [ Bits8(i) for i in range(20) ]
+    s.src  = TestSrcCL( Bits8, msgs, interval_delay=1 )
+    s.q    = NormalQueueCL( 3 )
+    s.sink = TestSinkCL( Bits8, msgs, interval_delay=2 )
+    s.mem  = Plain()
+
+    s.src.send //= s.q.enq
+
+    @update_once
+    def up_deq():
+      if s.q.deq.rdy() and s.sink.recv.rdy():
+        msg = s.q.deq()
+        s.mem.write( int(msg) )
+        s.sink.recv( msg )
+
+  def done( s ):
+    return s.src.done() and s.sink.done()
+
+def _rtl_trace( A, n ):
+  trace = []
+  for i in range(n):
+    A.in_ @= i * 3
+    A.sim_tick()
+    trace.append( (int(A.out), int(A.pr.a), int(A.pr.b)) )
+  return trace
+
+def _cl_trace( A, n ):
+  trace = []
+  for i in range(n):
+    A.sim_tick()
+    trace.append( (A.sink.idx, len(A.q.queue), bytes(A.mem.data), A.sim_cycle_count()) )
+  return trace
+
+@pytest.mark.parametrize( "PassGroup", [ DefaultPassGroup, EventDrivenPassGroup ] )
+def test_rtl_save_restore( PassGroup ):
+  A = RTLTop()
+  A.elaborate()
+  A.apply( PassGroup( print_line_trace=False, checkpoint=True ) )
+  A.sim_reset()
+  _rtl_trace( A, 5 )
+
+  blob = A.sim_save()
+  ref  = _rtl_trace( A, 8 )
+
+  A.sim_restore( blob )
+  assert _rtl_trace( A, 8 ) == ref
+
+  # Restore into a fresh instance
+  B = RTLTop()
+  B.elaborate()
+  B.apply( PassGroup( print_line_trace=False, checkpoint=True ) )
+  B.sim_reset()
+  B.sim_restore( blob )
+  assert _rtl_trace( B, 8 ) == ref
+
+def test_cl_save_restore( tmpdir ):
+  A = CLTop()
+  A.elaborate()
+  A.apply( DefaultPassGroup( print_line_trace=False ) )
+  # Also works after the simulation is locked in
+  A.apply( CheckpointPass() )
+  A.sim_reset()
+  _cl_trace( A, 10 )
+
+  path = str( tmpdir.join( "ckpt" ) )
+  A.sim_save( path )
+  ref = _cl_trace( A, 70 )
+  assert A.done()
+
+  A.sim_restore( path )
+  assert not A.done()
+  assert _cl_trace( A, 70 ) == ref
+  assert A.done()
+
+def test_in_memory_snapshot():
+  A = CLTop()
+  A.elaborate()
+  A.apply( DefaultPassGroup( print_line_trace=False, checkpoint=True ) )
+  A.sim_reset()
+  _cl_trace( A, 4 )
+
+  state = A._sim.checkpoint.capture()
+  ref = _cl_trace( A, 12 )
+  for i in range(2):
+    A._sim.checkpoint.restore( state )
+    assert _cl_trace( A, 12 ) == ref
+
+def test_restore_different_design():
+  A = RTLTop()
+  A.elaborate()
+  A.apply( DefaultPassGroup( print_line_trace=False, checkpoint=True ) )
+  A.sim_reset()
+
+  B = CLTop()
+  B.elaborate()
+  B.apply( DefaultPassGroup( print_line_trace=False, checkpoint=True ) )
+  B.sim_reset()
+
+  with pytest.raises( ValueError ):
+    B.sim_restore( A.sim_save() )
@@ -0,0 +1,189 @@
+#=========================================================================
+# ConeOfInfluencePass_test.py
+#=========================================================================
+#
+# Author : Batten Research Group
+# Date   : Oct 17, 2026
+
+import pytest
+
+from pymtl3.datatypes import Bits8, Bits16
+from pymtl3.dsl import *
+from pymtl3.passes.PassGroups import DefaultPassGroup
+from pymtl3.stdlib.test_utils import run_test_vector_sim
+
+from ..ConeOfInfluencePass import ConeOfInfluencePass, format_coi_report
+from ..GenDAGPass import GenDAGPass
+
+
+class Incr( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits8 )
+    s.out = OutPort( Bits8 )
+
+    @update
+    def up_incr():
+      s.out @= s.in_ + 1
+
+class Reg( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits8 )
+    s.out = OutPort( Bits8 )
+
+    @update_ff
+    def up_reg():
+      s.out <<= s.in_
+
+class TwoPaths( Component ):
+  def construct( s ):
+    s.in_a  = InPort( Bits8 )
+    s.in_b  = InPort( Bits8 )
+    s.out_a = OutPort( Bits8 )
+    s.out_b = OutPort( Bits8 )
+    s.out_c = OutPort( Bits16 )
+
+    # in_a -> incr -> reg -> out_a
+    s.incr_a = Incr()
+    s.reg_a  = Reg()
+    s.incr_a.in_ //= s.in_a
+    s.reg_a.in_  //= s.incr_a.out
+    s.out_a      //= s.reg_a.out
+
+    # in_b -> reg -> incr -> out_b
+    s.reg_b  = Reg()
+    s.incr_b = Incr()
+    s.reg_b.in_  //= s.in_b
+    s.incr_b.in_ //= s.reg_b.out
+    s.out_b      //= s.incr_b.out
+
+    # out_c[0:8] only depends on out_a
+    @update
+    def up_c_lo():
+      s.out_c[0:8] @= s.out_a
+
+    @update
+    def up_c_hi():
+      s.out_c[8:16] @= s.out_b
+
+def blk( c, name ):
+  return [ x for x in c.get_update_blocks() if x.__name__ == name ][0]
+
+def run( top, observed, **kwargs ):
+  top.elaborate()
+  top.apply( DefaultPassGroup( print_line_trace=False, observed=observed, **kwargs ) )
+  top.sim_reset()
+  return top
+
+@pytest.mark.parametrize( 'alias_nets', [ False, True ] )
+def test_prune_unobserved_path( alias_nets ):
+  top = TwoPaths()
+  top.elaborate()
+  run( top, [ top.out_a ], alias_nets=alias_nets )
+
+  kept = { x.__name__ for x in top._coi.kept if x not in top._dag.genblks }
+  assert kept == { 'up_incr', 'up_reg' }
+  assert blk( top.reg_b, 'up_reg' ) not in top._sched.schedule_ff
+  assert blk( top.incr_b, 'up_incr' ) not in top._sched.update_schedule
+  assert blk( top.reg_a, 'up_reg' ) in top._sched.schedule_ff
+
+  for i in range(5):
+    top.in_a @= i
+    top.in_b @= i
+    top.sim_tick()
+    assert top.out_a == i + 1
+    # The other path is not simulated
+    assert top.out_b == 0
+
+def test_walk_back_through_slices():
+  top = TwoPaths()
+  top.elaborate()
+  run( top, [ top.out_c[0:4] ] )
+
+  kept = { x for x in top._coi.kept if x not in top._dag.genblks }
+  assert kept == { blk( top, 'up_c_lo' ), blk( top.incr_a, 'up_incr' ), blk( top.reg_a, 'up_reg' ) }
+
+  top.in_a @= 3
+  top.sim_tick()
+  top.sim_eval_combinational()
+  assert top.out_c == 4
+
+  report = format_coi_report( top )
+  assert "pruned blocks per component" in report
+  assert f"{top.reg_b!r}: 1/1" in report
+
+def test_keep_all_observed():
+  top = TwoPaths()
+  top.elaborate()
+  run( top, [ top.out_c ] )
+  # Only the net blocks of clk and reset which nobody reads are pruned
+  assert top._coi.pruned <= top._dag.genblks
+
+  top.in_a @= 1
+  top.in_b @= 2
+  top.sim_tick()
+  top.sim_eval_combinational()
+  assert top.out_c == 0x0302
+
+class Checker( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits8 )
+    s.seen = []
+
+    @update
+    def up_check():
+      s.seen.append( int(s.in_) )
+
+class WithChecker( TwoPaths ):
+  def construct( s ):
+    super().construct()
+    s.checker = Checker()
+    s.checker.in_ //= s.out_b
+
+def test_keep_blocks_without_writes():
+  top = WithChecker()
+  top.elaborate()
+  run( top, [ top.out_a ] )
+
+  # The checker has invisible effects so the b path is kept
+  assert blk( top.checker, 'up_check' ) in top._coi.roots
+  assert blk( top.reg_b, 'up_reg' ) in top._coi.kept
+  assert blk( top.incr_b, 'up_incr' ) in top._coi.kept
+
+  top.in_b @= 5
+  top.sim_tick()
+  top.sim_tick()
+  assert top.checker.seen[-1] == 6
+
+def test_no_observed():
+  top = TwoPaths()
+  top.elaborate()
+  top.apply( GenDAGPass() )
+  top.apply( ConeOfInfluencePass() )
+  assert not hasattr( top, "_coi" )
+
+def test_run_test_vector_sim():
+  run_test_vector_sim( TwoPaths(), [
+    ( 'in_a in_b out_a* out_b*' ),
+    [ 1, 1, 1, '?' ],
+    [ 2, 1, 2, '?' ],
+    [ 3, 1, 3, '?' ],
+  ], line_trace=False, prune_unobserved=True )
+
+def test_sim_cache( tmpdir ):
+  # A schedule pruned for some observed signals is never reused by a
+  # build that observes other signals
+  for observed in [ [ 'out_a' ], None, [ 'out_b' ], None ]:
+    top = TwoPaths()
+    top.elaborate()
+    top.apply( DefaultPassGroup( print_line_trace=False, cache_dir=str(tmpdir),
+                                 observed=observed and [ getattr( top, x ) for x in observed ] ) )
+    top.sim_reset()
+
+    for i in range(5):
+      top.in_a @= i
+      top.in_b @= i
+      top.sim_tick()
+      if observed != [ 'out_b' ]:
+        assert top.out_a == i + 1
+      if observed != [ 'out_a' ]:
+        assert top.out_b == i + 1
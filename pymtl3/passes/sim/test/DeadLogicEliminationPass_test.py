@@ -0,0 +1,151 @@
+#=========================================================================
+# DeadLogicEliminationPass_test.py
+#=========================================================================
+#
+# Author : Batten Research Group
+# Date   : Oct 17, 2026
+
+from pymtl3.datatypes import Bits8, Bits16, zext
+from pymtl3.dsl import *
+from pymtl3.passes.PassGroups import DefaultPassGroup
+
+from ..DeadLogicEliminationPass import format_dead_logic_report
+
+
+class Config( Component ):
+  def construct( s, value ):
+    s.cfg = OutPort( Bits8 )
+    s.cfg //= value
+
+class Datapath( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits8 )
+    s.out = OutPort( Bits16 )
+
+    s.config = Config( 5 )
+    s.k      = Wire( Bits8 )
+    s.w      = Wire( Bits8 )
+    s.unused = Wire( Bits8 )
+    s.dead_q = Wire( Bits8 )
+
+    # Half of w is constant
+    s.w[0:4] //= 3
+    s.w[4:8] //= s.in_[0:4]
+
+    N = 7
+
+    @update
+    def up_k():
+      s.k @= s.config.cfg * 2
+
+    @update
+    def up_out():
+      s.out @= zext( s.in_, 16 ) + zext( s.k, 16 ) + zext( s.w, 16 ) + N
+
+    @update
+    def up_unused():
+      s.unused @= s.in_ + 1
+
+    @update_ff
+    def up_dead_q():
+      s.dead_q <<= s.unused
+
+def blk( c, name ):
+  return [ x for x in c.get_update_blocks() if x.__name__ == name ][0]
+
+def golden( x ):
+  return x + 10 + ( ( (x & 0xf) << 4 ) | 3 ) + 7
+
+def test_dead_and_constant_blocks():
+  top = Datapath()
+  top.elaborate()
+  top.apply( DefaultPassGroup( print_line_trace=False, dead_logic=True ) )
+  top.sim_reset()
+
+  # The net blocks of clk and reset are also dead
+  d = top._dead_logic
+  assert { x for x in d.dead if x not in top._dag.genblks } == \
+         { blk( top, 'up_unused' ), blk( top, 'up_dead_q' ) }
+  assert blk( top, 'up_dead_q' ) not in top._sched.schedule_ff
+
+  # up_k only reads the constant, and so does the net block of w[0:4]
+  assert blk( top, 'up_k' ) in d.const_blocks
+  assert any( x in top._dag.genblks for x in d.const_blocks )
+  assert blk( top, 'up_k' ) not in top._sched.update_schedule
+  assert top.k == 10
+
+  # up_out is recompiled with s.k and N folded
+  assert blk( top, 'up_out' ) in d.folded
+  assert d.folded[ blk( top, 'up_out' ) ] in top._sched.update_schedule
+  assert blk( top, 'up_out' ) not in top._sched.update_schedule
+
+  for x in [ 0, 1, 17, 200 ]:
+    top.in_ @= x
+    top.sim_eval_combinational()
+    assert top.out == golden( x )
+    top.sim_tick()
+
+  # The dead logic is not simulated
+  assert top.unused == 0
+
+  report = format_dead_logic_report( top )
+  assert "dead blocks removed      : 4 (2 update blocks, 2 net blocks)" in report
+  assert "up_unused" in report
+
+def test_same_behavior_without_elimination():
+  ref = Datapath()
+  ref.elaborate()
+  ref.apply( DefaultPassGroup( print_line_trace=False ) )
+  ref.sim_reset()
+
+  dut = Datapath()
+  dut.elaborate()
+  dut.apply( DefaultPassGroup( print_line_trace=False, dead_logic=True ) )
+  dut.sim_reset()
+
+  for x in range( 0, 256, 13 ):
+    ref.in_ @= x
+    dut.in_ @= x
+    ref.sim_tick()
+    dut.sim_tick()
+    assert ref.out == dut.out
+
+class Counter( Component ):
+  def construct( s ):
+    s.out = OutPort( Bits8 )
+    s.count = 0
+
+    @update
+    def up_out():
+      s.out @= s.count
+
+    @update_ff
+    def up_count():
+      s.count += 1
+
+def test_python_state_is_not_constant():
+  top = Counter()
+  top.elaborate()
+  top.apply( DefaultPassGroup( print_line_trace=False, dead_logic=True ) )
+  top.sim_reset()
+
+  assert not top._dead_logic.const_blocks
+  top.sim_tick()
+  top.sim_eval_combinational()
+  assert top.out == top.count
+
+def test_sim_cache( tmpdir ):
+  # The schedule without dead logic is never reused by a full build
+  for dead_logic in [ True, False, True, False ]:
+    top = Datapath()
+    top.elaborate()
+    top.apply( DefaultPassGroup( print_line_trace=False, dead_logic=dead_logic,
+                                 cache_dir=str(tmpdir) ) )
+    top.sim_reset()
+
+    for x in [ 0, 1, 17, 200 ]:
+      top.in_ @= x
+      top.sim_eval_combinational()
+      assert top.out == golden( x )
+      assert top.unused == ( 0 if dead_logic else (x + 1) & 0xff )
+      top.sim_tick()
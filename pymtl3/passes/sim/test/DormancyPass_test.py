@@ -0,0 +1,197 @@
+#=========================================================================
+# DormancyPass_test.py
+#=========================================================================
+#
+# Author : Batten Research Group
+# Date   : Oct 17, 2026
+
+from collections import deque
+
+from pymtl3.datatypes import Bits32
+from pymtl3.dsl import *
+from pymtl3.passes.autotick.OpenLoopCLPass import OpenLoopCLPass
+from pymtl3.passes.PassGroups import DefaultPassGroup
+from pymtl3.stdlib.queues.cl_queues import NormalQueueCL
+from pymtl3.stdlib.test_utils import TestSinkCL, TestSrcCL
+
+from ..DormancyPass import DormancyPass, TimingWheel
+from ..GenDAGPass import GenDAGPass
+
+
+def test_timing_wheel():
+  w = TimingWheel( 4 )
+  w.schedule( 'a', 2 )
+  w.schedule( 'b', 3 )
+  w.schedule( 'c', 10 )
+  assert w.advance( 1 ) == []
+  assert w.advance( 2 ) == [ (2, 'a') ]
+  assert w.advance( 3 ) == [ (3, 'b') ]
+  # 'c' shares the slot with cycle 6 but is not due
+  assert w.advance( 6 ) == []
+  assert w.size == 1
+  # Jump over more than one round
+  w.schedule( 'd', 8 )
+  assert sorted( w.advance( 20 ) ) == [ (8, 'd'), (10, 'c') ]
+  assert w.size == 0
+
+class Ticker( Dormant, Component ):
+  def construct( s, period ):
+    s.cycles = []
+
+    @update_once
+    def up_tick():
+      s.cycles.append( s.sim_cycle() )
+      s.sleep( up_tick, period )
+
+    s.wake_on( up_tick, s.poke )
+
+  @method_port
+  def poke( s ):
+    pass
+
+class TickerTop( Component ):
+  def construct( s ):
+    s.t0 = Ticker( 3 )
+    s.t1 = Ticker( 10 )
+    s.t0.sim_cycle = s.t1.sim_cycle = lambda: s.sim_cycle_count()
+
+def test_timed_sleep():
+  top = TickerTop()
+  top.elaborate()
+  top.set_metadata( DormancyPass.wheel_size, 4 )
+  top.apply( DefaultPassGroup( print_line_trace=False, dormancy=True ) )
+  top.sim_reset()
+  top.t0.cycles.clear()
+  top.t1.cycles.clear()
+
+  start = top.sim_cycle_count()
+  top.sim_run( 30 )
+  assert [ x - start for x in top.t0.cycles ] == list( range( 1, 31, 3 ) )
+  assert [ x - start for x in top.t1.cycles ] == [ 1, 11, 21 ]
+
+  # sim_reset wakes up all blocks
+  top.sim_reset()
+  top.sim_tick()
+  assert top.t1.cycles[-1] == top.sim_cycle_count()
+
+class CountedQueue( Dormant, Component ):
+  def construct( s, num_entries=1 ):
+    s.queue = deque( maxlen=num_entries )
+    s.enq_rdy = False
+    s.deq_rdy = False
+    s.nexec = 0
+
+    @update_once
+    def up_pulse():
+      s.nexec += 1
+      s.enq_rdy = len( s.queue ) < s.queue.maxlen
+      s.deq_rdy = len( s.queue ) > 0
+      s.sleep( up_pulse )
+
+    s.wake_on( up_pulse, s.enq, s.deq )
+
+    s.add_constraints(
+      U( up_pulse ) < M( s.enq.rdy ),
+      U( up_pulse ) < M( s.deq.rdy ),
+    )
+
+  @non_blocking( lambda s: s.enq_rdy )
+  def enq( s, msg ):
+    s.queue.appendleft( msg )
+
+  @non_blocking( lambda s: s.deq_rdy )
+  def deq( s ):
+    return s.queue.pop()
+
+class Pump( Component ):
+  def construct( s ):
+    s.deq = CallerIfcCL()
+    s.enq = CallerIfcCL()
+
+    @update_once
+    def up_pump():
+      if s.deq.rdy() and s.enq.rdy():
+        s.enq( s.deq() )
+
+class QueueChain( Component ):
+  def construct( s, nqueues, msgs, Queue=CountedQueue ):
+    s.src   = TestSrcCL( Bits32, msgs, 0, 5 )
+    s.qs    = [ Queue( 2 ) for _ in range(nqueues) ]
+    s.pumps = [ Pump() for _ in range(nqueues) ]
+    s.sink  = TestSinkCL( Bits32, msgs, 0, 3 )
+
+    s.src.send //= s.qs[0].enq
+    for i in range(nqueues):
+      s.pumps[i].deq //= s.qs[i].deq
+      if i < nqueues - 1:
+        s.pumps[i].enq //= s.qs[i+1].enq
+    s.pumps[-1].enq //= s.sink.recv
+
+  def done( s ):
+    return s.src.done() and s.sink.done()
+
+def test_wake_on_method():
+  msgs = [ Bits32(x) for x in range(10) ]
+  top = QueueChain( 4, msgs )
+  top.apply( DefaultPassGroup( print_line_trace=False, dormancy=True ) )
+  top.sim_reset()
+  stats = top.sim_run_until( top.done, 1000 )
+  assert stats.done
+
+  # Each queue only wakes up after reset and after every enq and deq
+  ncycles = top.sim_cycle_count()
+  for q in top.qs:
+    assert q.nexec <= 2 * len(msgs) + 2
+    assert q.nexec < ncycles // 2
+
+  # The sleeping blocks are skipped in generated functions
+  assert top._dormancy.groups
+
+def test_normal_queue():
+  msgs = [ Bits32(x) for x in range(10) ]
+  top = QueueChain( 4, msgs, NormalQueueCL )
+  top.apply( DefaultPassGroup( print_line_trace=False, dormancy=True ) )
+  top.sim_reset()
+  stats = top.sim_run_until( top.done, 1000 )
+  assert stats.done
+
+  # The idle queues sleep until the next enq or deq
+  top.sim_run( 2 )
+  d = top._dormancy
+  for q in top.qs:
+    blk = [ x for x in q.get_update_blocks() if x.__name__ == 'up_pulse' ][0]
+    assert not d.awake[ d.block_id[ blk ] ]
+
+class OpenLoopQueue( Component ):
+  def construct( s ):
+    s.q = CountedQueue( 2 )
+    s.enq = CalleeIfcCL()
+    s.deq = CalleeIfcCL()
+    s.enq //= s.q.enq
+    s.deq //= s.q.deq
+
+def test_open_loop():
+  top = OpenLoopQueue()
+  top.elaborate()
+  top.apply( GenDAGPass() )
+  top.apply( DormancyPass() )
+  top.apply( OpenLoopCLPass( print_line_trace=False ) )
+  top.sim_reset()
+
+  assert top.enq.rdy()
+  top.enq( 1 )
+  assert top.enq.rdy()
+  top.enq( 2 )
+  assert not top.enq.rdy()
+  assert top.deq.rdy()
+  assert top.deq() == 1
+  assert top.deq.rdy()
+  assert top.deq() == 2
+  assert not top.deq.rdy()
+  assert top.enq.rdy()
+
+  # up_pulse only runs again after a method call
+  nexec = top.q.nexec
+  for i in range(10):
+    assert top.enq.rdy()
+  assert top.q.nexec == nexec
@@ -315,3 +315,91 @@ def test_update_once():
     print(e)
     return
   raise Exception("Should've thrown UpblkCyclicError")
+
+def test_scc_worklist_only_reruns_changed():
+
+  class Counter:
+    n = 0
+  cnt = Counter()
+
+  class Top(Component):
+
+    def construct( s ):
+      s.in_ = InPort(32)
+      s.out = OutPort(32)
+      s.a = Wire(32)
+      s.b = Wire(32)
+      s.c = Wire(32)
+
+      @update
+      def up1():
+        s.a @= s.in_ | s.c
+
+      @update
+      def up2():
+        s.b @= s.a & 0xf0
+
+      @update
+      def up3():
+        cnt.n += 1
+        s.c @= s.b
+
+      @update
+      def up4():
+        s.out @= s.c
+
+  A = Top()
+  A.elaborate()
+  A.apply( GenDAGPass() )
+  A.apply( DynamicSchedulePass() )
+  A.apply( PrepareSimPass( print_line_trace=False ) )
+  A.sim_reset()
+
+  assert len(A._sched.scc_blocks) == 1
+
+  A.in_ @= 0x35
+  cnt.n = 0
+  A.sim_eval_combinational()
+  assert A.out == 0x30
+  # Rerunning the whole SCC would execute up3 three times
+  assert cnt.n <= 2
+
+def test_scc_bitstruct_field():
+
+  @bitstruct
+  class Pair:
+    a: Bits8
+    b: Bits8
+
+  class Top(Component):
+
+    def construct( s ):
+      s.in_ = InPort(8)
+      s.out = OutPort(8)
+      s.p = Wire( Pair )
+
+      @update
+      def up1():
+        s.p.a @= s.in_ | s.p.b
+
+      @update
+      def up2():
+        s.p.b @= s.p.a & 0xf0
+
+      @update
+      def up3():
+        s.out @= s.p.b
+
+  A = Top()
+  A.elaborate()
+  A.apply( GenDAGPass() )
+  A.apply( DynamicSchedulePass() )
+  A.apply( PrepareSimPass( print_line_trace=False ) )
+  A.sim_reset()
+
+  A.in_ @= 0x35
+  A.sim_eval_combinational()
+  assert A.out == 0x30
+  A.in_ @= 0x4f
+  A.sim_eval_combinational()
+  assert A.out == 0x70
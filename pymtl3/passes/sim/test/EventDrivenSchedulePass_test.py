@@ -0,0 +1,185 @@
+#=========================================================================
+# EventDrivenSchedulePass_test.py
+#=========================================================================
+#
+# Author : Batten Research Group
+# Date   : Oct 17, 2026
+
+from pymtl3.datatypes import Bits8, Bits32, bitstruct, zext
+from pymtl3.dsl import *
+from pymtl3.passes.PassGroups import DefaultPassGroup, EventDrivenPassGroup
+from pymtl3.stdlib.test_utils import TestSinkCL, TestSrcCL
+
+from ..DynamicSchedulePass import DynamicSchedulePass
+from ..EventDrivenSchedulePass import EventDrivenSchedulePass
+from ..GenDAGPass import GenDAGPass
+from ..PrepareSimPass import PrepareSimPass
+
+
+def _run( cls, sched_pass, inputs ):
+  A = cls()
+  A.elaborate()
+  A.apply( GenDAGPass() )
+  A.apply( sched_pass )
+  A.apply( PrepareSimPass( print_line_trace=False ) )
+  A.sim_reset()
+
+  trace = []
+  for x in inputs:
+    A.in_ @= x
+    A.sim_eval_combinational()
+    trace.append( int( A.out ) )
+    A.sim_tick()
+  return A, trace
+
+def _compare( cls, inputs ):
+  _, ref = _run( cls, DynamicSchedulePass(), inputs )
+  A, ed  = _run( cls, EventDrivenSchedulePass(), inputs )
+  assert ref == ed
+  return A
+
+def test_skip_idle_blocks():
+
+  class Counter:
+    n = 0
+  cnt = Counter()
+
+  class Top( Component ):
+    def construct( s ):
+      s.in_ = InPort(32)
+      s.out = OutPort(32)
+      s.w   = Wire(32)
+      s.reg = Wire(32)
+
+      @update
+      def up_a():
+        cnt.n += 1
+        s.w @= s.in_ + 1
+
+      @update
+      def up_b():
+        s.out @= s.w + s.reg
+
+      @update_ff
+      def up_reg():
+        s.reg <<= s.reg
+
+  A = _compare( Top, [1, 1, 1, 1, 2, 2, 3] )
+  assert A._sched.event_driven.num_sensitive == 2
+
+  # Count the executions of the second model only
+  cnt.n = 0
+  A.in_ @= 3
+  for i in range(10):
+    A.sim_tick()
+  assert cnt.n == 0
+
+  A.in_ @= 4
+  A.sim_tick()
+  assert cnt.n == 1
+
+def test_python_state_always_active():
+
+  class Top( Component ):
+    def construct( s ):
+      s.in_ = InPort(32)
+      s.out = OutPort(32)
+      s.count = 0
+
+      @update
+      def up():
+        s.count += 1
+        s.out @= s.in_ + s.count
+
+  A = _compare( Top, [1, 1, 1, 1] )
+  assert A._sched.event_driven.num_sensitive == 0
+
+def test_constant_attribute_is_pure():
+
+  class Top( Component ):
+    def construct( s, K=5 ):
+      s.in_ = InPort(32)
+      s.out = OutPort(32)
+      s.K   = K
+
+      @update
+      def up():
+        s.out @= s.in_ + s.K
+
+  A = _compare( Top, [1, 1, 2, 2, 3] )
+  assert A._sched.event_driven.num_sensitive == 1
+
+def test_bitstruct_and_slices():
+
+  @bitstruct
+  class Pair:
+    a: Bits8
+    b: Bits8
+
+  class Top( Component ):
+    def construct( s ):
+      s.in_ = InPort(32)
+      s.out = OutPort(32)
+      s.p   = Wire( Pair )
+      s.lo  = Wire( Bits8 )
+      s.lo //= s.in_[0:8]
+
+      @update
+      def up_p():
+        s.p.a @= s.lo
+        s.p.b @= s.in_[8:16]
+
+      @update
+      def up_out():
+        s.out @= zext( s.p.a + s.p.b, 32 )
+
+  _compare( Top, [0x0101, 0x0101, 0x0203, 0x0203, 0x0403, 0x0102] )
+
+def test_combinational_loop():
+
+  class Top( Component ):
+    def construct( s ):
+      s.in_ = InPort(32)
+      s.out = OutPort(32)
+      s.a   = Wire(32)
+      s.b   = Wire(32)
+
+      @update
+      def up1():
+        s.a @= s.in_ if s.b == 0 else s.b
+
+      @update
+      def up2():
+        s.b @= 0 if s.a == 0 else s.a - 1
+
+      @update
+      def up3():
+        s.out @= s.b
+
+  _compare( Top, [0, 0, 0, 1, 1, 0, 0] )
+
+def test_pass_group_cl():
+  # CL blocks call methods and are always executed
+
+  msgs = [ Bits8(x) for x in [1, 2, 3, 4, 5, 6] ]
+
+  class TestHarness( Component ):
+    def construct( s ):
+      s.src  = TestSrcCL( Bits8, msgs, interval_delay=1 )
+      s.sink = TestSinkCL( Bits8, msgs, interval_delay=2 )
+      s.src.send //= s.sink.recv
+
+    def done( s ):
+      return s.src.done() and s.sink.done()
+
+  for group in [ DefaultPassGroup, EventDrivenPassGroup ]:
+    th = TestHarness()
+    th.elaborate()
+    th.apply( group( print_line_trace=False ) )
+    th.sim_reset()
+
+    T = 0
+    while not th.done():
+      th.sim_tick()
+      T += 1
+      assert T < 100
@@ -0,0 +1,219 @@
+#=========================================================================
+# FastForwardPass_test.py
+#=========================================================================
+#
+# Author : Batten Research Group
+# Date   : Oct 17, 2026
+
+import pytest
+
+from pymtl3.datatypes import Bits1, Bits16, Bits32, b32
+from pymtl3.dsl import *
+from pymtl3.passes.PassGroups import DefaultPassGroup
+from pymtl3.stdlib.delays import DelayPipeDeqCL, DelayPipeSendCL
+from pymtl3.stdlib.ifcs import RecvIfcRTL, SendIfcRTL
+from pymtl3.stdlib.mem.MagicMemoryCL import MagicMemoryCL
+from pymtl3.stdlib.mem.MemMsg import MemMsgType, mk_mem_msg
+from pymtl3.stdlib.test_utils import TestSinkCL, TestSrcCL
+from pymtl3.stdlib.test_utils.test_sinks import TestSinkRTL
+from pymtl3.stdlib.test_utils.test_srcs import TestSrcRTL
+
+from ..FastForwardPass import FastForwardPass
+
+
+class Incr( Component ):
+  def construct( s ):
+    s.recv = RecvIfcRTL( Bits16 )
+    s.send = SendIfcRTL( Bits16 )
+
+    s.full = Wire( Bits1 )
+    s.buf  = Wire( Bits16 )
+
+    @update
+    def up_comb():
+      s.recv.rdy @= ~s.full
+      s.send.en  @= s.full & s.send.rdy
+      s.send.msg @= s.buf + 1
+
+    @update_ff
+    def up_ff():
+      if s.reset:
+        s.full <<= 0
+      elif s.recv.en:
+        s.full <<= 1
+        s.buf  <<= s.recv.msg
+      elif s.send.en:
+        s.full <<= 0
+
+MSGS = [ Bits16(x * 3) for x in range(8) ]
+
+# TestSrcRTL and TestSinkRTL also cover the RecvCL2SendRTL and
+# RecvRTL2SendCL adapters
+
+class RTLHarness( Component ):
+  def construct( s ):
+    s.src  = TestSrcRTL( Bits16, MSGS, initial_delay=200, interval_delay=100 )
+    s.inc  = Incr()
+    s.sink = TestSinkRTL( Bits16, [ x + 1 for x in MSGS ], interval_delay=37 )
+
+    s.src.send //= s.inc.recv
+    s.inc.send //= s.sink.recv
+
+    s.cycles = OutPort( Bits32 )
+
+    @update_ff
+    def up_cycles():
+      if s.reset:
+        s.cycles <<= 0
+      else:
+        s.cycles <<= s.cycles + 1
+
+  def done( s ):
+    return s.src.done() and s.sink.done()
+
+req_cls, resp_cls = mk_mem_msg( 8, 32, 32 )
+
+class MemHarness( Component ):
+  def construct( s, stall_prob=0 ):
+    src_msgs  = []
+    sink_msgs = []
+    for i in range(6):
+      src_msgs.append( req_cls( MemMsgType.WRITE, i, 0x1000 + 4*i, 0, b32(i*11) ) )
+      sink_msgs.append( resp_cls( MemMsgType.WRITE, i, 0, 0, 0 ) )
+    for i in range(6):
+      src_msgs.append( req_cls( MemMsgType.READ, i, 0x1000 + 4*i, 0, 0 ) )
+      sink_msgs.append( resp_cls( MemMsgType.READ, i, 0, 0, b32(i*11) ) )
+
+    s.src  = TestSrcCL( req_cls, src_msgs, 10, 3 )
+    s.mem  = MagicMemoryCL( 1, [ (req_cls, resp_cls) ], stall_prob, 150 )
+    s.sink = TestSinkCL( resp_cls, sink_msgs, 0, 20 )
+
+    s.src.send //= s.mem.ifc[0].req
+    s.mem.ifc[0].resp //= s.sink.recv
+
+  def done( s ):
+    return s.src.done() and s.sink.done()
+
+class PipeHarness( Component ):
+  def construct( s, dut_class, sink_interval ):
+    s.src  = TestSrcCL( None, MSGS, 5, 3 )
+    s.dut  = dut_class( 10 )
+    s.sink = TestSinkCL( None, MSGS, 0, sink_interval )
+
+    s.src.send //= s.dut.enq
+
+    if dut_class is DelayPipeDeqCL:
+      @update_once
+      def up_adapt():
+        if s.dut.deq.rdy() and s.sink.recv.rdy():
+          s.sink.recv( s.dut.deq() )
+    else:
+      s.dut.send //= s.sink.recv
+
+  def done( s ):
+    return s.src.done() and s.sink.done()
+
+  # up_adapt only reacts to the pipe and the sink
+  def next_event( s ):
+    return None
+
+def run( top, fast_forward ):
+  top.elaborate()
+  if fast_forward and hasattr( top, 'cycles' ):
+    top.set_metadata( FastForwardPass.cycle_counters, [ top.cycles ] )
+  top.apply( DefaultPassGroup( print_line_trace=False, fast_forward=fast_forward ) )
+  top.sim_reset()
+  stats = top.sim_run_until( top.done, 100000 )
+  assert stats.done
+  return top
+
+def test_rtl_fast_forward():
+  ref = run( RTLHarness(), False )
+  top = run( RTLHarness(), True )
+
+  ff = top._ff
+  assert ff.enabled
+  assert top.sim_cycle_count() == ref.sim_cycle_count()
+  assert top.cycles == ref.cycles == ref.sim_cycle_count() - 3
+  assert ff.skipped_cycles > top.sim_cycle_count() // 2
+
+  # sim_tick still simulates exactly one cycle
+  top.sim_tick()
+  assert top.sim_cycle_count() == ref.sim_cycle_count() + 1
+
+def test_cl_memory_fast_forward():
+  ref = run( MemHarness(), False )
+  top = run( MemHarness(), True )
+
+  ff = top._ff
+  assert ff.enabled
+  assert top.sim_cycle_count() == ref.sim_cycle_count()
+  assert ff.skipped_cycles > top.sim_cycle_count() // 2
+
+def test_sim_run_fast_forward():
+  ref = RTLHarness()
+  ref.apply( DefaultPassGroup( print_line_trace=False ) )
+  ref.sim_reset()
+
+  top = RTLHarness()
+  top.elaborate()
+  top.set_metadata( FastForwardPass.cycle_counters, [ top.cycles ] )
+  top.apply( DefaultPassGroup( print_line_trace=False, fast_forward=True ) )
+  top.sim_reset()
+
+  for n in [ 1, 150, 73, 500, 1000 ]:
+    ref.sim_run( n )
+    top.sim_run( n )
+    assert top.sim_cycle_count() == ref.sim_cycle_count()
+    assert top.cycles == ref.cycles
+    assert top.sink.sink.idx == ref.sink.sink.idx
+
+def test_stall_disables_fast_forward():
+  # The random stalls of StallCL do not allow skipping any cycle
+  ref = run( MemHarness( 0.5 ), False )
+  top = run( MemHarness( 0.5 ), True )
+  assert top._ff.enabled
+  assert top._ff.skipped_cycles == 0
+  assert top.sim_cycle_count() == ref.sim_cycle_count()
+
+@pytest.mark.parametrize( 'sink_interval', [ 0, 30 ] )
+@pytest.mark.parametrize( 'dut_class', [ DelayPipeDeqCL, DelayPipeSendCL ] )
+def test_delay_pipe_fast_forward( dut_class, sink_interval ):
+  ref = run( PipeHarness( dut_class, sink_interval ), False )
+  top = run( PipeHarness( dut_class, sink_interval ), True )
+
+  assert top._ff.enabled
+  assert top.sim_cycle_count() == ref.sim_cycle_count()
+  assert top._ff.skipped_cycles > 0
+
+def test_delay_pipe_send_stalled():
+  top = PipeHarness( DelayPipeSendCL, 30 )
+  top.elaborate()
+  top.apply( DefaultPassGroup( print_line_trace=False ) )
+  top.sim_reset()
+
+  # A stalled pipe waits for the sink, which declares when it is ready
+  events = []
+  while not top.done():
+    top.sim_tick()
+    events.append( ( top.dut.stalled, top.dut.next_event(), top.sink.next_event() ) )
+
+  stalls = [ x for x in events if x[0] ]
+  assert stalls
+  assert all( y is None and z > 0 for _, y, z in stalls )
+
+class Blocker( Component ):
+  def construct( s ):
+    s.out = OutPort( Bits16 )
+    s.n = 0
+
+    @update_once
+    def up_count():
+      s.n += 1
+      s.out @= s.n
+
+def test_blocker():
+  top = Blocker()
+  top.apply( DefaultPassGroup( print_line_trace=False, fast_forward=True ) )
+  assert not top._ff.enabled
+  assert top._ff.blockers == [ top ]
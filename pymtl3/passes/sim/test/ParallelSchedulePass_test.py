@@ -0,0 +1,219 @@
+#=========================================================================
+# ParallelSchedulePass_test.py
+#=========================================================================
+#
+# Author : Batten Research Group
+# Date   : Oct 17, 2026
+
+import gc
+
+import pytest
+
+from pymtl3.datatypes import Bits32
+from pymtl3.dsl import *
+from pymtl3.passes.PassGroups import DefaultPassGroup, ParallelPassGroup
+
+from ..ParallelSchedulePass import ParallelSchedulePass, format_level_report
+
+
+class Tile( Component ):
+  def construct( s ):
+    s.in_ = InPort(32)
+    s.out = OutPort(32)
+    s.mid = Wire(32)
+    s.reg = Wire(32)
+
+    @update
+    def up_mid():
+      s.mid @= s.in_ * 3 + s.reg
+
+    @update
+    def up_out():
+      s.out @= s.mid ^ ( s.mid >> 3 )
+
+    @update_ff
+    def up_reg():
+      if s.reset:
+        s.reg <<= 0
+      else:
+        s.reg <<= s.out + 1
+
+class Log:
+  def __init__( s ):
+    s.items = []
+
+class Mesh( Component ):
+  def construct( s ):
+    s.in_   = InPort(32)
+    s.out   = OutPort(32)
+    s.tiles = [ Tile() for _ in range(16) ]
+    s.log   = Log()
+
+    # Four independent chains of four tiles
+    for i, t in enumerate( s.tiles ):
+      if i % 4 == 0:
+        t.in_ //= s.in_
+      else:
+        t.in_ //= s.tiles[i-1].out
+
+    s.o0 = Wire(32)
+    s.o1 = Wire(32)
+    s.o2 = Wire(32)
+    s.o3 = Wire(32)
+    s.o0 //= s.tiles[3].out
+    s.o1 //= s.tiles[7].out
+    s.o2 //= s.tiles[11].out
+    s.o3 //= s.tiles[15].out
+
+    @update
+    def up_sum():
+      s.out @= s.o0 + s.o1 + s.o2 + s.o3
+
+    # Reads Python state, so it must stay on the main thread
+    @update
+    def up_log():
+      s.log.items.append( int(s.in_) )
+
+def _run( A ):
+  A.sim_reset()
+  trace = []
+  for i in range(30):
+    A.in_ @= i * 7
+    A.sim_eval_combinational()
+    trace.append( int(A.out) )
+    A.sim_tick()
+  return trace
+
+def _parallel_mesh( nthreads=4 ):
+  A = Mesh()
+  A.elaborate()
+  A.set_metadata( ParallelSchedulePass.force, True )
+  A.set_metadata( ParallelSchedulePass.min_level_cost, 0 )
+  A.set_metadata( ParallelSchedulePass.min_chunk_cost, 1 )
+  A.apply( ParallelPassGroup( nthreads=nthreads, print_line_trace=False ) )
+  return A
+
+def test_levels():
+  A = _parallel_mesh()
+
+  p = A._sched.parallel
+  assert sum( len(x) for x in p.levels ) == len( A._sched.static_update_schedule )
+
+  # Every entry only depends on entries of lower levels
+  level = { x: i for i, lv in enumerate( p.levels ) for x in lv }
+  for (u, v) in A._dag.all_constraints:
+    if u in level and v in level:
+      assert level[u] < level[v]
+
+  assert max( len(x) for x in p.levels ) >= 4
+  assert any( p.chunks )
+  assert "levels" in format_level_report( A )
+
+def test_equivalence():
+  ref = Mesh()
+  ref.apply( DefaultPassGroup( print_line_trace=False ) )
+  expected = _run( ref )
+
+  A = _parallel_mesh()
+  assert _run( A ) == expected
+  assert A.log.items == ref.log.items
+
+def test_pool_shutdown():
+  A = _parallel_mesh()
+  pool = A._sched.parallel.pool
+  assert pool is not None
+  _run( A )
+
+  # The pool is shut down once the model is garbage collected
+  del A
+  gc.collect()
+  with pytest.raises( RuntimeError ):
+    pool.submit( int )
+
+def test_serial_fallback():
+  A = Mesh()
+  A.elaborate()
+  A.set_metadata( ParallelSchedulePass.min_level_cost, 0 )
+  A.apply( ParallelPassGroup( nthreads=4, print_line_trace=False ) )
+
+  if A._sched.parallel.gil_enabled:
+    assert A._sched.update_schedule == A._sched.static_update_schedule
+    assert not any( A._sched.parallel.chunks )
+
+  # Levels with too little work stay serial
+  B = Mesh()
+  B.elaborate()
+  B.set_metadata( ParallelSchedulePass.force, True )
+  B.set_metadata( ParallelSchedulePass.min_level_cost, 10**9 )
+  B.apply( ParallelPassGroup( nthreads=4, print_line_trace=False ) )
+  assert B._sched.update_schedule == B._sched.static_update_schedule
+
+class Bad( Component ):
+  def construct( s ):
+    s.a0 = OutPort(32)
+    s.a1 = OutPort(32)
+    s.a2 = OutPort(32)
+    s.a3 = OutPort(32)
+
+    @update
+    def up0():
+      s.a0 @= 1
+    @update
+    def up1():
+      s.a1 @= 1
+    @update
+    def up2():
+      s.a2 @= Bits32(1) // Bits32(0)
+    @update
+    def up3():
+      s.a3 @= 1
+
+def test_worker_exception():
+  A = Bad()
+  A.elaborate()
+  A.set_metadata( ParallelSchedulePass.force, True )
+  A.set_metadata( ParallelSchedulePass.min_level_cost, 0 )
+  A.set_metadata( ParallelSchedulePass.min_chunk_cost, 1 )
+  A.apply( ParallelPassGroup( nthreads=4, print_line_trace=False ) )
+  with pytest.raises( ZeroDivisionError ):
+    A.sim_eval_combinational()
+
+class SliceWriters( Component ):
+  def construct( s ):
+    s.in_ = InPort(32)
+    s.out = OutPort(32)
+
+    @update
+    def up_b0():
+      s.out[0:8] @= s.in_[8:16] + 1
+
+    @update
+    def up_b1():
+      s.out[8:16] @= s.in_[16:24] + 2
+
+    @update
+    def up_b2():
+      s.out[16:24] @= s.in_[24:32] + 3
+
+    @update
+    def up_b3():
+      s.out[24:32] @= s.in_[0:8] + 4
+
+def test_slice_writers():
+  A = SliceWriters()
+  A.elaborate()
+  A.set_metadata( ParallelSchedulePass.force, True )
+  A.set_metadata( ParallelSchedulePass.min_level_cost, 0 )
+  A.set_metadata( ParallelSchedulePass.min_chunk_cost, 1 )
+  A.apply( ParallelPassGroup( nthreads=4, print_line_trace=False ) )
+
+  # Writing a slice is a read-modify-write of the whole signal, so the
+  # writers of the same signal never share a level
+  p = A._sched.parallel
+  for lv in p.levels:
+    assert len( [ x for x in lv if x.__name__.startswith( 'up_b' ) ] ) <= 1
+
+  A.sim_reset()
+  A.in_ @= 0x04030201
+  A.sim_eval_combinational()
+  assert A.out == 0x05070503
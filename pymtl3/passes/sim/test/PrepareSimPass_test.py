@@ -0,0 +1,199 @@
+#=========================================================================
+# PrepareSimPass_test.py
+#=========================================================================
+#
+# Author : Batten Research Group
+# Date   : Oct 17, 2026
+
+import threading
+
+from pymtl3.dsl import *
+from pymtl3.passes.mamba import UnrollSim
+from pymtl3.passes.PassGroups import DefaultPassGroup
+
+from ..PrepareSimPass import PrepareSimPass
+from ..SimHooks import SimHooks, add_hook
+
+
+class Counter( Component ):
+  def construct( s ):
+    s.out  = OutPort(32)
+    s.next = OutPort(32)
+
+    @update
+    def up_next():
+      s.next @= s.out + 1
+
+    @update_ff
+    def up_cnt():
+      if s.reset:
+        s.out <<= 0
+      else:
+        s.out <<= s.next
+
+  def done( s ):
+    return s.out >= 10
+
+def test_hooks():
+  A = Counter()
+  A.elaborate()
+
+  calls = []
+  add_hook( A, SimHooks.sim_api_hooks, 'api', 0, lambda: calls.append( 'api' ) )
+  add_hook( A, SimHooks.lock_in_hooks, 'late', 20, lambda: calls.append( 'late' ) )
+  add_hook( A, SimHooks.lock_in_hooks, 'early', 10, lambda: calls.append( 'early' ) )
+  # Registering a hook of the same name again replaces it
+  add_hook( A, SimHooks.lock_in_hooks, 'early', 10,
+            lambda: calls.append( ( 'early', A._sim.locked_simulation ) ) )
+
+  A.apply( DefaultPassGroup( print_line_trace=False ) )
+  assert calls == [ ( 'early', True ), 'late', 'api' ]
+
+def test_sim_run():
+  A = Counter()
+  A.apply( DefaultPassGroup( print_line_trace=False ) )
+  A.sim_reset()
+  start = A.sim_cycle_count()
+
+  stats = A.sim_run( 5 )
+  assert stats.ncycles == 5 and stats.done is None
+  assert stats.seconds >= 0
+  assert A.out == 5
+  assert A.sim_cycle_count() == start + 5
+
+def test_sim_run_until():
+  for passes in [ DefaultPassGroup( print_line_trace=False ), UnrollSim( print_line_trace=False ) ]:
+    A = Counter()
+    A.apply( passes )
+    A.sim_reset()
+
+    stats = A.sim_run_until( A.done, 100 )
+    assert stats.done and stats.ncycles == 10
+    assert A.out == 10
+
+def test_sim_run_until_check_every():
+  A = Counter()
+  A.apply( DefaultPassGroup( print_line_trace=False ) )
+  A.sim_reset()
+
+  # Check the condition every 4 cycles
+  stats = A.sim_run_until( A.done, 100, check_every=4 )
+  assert stats.done and stats.ncycles == 12
+  assert A.out == 12
+
+def test_sim_run_until_max_cycles():
+  A = Counter()
+  A.apply( DefaultPassGroup( print_line_trace=False ) )
+  A.sim_reset()
+
+  stats = A.sim_run_until( A.done, 7, check_every=3 )
+  assert not stats.done and stats.ncycles == 7
+  assert A.out == 7
+
+class Calls:
+  n = 0
+
+class ResetTop( Component ):
+  def construct( s ):
+    s.in_ = InPort(32)
+    s.out = OutPort(32)
+
+    @update_ff
+    def up_reg():
+      Calls.n += 1
+      if s.reset:
+        s.out <<= s.in_
+      else:
+        s.out <<= s.out + 1
+
+def test_reset_snapshot():
+  A = ResetTop()
+  A.apply( DefaultPassGroup( print_line_trace=False ) )
+  A.in_ @= 5
+  A.sim_reset()
+  assert A.out == 5
+  A.sim_run( 3 )
+  assert A.out == 8
+
+  Calls.n = 0
+  cycles = A.sim_cycle_count()
+  A.sim_reset()
+  # Restored from the snapshot without simulating
+  assert Calls.n == 0
+  assert A.out == 5
+  assert A.sim_cycle_count() == cycles + 3
+  A.sim_run( 3 )
+  assert A.out == 8
+
+  # Different inputs during reset
+  A.in_ @= 7
+  A.sim_reset()
+  assert Calls.n > 0
+  assert A.out == 7
+
+def test_reset_snapshot_opt_out():
+  A = ResetTop()
+  A.elaborate()
+  A.set_metadata( PrepareSimPass.reset_snapshot, False )
+  A.apply( DefaultPassGroup( print_line_trace=False ) )
+  A.sim_reset()
+  A.sim_tick()
+
+  Calls.n = 0
+  A.sim_reset()
+  assert Calls.n > 0
+  assert not hasattr( A._sim, 'reset_snapshot' )
+
+class HarnessTop( ResetTop ):
+  def construct( s ):
+    super().construct()
+    s.msgs = [ 1, 2, 3 ]
+
+def test_reset_snapshot_python_state():
+  A = HarnessTop()
+  A.apply( DefaultPassGroup( print_line_trace=False ) )
+  A.in_ @= 5
+  A.sim_reset()
+  A.sim_run( 3 )
+
+  # The snapshot is used while the Python state is unchanged
+  Calls.n = 0
+  A.sim_reset()
+  assert Calls.n == 0
+  assert A.out == 5
+
+  # A testbench consumed a message, which the reset doesn't restore
+  A.msgs.pop()
+  A.sim_run( 3 )
+  A.sim_reset()
+  assert Calls.n > 0
+  assert A.out == 5 and A.msgs == [ 1, 2 ]
+  assert A._sim.reset_snapshot.failed
+
+  # The reset cycles are simulated from now on
+  Calls.n = 0
+  A.sim_reset()
+  assert Calls.n > 0
+
+class LockTop( ResetTop ):
+  def construct( s ):
+    super().construct()
+    # A lock cannot be copied
+    s.lock = threading.Lock()
+    s.nresets = 0
+
+def test_reset_snapshot_uncopyable():
+  A = LockTop()
+  A.apply( DefaultPassGroup( print_line_trace=False ) )
+  A.in_ @= 5
+  A.sim_reset()
+  assert A.out == 5
+  assert A._sim.reset_snapshot.failed
+
+  # The reset cycles are simulated again
+  A.sim_run( 3 )
+  A.nresets += 1
+  Calls.n = 0
+  A.sim_reset()
+  assert Calls.n > 0
+  assert A.out == 5 and A.nresets == 1
@@ -0,0 +1,176 @@
+#=========================================================================
+# ProfileSimPass_test.py
+#=========================================================================
+#
+# Author : Batten Research Group
+# Date   : Oct 17, 2026
+
+import csv
+import json
+import time
+
+import pytest
+
+from pymtl3.datatypes import Bits32
+from pymtl3.dsl import *
+from pymtl3.passes.PassGroups import DefaultPassGroup, EventDrivenPassGroup
+
+from ..ProfileSimPass import (
+    ProfileSimPass,
+    collect_profile,
+    dump_profile_csv,
+    dump_profile_json,
+    format_profile_report,
+)
+from ..SimHooks import SimHooks, has_hook
+
+
+class Work( Component ):
+  def construct( s, n ):
+    s.in_ = InPort( Bits32 )
+    s.out = OutPort( Bits32 )
+
+    @update
+    def up_work():
+      x = 0
+      for i in range( n ):
+        x += i
+      s.out @= s.in_ + x
+
+class Top( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits32 )
+    s.out = OutPort( Bits32 )
+
+    s.light = Work( 1 )
+    s.heavy = Work( 2000 )
+    s.light.in_ //= s.in_
+    s.heavy.in_ //= s.light.out
+
+    # A combinational loop that converges
+    s.x = Wire( Bits32 )
+    s.y = Wire( Bits32 )
+
+    @update
+    def up_x():
+      if s.y > 0: s.x @= s.heavy.out
+      else:       s.x @= s.heavy.out
+
+    @update
+    def up_y():
+      s.y @= s.x + 1
+
+    s.q    = Wire( Bits32 )
+    s.slow = Wire( Bits32 )
+
+    @update
+    def up_out():
+      s.out @= s.y + s.q
+
+    @update_ff
+    def up_q():
+      s.q <<= s.in_
+
+    @update_ff( period=2 )
+    def up_slow():
+      s.slow <<= s.slow + 1
+
+def golden( x ):
+  return x + sum( range(2000) ) + 1
+
+def is_wrapped( blk ):
+  return '_rec' in blk.__globals__
+
+def rows_by_name( top ):
+  return { f"{x['component']}.{x['block']}": x for x in collect_profile( top ) }
+
+def test_exact( tmp_path ):
+  top = Top()
+  top.elaborate()
+  top.apply( DefaultPassGroup( print_line_trace=False, profile='exact' ) )
+  top.sim_reset()
+
+  for i in range( 10 ):
+    top.in_ @= i
+    top.sim_tick()
+    assert top.out == golden( i ) + i
+
+  assert all( is_wrapped( x ) for x in top._sched.update_schedule )
+
+  rows = rows_by_name( top )
+
+  # Instances of the same class are profiled separately
+  assert rows['s.heavy.up_work']['calls'] == rows['s.light.up_work']['calls'] > 0
+  assert rows['s.heavy.up_work']['time_ns'] > rows['s.light.up_work']['time_ns']
+  assert rows['s.heavy.up_work']['class'] == 'Work'
+
+  # The blocks inside the SCC and the multi-rate blocks are profiled too
+  assert rows['s.up_x']['calls'] >= rows['s.up_out']['calls']
+  assert [ x for x in rows.values() if x['kind'] == 'scc' and x['component'] == 's' ]
+  assert rows['s.up_q']['kind'] == 'ff'
+  assert 0 < rows['s.up_slow']['calls'] < rows['s.up_q']['calls']
+
+  report = format_profile_report( top )
+  assert report.splitlines()[2].endswith( "s.heavy.up_work (comb)" )
+  assert "per component:" in report and "per class:" in report
+
+  dump_profile_json( top, tmp_path / "profile.json" )
+  with open( tmp_path / "profile.json" ) as f:
+    data = json.load( f )
+  assert data['mode'] == 'exact'
+  assert next( iter( data['classes'] ) ) == 'Work'
+  assert len( data['blocks'] ) == len( rows )
+
+  dump_profile_csv( top, tmp_path / "profile.csv" )
+  with open( tmp_path / "profile.csv" ) as f:
+    assert len( list( csv.DictReader( f ) ) ) == len( rows )
+
+def test_sample():
+  top = Top()
+  top.elaborate()
+  top.set_metadata( ProfileSimPass.sample_interval, 0.0005 )
+  top.apply( DefaultPassGroup( print_line_trace=False, profile='sample' ) )
+  top.sim_reset()
+
+  # Nothing is wrapped in the sample mode
+  assert not any( is_wrapped( x ) for x in top._sched.update_schedule )
+
+  deadline = time.perf_counter() + 10
+  while top._profile.num_samples < 200 and time.perf_counter() < deadline:
+    top.sim_run( 10 )
+  top._profile.stop()
+
+  rows = rows_by_name( top )
+  assert rows['s.heavy.up_work']['samples'] > rows['s.light.up_work']['samples']
+  assert all( x['calls'] == 0 for x in rows.values() )
+  assert "sampled profile" in format_profile_report( top )
+
+def test_not_applied():
+  top = Top()
+  top.elaborate()
+  top.apply( DefaultPassGroup( print_line_trace=False ) )
+  assert not hasattr( top, "_profile" )
+  assert not has_hook( top, SimHooks.lock_in_hooks, 'ProfileSimPass' )
+  assert not any( is_wrapped( x ) for x in top._sched.update_schedule )
+
+def test_event_driven():
+  top = Top()
+  top.elaborate()
+  top.apply( EventDrivenPassGroup( print_line_trace=False, profile='exact' ) )
+  top.sim_reset()
+
+  top.in_ @= 3
+  top.sim_tick()
+  calls = rows_by_name( top )['s.heavy.up_work']['calls']
+
+  # Blocks whose inputs don't change are skipped and not counted
+  for i in range( 5 ):
+    top.sim_tick()
+  assert rows_by_name( top )['s.heavy.up_work']['calls'] == calls
+  assert top.out == golden( 3 ) + 3
+
+def test_bad_mode():
+  top = Top()
+  top.elaborate()
+  with pytest.raises( ValueError ):
+    top.apply( DefaultPassGroup( print_line_trace=False, profile='fast' ) )
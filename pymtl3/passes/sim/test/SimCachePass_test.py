@@ -0,0 +1,194 @@
+#=========================================================================
+# SimCachePass_test.py
+#=========================================================================
+#
+# Author : Batten Research Group
+# Date   : Oct 17, 2026
+
+import os
+import pickle
+
+import pytest
+
+from pymtl3.dsl import *
+from pymtl3.passes.PassGroups import DefaultPassGroup
+
+from ..DynamicSchedulePass import DynamicSchedulePass
+from ..GenDAGPass import GenDAGPass
+from ..PrepareSimPass import PrepareSimPass
+from ..SimCachePass import SimCachePass, read_cache_entry, write_cache_entry
+
+
+class Inner( Component ):
+  def construct( s, nbits ):
+    s.in_ = InPort( nbits )
+    s.out = OutPort( nbits )
+
+    @update
+    def up_inner():
+      s.out @= s.in_ + 1
+
+class Top( Component ):
+  def construct( s, N=2 ):
+    s.in_ = InPort(32)
+    s.out = OutPort(32)
+    s.inners = [ Inner( 32 ) for _ in range(N) ]
+    s.a = Wire(32)
+    s.b = Wire(32)
+    s.c = Wire(32)
+    s.last = Wire(32)
+
+    s.inners[0].in_ //= s.in_
+    for i in range(1, N):
+      s.inners[i].in_ //= s.inners[i-1].out
+    s.last //= s.inners[N-1].out
+    s.c //= 3
+
+    # A combinational loop that becomes a SCC block
+    @update
+    def up1():
+      s.a @= s.last | s.b
+
+    @update
+    def up2():
+      s.b @= s.a & 0xf0
+
+    @update
+    def up3():
+      s.out @= s.b + s.a + s.c
+
+def _run( cache_dir, *args, remove=None ):
+  A = Top( *args )
+  A.elaborate()
+  A.set_metadata( SimCachePass.cache_dir, cache_dir )
+  A.apply( SimCachePass() )
+  A.apply( GenDAGPass() )
+  # Mimic a pass that removes an update block before scheduling
+  if remove is not None:
+    blk = [ x for x in A.get_update_blocks() if x.__name__ == remove ][0]
+    A._dag.final_upblks = A._dag.final_upblks - { blk }
+    A._dag.all_constraints = { (x, y) for x, y in A._dag.all_constraints
+                               if x is not blk and y is not blk }
+  A.apply( DynamicSchedulePass() )
+  A.apply( PrepareSimPass( print_line_trace=False ) )
+  A.sim_reset()
+
+  trace = []
+  for x in [ 1, 2, 10, 20, 3 ]:
+    A.in_ @= x
+    A.sim_eval_combinational()
+    trace.append( int(A.out) )
+    A.sim_tick()
+  return A, trace
+
+def test_cache_hit( tmpdir ):
+  cache_dir = str(tmpdir)
+
+  A, ref = _run( cache_dir )
+  assert not A._cache.dag_restored
+  assert len(os.listdir( cache_dir )) == 1
+
+  B, trace = _run( cache_dir )
+  assert B._cache.key == A._cache.key
+  assert B._cache.dag_restored and B._cache.sched_restored
+  assert len(B._sched.scc_blocks) == 1
+  assert trace == ref
+
+def test_schedule_key( tmpdir ):
+  cache_dir = str(tmpdir)
+
+  A, ref = _run( cache_dir )
+
+  # The schedule of the full design doesn't match the remaining blocks
+  B, trace = _run( cache_dir, remove='up3' )
+  assert B._cache.dag_restored and not B._cache.sched_restored
+  assert 'up3' not in [ x.__name__ for x in B._sched.update_schedule ]
+  assert trace == [ 0 ] * len(ref)
+
+  # Both schedules are kept in the same entry
+  C, trace = _run( cache_dir )
+  assert C._cache.sched_restored
+  assert trace == ref
+  assert len(os.listdir( cache_dir )) == 1
+  D, _ = _run( cache_dir, remove='up3' )
+  assert D._cache.sched_restored
+
+def test_invalid_schedule( tmpdir ):
+  cache_dir = str(tmpdir)
+  A, ref = _run( cache_dir )
+
+  # A cached schedule that misses a block is not used
+  entry = read_cache_entry( A._cache.path )
+  for x in entry['schedules'].values():
+    x.pop()
+  write_cache_entry( A._cache.path, entry )
+
+  B, trace = _run( cache_dir )
+  assert B._cache.dag_restored and not B._cache.sched_restored
+  assert trace == ref
+
+@pytest.mark.parametrize( 'corrupt', [ 'truncate', 'flip', 'raw_pickle', 'version' ] )
+def test_corrupted_entry( tmpdir, corrupt ):
+  cache_dir = str(tmpdir)
+  A, ref = _run( cache_dir )
+
+  with open( A._cache.path, 'rb' ) as f:
+    blob = f.read()
+  if corrupt == 'truncate':
+    blob = blob[:len(blob)//2]
+  elif corrupt == 'flip':
+    blob = blob[:-1] + bytes([ blob[-1] ^ 1 ])
+  elif corrupt == 'raw_pickle':
+    blob = pickle.dumps( read_cache_entry( A._cache.path ) )
+  else:
+    blob = blob[:8] + bytes([ blob[8] + 1 ]) + blob[9:]
+  with open( A._cache.path, 'wb' ) as f:
+    f.write( blob )
+
+  # A file that fails the check is a cache miss and gets rewritten
+  B, trace = _run( cache_dir )
+  assert not B._cache.dag_restored
+  assert trace == ref
+  assert read_cache_entry( A._cache.path ) is not None
+
+def test_cache_key_args( tmpdir ):
+  cache_dir = str(tmpdir)
+
+  A, _ = _run( cache_dir, 2 )
+  B, _ = _run( cache_dir, 3 )
+  assert A._cache.key != B._cache.key
+  assert not B._cache.dag_restored
+  assert len(os.listdir( cache_dir )) == 2
+
+def test_cache_disabled( monkeypatch ):
+  monkeypatch.delenv( 'PYMTL_SIM_CACHE', raising=False )
+  A = Top()
+  A.elaborate()
+  A.apply( SimCachePass() )
+  assert not hasattr( A, "_cache" )
+
+def test_uncacheable_args( tmpdir ):
+
+  class Foo( Component ):
+    def construct( s, func ):
+      s.in_ = InPort(32)
+      s.out = OutPort(32)
+      @update
+      def up():
+        s.out @= s.in_
+
+  A = Foo( lambda x: x )
+  A.elaborate()
+  A.set_metadata( SimCachePass.cache_dir, str(tmpdir) )
+  A.apply( SimCachePass() )
+  assert A._cache.key is None
+
+def test_pass_group_cache_dir( tmpdir ):
+  for i in range(2):
+    A = Top()
+    A.elaborate()
+    A.apply( DefaultPassGroup( print_line_trace=False, cache_dir=str(tmpdir) ) )
+    A.sim_reset()
+    A.in_ @= 5
+    A.sim_tick()
+    assert A._cache.dag_restored == (i == 1)
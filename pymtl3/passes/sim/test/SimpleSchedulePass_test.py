@@ -261,3 +261,52 @@ def test_equal_top_level():
     print(e)
     assert str(e).startswith("Please use @= to assign top level InPort")
     return
+
+def test_multirate_update_ff():
+
+  class Top(Component):
+    def construct( s ):
+      s.fast = OutPort( Bits32 )
+      s.mid  = OutPort( Bits32 )
+      s.slow = OutPort( Bits32 )
+
+      @update_ff
+      def up_fast():
+        if s.reset: s.fast <<= 0
+        else:       s.fast <<= s.fast + 1
+
+      @update_ff( period=2 )
+      def up_mid():
+        if s.reset: s.mid <<= 0
+        else:       s.mid <<= s.mid + 1
+
+      @update_ff( period=4, phase=1 )
+      def up_slow():
+        if s.reset: s.slow <<= 0
+        else:       s.slow <<= s.slow + 1
+
+  A = Top()
+  A.elaborate()
+  assert A.get_all_update_ff_rates() == { A.get_update_block( 'up_mid' ): (2, 0),
+                                          A.get_update_block( 'up_slow' ): (4, 1) }
+  A.apply( GenDAGPass() )
+  A.apply( SimpleSchedulePass() )
+
+  assert A._sched.schedule_ff == [ A.get_update_block( 'up_fast' ) ]
+  phases = A._sched.schedule_ff_phases
+  assert sorted( phases ) == [ 2, 4 ]
+  assert [ f.__name__ for f in phases[4] ] == [ f"ff_period4_phase{i}" for i in range(4) ]
+
+  A.apply( PrepareSimPass( print_line_trace=False ) )
+  A.sim_reset()
+
+  # All blocks observe the reset regardless of the phase
+  assert A.fast == A.mid == A.slow == 0
+
+  start = A.sim_cycle_count()
+  for _ in range(20):
+    A.sim_tick()
+    cycles = range( start, A.sim_cycle_count() )
+    assert A.fast == len( cycles )
+    assert A.mid  == len( [ c for c in cycles if c % 2 == 0 ] )
+    assert A.slow == len( [ c for c in cycles if c % 4 == 1 ] )
@@ -0,0 +1,125 @@
+"""
+========================================================================
+AsyncWaveWriter.py
+========================================================================
+Move the encoding, compression and file I/O of BinaryWavePass off the
+simulation thread. Every cycle the simulation only appends the changed
+nets and their values to the flat buffer of the current batch, so no
+list or tuple is created per cycle or per change. A full batch is
+handed to a worker thread through a bounded queue, which blocks the
+simulation when the worker falls behind so that the memory stays
+bounded.
+
+The worker calls write_batch( first, changes, ends ), where first is
+the index of the first cycle of the batch, changes is the flat list
+net, value, net, value, ... of all cycles, and the changes of the k-th
+cycle end at ends[k]. iter_cycles turns them back into the ( net,
+value ) pairs of every cycle. An exception of write_batch stops the
+writing and is raised on the simulation thread by the next submit,
+flush or close.
+
+The worker still holds the GIL while it encodes the changes, so only
+the file I/O and zlib, which release it, overlap with the simulation.
+VcdGenerationPass doesn't use it since formatting the VCD text holds
+the GIL all the time, which made the async VCD slower than writing it
+on the simulation thread.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+import queue
+import threading
+from array import array
+
+
+class AsyncWaveWriter:
+
+  def __init__( s, write_batch, batch_cycles=1024, queue_depth=4 ):
+    s.write_batch  = write_batch
+    s.batch_cycles = max( 1, batch_cycles )
+
+    s.first  = 0
+    s._new_batch()
+    s.error  = None
+    s.closed = False
+
+    s.queue  = queue.Queue( maxsize=max( 1, queue_depth ) )
+    # A daemon thread doesn't keep the interpreter alive if
+    # nobody closes the writer. weakref.finalize of the passes closes it
+    # at exit, which runs before daemon threads are stopped.
+    s.thread = threading.Thread( target=s._work, name="AsyncWaveWriter", daemon=True )
+    s.thread.start()
+
+  def _work( s ):
+    while True:
+      item = s.queue.get()
+      try:
+        if item is None:
+          return
+        if s.error is None:
+          s.write_batch( *item )
+      except Exception as e:
+        s.error = e
+      finally:
+        s.queue.task_done()
+
+  def _raise_error( s ):
+    if s.error is not None:
+      error, s.error = s.error, None
+      raise error
+
+  def _new_batch( s ):
+    # The worker owns the buffers of a submitted batch, so every batch
+    # gets its own. The offsets are preallocated for the whole batch.
+    s.changes = []
+    s.ends    = array( 'Q', bytes( 8 * s.batch_cycles ) )
+    s.ncycles = 0
+
+  def gen_capture_func( s, top, nets, last ):
+    """ Generate the per-cycle function that captures the changes of the
+    nets into the batch. See gen_record_func for last. """
+    # BinaryWavePass imports this module
+    from .BinaryWavePass import gen_record_func
+
+    return gen_record_func( top, nets, last,
+      { 'W': s },
+      head   = [ "add = W.changes.append" ],
+      record = "add( {i} ); add( {v} )",
+      tail   = [ "n = W.ncycles",
+                 "W.ends[n] = len( W.changes )",
+                 "W.ncycles = n = n + 1",
+                 f"if n == {s.batch_cycles}:",
+                 "  W.submit()" ] )
+
+  def submit( s ):
+    """ Hand the captured cycles to the worker. """
+    s._raise_error()
+    if s.ncycles and not s.closed:
+      s.queue.put( ( s.first, s.changes, s.ends[:s.ncycles] ) )
+      s.first += s.ncycles
+    s._new_batch()
+
+  def flush( s ):
+    """ Wait until the worker has written every captured cycle. """
+    s.submit()
+    s.queue.join()
+    s._raise_error()
+
+  def close( s ):
+    if s.closed:
+      return
+    try:
+      s.submit()
+    finally:
+      s.closed = True
+      s.queue.put( None )
+      s.thread.join()
+    s._raise_error()
+
+def iter_cycles( changes, ends ):
+  """ Yield the list of ( net, value ) changes of every cycle of a
+  batch. """
+  start = 0
+  for end in ends:
+    yield list( zip( changes[start:end:2], changes[start+1:end:2] ) )
+    start = end
@@ -0,0 +1,635 @@
+"""
+========================================================================
+BinaryWavePass.py
+========================================================================
+Dump the waveform in a compact binary format instead of VCD. Every
+value net of top-level signals is recorded once per cycle, like
+VcdGenerationPass, except the clock which is implied by the cycles.
+
+The file consists of
+
+  MAGIC header_size:u32 header chunk* footer footer_offset:u64 END_MAGIC
+
+- header: a JSON object with the timescale, the nbits and initial value
+  of every net, and the component hierarchy with the nets of the signals.
+  The clock signals refer to net -1.
+- chunk: the value changes of one group of signals_per_chunk nets over
+  one range of chunk_cycles cycles, compressed with zlib. A chunk starts
+  with one u32 offset per net, followed by one column per net:
+  varint(value at the first cycle of the range) varint(nchanges)
+  nchanges x [ varint(cycle delta) varint(value xor previous value) ].
+  The first cycle delta is relative to the first cycle of the range. A
+  chunk is self-contained, so one signal can be fetched over a window of
+  cycles by only decompressing the chunks of its group in the window.
+- footer: a JSON object with the number of cycles and, per cycle range,
+  the offset and size of the chunk of each group.
+
+All values are unsigned integers; bitstructs are recorded as the
+concatenation of their fields. BinaryWaveReader reads the file and
+binary_wave_to_vcd converts it to VCD. The footer is written when the
+file is closed, either by wave_close_func or when top is garbage
+collected.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+import json
+import struct
+import time
+import weakref
+import zlib
+from bisect import bisect_right
+from collections import OrderedDict, defaultdict
+
+import py
+
+from pymtl3.datatypes import is_bitstruct_class
+from pymtl3.dsl import Const, MetadataKey
+from pymtl3.extra.pypy import custom_exec
+from pymtl3.passes.BasePass import BasePass
+from pymtl3.passes.sim.DynamicSchedulePass import gen_raw_value_src
+from pymtl3.passes.sim.SimHooks import TRACING_PRIORITY, SimHooks, add_hook
+
+from .AsyncWaveWriter import AsyncWaveWriter, iter_cycles
+from .TraceSelection import get_traced_components, select_traced_signals
+from .VcdGenerationPass import gen_vcd_symbols, vcd_mangle_name
+
+MAGIC     = b"PYMTLWV\x01"
+END_MAGIC = b"PYMTLWE\x01"
+FORMAT_VERSION = 1
+
+class BinaryWavePass( BasePass ):
+
+  # BinaryWavePass public pass data
+
+  #: The name of the waveform file without the .pwave suffix. The class
+  #: name of top is used if it is "".
+  #:
+  #: Type: ``str``; input
+  #:
+  #: Default value: None
+  wave_file_name = MetadataKey(str)
+
+  #: The number of cycles of one chunk.
+  #:
+  #: Type: ``int``; input
+  #:
+  #: Default value: 4096
+  chunk_cycles = MetadataKey(int)
+
+  #: The number of nets of one chunk.
+  #:
+  #: Type: ``int``; input
+  #:
+  #: Default value: 256
+  signals_per_chunk = MetadataKey(int)
+
+  #: The number of cycles captured before they are handed to a worker
+  #: thread that encodes, compresses and writes them. The waveform is
+  #: written on the simulation thread if it is 0.
+  #:
+  #: Type: ``int``; input
+  #:
+  #: Default value: 0
+  async_batch_cycles = MetadataKey(int)
+
+  #: The number of batches that wait for the worker thread before the
+  #: simulation blocks.
+  #:
+  #: Type: ``int``; input
+  #:
+  #: Default value: 4
+  async_queue_depth = MetadataKey(int)
+
+  #: The function that records the values of one cycle.
+  #:
+  #: Type: ``callable``; output
+  wave_func = MetadataKey()
+
+  #: The function that writes the last chunk and the footer and closes
+  #: the file. Nothing is recorded afterwards.
+  #:
+  #: Type: ``callable``; output
+  wave_close_func = MetadataKey()
+
+  def __call__( self, top ):
+    if not top.has_metadata( self.wave_file_name ):
+      return
+    file_name = top.get_metadata( self.wave_file_name )
+    if file_name is None:
+      return
+
+    assert not top.has_metadata( self.wave_func )
+    if file_name == "":
+      file_name = top.__class__.__name__
+    file_name = str(file_name) + ".pwave"
+
+    chunk_cycles = 4096
+    if top.has_metadata( self.chunk_cycles ):
+      chunk_cycles = max( 1, top.get_metadata( self.chunk_cycles ) )
+
+    group_size = 256
+    if top.has_metadata( self.signals_per_chunk ):
+      group_size = max( 1, top.get_metadata( self.signals_per_chunk ) )
+
+    nets, clock, scopes = collect_wave_nets( top )
+    header = make_wave_header( top, nets, scopes, chunk_cycles, group_size )
+
+    batch_cycles = 0
+    if top.has_metadata( self.async_batch_cycles ):
+      batch_cycles = top.get_metadata( self.async_batch_cycles )
+
+    queue_depth = 4
+    if top.has_metadata( self.async_queue_depth ):
+      queue_depth = top.get_metadata( self.async_queue_depth )
+
+    writer = BinaryWaveWriter( file_name, header )
+
+    dump = [ None ]
+
+    if batch_cycles > 0:
+      def write_batch( first, changes, ends ):
+        for x in iter_cycles( changes, ends ):
+          writer.write_cycle( x )
+
+      async_writer = AsyncWaveWriter( write_batch, batch_cycles, queue_depth )
+
+      def bind():
+        dump[0] = async_writer.gen_capture_func( top, nets, [ None ] * len(nets) )
+
+      def close():
+        try:
+          async_writer.close()
+        finally:
+          writer.close()
+
+    else:
+      def bind():
+        for i in range( len(nets) ):
+          writer.last[i] = None
+        dump[0] = gen_record_func( top, nets, writer.last,
+          { 'N': writer.ncycles, 'flush_chunk': writer.flush_chunk,
+            'C': writer.cycles, 'V': writer.values },
+          head   = [ "n = N[0]" ],
+          record = "C[{i}].append( n ); V[{i}].append( {v} )",
+          tail   = [ "N[0] = n + 1",
+                     f"if not N[0] % {writer.chunk_cycles}:",
+                     "  flush_chunk()" ] )
+
+      close = writer.close
+
+    closed = [ False ]
+
+    def close_wave():
+      closed[0] = True
+      close()
+
+    def dump_wave():
+      if closed[0]:
+        return
+      if dump[0] is None:
+        bind()
+      dump[0]()
+
+    # Close the file when top is garbage collected or at exit
+    weakref.finalize( top, close_wave )
+
+    top.set_metadata( self.wave_func, dump_wave )
+    add_hook( top, SimHooks.lock_in_hooks, 'BinaryWavePass', TRACING_PRIORITY,
+              bind )
+    top.set_metadata( self.wave_close_func, close_wave )
+
+#-------------------------------------------------------------------------
+# collect_wave_nets
+#-------------------------------------------------------------------------
+# Return the nets of top-level signals except the clock net, the signals
+# of the clock net, and the component hierarchy in which every signal
+# refers to the index of its net. Like VcdGenerationPass, a signal that
+# is not in any value net gets a net of its own. Only the signals picked
+# by TraceSelection are recorded.
+
+def collect_wave_nets( top ):
+  selected = select_traced_signals( top )
+
+  component_signals = defaultdict(list)
+  for x in top._dsl.all_signals:
+    if x.is_top_level_signal() and ( selected is None or x in selected ):
+      component_signals[ x.get_host_component() ].append( x )
+
+  nets = []
+  for writer, net in top.get_all_value_nets():
+    net = [ x for x in net if not isinstance(x, Const) and x.is_top_level_signal()
+                              and ( selected is None or x in selected ) ]
+    if net:
+      nets.append( sorted( net, key=repr ) )
+
+  in_net = { x for net in nets for x in net }
+  for signals in component_signals.values():
+    nets.extend( [ x ] for x in signals if x not in in_net )
+
+  nets.sort( key=lambda net: repr(net[0]) )
+
+  clock = []
+  signal_net = {}
+  recorded = []
+  for net in nets:
+    if any( repr(x) == "s.clk" for x in net ):
+      clock = net
+      for x in net:
+        signal_net[x] = -1
+    else:
+      for x in net:
+        signal_net[x] = len(recorded)
+      recorded.append( net[0] )
+
+  def get_scope( m ):
+    name = m.get_field_name()
+    return {
+      'name'     : "top" if name == "s" else name,
+      'path'     : repr(m),
+      'signals'  : [ [ repr(x), signal_net[x] ]
+                     for x in sorted( component_signals[m], key=repr ) ],
+      'children' : [ get_scope( c ) for c in m.get_child_components( repr )
+                     if traced is None or c in traced ],
+    }
+
+  traced = None if selected is None else get_traced_components( top, selected )
+
+  return recorded, clock, get_scope( top )
+
+def make_wave_header( top, nets, scopes, chunk_cycles=4096, group_size=256 ):
+  try:                    timescale = top.vcd_timescale
+  except AttributeError:  timescale = "10ps"
+
+  return {
+    'version'      : FORMAT_VERSION,
+    'timescale'    : timescale,
+    'chunk_cycles' : chunk_cycles,
+    'group_size'   : group_size,
+    'nets'         : [ { 'nbits': x._dsl.Type.nbits, 'init': int( x._dsl.Type().to_bits() ) }
+                       for x in nets ],
+    'scopes'       : scopes,
+  }
+
+#-------------------------------------------------------------------------
+# gen_record_func
+#-------------------------------------------------------------------------
+# Like the VCD dump function, compare the raw values of the value objects
+# of the nets with the previous values in last. The generated function
+# executes the lines of head, the line record formatted with the index i
+# and the integer value v of every changed net, and the lines of tail.
+#
+# The raw values of bitstructs are tuples, so the caller resets last to
+# None before binding and the first cycle afterwards records every net.
+# The writers drop the values that don't change.
+
+def gen_record_func( top, nets, last, _globals, head, record, tail ):
+  mapping = getattr( top._sim, 'signal_object_mapping', {} ) if hasattr( top, '_sim' ) else {}
+
+  _globals = dict( _globals, L=last )
+  src = [ "def record():" ] + [ f"  {x}" for x in head ]
+
+  for i, signal in enumerate( nets ):
+    if signal in mapping:
+      value = mapping[ signal ][-1]
+    else:
+      value = eval( repr(signal), { 's': top } )
+    _globals[ f"v{i}" ] = value
+
+    Type = signal._dsl.Type
+    v = f"int( v{i}.to_bits() )" if is_bitstruct_class( Type ) else "x"
+
+    src.append( f"  x = {gen_raw_value_src( Type, f'v{i}' )}" )
+    src.append( f"  if x != L[{i}]:" )
+    src.append( f"    L[{i}] = x" )
+    src.append( f"    {record.format( i=i, v=v )}" )
+
+  src += [ f"  {x}" for x in tail ]
+
+  _locals = {}
+  custom_exec( py.code.Source( "\n".join( src ) ).compile(), _globals, _locals )
+  return _locals['record']
+
+#-------------------------------------------------------------------------
+# Varint
+#-------------------------------------------------------------------------
+
+def _write_varint( buf, x ):
+  while x > 0x7f:
+    buf.append( (x & 0x7f) | 0x80 )
+    x >>= 7
+  buf.append( x )
+
+def _read_varint( data, pos ):
+  x = shift = 0
+  while True:
+    b = data[pos]
+    pos += 1
+    x |= (b & 0x7f) << shift
+    if b < 0x80:
+      return x, pos
+    shift += 7
+
+#-------------------------------------------------------------------------
+# BinaryWaveWriter
+#-------------------------------------------------------------------------
+
+class BinaryWaveWriter:
+
+  def __init__( s, file_name, header ):
+    s.file_name    = file_name
+    s.chunk_cycles = header['chunk_cycles']
+    s.group_size   = header['group_size']
+
+    nnets = len( header['nets'] )
+    s.start  = [ x['init'] for x in header['nets'] ]
+    s.last   = [ None ] * nnets
+    s.cycles = [ [] for _ in range(nnets) ]
+    s.values = [ [] for _ in range(nnets) ]
+
+    s.ncycles = [ 0 ]
+    s.chunk_start = 0
+    s.ranges = []
+    s.closed = False
+
+    s.file = open( file_name, 'wb' )
+    data = json.dumps( header, separators=(',', ':') ).encode()
+    s.file.write( MAGIC + struct.pack( '<I', len(data) ) + data )
+    s.offset = len(MAGIC) + 4 + len(data)
+
+  def encode_column( s, i, c0 ):
+    """ Encode the changes of net i since cycle c0 and clear them. """
+    buf = bytearray()
+    prev_c, prev_v = c0, s.start[i]
+    cycles, values = s.cycles[i], s.values[i]
+
+    changes = bytearray()
+    count = 0
+    for c, v in zip( cycles, values ):
+      if v != prev_v:
+        _write_varint( changes, c - prev_c )
+        _write_varint( changes, v ^ prev_v )
+        prev_c, prev_v = c, v
+        count += 1
+
+    _write_varint( buf, s.start[i] )
+    _write_varint( buf, count )
+    buf += changes
+
+    s.start[i] = prev_v
+    cycles.clear()
+    values.clear()
+    return buf
+
+  def flush_chunk( s ):
+    c0, c1 = s.chunk_start, s.ncycles[0]
+    if s.closed or c1 == c0:
+      return
+
+    chunks = []
+    nnets = len(s.start)
+    for g in range( 0, nnets, s.group_size ):
+      offsets = []
+      columns = bytearray()
+      for i in range( g, min( g + s.group_size, nnets ) ):
+        offsets.append( len(columns) )
+        columns += s.encode_column( i, c0 )
+
+      data = zlib.compress( struct.pack( f'<{len(offsets)}I', *offsets ) + columns )
+      s.file.write( data )
+      chunks.append( [ s.offset, len(data) ] )
+      s.offset += len(data)
+
+    s.ranges.append( [ c0, c1, chunks ] )
+    s.chunk_start = c1
+
+  def write_cycle( s, changes ):
+    """ Record the ( net, value ) changes of the next cycle. """
+    n = s.ncycles[0]
+    for i, v in changes:
+      s.cycles[i].append( n )
+      s.values[i].append( v )
+    s.ncycles[0] = n + 1
+    if not s.ncycles[0] % s.chunk_cycles:
+      s.flush_chunk()
+
+  def close( s ):
+    if s.closed:
+      return
+    s.flush_chunk()
+    s.closed = True
+
+    footer = { 'num_cycles': s.ncycles[0], 'ranges': s.ranges }
+    data = json.dumps( footer, separators=(',', ':') ).encode()
+    s.file.write( data + struct.pack( '<Q', s.offset ) + END_MAGIC )
+    s.file.close()
+
+#-------------------------------------------------------------------------
+# BinaryWaveReader
+#-------------------------------------------------------------------------
+
+class BinaryWaveReader:
+  """ Read a waveform written by BinaryWavePass. Signals are named like
+  repr(signal), e.g. "s.inner.out". Cycles are the indices of the
+  recorded clock edges. The first recorded cycle of the simulation is
+  first_cycle, which is only non-zero for the flight recorder. """
+
+  def __init__( s, file_name, cache_size=8 ):
+    s.file = open( file_name, 'rb' )
+
+    if s.file.read( len(MAGIC) ) != MAGIC:
+      raise ValueError( f"{file_name} is not a PyMTL binary waveform" )
+    size, = struct.unpack( '<I', s.file.read(4) )
+    s.header = json.loads( s.file.read( size ) )
+
+    s.file.seek( -8 - len(END_MAGIC), 2 )
+    footer_offset, = struct.unpack( '<Q', s.file.read(8) )
+    if s.file.read( len(END_MAGIC) ) != END_MAGIC:
+      raise ValueError( f"{file_name} is truncated, the waveform was not closed" )
+    s.file.seek( footer_offset )
+    footer = json.loads( s.file.read()[ :-8-len(END_MAGIC) ] )
+
+    s.num_cycles = footer['num_cycles']
+    s.ranges = footer['ranges']
+    s._range_starts = [ x[0] for x in s.ranges ]
+
+    s.nets = s.header['nets']
+    s.first_cycle = s.header.get( 'first_cycle', 0 )
+    s.group_size = s.header['group_size']
+
+    s.signal_net = {}
+    def visit( scope ):
+      for name, net in scope['signals']:
+        s.signal_net[ name ] = net
+      for c in scope['children']:
+        visit( c )
+    visit( s.header['scopes'] )
+
+    s._cache = OrderedDict()
+    s._cache_size = cache_size
+    s.num_chunk_loads = 0
+
+  def close( s ):
+    s.file.close()
+
+  def __enter__( s ):
+    return s
+
+  def __exit__( s, *args ):
+    s.close()
+
+  @property
+  def signals( s ):
+    return list( s.signal_net )
+
+  def get_net( s, name ):
+    try:
+      net = s.signal_net[ name ]
+    except KeyError:
+      raise KeyError( f"{name} is not in the waveform" ) from None
+    if net < 0:
+      raise ValueError( f"{name} is the clock, which is not recorded" )
+    return net
+
+  def get_nbits( s, name ):
+    net = s.signal_net[ name ]
+    return 1 if net < 0 else s.nets[ net ]['nbits']
+
+  def load_chunk( s, r, group ):
+    key = ( r, group )
+    data = s._cache.get( key )
+    if data is None:
+      offset, size = s.ranges[r][2][group]
+      s.file.seek( offset )
+      data = zlib.decompress( s.file.read( size ) )
+      s.num_chunk_loads += 1
+      s._cache[ key ] = data
+      if len(s._cache) > s._cache_size:
+        s._cache.popitem( last=False )
+    else:
+      s._cache.move_to_end( key )
+    return data
+
+  def read_column( s, r, net ):
+    """ Return the value at the first cycle of range r and the list of
+    ( cycle, value ) changes of net in range r. """
+    group, col = divmod( net, s.group_size )
+    data = s.load_chunk( r, group )
+    ncols = min( s.group_size, len(s.nets) - group * s.group_size )
+
+    pos = 4 * ncols + struct.unpack_from( '<I', data, 4 * col )[0]
+    value, pos = _read_varint( data, pos )
+    count, pos = _read_varint( data, pos )
+
+    start = value
+    cycle = s.ranges[r][0]
+    changes = []
+    for _ in range(count):
+      delta, pos = _read_varint( data, pos )
+      x, pos = _read_varint( data, pos )
+      cycle += delta
+      value ^= x
+      changes.append( ( cycle, value ) )
+    return start, changes
+
+  def get_changes( s, name, start=0, end=None ):
+    """ Return the list of ( cycle, value ) of signal name in cycles
+    [start, end). The first entry is the value at cycle start and the
+    rest are the changes afterwards. Only the chunks of the signal that
+    overlap the window are decompressed. """
+    net = s.get_net( name )
+    if end is None or end > s.num_cycles:
+      end = s.num_cycles
+    start = max( start, 0 )
+    if start >= end:
+      return []
+
+    ret = []
+    r = max( bisect_right( s._range_starts, start ) - 1, 0 )
+    while r < len(s.ranges) and s.ranges[r][0] < end:
+      value, changes = s.read_column( r, net )
+      if not ret:
+        for c, v in changes:
+          if c > start:
+            break
+          value = v
+        ret.append( ( start, value ) )
+      ret.extend( x for x in changes if start < x[0] < end )
+      r += 1
+    return ret
+
+  def get_value( s, name, cycle ):
+    """ Return the value of signal name at the cycle. """
+    if not 0 <= cycle < s.num_cycles:
+      raise IndexError( f"cycle {cycle} is not in [0, {s.num_cycles})" )
+    return s.get_changes( name, cycle, cycle+1 )[0][1]
+
+#-------------------------------------------------------------------------
+# write_vcd
+#-------------------------------------------------------------------------
+
+def write_vcd( f, header, cycles ):
+  """ Write a VCD file with the same clock and timestamps as
+  VcdGenerationPass. The initial values of the nets are in the header
+  and cycles yields ( cycle, [ ( net, value ), ... ] ) from cycle
+  header['first_cycle']. """
+  nets = header['nets']
+
+  f.write( "$date\n  {}\n$end\n$version\n  PyMTL 3 (Mamba)\n$end\n"
+           "$timescale\n {}\n$end\n\n".format( time.asctime(), header['timescale'] ) )
+
+  symbols = gen_vcd_symbols()
+  clock_symbol = next( symbols )
+  net_symbols  = [ next( symbols ) for _ in nets ]
+
+  def recurse_scopes( scope, spaces ):
+    f.write( f"{spaces}$scope module {vcd_mangle_name( scope['name'] )} $end\n" )
+    for name, net in scope['signals']:
+      symbol = clock_symbol if net < 0 else net_symbols[net]
+      nbits  = 1 if net < 0 else nets[net]['nbits']
+      f.write( f"{spaces}  $var reg {nbits} {symbol} "
+               f"{vcd_mangle_name( name[ len(scope['path'])+1: ] )} $end\n" )
+    for c in scope['children']:
+      recurse_scopes( c, spaces+'  ' )
+    f.write( f"{spaces}$upscope $end\n" )
+
+  recurse_scopes( header['scopes'], '' )
+  f.write( "$enddefinitions $end\n\n" )
+
+  formats = [ f"b0b{{:0{x['nbits']}b}} {net_symbols[i]}\n" for i, x in enumerate( nets ) ]
+  values  = [ x['init'] for x in nets ]
+
+  f.write( f"b0b0 {clock_symbol}\n" )
+  for i, v in enumerate( values ):
+    f.write( formats[i].format( v ) )
+  f.write( f"\n#{100*header.get( 'first_cycle', 0 )}\nb0b1 {clock_symbol}\n\n" )
+
+  for c, changes in cycles:
+    out = []
+    for i, v in changes:
+      if v != values[i]:
+        values[i] = v
+        out.append( formats[i].format( v ) )
+    out.append( f"\n#{100*c+50}\nb0b0 {clock_symbol}\n#{100*c+100}\nb0b1 {clock_symbol}\n\n" )
+    f.write( "".join( out ) )
+
+#-------------------------------------------------------------------------
+# binary_wave_to_vcd
+#-------------------------------------------------------------------------
+
+def binary_wave_to_vcd( file_name, vcd_file_name ):
+  """ Convert a waveform written by BinaryWavePass to VCD with the same
+  clock and timestamps as VcdGenerationPass. """
+  with BinaryWaveReader( file_name ) as reader, \
+       open( vcd_file_name, 'w', buffering=1<<20 ) as f:
+
+    def cycles():
+      for r, ( c0, c1, _ ) in enumerate( reader.ranges ):
+        changes = defaultdict(list)
+        for net in range( len(reader.nets) ):
+          for c, v in reader.read_column( r, net )[1]:
+            changes[c].append( ( net, v ) )
+        for c in range( c0, c1 ):
+          yield reader.first_cycle + c, changes.get( c, () )
+
+    write_vcd( f, reader.header, cycles() )
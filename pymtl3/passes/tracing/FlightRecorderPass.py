@@ -0,0 +1,164 @@
+"""
+========================================================================
+FlightRecorderPass.py
+========================================================================
+Keep the value changes of the last recorder_cycles cycles in memory and
+only write a waveform when asked to, e.g. when a test fails. The
+recorder is a ring buffer of preallocated per-cycle lists of
+( net, value ) changes. When a cycle is overwritten, its changes are
+applied to the values before the oldest recorded cycle, so the cost per
+cycle only depends on the number of changes.
+
+top.dump_flight_recorder( file_name=None ) writes the recorded cycles
+to a VCD file or to a binary waveform readable by BinaryWaveReader,
+depending on recorder_format, and returns the path. The timestamps of
+the VCD file are the same as if VcdGenerationPass had dumped the whole
+simulation.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+import os
+
+from pymtl3.dsl import MetadataKey
+from pymtl3.passes.BasePass import BasePass
+from pymtl3.passes.sim.SimHooks import TRACING_PRIORITY, SimHooks, add_hook
+
+from .BinaryWavePass import (
+    BinaryWaveWriter,
+    collect_wave_nets,
+    gen_record_func,
+    make_wave_header,
+    write_vcd,
+)
+
+
+class FlightRecorderPass( BasePass ):
+
+  # FlightRecorderPass public pass data
+
+  #: The number of the last cycles to keep. The recorder is disabled if
+  #: it is 0.
+  #:
+  #: Type: ``int``; input
+  #:
+  #: Default value: 0
+  recorder_cycles = MetadataKey(int)
+
+  #: The name of the dumped file without the suffix. The class name of
+  #: top is used if it is "".
+  #:
+  #: Type: ``str``; input
+  #:
+  #: Default value: ""
+  recorder_file_name = MetadataKey(str)
+
+  #: The format of the dumped file, either 'vcd' or 'pwave'.
+  #:
+  #: Type: ``str``; input
+  #:
+  #: Default value: 'vcd'
+  recorder_format = MetadataKey(str)
+
+  #: The function that records the values of one cycle.
+  #:
+  #: Type: ``callable``; output
+  record_func = MetadataKey()
+
+  def __call__( self, top ):
+    if not top.has_metadata( self.recorder_cycles ):
+      return
+    size = top.get_metadata( self.recorder_cycles )
+    if not size:
+      return
+
+    assert not top.has_metadata( self.record_func )
+
+    file_name = ""
+    if top.has_metadata( self.recorder_file_name ):
+      file_name = top.get_metadata( self.recorder_file_name )
+    file_name = str(file_name) or top.__class__.__name__
+
+    fmt = 'vcd'
+    if top.has_metadata( self.recorder_format ):
+      fmt = top.get_metadata( self.recorder_format )
+    if fmt not in ( 'vcd', 'pwave' ):
+      raise ValueError( f"Unknown flight recorder format '{fmt}', please use 'vcd' or 'pwave'" )
+
+    nets, clock, scopes = collect_wave_nets( top )
+    header = make_wave_header( top, nets, scopes )
+
+    recorder = FlightRecorder( header, size )
+    record = [ None ]
+
+    def bind():
+      record[0] = recorder.gen_record_func( top, nets )
+
+    def record_cycle():
+      if record[0] is None:
+        bind()
+      record[0]()
+
+    def dump( file_name=file_name ):
+      return recorder.dump( file_name, fmt )
+
+    top.set_metadata( self.record_func, record_cycle )
+    add_hook( top, SimHooks.lock_in_hooks, 'FlightRecorderPass', TRACING_PRIORITY,
+              bind )
+    top.dump_flight_recorder = dump
+
+#-------------------------------------------------------------------------
+# FlightRecorder
+#-------------------------------------------------------------------------
+
+class FlightRecorder:
+
+  def __init__( s, header, size ):
+    s.header = header
+    s.size   = size
+
+    nnets = len( header['nets'] )
+    # The values before the oldest recorded cycle
+    s.base  = [ x['init'] for x in header['nets'] ]
+    s.last  = [ None ] * nnets
+    s.slots = [ [] for _ in range(size) ]
+    s.ncycles = [ 0 ]
+
+  def gen_record_func( s, top, nets ):
+    for i in range( len(nets) ):
+      s.last[i] = None
+
+    return gen_record_func( top, nets, s.last,
+      { 'N': s.ncycles, 'R': s.slots, 'B': s.base },
+      head   = [ "n = N[0]",
+                 f"ch = R[n % {s.size}]",
+                 "for i, v in ch:",
+                 "  B[i] = v",
+                 "ch.clear()" ],
+      record = "ch.append( ( {i}, {v} ) )",
+      tail   = [ "N[0] = n + 1" ] )
+
+  def get_cycles( s ):
+    """ Return the first recorded cycle, the values before it, and the
+    list of changes of every recorded cycle. """
+    n = s.ncycles[0]
+    first = max( 0, n - s.size )
+    return first, list( s.base ), [ list( s.slots[ c % s.size ] ) for c in range( first, n ) ]
+
+  def dump( s, file_name, fmt ):
+    first, base, changes = s.get_cycles()
+
+    header = dict( s.header, first_cycle=first,
+                   nets=[ dict( x, init=v ) for x, v in zip( s.header['nets'], base ) ] )
+
+    path = f"{file_name}.{fmt}"
+    if fmt == 'vcd':
+      with open( path, 'w', buffering=1<<20 ) as f:
+        write_vcd( f, header, enumerate( changes, first ) )
+    else:
+      writer = BinaryWaveWriter( path, header )
+      for x in changes:
+        writer.write_cycle( x )
+      writer.close()
+
+    return os.path.abspath( path )
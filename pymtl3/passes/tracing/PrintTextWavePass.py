@@ -22,6 +22,8 @@ from pymtl3.dsl import Const, MetadataKey
 from pymtl3.passes.BasePass import BasePass
 from pymtl3.passes.errors import PassOrderError
 
+from .TraceSelection import select_traced_signals
+
 
 class PrintTextWavePass( BasePass ):
 
@@ -221,9 +223,13 @@ class PrintTextWavePass( BasePass ):
     text_sigs = {}
 
     # Now we create per-cycle signal value collect functions
+    # Only trace the signals picked by TraceSelection, None means all
+    selected = select_traced_signals( top )
+
     signal_names = []
     for x in top._dsl.all_signals:
-      if x.is_top_level_signal() and x.get_field_name() != "clk" and x.get_field_name() != "reset":
+      if x.is_top_level_signal() and x.get_field_name() != "clk" and x.get_field_name() != "reset" and \
+         ( selected is None or x in selected ):
         signal_names.append( (x._dsl.level, repr(x)) )
 
     for _, x in [(0, 's.reset')] + sorted(signal_names):
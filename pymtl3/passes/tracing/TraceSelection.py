@@ -0,0 +1,135 @@
+"""
+========================================================================
+TraceSelection.py
+========================================================================
+Select the signals that VcdGenerationPass, BinaryWavePass,
+FlightRecorderPass and PrintTextWavePass trace. Signals are named like
+repr(signal), e.g. "s.inners[0].out". A pattern is either a string glob,
+in which * matches any characters including dots, ? matches one
+character, and everything else including [ and ] is literal, or a
+compiled regular expression that has to match the whole name.
+
+- include: only trace the signals that match one of the patterns.
+- exclude: don't trace the signals that match one of the patterns.
+- max_depth: only trace the signals of components at most max_depth
+  levels below top, which is at level 0.
+- trace: set on a component, True traces all signals of the component
+  and its children regardless of the above, and False traces none of
+  them. The setting of the closest component wins.
+
+The clock and reset of top are always traced. If none of the keys is
+set, everything is traced as before.
+
+Author : Batten Research Group
+Date   : Oct 17, 2026
+"""
+import re
+
+from pymtl3.dsl import MetadataKey
+
+
+class TraceSelection:
+
+  #: The patterns of the signals to trace.
+  #:
+  #: Type: ``list`` of ``str`` or ``re.Pattern``; input
+  #:
+  #: Default value: all signals
+  include = MetadataKey(list)
+
+  #: The patterns of the signals not to trace.
+  #:
+  #: Type: ``list`` of ``str`` or ``re.Pattern``; input
+  #:
+  #: Default value: []
+  exclude = MetadataKey(list)
+
+  #: The deepest level of components whose signals are traced.
+  #:
+  #: Type: ``int``; input
+  #:
+  #: Default value: no limit
+  max_depth = MetadataKey(int)
+
+  #: Set on any component to trace all or none of its signals and the
+  #: signals of its children.
+  #:
+  #: Type: ``bool``; input
+  trace = MetadataKey(bool)
+
+def _compile_patterns( patterns ):
+  regexes = []
+  for x in patterns:
+    if isinstance( x, re.Pattern ):
+      regexes.append( x )
+    else:
+      x = re.escape( x ).replace( r'\*', '.*' ).replace( r'\?', '.' )
+      regexes.append( re.compile( x ) )
+  return regexes
+
+def select_traced_signals( top ):
+  """ Return the set of selected top-level signals, or None if all of
+  them are traced. """
+  components = [ c for c in top._dsl.all_components if c.has_metadata( TraceSelection.trace ) ]
+
+  keys = [ TraceSelection.include, TraceSelection.exclude, TraceSelection.max_depth ]
+  if not components and not any( top.has_metadata( x ) for x in keys ):
+    return None
+
+  include = None
+  if top.has_metadata( TraceSelection.include ):
+    include = _compile_patterns( top.get_metadata( TraceSelection.include ) )
+
+  exclude = []
+  if top.has_metadata( TraceSelection.exclude ):
+    exclude = _compile_patterns( top.get_metadata( TraceSelection.exclude ) )
+
+  max_depth = None
+  if top.has_metadata( TraceSelection.max_depth ):
+    max_depth = top.get_metadata( TraceSelection.max_depth )
+
+  # The closest component with the trace key decides for its subtree
+  decisions = {}
+  def get_decision( c ):
+    if c not in decisions:
+      if c.has_metadata( TraceSelection.trace ):
+        decisions[c] = c.get_metadata( TraceSelection.trace )
+      else:
+        parent = c.get_parent_object()
+        decisions[c] = None if parent is None else get_decision( parent )
+    return decisions[c]
+
+  selected = { top.clk, top.reset }
+  for x in top._dsl.all_signals:
+    if not x.is_top_level_signal():
+      continue
+
+    host = x.get_host_component()
+    decision = get_decision( host ) if components else None
+    if decision is not None:
+      if decision:
+        selected.add( x )
+      continue
+
+    if max_depth is not None and host._dsl.level > max_depth:
+      continue
+
+    name = repr(x)
+    if include is not None and not any( p.fullmatch( name ) for p in include ):
+      continue
+    if any( p.fullmatch( name ) for p in exclude ):
+      continue
+    selected.add( x )
+
+  return selected
+
+def get_traced_components( top, selected ):
+  """ Return the set of components that host a selected signal or have
+  a child that does. """
+  ret = set()
+  for x in selected:
+    c = x.get_host_component()
+    while c is not None and c not in ret:
+      ret.add( c )
+      c = c.get_parent_object()
+  return ret
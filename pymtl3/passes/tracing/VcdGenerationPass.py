@@ -8,13 +8,46 @@ Date   : Sep 8, 2019
 """
 
 import time
+import weakref
 from collections import defaultdict
 
-from pymtl3.datatypes import Bits, concat
+import py
+
+from pymtl3.datatypes import Bits, concat, is_bitstruct_class
 from pymtl3.dsl import Const, MetadataKey
+from pymtl3.extra.pypy import custom_exec
 from pymtl3.passes.BasePass import BasePass
 from pymtl3.passes.errors import PassOrderError
+from pymtl3.passes.sim.DynamicSchedulePass import gen_raw_value_src
+from pymtl3.passes.sim.SimHooks import TRACING_PRIORITY, SimHooks, add_hook
+
+from .TraceSelection import get_traced_components, select_traced_signals
+
+# Utility generator to create new symbols for each VCD signal.
+# Code inspired by MyHDL 0.7.
+# Shunning: I just reuse it from pymtl v2
+
+def gen_vcd_symbols():
 
+  # Generate a string containing all valid vcd symbol characters
+  _codechars = ''.join([chr(i) for i in range(33, 127)])
+  _mod       = len(_codechars)
+
+  # Generator logic
+  n = 0
+  while True:
+    q, r = divmod(n, _mod)
+    code = _codechars[r]
+    while q > 0:
+      q, r = divmod(q, _mod)
+      code = _codechars[r] + code
+    yield code
+    n += 1
+
+# Vcd file takes a(0) instead of a[0]
+def vcd_mangle_name( name ):
+  # signal names with colons in it silently fail gtkwave
+  return name.replace('[','(').replace(']',')').replace(':', '__')
 
 class VcdGenerationPass( BasePass ):
 
@@ -27,8 +60,21 @@ class VcdGenerationPass( BasePass ):
   #: Default value: ""
   vcd_file_name = MetadataKey(str)
 
+  #: The number of cycles between two flushes of the buffered output.
+  #: The output is also flushed when top is garbage collected or at exit.
+  #:
+  #: Type: ``int``; input
+  #:
+  #: Default value: 10000
+  vcd_flush_interval = MetadataKey(int)
+
   vcd_func = MetadataKey()
 
+  #: The function that flushes the buffered output to the file.
+  #:
+  #: Type: ``callable``; output
+  vcd_flush_func = MetadataKey()
+
   def __call__( self, top ):
     if top.has_metadata( self.vcd_file_name ):
       vcd_file_name = top.get_metadata( self.vcd_file_name )
@@ -44,7 +90,7 @@ class VcdGenerationPass( BasePass ):
     else:
       vcd_file_name = str(top.__class__.__name__) + ".vcd"
 
-    vcd_file = open( vcd_file_name, "w" )
+    vcd_file = open( vcd_file_name, "w", buffering=1<<20 )
 
     # Get vcd timescale
 
@@ -57,28 +103,7 @@ class VcdGenerationPass( BasePass ):
            "$timescale\n {}\n$end\n".format( time.asctime(), vcd_timescale ),
            file=vcd_file )
 
-    # Utility generator to create new symbols for each VCD signal.
-    # Code inspired by MyHDL 0.7.
-    # Shunning: I just reuse it from pymtl v2
-
-    def _gen_vcd_symbol():
-
-      # Generate a string containing all valid vcd symbol characters
-      _codechars = ''.join([chr(i) for i in range(33, 127)])
-      _mod       = len(_codechars)
-
-      # Generator logic
-      n = 0
-      while True:
-        q, r = divmod(n, _mod)
-        code = _codechars[r]
-        while q > 0:
-          q, r = divmod(q, _mod)
-          code = _codechars[r] + code
-        yield code
-        n += 1
-
-    vcd_symbols = _gen_vcd_symbol()
+    vcd_symbols = gen_vcd_symbols()
 
     # Preprocess some metadata
 
@@ -86,10 +111,14 @@ class VcdGenerationPass( BasePass ):
 
     all_components = set()
 
+    # Only trace the signals picked by TraceSelection, None means all
+    selected = select_traced_signals( top )
+    traced   = None if selected is None else get_traced_components( top, selected )
+
     # We only collect top level signals, and squash bitstruct into a long
     # bits object
     for x in top._dsl.all_signals:
-      if x.is_top_level_signal():
+      if x.is_top_level_signal() and ( selected is None or x in selected ):
         host = x.get_host_component()
         component_signals[ host ].add( x )
 
@@ -103,7 +132,8 @@ class VcdGenerationPass( BasePass ):
     for writer, net in top.get_all_value_nets():
       new_net = []
       for x in net:
-        if not isinstance(x, Const) and x.is_top_level_signal():
+        if not isinstance(x, Const) and x.is_top_level_signal() and \
+           ( selected is None or x in selected ):
           new_net.append( x )
           if repr(x) == "s.clk":
             # Hardcode clock net because it needs to go up and down
@@ -125,13 +155,8 @@ class VcdGenerationPass( BasePass ):
     # Inner utility function to perform recursive descent of the model.
     # Shunning: I mostly follow v2's implementation
 
-    # Vcd file takes a(0) instead of a[0]
-    def vcd_mangle_name( name ):
-      # signal names with colons in it silently fail gtkwave
-      return name.replace('[','(').replace(']',')').replace(':', '__')
-
     def recurse_models( m, spaces ):
-      nonlocal vcd_clock_net_idx, vcd_sim_ncycles
+      nonlocal vcd_clock_net_idx
 
       # Special case the top level "s" to "top"
 
@@ -183,7 +208,8 @@ class VcdGenerationPass( BasePass ):
 
       # Recursively visit all submodels.
       for child in m.get_child_components():
-        recurse_models( child, spaces+'  ' )
+        if traced is None or child in traced:
+          recurse_models( child, spaces+'  ' )
 
       print( f"{spaces}$upscope $end", file=vcd_file )
 
@@ -209,10 +235,6 @@ class VcdGenerationPass( BasePass ):
       # Set this to be the last cycle value str
       last_values[i] = bin_str
 
-    # Now we create per-cycle signal value collect functions
-
-    vcd_sim_ncycles = 0
-
     # Separate clock net from normal nets ahead of time
     clock_symbol = net_symbol_mapping[ vcd_clock_net_idx ]
 
@@ -223,46 +245,98 @@ class VcdGenerationPass( BasePass ):
     # Flip clock for the first cycle
     print( '\n#0\nb0b1 {}\n'.format( clock_symbol ), file=vcd_file, flush=True )
 
-    # Returns a dump_vcd function that is ready to be appended to _sched.
-    # TODO: type check?
-
-    # Adding this 's' argument is for eval to correctly evaluate 's.x'...
-    # Python 3 destroys a lot of our hacks .. sigh
-
-    def dump_vcd_inner( s ):
-      nonlocal vcd_sim_ncycles
-
-      for i, (signal, symbol) in enumerate( net_details ):
-
-        # If we encounter a BitStruct then dump it as a concatenation of
-        # all fields.
-        # TODO: treat each field in a BitStruct as a separate signal?
-
-        try:
-          net_bits_bin = eval(repr(signal)).to_bits()
-        except Exception as e:
-          raise TypeError(f'{e}\n - {signal} becomes another type. Please check your code.')
-
-        net_bits_bin_str = net_bits_bin.bin()
-        # `last_value` is the string form of a Bits object in binary
-        # e.g. '0b000' == Bits3(0).bin()
-        # We store strings instead of values ...
-        if last_values[i] != net_bits_bin_str:
-          last_values[i] = net_bits_bin_str
-          print( f'b{net_bits_bin_str} {symbol}', file=vcd_file )
-
-      # Flop clock at the end of cycle
-      next_neg_edge = 100 * vcd_sim_ncycles + 50
-      print( f'\n#{next_neg_edge}\nb0b0 {clock_symbol}', file=vcd_file )
-
-      # Flip clock of the next cycle
-      next_pos_edge = next_neg_edge + 50
-      print( f'#{next_pos_edge}\nb0b1 {clock_symbol}\n', file=vcd_file, flush=True )
-      vcd_sim_ncycles += 1
-
-    def gen_dump_vcd( s ):
-      def dump_vcd():
-        dump_vcd_inner( s )
-      return dump_vcd
+    flush_interval = 10000
+    if top.has_metadata( self.vcd_flush_interval ):
+      flush_interval = max( 1, top.get_metadata( self.vcd_flush_interval ) )
+
+    # Close the file when top is garbage collected or at exit, which
+    # flushes the buffered output
+    weakref.finalize( top, vcd_file.close )
+
+    # The dump function refers to the actual value objects,
+    # which only exist after the simulation is locked in. We generate it
+    # in the lock-in hook, and the placeholder binds it lazily in case
+    # nobody called the hook.
+
+    dump = [ None ]
+    ncycles = [ 0 ]
+
+    def bind():
+      dump[0] = gen_dump_vcd_func( top, net_details, last_values, clock_symbol,
+                                   vcd_file, flush_interval, ncycles )
+
+    def dump_vcd():
+      if dump[0] is None:
+        bind()
+      dump[0]()
+
+    add_hook( top, SimHooks.lock_in_hooks, 'VcdGenerationPass', TRACING_PRIORITY,
+              bind )
+    top.set_metadata( self.vcd_flush_func, vcd_file.flush )
+
+    return dump_vcd
+
+#-------------------------------------------------------------------------
+# gen_dump_vcd_func
+#-------------------------------------------------------------------------
+# Generate a function that compares the raw values of the value objects
+# of all nets with the values of the previous cycle and formats only
+# the changed ones. The output is byte-identical to printing
+# b{value.to_bits().bin()} {symbol} for every changed net.
+
+def gen_dump_vcd_func( top, net_details, last_values, clock_symbol, vcd_file,
+                       flush_interval, ncycles ):
+  mapping = getattr( top._sim, 'signal_object_mapping', {} ) if hasattr( top, '_sim' ) else {}
+
+  _globals = { 'write': vcd_file.write, 'flush': vcd_file.flush, 'N': ncycles,
+               'CLK0': f"b0b0 {clock_symbol}\n", 'CLK1': f"b0b1 {clock_symbol}\n\n" }
+  last = []
+  src  = [ "def dump_vcd():", "  out = []" ]
+
+  for i, (signal, symbol) in enumerate( net_details ):
+    if signal in mapping:
+      value = mapping[ signal ][-1]
+    else:
+      value = eval( repr(signal), { 's': top } )
+
+    Type = signal._dsl.Type
+    raw  = gen_raw_value_src( Type, f"v{i}" )
+    _globals[ f"v{i}" ] = value
+    _globals[ f"S{i}" ] = f" {symbol}\n"
+
+    # The net_details skips the clock net but last_values doesn't,
+    # so the nets after the clock net are first compared against the
+    # default value of the next net. We keep the output the same by
+    # dumping them in the first cycle if the strings differ.
+    default = Type()
+    if default.to_bits().bin() == last_values[i]:
+      last.append( eval( gen_raw_value_src( Type, "x" ), { 'x': default } ) )
+    else:
+      last.append( None )
 
-    return gen_dump_vcd( top )
+    src.append( f"  x = {raw}" )
+    src.append( f"  if x != L[{i}]:" )
+    src.append( f"    L[{i}] = x" )
+    if is_bitstruct_class( Type ):
+      src.append( f"    out.append( 'b' + v{i}.to_bits().bin() + S{i} )" )
+    else:
+      src.append( f"    out.append( f'b0b{{x:0{value.nbits}b}}' + S{i} )" )
+
+  _globals['L'] = last
+
+  src += [
+    "  n = N[0]",
+    "  # Flop the clock at the end of the cycle and flip it for the next one",
+    "  out.append( f'\\n#{100*n+50}\\n' )",
+    "  out.append( CLK0 )",
+    "  out.append( f'#{100*n+100}\\n' )",
+    "  out.append( CLK1 )",
+    "  write( ''.join( out ) )",
+    "  N[0] = n + 1",
+    f"  if not N[0] % {flush_interval}:",
+    "    flush()",
+  ]
+
+  _locals = {}
+  custom_exec( py.code.Source( "\n".join( src ) ).compile(), _globals, _locals )
+  return _locals['dump_vcd']
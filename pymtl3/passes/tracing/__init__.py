@@ -1,2 +1,5 @@
+from .BinaryWavePass import BinaryWavePass, BinaryWaveReader, binary_wave_to_vcd
+from .FlightRecorderPass import FlightRecorderPass
 from .PrintTextWavePass import PrintTextWavePass
+from .TraceSelection import TraceSelection
 from .VcdGenerationPass import VcdGenerationPass
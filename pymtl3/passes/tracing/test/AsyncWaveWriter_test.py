@@ -0,0 +1,66 @@
+#=========================================================================
+# AsyncWaveWriter_test.py
+#=========================================================================
+#
+# Author : Batten Research Group
+# Date   : Oct 17, 2026
+
+import threading
+
+import pytest
+
+from ..AsyncWaveWriter import AsyncWaveWriter, iter_cycles
+
+
+def capture( writer, changes ):
+  """ Capture one cycle the same way as the generated function. """
+  for i, v in changes:
+    writer.changes += [ i, v ]
+  writer.ends[ writer.ncycles ] = len( writer.changes )
+  writer.ncycles += 1
+  if writer.ncycles == writer.batch_cycles:
+    writer.submit()
+
+def test_batches():
+  written = []
+  writer = AsyncWaveWriter( lambda first, changes, ends:
+                              written.append( ( first, list( iter_cycles( changes, ends ) ) ) ), 3 )
+  for i in range(7):
+    capture( writer, [ ( 0, i ), ( 2, i * 10 ) ] if i % 2 else [] )
+
+  writer.flush()
+  assert [ ( x, len(y) ) for x, y in written ] == [ ( 0, 3 ), ( 3, 3 ), ( 6, 1 ) ]
+  assert [ c for _, y in written for c in y ] == [
+    [ ( 0, i ), ( 2, i * 10 ) ] if i % 2 else [] for i in range(7) ]
+
+  writer.close()
+  writer.close()
+  assert not writer.thread.is_alive()
+
+def test_backpressure():
+  release = threading.Event()
+  writer = AsyncWaveWriter( lambda first, changes, ends: release.wait(), 1, queue_depth=2 )
+
+  # The worker holds one batch and the queue holds two more
+  for i in range(3):
+    capture( writer, [] )
+
+  blocked = threading.Thread( target=lambda: capture( writer, [] ) )
+  blocked.start()
+  blocked.join( 0.2 )
+  assert blocked.is_alive()
+
+  release.set()
+  blocked.join()
+  writer.close()
+  assert writer.first == 4
+
+def test_error():
+  def write_batch( first, changes, ends ):
+    raise OSError( "disk full" )
+
+  writer = AsyncWaveWriter( write_batch, 1 )
+  capture( writer, [] )
+  with pytest.raises( OSError ):
+    writer.flush()
+  writer.close()
@@ -0,0 +1,143 @@
+#=========================================================================
+# BinaryWavePass_test.py
+#=========================================================================
+#
+# Author : Batten Research Group
+# Date   : Oct 17, 2026
+
+import pytest
+
+from pymtl3.datatypes import *
+from pymtl3.dsl import *
+from pymtl3.passes.PassGroups import DefaultPassGroup
+
+from ..BinaryWavePass import BinaryWavePass, BinaryWaveReader, binary_wave_to_vcd
+from ..VcdGenerationPass import VcdGenerationPass
+
+Msg = mk_bitstruct( "BinaryWaveMsg", {
+  'foo' : Bits1,
+  'bar' : Bits13,
+} )
+
+class Inner( Component ):
+  def construct( s ):
+    s.in_ = InPort( Msg )
+    s.out = OutPort( Bits13 )
+    s.acc = Wire( Bits13 )
+
+    @update_ff
+    def up_acc():
+      s.acc <<= s.acc + s.in_.bar
+
+    @update
+    def up_out():
+      s.out @= s.acc if s.in_.foo else 0
+
+class Outer( Component ):
+  def construct( s ):
+    s.in_ = InPort( Msg )
+    s.outs = [ OutPort( Bits13 ) for _ in range(3) ]
+    s.inners = [ Inner() for _ in range(3) ]
+    for i in range(3):
+      s.inners[i].in_ //= s.in_
+      s.outs[i] //= s.inners[i].out
+
+NAMES = [ "s.in_", "s.outs[1]", "s.inners[2].acc", "s.inners[0].in_" ]
+
+def run( tmp_path, ncycles, batch_cycles=0, **kwargs ):
+  """ Simulate Outer and return the values of NAMES in every cycle. """
+  top = Outer()
+  top.elaborate()
+  top.set_metadata( BinaryWavePass.chunk_cycles, 7 )
+  top.set_metadata( BinaryWavePass.signals_per_chunk, 2 )
+  top.set_metadata( BinaryWavePass.async_batch_cycles, batch_cycles )
+  top.apply( DefaultPassGroup( print_line_trace=False, binwave=str( tmp_path / "outer" ), **kwargs ) )
+
+  # The dump function observes the values after the update blocks
+  expected = { x: [] for x in NAMES }
+  for i in range( ncycles ):
+    top.in_ @= Msg( i % 3 != 0, (i // 4) * 300 )
+    top.sim_eval_combinational()
+    for x in NAMES:
+      expected[x].append( int( eval( x, { 's': top } ).to_bits() ) )
+    top.sim_tick()
+
+  top.get_metadata( BinaryWavePass.wave_close_func )()
+  return top, expected
+
+@pytest.mark.parametrize( "batch_cycles", [ 0, 3 ] )
+def test_reader( tmp_path, batch_cycles ):
+  top, expected = run( tmp_path, 50, batch_cycles )
+
+  with BinaryWaveReader( tmp_path / "outer.pwave" ) as r:
+    assert r.num_cycles == 50
+    assert len( r.ranges ) == 8
+    assert set( NAMES ) <= set( r.signals )
+    assert r.get_nbits( "s.in_" ) == 14
+
+    for x in NAMES:
+      assert [ r.get_value( x, c ) for c in range(50) ] == expected[x]
+
+    # A window only decompresses the chunks that overlap it
+    r._cache.clear()
+    r.num_chunk_loads = 0
+    changes = r.get_changes( "s.in_", 9, 20 )
+    assert r.num_chunk_loads == 2
+
+    golden = [ ( 9, expected["s.in_"][9] ) ]
+    for c in range( 10, 20 ):
+      if expected["s.in_"][c] != expected["s.in_"][c-1]:
+        golden.append( ( c, expected["s.in_"][c] ) )
+    assert changes == golden
+
+    assert r.get_changes( "s.in_", 60 ) == []
+    with pytest.raises( ValueError ):
+      r.get_changes( "s.clk" )
+    with pytest.raises( KeyError ):
+      r.get_changes( "s.nothing" )
+
+def read_vcd( file_name ):
+  """ Return the values of every signal at every cycle of a VCD file
+  written by VcdGenerationPass. """
+  with open( file_name ) as f:
+    lines = f.read().split("\n")
+
+  scopes, names, values, cycles = [], {}, {}, {}
+  for line in lines:
+    words = line.replace('(','[').replace(')',']').split()
+    if not words:
+      continue
+    if words[0] == "$scope":
+      scopes.append( 's' if words[2] == 'top' else words[2] )
+    elif words[0] == "$upscope":
+      scopes.pop()
+    elif words[0] == "$var":
+      names[ ".".join( scopes + [ words[4] ] ) ] = words[3]
+    elif line.startswith( "b" ):
+      values[ words[1] ] = int( words[0][3:], 2 )
+    elif line.startswith( "#" ) and int( line[1:] ) % 100 == 50:
+      for name, symbol in names.items():
+        cycles.setdefault( name, [] ).append( values[ symbol ] )
+  return cycles
+
+@pytest.mark.parametrize( "batch_cycles", [ 0, 4 ] )
+def test_to_vcd( tmp_path, batch_cycles ):
+  top, expected = run( tmp_path, 30, batch_cycles, vcdwave=str( tmp_path / "direct" ) )
+  binary_wave_to_vcd( tmp_path / "outer.pwave", tmp_path / "converted.vcd" )
+
+  converted = read_vcd( tmp_path / "converted.vcd" )
+  for x in NAMES:
+    assert converted[x] == expected[x]
+
+  # Same as the VCD written during the simulation
+  top.get_metadata( VcdGenerationPass.vcd_flush_func )()
+  direct = read_vcd( tmp_path / "direct.vcd" )
+  assert converted == direct
+
+def test_not_closed( tmp_path ):
+  top = Outer()
+  top.elaborate()
+  top.apply( DefaultPassGroup( print_line_trace=False, binwave=str( tmp_path / "outer" ) ) )
+  top.sim_tick()
+  with pytest.raises( ValueError ):
+    BinaryWaveReader( tmp_path / "outer.pwave" )
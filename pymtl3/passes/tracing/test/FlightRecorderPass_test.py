@@ -0,0 +1,103 @@
+#=========================================================================
+# FlightRecorderPass_test.py
+#=========================================================================
+#
+# Author : Batten Research Group
+# Date   : Oct 17, 2026
+
+import pytest
+
+from pymtl3.datatypes import *
+from pymtl3.dsl import *
+from pymtl3.passes.PassGroups import DefaultPassGroup
+
+from ..BinaryWavePass import BinaryWaveReader
+from ..FlightRecorderPass import FlightRecorderPass
+
+Msg = mk_bitstruct( "FlightRecorderMsg", {
+  'foo' : Bits1,
+  'bar' : Bits7,
+} )
+
+class Acc( Component ):
+  def construct( s ):
+    s.in_ = InPort( Msg )
+    s.out = OutPort( Bits16 )
+    s.acc = Wire( Bits16 )
+
+    @update_ff
+    def up_acc():
+      if s.in_.foo:
+        s.acc <<= s.acc + zext( s.in_.bar, 16 )
+
+    s.out //= s.acc
+
+class Top( Component ):
+  def construct( s ):
+    s.in_  = InPort( Msg )
+    s.out  = OutPort( Bits16 )
+    s.acc  = Acc()
+    s.acc.in_ //= s.in_
+    s.out //= s.acc.out
+
+def run( tmp_path, ncycles, size, fmt ):
+  top = Top()
+  top.elaborate()
+  top.set_metadata( FlightRecorderPass.recorder_file_name, str( tmp_path / "last" ) )
+  top.set_metadata( FlightRecorderPass.recorder_format, fmt )
+  top.apply( DefaultPassGroup( print_line_trace=False, flight_recorder=size ) )
+
+  # The recorder observes the values after the update blocks
+  expected = { "s.in_": [], "s.out": [] }
+  for i in range( ncycles ):
+    top.in_ @= Msg( i % 3 != 0, i )
+    top.sim_eval_combinational()
+    expected["s.in_"].append( int( top.in_.to_bits() ) )
+    expected["s.out"].append( int( top.out ) )
+    top.sim_tick()
+  return top, expected
+
+def test_pwave( tmp_path ):
+  top, expected = run( tmp_path, 50, 16, 'pwave' )
+  path = top.dump_flight_recorder()
+  assert path.endswith( "last.pwave" )
+
+  with BinaryWaveReader( path ) as r:
+    assert r.first_cycle == 34 and r.num_cycles == 16
+    for name, values in expected.items():
+      assert [ r.get_value( name, c ) for c in range(16) ] == values[34:]
+
+  # The recorder keeps running after a dump
+  top.sim_tick()
+  with BinaryWaveReader( top.dump_flight_recorder() ) as r:
+    assert r.first_cycle == 35
+
+def test_vcd( tmp_path ):
+  top, expected = run( tmp_path, 30, 8, 'vcd' )
+  path = top.dump_flight_recorder( str( tmp_path / "explicit" ) )
+
+  with open( path ) as f:
+    text = f.read()
+
+  # The timestamps continue from the simulation
+  assert "\n#2200\nb0b1 " in text
+  assert "\n#2950\nb0b0 " in text
+  assert "\n#2150\n" not in text
+  assert f"b0b{expected['s.out'][-1]:016b} " in text
+
+def test_short_run( tmp_path ):
+  top, expected = run( tmp_path, 5, 16, 'pwave' )
+  with BinaryWaveReader( top.dump_flight_recorder() ) as r:
+    assert r.first_cycle == 0 and r.num_cycles == 5
+    assert [ r.get_value( "s.out", c ) for c in range(5) ] == expected["s.out"]
+
+def test_disabled():
+  top = Top()
+  top.elaborate()
+  top.apply( DefaultPassGroup( print_line_trace=False ) )
+  assert not hasattr( top, "dump_flight_recorder" )
+  assert not top.has_metadata( FlightRecorderPass.record_func )
+
+def test_bad_format( tmp_path ):
+  with pytest.raises( ValueError ):
+    run( tmp_path, 1, 4, 'fst' )
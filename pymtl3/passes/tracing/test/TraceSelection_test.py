@@ -0,0 +1,124 @@
+#=========================================================================
+# TraceSelection_test.py
+#=========================================================================
+#
+# Author : Batten Research Group
+# Date   : Oct 17, 2026
+
+import re
+
+from pymtl3.datatypes import *
+from pymtl3.dsl import *
+from pymtl3.passes.PassGroups import DefaultPassGroup
+
+from ..BinaryWavePass import BinaryWavePass, BinaryWaveReader
+from ..PrintTextWavePass import PrintTextWavePass
+from ..TraceSelection import TraceSelection, select_traced_signals
+
+
+class Inner( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits8 )
+    s.out = OutPort( Bits8 )
+    s.acc = Wire( Bits8 )
+
+    @update_ff
+    def up_acc():
+      s.acc <<= s.acc + s.in_
+
+    s.out //= s.acc
+
+class Outer( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits8 )
+    s.outs = [ OutPort( Bits8 ) for _ in range(3) ]
+    s.inners = [ Inner() for _ in range(3) ]
+    for i in range(3):
+      s.inners[i].in_ //= s.in_
+      s.outs[i] //= s.inners[i].out
+
+def make_top( **kwargs ):
+  top = Outer()
+  top.elaborate()
+  for key, value in kwargs.items():
+    top.set_metadata( getattr( TraceSelection, key ), value )
+  return top
+
+def selected_names( top ):
+  return { repr(x) for x in select_traced_signals( top ) }
+
+def test_nothing_set():
+  assert select_traced_signals( make_top() ) is None
+
+def test_glob():
+  top = make_top( include=[ "s.inners[0].*", "s.outs[?]" ] )
+  assert selected_names( top ) == {
+    "s.clk", "s.reset", "s.outs[0]", "s.outs[1]", "s.outs[2]",
+    "s.inners[0].clk", "s.inners[0].reset",
+    "s.inners[0].in_", "s.inners[0].out", "s.inners[0].acc",
+  }
+
+def test_regex_and_exclude():
+  top = make_top( include=[ re.compile( r"s\.inners\[[01]\]\..*" ) ],
+                  exclude=[ "*.clk", "*.reset", "*.in_" ] )
+  assert selected_names( top ) == {
+    "s.clk", "s.reset",
+    "s.inners[0].out", "s.inners[0].acc",
+    "s.inners[1].out", "s.inners[1].acc",
+  }
+
+def test_max_depth():
+  top = make_top( max_depth=0 )
+  assert selected_names( top ) == {
+    "s.clk", "s.reset", "s.in_", "s.outs[0]", "s.outs[1]", "s.outs[2]",
+  }
+
+def test_component_trace():
+  top = make_top( max_depth=0, exclude=[ "s.outs*" ] )
+  # The closest component with the key wins over the patterns and depth
+  top.inners[1].set_metadata( TraceSelection.trace, True )
+  top.set_metadata( TraceSelection.trace, False )
+  assert selected_names( top ) == {
+    "s.clk", "s.reset",
+    "s.inners[1].clk", "s.inners[1].reset",
+    "s.inners[1].in_", "s.inners[1].out", "s.inners[1].acc",
+  }
+
+def run( top, ncycles, **kwargs ):
+  top.apply( DefaultPassGroup( print_line_trace=False, **kwargs ) )
+  for i in range( ncycles ):
+    top.in_ @= i
+    top.sim_tick()
+
+def test_vcd( tmp_path ):
+  top = make_top( include=[ "s.inners[2].acc", "s.in_" ] )
+  run( top, 5, vcdwave=str( tmp_path / "outer" ) )
+  del top
+
+  with open( tmp_path / "outer.vcd" ) as f:
+    text = f.read()
+
+  # Components without traced signals get no scope
+  assert "$scope module inners(2) $end" in text
+  assert "inners(0)" not in text and "inners(1)" not in text
+  assert text.count( "$var " ) == 4
+  assert " acc $end" in text and " in_ $end" in text
+  assert " outs(" not in text
+
+def test_binary_wave( tmp_path ):
+  top = make_top( include=[ "s.inners[1].*" ], exclude=[ "*.clk", "*.reset" ] )
+  run( top, 5, binwave=str( tmp_path / "outer" ) )
+  top.get_metadata( BinaryWavePass.wave_close_func )()
+
+  with BinaryWaveReader( tmp_path / "outer.pwave" ) as r:
+    assert set( r.signals ) == { "s.clk", "s.reset", "s.inners[1].in_",
+                                 "s.inners[1].out", "s.inners[1].acc" }
+    assert [ x['name'] for x in r.header['scopes']['children'] ] == [ "inners[1]" ]
+    assert r.get_value( "s.inners[1].in_", 4 ) == 4
+
+def test_textwave():
+  top = make_top( max_depth=0, exclude=[ "s.outs[1]" ] )
+  run( top, 3, textwave=True )
+  sigs = top.get_metadata( PrintTextWavePass.textwave_dict )
+  assert set( sigs ) == { "s.reset", "s.in_", "s.outs[0]", "s.outs[2]" }
+  assert len( sigs["s.in_"] ) == 3
@@ -89,3 +89,93 @@ def test_bitstruct_signals():
     [  bs(0, -1), b32(0), b32(-1), ],
     [  bs(0, 42), b32(42), b32(84), ],
   ], tv_in, tv_out )
+
+def ref_dump( top, header ):
+  # The original per-cycle dump: evaluate every net and compare the
+  # strings of the binary values
+  scopes, symbol_signal, order, lines = [], {}, [], header.split("\n")
+  for i, line in enumerate( lines ):
+    words = line.replace('(','[').replace(')',']').split()
+    if words[0] == "$scope":
+      scopes.append( 's' if words[2] == 'top' else words[2] )
+    elif words[0] == "$upscope":
+      scopes.pop()
+    elif words[0] == "$var":
+      symbol_signal.setdefault( words[3], ".".join( scopes + [ words[4] ] ) )
+    elif words[0] == "$enddefinitions":
+      order = [ x.split()[1] for x in lines[i+2:] if x ]
+      last = { x.split()[1]: x.split()[0][1:] for x in lines[i+2:] if x }
+      break
+
+  clk = symbol_signal and [ x for x, y in symbol_signal.items() if y == "s.clk" ][0]
+  ncycles = 0
+
+  def dump():
+    nonlocal ncycles
+    out = []
+    for symbol in order:
+      if symbol == clk:
+        continue
+      value = eval( symbol_signal[ symbol ], { 's': top } ).to_bits().bin()
+      if last[ symbol ] != value:
+        last[ symbol ] = value
+        out.append( f"b{value} {symbol}\n" )
+    out.append( f"\n#{100*ncycles+50}\nb0b0 {clk}\n#{100*ncycles+100}\nb0b1 {clk}\n\n" )
+    ncycles += 1
+    return "".join( out )
+  return dump
+
+def test_byte_identical( tmp_path ):
+  bs = mk_bitstruct( "BitStructType2", {
+    'foo' : Bits1,
+    'bar' : Bits13,
+  } )
+
+  class Inner( Component ):
+    def construct( s ):
+      s.in_ = InPort( bs )
+      s.out = OutPort( Bits13 )
+      s.acc = Wire( Bits13 )
+
+      @update_ff
+      def up_acc():
+        s.acc <<= s.acc + s.in_.bar
+
+      @update
+      def up_out():
+        s.out @= s.acc if s.in_.foo else 0
+
+  class Outer( Component ):
+    def construct( s ):
+      s.in_ = InPort( bs )
+      s.outs = [ OutPort( Bits13 ) for _ in range(2) ]
+      s.inners = [ Inner() for _ in range(2) ]
+      for i in range(2):
+        s.inners[i].in_ //= s.in_
+        s.outs[i] //= s.inners[i].out
+
+  vcd_file_name = str( tmp_path / "byte_identical" )
+  top = Outer()
+  top.elaborate()
+  top.set_metadata( VcdGenerationPass.vcd_file_name, vcd_file_name )
+  top.set_metadata( VcdGenerationPass.vcd_flush_interval, 3 )
+  top.apply( DefaultPassGroup( print_line_trace=False ) )
+
+  with open( vcd_file_name+".vcd" ) as f:
+    header = f.read()
+  header = header[ header.index("$scope"): header.index("\n#0\n") ]
+  ref = ref_dump( top, header )
+
+  # The dump function observes the values after the update blocks
+  expected = []
+  for i in range(20):
+    top.in_ @= bs( i % 3 != 0, i * 300 )
+    top.sim_eval_combinational()
+    expected.append( ref() )
+    top.sim_tick()
+
+  top.get_metadata( VcdGenerationPass.vcd_flush_func )()
+  with open( vcd_file_name+".vcd" ) as f:
+    output = f.read()
+  assert output.endswith( "".join( expected ) )
+  assert output.count( "b0b1 " ) == 21
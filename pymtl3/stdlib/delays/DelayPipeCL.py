@@ -13,17 +13,19 @@ from pymtl3.extra import clone_deepcopy
 
 # This delay pipe is for cycle-level performance modeling purpose
 
-class DelayPipeDeqCL( Component ):
+class DelayPipeDeqCL( Dormant, Component ):
 
   @non_blocking( lambda s: s.pipeline[0] is None )
   def enq( s, msg ):
     assert s.pipeline[0] is None
     s.pipeline[0] = clone_deepcopy(msg)
+    s.nmsgs += 1
 
   @non_blocking( lambda s: s.pipeline[-1] is not None )
   def deq( s ):
     ret = s.pipeline[-1]
     s.pipeline[-1] = None
+    s.nmsgs -= 1
     return ret
 
   @non_blocking( lambda s: True )
@@ -37,6 +39,9 @@ class DelayPipeDeqCL( Component ):
 
     s.trace_len = trace_len
 
+    # The number of messages in the pipeline
+    s.nmsgs = 0
+
     if delay == 0: # This is essentially a bypass queue
       s.pipeline = [ None ]
 
@@ -51,6 +56,12 @@ class DelayPipeDeqCL( Component ):
       def up_delay():
         if s.pipeline[-1] is None:
           s.pipeline.rotate()
+        # Nothing moves until the last entry is dequeued or a new message
+        # is enqueued into the empty pipeline
+        if s.pipeline[-1] is not None or s.nmsgs == 0:
+          s.sleep( up_delay )
+
+      s.wake_on( up_delay, s.enq, s.deq )
 
       # Model decoupled pipe behavior to cut cyclic dependencies.
       # Basically no matter in what order s.deq and s.enq are called,
@@ -67,6 +78,23 @@ class DelayPipeDeqCL( Component ):
         U(up_delay) < M(s.enq.rdy),
       )
 
+  # Fast-forward hooks
+
+  def next_event( s ):
+    # The receiver already had the chance to dequeue the last entry in
+    # this cycle, so the pipe is waiting for the receiver
+    if s.pipeline[-1] is not None:
+      return None
+    # Otherwise the frontmost message reaches the end in a few cycles
+    for i in range( len(s.pipeline) - 2, -1, -1 ):
+      if s.pipeline[i] is not None:
+        return s.delay - i
+    return None
+
+  def skip_cycles( s, ncycles ):
+    if s.delay > 0 and s.pipeline[-1] is None:
+      s.pipeline.rotate( ncycles % len(s.pipeline) )
+
   def line_trace( s ):
     return "[{}]".format( "".join( [ " " if x is None else "*" for x in list(s.pipeline)[:-1] ] ) )
 
@@ -93,6 +121,8 @@ class DelayPipeSendCL( Component ):
       s.enq = CalleeIfcCL( Type=None, method=s.enq_pipe, rdy=s.enq_rdy_pipe )
       s.pipeline = deque( [None]*delay, maxlen=delay )
 
+      s.stalled = False
+
       @update_once
       def up_delay():
         if s.pipeline[-1] is not None:
@@ -100,6 +130,9 @@ class DelayPipeSendCL( Component ):
             s.send( s.pipeline[-1] )
             s.pipeline[-1] = None
             s.pipeline.rotate()
+            s.stalled = False
+          else:
+            s.stalled = True
         else:
           s.pipeline.rotate()
 
@@ -108,6 +141,23 @@ class DelayPipeSendCL( Component ):
         M(s.enq.rdy) > U(up_delay),  # pipe behavior
       )
 
+  # Fast-forward hooks
+
+  def next_event( s ):
+    if s.delay == 0:
+      return None
+    if s.pipeline[-1] is not None:
+      # Either waiting for the receiver or sending in the next cycle
+      return None if s.stalled else 0
+    for i in range( len(s.pipeline) - 2, -1, -1 ):
+      if s.pipeline[i] is not None:
+        return s.delay - i
+    return None
+
+  def skip_cycles( s, ncycles ):
+    if s.delay > 0 and s.pipeline[-1] is None:
+      s.pipeline.rotate( ncycles % s.delay )
+
   def line_trace( s ):
     if s.delay > 0:
       return "[{}]".format( "".join( [ " " if x is None else "*" for x in s.pipeline ] ) )
@@ -11,6 +11,7 @@
 from random import Random
 
 from pymtl3 import *
+from pymtl3.passes.sim.PrepareSimPass import PrepareSimPass
 
 # This stall is for testing purpose
 # Recv side has a random stall
@@ -29,11 +30,19 @@ class StallCL( Component ):
     s.stall_prob = stall_prob
     s.stall_rgen = Random( stall_seed ) # Separate randgen for each injector
 
+    # The random generator keeps advancing across resets
+    s.set_metadata( PrepareSimPass.reset_snapshot, False )
+
     s.add_constraints(
       M(s.recv)     == M(s.send),  # pass_through
       M(s.recv.rdy) == M(s.send.rdy),  # pass_through
     )
 
+  # Fast-forward hooks. The random generator advances every time recv.rdy
+  # is called, so only a stall-free StallCL can be skipped.
+
+  def next_event( s ):
+    return None if s.stall_prob == 0 else 0
 
   def line_trace( s ):
     return f"{s.recv}"
@@ -208,6 +208,10 @@ class RecvCL2SendRTL( Component ):
   def recv( s, msg ):
     s.entry = clone_deepcopy( msg )
 
+  # Fast-forward hook: entry is reflected in send.en/send.msg
+  def next_event( s ):
+    return None
+
   def line_trace( s ):
     return "{}(){}".format( s.recv, s.send )
 
@@ -241,6 +245,10 @@ class RecvRTL2SendCL( Component ):
 
     s.add_constraints( U( up_recv_rtl_rdy ) < U( up_send_cl ) )
 
+  # Fast-forward hook: the adapter only reacts to recv.en and send.rdy()
+  def next_event( s ):
+    return None
+
   def line_trace( s ):
     return "{}(){}".format(
       s.recv.line_trace(),
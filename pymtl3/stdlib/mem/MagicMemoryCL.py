@@ -141,6 +141,14 @@ class MagicMemoryCL( Component ):
 
           s.resp_qs[i].enq( resp )
 
+  #-----------------------------------------------------------------------
+  # Fast-forward hooks
+  #-----------------------------------------------------------------------
+  # up_mem only reacts to the delay pipes, which declare their own events
+
+  def next_event( s ):
+    return None
+
   #-----------------------------------------------------------------------
   # line_trace
   #-----------------------------------------------------------------------
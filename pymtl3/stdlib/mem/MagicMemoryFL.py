@@ -61,5 +61,9 @@ class MagicMemoryFL( Component ):
     assert len(s.mem) > (addr + len(data))
     s.mem[ addr : addr + len(data) ] = data
 
+  # Fast-forward hook: the memory only changes when it is accessed
+  def next_event( s ):
+    return None
+
   def line_trace( s ):
     return s.trace
@@ -74,17 +74,21 @@ class BypassQueueCL( Component ):
 # NormalQueueCL
 #-------------------------------------------------------------------------
 
-class NormalQueueCL( Component ):
+class NormalQueueCL( Dormant, Component ):
 
   def construct( s, num_entries=1 ):
     s.queue = deque( maxlen=num_entries )
     s.enq_rdy = False
     s.deq_rdy = False
 
-    @update
+    # The ready flags only change after an enq or deq
+    @update_once
     def up_pulse():
       s.enq_rdy = len( s.queue ) < s.queue.maxlen
       s.deq_rdy = len( s.queue ) > 0
+      s.sleep( up_pulse )
+
+    s.wake_on( up_pulse, s.enq, s.deq )
 
     s.add_constraints(
       U( up_pulse ) < M( s.enq.rdy ),
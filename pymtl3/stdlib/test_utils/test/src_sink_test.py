@@ -10,6 +10,7 @@ Author : Yanghui Ou
 import pytest
 
 from pymtl3 import *
+from pymtl3.passes.sim.SimHooks import SimHooks, add_hook
 
 from ..test_helpers import run_sim
 from ..test_sinks import PyMTLTestSinkError, TestSinkCL, TestSinkRTL
@@ -44,6 +45,24 @@ def test_cl_no_delay():
   th = TestHarnessSimple( Bits16, TestSrcCL, TestSinkCL, msgs, msgs )
   run_sim( th )
 
+def test_run_sim_wrapped_sim_tick():
+  msgs  = [ Bits16( 0 ), Bits16( 1 ), Bits16( 2 ), Bits16( 3 ) ]
+  th = TestHarnessSimple( Bits16, TestSrcCL, TestSinkCL, msgs, msgs )
+
+  # A wrapped sim_tick has to be called in every cycle
+  ncalls = [ 0 ]
+  def wrap_sim_tick():
+    sim_tick = th.sim_tick
+    def wrapped():
+      ncalls[0] += 1
+      sim_tick()
+    th.sim_tick = wrapped
+
+  add_hook( th, SimHooks.sim_api_hooks, 'wrap_sim_tick', 100, wrap_sim_tick )
+  run_sim( th )
+  assert th.done()
+  assert ncalls[0] > 3
+
 # int_msgs = [ 0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10 ]
 bit_msgs = [ Bits16( 0 ), Bits16( 1 ), Bits16( 2 ), Bits16( 3 ),
              Bits16( 0 ), Bits16( 1 ), Bits16( 2 ), Bits16( 3 ),
@@ -217,6 +236,33 @@ def test_error_late_msg():
     return
   raise Exception( 'Fail to detect error!')
 
+def test_error_flight_recorder( tmp_path ):
+  th = TestHarnessSimple(
+    Bits16, TestSrcRTL, TestSinkRTL,
+    src_msgs  = [ b16(0xface), b16(0xface) ],
+    sink_msgs = [ b16(0xface), b16(0xdead) ],
+  )
+  cmdline_opts = { 'dump_vcd': False, 'test_verilog': False, 'max_cycles': None,
+                   'dump_vtb': '', 'flight_recorder': 4,
+                   'flight_recorder_file': str( tmp_path / "last" ) }
+  with pytest.raises( PyMTLTestSinkError ):
+    run_sim( th, cmdline_opts )
+
+  # Only the waveform of the last cycles is dumped on failure
+  with open( tmp_path / "last.vcd" ) as f:
+    text = f.read()
+  assert "$var reg 16" in text
+  assert text.count( "\n#" ) == 1 + 2 * 4
+
+def test_no_error_flight_recorder( tmp_path ):
+  msgs = [ b16(0xface), b16(0xface) ]
+  th = TestHarnessSimple( Bits16, TestSrcRTL, TestSinkRTL, msgs, msgs )
+  cmdline_opts = { 'dump_vcd': False, 'test_verilog': False, 'max_cycles': None,
+                   'dump_vtb': '', 'flight_recorder': 4,
+                   'flight_recorder_file': str( tmp_path / "last" ) }
+  run_sim( th, cmdline_opts )
+  assert not ( tmp_path / "last.vcd" ).exists()
+
 #-------------------------------------------------------------------------
 # Customized compare function test
 #-------------------------------------------------------------------------
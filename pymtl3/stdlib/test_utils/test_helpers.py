@@ -14,7 +14,7 @@ import re
 from pymtl3 import *
 from pymtl3.datatypes import is_bitstruct_class
 from pymtl3.passes.backends.verilog import *
-from pymtl3.passes.tracing import VcdGenerationPass
+from pymtl3.passes.tracing import FlightRecorderPass, VcdGenerationPass
 
 #-------------------------------------------------------------------------
 # mk_test_case_table
@@ -113,8 +113,23 @@ def config_model_with_cmdline_opts( top, cmdline_opts, duts ):
   if dump_vcd:
     top.set_metadata( VcdGenerationPass.vcd_file_name, dump_vcd )
 
+  if cmdline_opts.get( 'flight_recorder' ):
+    top.set_metadata( FlightRecorderPass.recorder_cycles, cmdline_opts['flight_recorder'] )
+    top.set_metadata( FlightRecorderPass.recorder_file_name,
+                      cmdline_opts.get( 'flight_recorder_file', '' ) )
+    top.set_metadata( FlightRecorderPass.recorder_format,
+                      cmdline_opts.get( 'flight_recorder_format', 'vcd' ) )
+
   return top
 
+# With the flight recorder, the waveform of the last cycles is
+# only written when the simulation fails.
+
+def dump_flight_recorder( top ):
+  if hasattr( top, 'dump_flight_recorder' ):
+    path = top.dump_flight_recorder()
+    print( f"\nThe waveform of the last cycles is dumped to {path}" )
+
 #------------------------------------------------------------------------------
 # TestVectorSimulator
 #------------------------------------------------------------------------------
@@ -132,15 +147,23 @@ class TestVectorSimulator:
     self.test_vectors        = test_vectors
     self.wait_cycles         = wait_cycles
 
-  def run_test( self, cmdline_opts=None ):
+  # observed is a list of the names of the ports that verify_outputs_func
+  # checks, e.g. [ 'deq_msg', 'out[0]' ]. The logic that cannot affect
+  # them is not simulated.
+
+  def run_test( self, cmdline_opts=None, observed=None ):
 
     cmdline_opts = cmdline_opts or {'dump_vcd': False, 'test_verilog': False, 'dump_vtb': ''}
 
     # Setup the model
     self.model = config_model_with_cmdline_opts( self.model, cmdline_opts, [] )
 
+    if observed is not None:
+      observed = None if cmdline_opts['dump_vcd'] or cmdline_opts.get( 'flight_recorder' ) else \
+                 _get_observed_ports( self.model, [ f"{x}*" for x in observed ] )
+
     try:
-      self.model.apply( DefaultPassGroup(print_line_trace=True) )
+      self.model.apply( DefaultPassGroup(print_line_trace=True, observed=observed) )
       self.model.sim_reset()
 
       for test_vector in self.test_vectors:
@@ -157,9 +180,43 @@ class TestVectorSimulator:
           raise e
 
         self.model.sim_tick()
+    except Exception:
+      dump_flight_recorder( self.model )
+      raise
     finally:
       finalize_verilator( self.model )
 
+  # Run a batch of test vector lists in lockstep, one list per
+  # instance of the model, using the NumPy multi-instance simulator. The
+  # input/output functions get a per-instance view of the model.
+
+  def run_batch_test( self, batch=None ):
+    # Only batch tests need the lowered backend, which also loads NumPy
+    from pymtl3.passes.backends.lowered import NumPySim
+
+    batch = batch or [ self.test_vectors ]
+
+    self.model.elaborate()
+    self.model.apply( NumPySim( len(batch) ) )
+    self.model.sim_reset()
+
+    lanes = [ self.model.sim_lane(i) for i in range(len(batch)) ]
+    for step in range( max( len(x) for x in batch ) ):
+      for lane, test_vectors in zip( lanes, batch ):
+        if step < len(test_vectors):
+          self.set_inputs_func( lane, test_vectors[step] )
+
+      self.model.sim_eval_combinational()
+
+      for i, (lane, test_vectors) in enumerate( zip( lanes, batch ) ):
+        if step < len(test_vectors):
+          try:
+            self.verify_outputs_func( lane, test_vectors[step] )
+          except Exception as e:
+            raise AssertionError( f"Test vector {step} of instance {i} failed:\n{e}" ) from e
+
+      self.model.sim_tick()
+
 def run_sim( model, cmdline_opts=None, line_trace=True, duts=None ):
 
   cmdline_opts = cmdline_opts or {'dump_vcd': False, 'test_verilog': False, 'max_cycles': None, 'dump_vtb': ''}
@@ -176,9 +233,14 @@ def run_sim( model, cmdline_opts=None, line_trace=True, duts=None ):
     # Reset model
     model.sim_reset()
 
-    # Run simulation
-    while not model.done() and model.sim_cycle_count() < max_cycles:
-      model.sim_tick()
+    # Run simulation. sim_run_until doesn't call a sim_tick that has
+    # been replaced after the simulator was created, so we tick it
+    # ourselves in that case.
+    if model.sim_tick is getattr( model._sim, 'run_tick', None ):
+      model.sim_run_until( model.done, max_cycles - model.sim_cycle_count() )
+    else:
+      while not model.done() and model.sim_cycle_count() < max_cycles:
+        model.sim_tick()
 
     # Force a test failure if we timed out
     assert model.sim_cycle_count() < max_cycles
@@ -188,13 +250,31 @@ def run_sim( model, cmdline_opts=None, line_trace=True, duts=None ):
     model.sim_tick()
     model.sim_tick()
 
+  except Exception:
+    dump_flight_recorder( model )
+    raise
   finally:
     finalize_verilator( model )
 
 class RunTestVectorSimError( Exception ):
   pass
 
-def run_test_vector_sim( model, test_vectors, cmdline_opts=None, line_trace=True ):
+# Only the output ports in the test vectors are observed, so
+# with prune_unobserved=True we skip the logic that cannot affect them.
+# We don't prune when dumping waveforms, including the flight recorder,
+# which would show stale values.
+
+def _get_observed_ports( model, port_names ):
+  observed = []
+  for port_full_name in port_names:
+    if port_full_name[-1] == "*":
+      m = re.match( r'(\w+)\[(\d+)\]', port_full_name[:-1] )
+      if m: observed.append( getattr( model, m.group(1) )[ int(m.group(2)) ] )
+      else: observed.append( getattr( model, port_full_name[:-1] ) )
+  return observed
+
+def run_test_vector_sim( model, test_vectors, cmdline_opts=None, line_trace=True,
+                         prune_unobserved=False ):
   cmdline_opts = cmdline_opts or {'dump_vcd': False, 'test_verilog': False, 'dump_vtb': ''}
 
   # First row in test vectors contains port names
@@ -212,9 +292,13 @@ def run_test_vector_sim( model, test_vectors, cmdline_opts=None, line_trace=True
 
   model = config_model_with_cmdline_opts( model, cmdline_opts, [] )
 
+  observed = None
+  if prune_unobserved and not cmdline_opts['dump_vcd'] and not cmdline_opts.get( 'flight_recorder' ):
+    observed = _get_observed_ports( model, port_names )
+
   try:
     # Create a simulator
-    model.apply( DefaultPassGroup(print_line_trace=line_trace) )
+    model.apply( DefaultPassGroup(print_line_trace=line_trace, observed=observed) )
     # Reset model
     model.sim_reset()
 
@@ -314,5 +398,8 @@ run_test_vector_sim received an incorrect value!
     model.sim_tick()
     model.sim_tick()
 
+  except Exception:
+    dump_flight_recorder( model )
+    raise
   finally:
     finalize_verilator( model )
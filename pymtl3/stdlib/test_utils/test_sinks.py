@@ -113,6 +113,20 @@ class TestSinkCL( Component ):
   def done( s ):
     return s.done_flag
 
+  # Fast-forward hooks
+
+  def next_event( s ):
+    if s.error_msg or s.recv_called or s.done_flag != s.all_msg_recved or \
+       s.all_msg_recved != ( s.idx >= len( s.msgs ) ):
+      return 0
+    if s.count > 0: # ready again in count cycles
+      return s.count
+    return None
+
+  def skip_cycles( s, ncycles ):
+    s.cycle_count += ncycles
+    s.count = max( s.count - ncycles, 0 )
+
   # Line trace
   def line_trace( s ):
     return "{}".format( s.recv )
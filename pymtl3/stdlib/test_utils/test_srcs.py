@@ -25,6 +25,7 @@ class TestSrcCL( Component ):
 
     s.count  = initial_delay
     s.delay  = interval_delay
+    s.stalled = False
 
     @update_once
     def up_src_send():
@@ -34,10 +35,26 @@ class TestSrcCL( Component ):
         if s.send.rdy() and s.msgs:
           s.send( s.msgs.popleft() )
           s.count = s.delay # reset count after a message is sent
+          s.stalled = False
+        else:
+          s.stalled = True
 
   def done( s ):
     return not s.msgs
 
+  # Fast-forward hooks
+
+  def next_event( s ):
+    if not s.msgs:
+      return None
+    if s.count > 0:
+      return s.count + 1
+    # Waiting for the receiver to become ready
+    return None if s.stalled else 0
+
+  def skip_cycles( s, ncycles ):
+    s.count = max( s.count - ncycles, 0 )
+
   # Line trace
 
   def line_trace( s ):
@@ -34,6 +34,13 @@ def pytest_addoption(parser):
                     default=None, help="dump verilog test bench for each test" )
   group.addoption( "--max-cycles", dest="max_cycles", action="store",
                     default=None, help="max cycles of simulation" )
+  group.addoption( "--flight-recorder", dest="flight_recorder", action="store",
+                    default=None, nargs='?', const='10000',
+                    help="keep the waveform of the last N cycles (default 10000) "
+                         "in memory and dump it only if the test fails" )
+  group.addoption( "--flight-recorder-format", dest="flight_recorder_format",
+                    action="store", default='vcd', choices=[ 'vcd', 'pwave' ],
+                    help="format of the flight recorder waveform" )
 
 @pytest.fixture
 def cmdline_opts( request ):
@@ -80,6 +87,8 @@ def _any_opts_present( config ):
       ( 'dump_vcd',     None ),
       ( 'dump_vtb',     None ),
       ( 'max_cycles',   None ),
+      ( 'flight_recorder', None ),
+      ( 'flight_recorder_format', 'vcd' ),
   ]
   return any([config.getoption(opt) != val for opt, val in opt_default_pairs])
 
@@ -125,4 +134,19 @@ def _parse_opts_from_request( request ):
       raise Exception("command line option `--max-cycles` should have integer value!")
   opts['max_cycles'] = max_cycles
 
+  # flight_recorder
+  flight_recorder = request.config.getoption("flight_recorder")
+  if flight_recorder is not None:
+    try:
+      flight_recorder = int(flight_recorder)
+    except ValueError:
+      raise Exception("command line option `--flight-recorder` should have integer value!")
+    test_module = request.module.__name__
+    test_name   = request.node.name.replace('-', '_').replace( '[', '_' ).replace( ']', '' )
+    opts['flight_recorder_file'] = f'{test_module}__{test_name}_last'
+  else:
+    flight_recorder = 0
+  opts['flight_recorder'] = flight_recorder
+  opts['flight_recorder_format'] = request.config.getoption("flight_recorder_format")
+
   return opts